@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : bm25_bm.py
+@Desc    : Benchmark incremental `DynamicBM25Retriever.add_nodes` against rebuilding `BM25Okapi` on every add, plus
+           query latency and reloading the persisted index. Rebuilds are quadratic, they only run up to `max_rebuild`.
+"""
+
+import random
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+import fire
+from llama_index.core import VectorStoreIndex
+from llama_index.core.schema import TextNode
+from rank_bm25 import BM25Okapi
+
+from metagpt.logs import logger
+from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever
+
+VOCAB = [f"term{i}" for i in range(20000)]
+
+
+def _nodes(size: int) -> list[TextNode]:
+    rnd = random.Random(0)
+    return [TextNode(text=" ".join(rnd.choices(VOCAB, k=rnd.randint(10, 60))), id_=str(i)) for i in range(size)]
+
+
+def _tokenizer(tokenizer: str):
+    return str.split if tokenizer == "split" else None  # None is the stopwords tokenizer of llama-index
+
+
+def main(sizes: str = "10000,100000,1000000", batch: int = 1000, max_rebuild: int = 10000, tokenizer: str = "split"):
+    sizes = [int(i) for i in str(sizes).split(",")] if isinstance(sizes, str) else list(sizes)
+    for size in sizes:
+        nodes = _nodes(size)
+        retriever = DynamicBM25Retriever(nodes=[], tokenizer=_tokenizer(tokenizer), index=MagicMock(VectorStoreIndex))
+
+        start = time.perf_counter()
+        for i in range(0, size, batch):
+            retriever.add_nodes(nodes[i : i + batch])
+        logger.info(f"{size} nodes, incremental add in batches of {batch}: {time.perf_counter() - start:.3f}s")
+
+        if size <= max_rebuild:
+            tokenize = _tokenizer(tokenizer) or retriever._tokenizer
+            start = time.perf_counter()
+            for i in range(batch, size + batch, batch):
+                BM25Okapi([tokenize(node.get_content()) for node in nodes[:i]])
+            logger.info(f"{size} nodes, rebuild on every add: {time.perf_counter() - start:.3f}s")
+
+        queries = [" ".join(random.choices(VOCAB, k=3)) for _ in range(100)]
+        start = time.perf_counter()
+        for query in queries:
+            retriever.retrieve(query)
+        logger.info(f"{size} nodes, query: {(time.perf_counter() - start) / len(queries) * 1000:.2f}ms")
+
+        with tempfile.TemporaryDirectory() as persist_dir:
+            retriever.persist(persist_dir)
+            start = time.perf_counter()
+            bm25_index = DynamicBM25Retriever.load_bm25_index(persist_dir)
+            DynamicBM25Retriever(nodes=nodes, tokenizer=_tokenizer(tokenizer), bm25_index=bm25_index)
+            logger.info(f"{size} nodes, reload persisted index: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : env_publish_bm.py
+@Desc    : Benchmark `Environment.publish_message` routing, publishing messages across many roles.
+"""
+
+import time
+
+import fire
+
+from metagpt.environment import Environment
+from metagpt.logs import logger
+from metagpt.roles import Role
+from metagpt.schema import Message
+
+
+def main(n_messages: int = 1_000_000, n_roles: int = 500, broadcast_every: int = 100, drain_every: int = 10_000):
+    env = Environment()
+    roles = [Role(name=f"role{i}", profile=f"profile{i}") for i in range(n_roles)]
+    env.add_roles(roles)
+
+    start = time.perf_counter()
+    for i in range(n_messages):
+        send_to = "<all>" if i % broadcast_every == 0 else f"role{i % n_roles}"
+        env.publish_message(Message(content=f"message {i}", send_to=send_to))
+        if (i + 1) % drain_every == 0:
+            for role in roles:
+                role.rc.msg_buffer.pop_all()
+    cost = time.perf_counter() - start
+
+    logger.info(
+        f"published {n_messages} messages across {n_roles} roles in {cost:.2f}s, "
+        f"{n_messages / cost:.0f} msg/s, history kept {len(env.history_buffer)} messages"
+    )
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : faiss_bm.py
+@Desc    : Benchmark recall@k, query latency, index size and load time of the faiss index types of FAISSVectorStore.
+           Index factories are separated by ";", e.g. --factories "Flat;HNSW32;IVF1024,PQ16".
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import fire
+import numpy as np
+from llama_index.core.vector_stores.types import VectorStoreQuery
+
+from metagpt.logs import logger
+from metagpt.rag.vector_stores import FAISSVectorStore
+
+
+def _vectors(num: int, dimensions: int, seed: int) -> np.ndarray:
+    # clustered data, as real embeddings are, uniform random data makes every index look bad
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((1000, dimensions), dtype="float32")
+    return centers[rng.integers(0, len(centers), num)] + 0.3 * rng.standard_normal((num, dimensions), dtype="float32")
+
+
+def main(
+    num: int = 1_000_000,
+    dimensions: int = 128,
+    queries: int = 200,
+    k: int = 10,
+    factories: str = "Flat;HNSW32;IVF1024,Flat;IVF1024,PQ16;IVF1024,SQ8",
+    nprobe: int = 16,
+):
+    data = _vectors(num, dimensions, seed=0)
+    query_vectors = _vectors(queries, dimensions, seed=1)
+    _, truth = faiss.knn(query_vectors, data, k)
+
+    for index_factory in factories.split(";"):
+        params = {"nprobe": nprobe} if "IVF" in index_factory else {}
+        train_size = min(num, 100_000)
+        store = FAISSVectorStore.from_factory(dimensions, index_factory, train_size=train_size, search_params=params)
+
+        start = time.perf_counter()
+        for i in range(0, num, 100_000):
+            store._add_vectors(data[i : i + 100_000])
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        hits = 0
+        for vector, expected in zip(query_vectors, truth):
+            ids = store.query(VectorStoreQuery(query_embedding=vector.tolist(), similarity_top_k=k)).ids
+            hits += len(set(map(int, ids)) & set(expected))
+        latency = (time.perf_counter() - start) / queries * 1000
+
+        with tempfile.TemporaryDirectory() as persist_dir:
+            persist_path = str(Path(persist_dir) / "default__vector_store.json")
+            store.persist(persist_path)
+            size = Path(persist_path).stat().st_size / 1024 / 1024
+            load = {}
+            for mmap in (False, True):
+                start = time.perf_counter()
+                FAISSVectorStore.from_persist_path(persist_path, mmap=mmap)
+                load[mmap] = time.perf_counter() - start
+
+        logger.info(
+            f"{index_factory}: recall@{k} {hits / queries / k:.3f}, query {latency:.2f}ms, build {build:.1f}s, "
+            f"size {size:.1f}MB, load {load[False]:.3f}s, mmap load {load[True]:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : memory_bm.py
+@Desc    : Benchmark `Memory.add_batch` / `Memory.find_news` as storage grows.
+           The cost per batch should stay flat instead of growing with the storage size.
+"""
+
+import time
+
+import fire
+
+from metagpt.logs import logger
+from metagpt.memory import Memory
+from metagpt.schema import Message
+
+
+def _new_batch(batch_size: int, offset: int) -> list[Message]:
+    return [Message(content=f"message {offset + i}", role=f"role{i % 10}") for i in range(batch_size)]
+
+
+def main(total: int = 100_000, batch_size: int = 100, report_every: int = 10_000):
+    memory = Memory()
+    for offset in range(0, total, batch_size):
+        batch = _new_batch(batch_size, offset)
+
+        start = time.perf_counter()
+        news = memory.find_news(batch)
+        memory.add_batch(news)
+        cost = time.perf_counter() - start
+
+        size = memory.count()
+        if size % report_every == 0:
+            logger.info(f"storage={size:>8} find_news+add_batch({batch_size}) cost={cost * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : rag_runner_bm.py
+@Desc    : Sweep retriever/ranker configs over the rag_bm datasets, report the retrieval and synthesis latency
+           percentiles, throughput and tokens per query as json. `--offline` uses MockLLM and FakeEmbedding, so the
+           retrieval latency can be tracked without any API key.
+"""
+
+import asyncio
+
+import fire
+from llama_index.core.llms import MockLLM
+
+from metagpt.const import DATA_PATH
+from metagpt.rag.benchmark import BenchmarkCase, RAGBenchmarkRunner
+from metagpt.rag.embeddings import FakeEmbedding
+from metagpt.rag.schema import (
+    BM25RetrieverConfig,
+    FAISSRetrieverConfig,
+    LLMRankerConfig,
+)
+
+
+def main(
+    datasets: str = "all",
+    concurrency: int = 8,
+    offline: bool = False,
+    output: str = str(DATA_PATH / "rag_bm_report.json"),
+):
+    dimensions = 256 if offline else None
+    faiss_config = FAISSRetrieverConfig(dimensions=dimensions) if dimensions else FAISSRetrieverConfig()
+    cases = [
+        BenchmarkCase(name="faiss", retriever_configs=[faiss_config]),
+        BenchmarkCase(name="bm25", retriever_configs=[BM25RetrieverConfig()]),
+        BenchmarkCase(name="faiss+bm25", retriever_configs=[faiss_config, BM25RetrieverConfig()]),
+    ]
+    if not offline:
+        cases.append(
+            BenchmarkCase(
+                name="faiss+bm25+llm_ranker",
+                retriever_configs=[faiss_config, BM25RetrieverConfig()],
+                ranker_configs=[LLMRankerConfig()],
+            )
+        )
+
+    kwargs = {}
+    if offline:
+        kwargs = dict(
+            llm=MockLLM(max_tokens=64),
+            embed_model=FakeEmbedding(embed_dim=dimensions),
+            token_counter=lambda text: len(text.split()),
+        )
+    runner = RAGBenchmarkRunner(cases, concurrency=concurrency, **kwargs)
+
+    report = asyncio.run(runner.run(datasets.split(",")))
+    report.log_summary()
+    report.save(output)
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : st_maze_bm.py
+@Desc    : Benchmark the load time and memory of the StanfordTown maze. The bundled map is tiled `scale` x `scale`
+           times to make a larger one, then loaded with the former per-tile dicts and with the array-backed Maze,
+           parsing the csv files and from its `.npz` cache.
+"""
+
+import gc
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import fire
+import numpy as np
+
+from metagpt.environment.stanford_town.maze import Maze
+from metagpt.ext.stanford_town.utils.const import MAZE_ASSET_PATH
+from metagpt.logs import logger
+from metagpt.utils.common import read_csv_to_list, read_json_file
+
+
+def _scaled_assets(asset_path: Path, scale: int) -> Path:
+    matrix_path = asset_path / "matrix"
+    shutil.copytree(MAZE_ASSET_PATH / "matrix", matrix_path)
+    meta_info = read_json_file(matrix_path / "maze_meta_info.json")
+    width, height = int(meta_info["maze_width"]), int(meta_info["maze_height"])
+    for maze_file in (matrix_path / "maze").glob("*.csv"):
+        row = read_csv_to_list(maze_file, header=False)[0]
+        grid = np.array(row).reshape(height, width)
+        maze_file.write_text(", ".join(np.tile(grid, (scale, scale)).ravel().tolist()))
+    meta_info.update(maze_width=str(width * scale), maze_height=str(height * scale))
+    (matrix_path / "maze_meta_info.json").write_text(str(meta_info).replace("'", '"'))
+    return asset_path
+
+
+def _former_load(asset_path: Path) -> tuple[list, dict]:
+    """The former `StanfordTownExtEnv._init_maze`: a dict per tile and a set of tuples per address"""
+    matrix_path = asset_path / "matrix"
+    meta_info = read_json_file(matrix_path / "maze_meta_info.json")
+    width, height = int(meta_info["maze_width"]), int(meta_info["maze_height"])
+    blocks = {
+        layer: {row[0]: row[-1] for row in read_csv_to_list(matrix_path / "special_blocks" / f"{layer}_blocks.csv")}
+        for layer in ("sector", "arena", "game_object", "spawning_location")
+    }
+    world = read_csv_to_list(matrix_path / "special_blocks" / "world_blocks.csv")[0][-1]
+    mazes = {}
+    for layer in ("collision", "sector", "arena", "game_object", "spawning_location"):
+        raw = read_csv_to_list(matrix_path / "maze" / f"{layer}_maze.csv")[0]
+        mazes[layer] = [raw[i : i + width] for i in range(0, len(raw), width)]
+
+    tiles, address_tiles = [], {}
+    for i in range(height):
+        row = []
+        for j in range(width):
+            tile = {"world": world}
+            for layer, names in blocks.items():
+                tile[layer] = names.get(mazes[layer][i][j], "")
+            tile["collision"] = mazes["collision"][i][j] != "0"
+            tile["events"] = set()
+            if tile["game_object"]:
+                object_name = f"{world}:{tile['sector']}:{tile['arena']}:{tile['game_object']}"
+                tile["events"].add((object_name, None, None, None))
+            addresses = []
+            if tile["sector"]:
+                addresses.append(f"{world}:{tile['sector']}")
+            if tile["arena"]:
+                addresses.append(f"{world}:{tile['sector']}:{tile['arena']}")
+            if tile["game_object"]:
+                addresses.append(f"{world}:{tile['sector']}:{tile['arena']}:{tile['game_object']}")
+            if tile["spawning_location"]:
+                addresses.append(f"<spawn_loc>{tile['spawning_location']}")
+            for address in addresses:
+                address_tiles.setdefault(address, set()).add((j, i))
+            row.append(tile)
+        tiles.append(row)
+    return tiles, address_tiles
+
+
+def _measure(name: str, load):
+    """Time a load, then trace the memory it holds in another run, as tracing slows the allocations down"""
+    gc.collect()
+    start = time.perf_counter()
+    result = load()
+    cost = time.perf_counter() - start
+    del result
+    gc.collect()
+
+    tracemalloc.start()
+    result = load()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    logger.info(f"{name}: {cost * 1000:.1f}ms, {memory / 2**20:.1f}MiB")
+    return result, cost, memory
+
+
+def main(scale: int = 4):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asset_path = _scaled_assets(Path(tmp_dir) / "assets", scale)
+        cache_dir = Path(tmp_dir) / "cache"
+
+        _, former_cost, former_memory = _measure("former dicts", lambda: _former_load(asset_path))
+        _measure("Maze from csv", lambda: Maze.load(asset_path))
+        maze, _ = Maze.load(asset_path, cache_dir)
+        _, cached_cost, cached_memory = _measure("Maze from npz cache", lambda: Maze.load(asset_path, cache_dir))
+
+        logger.info(
+            f"{maze.width}x{maze.height} tiles, {len(maze.address_tiles)} addresses: "
+            f"{former_cost / cached_cost:.0f}x faster, {former_memory / cached_memory:.0f}x less memory"
+        )
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
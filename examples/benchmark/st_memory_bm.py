@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : st_memory_bm.py
+@Desc    : Benchmark the persistence of the stanford town AgentMemory: the JSON files against the binary columnar
+           store, a full save, the save of a step adding a few nodes, and a load.
+"""
+
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import fire
+import numpy as np
+
+from metagpt.ext.stanford_town.memory.agent_memory import AgentMemory
+from metagpt.logs import logger
+from metagpt.utils.common import read_json_file
+
+
+def _add_nodes(memory: AgentMemory, start: int, stop: int, dim: int, rng: np.random.Generator):
+    start_time = datetime(2023, 2, 13)
+    for i in range(start, stop):
+        created = start_time + timedelta(minutes=i)
+        embedding_pair = (f"Isabella is doing {i}", rng.standard_normal(dim).tolist())
+        args = (created, None, "Isabella", "is", f"doing {i}", f"Isabella is doing {i}", {"Isabella", f"kw{i % 50}"})
+        if i % 3:
+            memory.add_event(*args, int(rng.integers(1, 10)), embedding_pair, [])
+        else:
+            memory.add_thought(*args, int(rng.integers(1, 10)), embedding_pair, None)
+
+
+def _timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def _size(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.iterdir())
+
+
+def _read_json(path: Path):
+    # the JSON load parses both files before building the nodes one by one, this is its lower bound
+    read_json_file(path.joinpath("embeddings.json"))
+    read_json_file(path.joinpath("nodes.json"))
+
+
+def _load(path: Path):
+    AgentMemory().set_mem_path(path)
+
+
+def main(nodes: int = 5000, dim: int = 1536, step_nodes: int = 10, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    memory = AgentMemory()
+    _add_nodes(memory, 0, nodes, dim, rng)
+
+    root = Path(tempfile.mkdtemp())
+    try:
+        json_path, store_path = root / "json", root / "store"
+        json_path.mkdir()
+        json_save = _timed(memory.save_json, json_path)
+        json_read = _timed(_read_json, json_path)
+        store_save = _timed(memory.save, store_path)
+        store_load = _timed(_load, store_path)
+
+        _add_nodes(memory, nodes, nodes + step_nodes, dim, rng)
+        json_step = _timed(memory.save_json, json_path)
+        store_step = _timed(memory.save, store_path)
+
+        logger.info(
+            f"{nodes} nodes of {dim}-dim embeddings, JSON {_size(json_path) / 2**20:.1f}MB, "
+            f"store {_size(store_path) / 2**20:.1f}MB"
+        )
+        logger.info(f"full save: JSON {json_save:.2f}s, store {store_save:.2f}s, {json_save / store_save:.0f}x faster")
+        logger.info(
+            f"save of a step adding {step_nodes} nodes: JSON {json_step:.2f}s, store {store_step * 1000:.1f}ms, "
+            f"{json_step / store_step:.0f}x faster"
+        )
+        logger.info(
+            f"load: JSON parsing alone {json_read:.2f}s, store {store_load:.2f}s, {json_read / store_load:.0f}x faster"
+        )
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
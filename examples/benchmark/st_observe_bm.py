@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : st_observe_bm.py
+@Desc    : Benchmark the perception of the stanford town personas on the bundled maze: the env part of
+           `STRole.observe` from random walkable tiles, with a region query and with the former per-tile queries.
+"""
+
+import math
+import random
+import time
+from operator import itemgetter
+
+import fire
+import numpy as np
+
+from metagpt.environment.stanford_town.env_space import EnvObsParams, EnvObsType
+from metagpt.environment.stanford_town.stanford_town_ext_env import StanfordTownExtEnv
+from metagpt.ext.stanford_town.utils.const import MAZE_ASSET_PATH
+from metagpt.logs import logger
+
+
+def _former_observe(env: StanfordTownExtEnv, tile, vision_r) -> list:
+    """The former `STRole.observe`: a `GET_TITLE` per nearby tile, then a `GET_TITLE` and `TILE_PATH` per tile"""
+    nearby_tiles = env.observe(EnvObsParams(obs_type=EnvObsType.TILE_NBR, coord=tile, vision_radius=vision_r))
+    for nearby_tile in nearby_tiles:
+        env.observe(EnvObsParams(obs_type=EnvObsType.GET_TITLE, coord=nearby_tile))
+    curr_arena_path = env.observe(EnvObsParams(obs_type=EnvObsType.TILE_PATH, coord=tile, level="arena"))
+    events, seen = [], set()
+    for nearby_tile in nearby_tiles:
+        details = env.observe(EnvObsParams(obs_type=EnvObsType.GET_TITLE, coord=nearby_tile))
+        if details["events"]:
+            arena_path = env.observe(EnvObsParams(obs_type=EnvObsType.TILE_PATH, coord=nearby_tile, level="arena"))
+            if arena_path == curr_arena_path:
+                dist = math.dist(nearby_tile, tile)
+                for event in details["events"]:
+                    if event not in seen:
+                        events.append((dist, event))
+                        seen.add(event)
+    return sorted(events, key=itemgetter(0))
+
+
+def _region_observe(env: StanfordTownExtEnv, tile, vision_r) -> list:
+    return env.observe(EnvObsParams(obs_type=EnvObsType.REGION, coord=tile, vision_radius=vision_r))["events"]
+
+
+def _measure(observe, env, tiles, vision_r) -> float:
+    start = time.perf_counter()
+    for tile in tiles:
+        observe(env, tile, vision_r)
+    return (time.perf_counter() - start) / len(tiles)
+
+
+def main(personas: int = 25, vision_radii: tuple = (4, 8, 16), seed: int = 0):
+    env = StanfordTownExtEnv(maze_asset_path=MAZE_ASSET_PATH)
+    walkable = np.argwhere(env.maze.collision == 0)
+    rnd = random.Random(seed)
+    tiles = [tuple(walkable[rnd.randrange(len(walkable))][::-1].tolist()) for _ in range(personas)]
+
+    for vision_r in vision_radii:
+        assert all(_former_observe(env, t, vision_r) == _region_observe(env, t, vision_r) for t in tiles)
+        former = _measure(_former_observe, env, tiles, vision_r)
+        region = _measure(_region_observe, env, tiles, vision_r)
+        logger.info(
+            f"vision_r {vision_r}: per-tile {former * 1000:.2f}ms, region {region * 1000:.2f}ms per persona, "
+            f"{former / region:.0f}x faster, {personas} personas {former * personas * 1000:.0f}ms -> "
+            f"{region * personas * 1000:.0f}ms per step"
+        )
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : st_path_bm.py
+@Desc    : Benchmark the pathfinding of the stanford town personas on the bundled maze: 25 personas repeatedly head to
+           random addresses, as `STRole.execute` does, with the env PathFinder and the former wavefront expansion.
+"""
+
+import random
+import time
+
+import fire
+import numpy as np
+
+from metagpt.environment.stanford_town.stanford_town_ext_env import StanfordTownExtEnv
+from metagpt.ext.stanford_town.utils.const import MAZE_ASSET_PATH
+from metagpt.logs import logger
+
+
+def _wavefront_path(collision_maze, start, targets, collision_block_char="32125") -> list:
+    """The former `path_finder`: a wavefront over the whole grid per step, capped at 150 steps, one search per
+    target tile"""
+    maze = [[1 if j == collision_block_char else 0 for j in row] for row in collision_maze]
+    best = None
+    for end in targets:
+        m = [[0] * len(row) for row in maze]
+        m[start[1]][start[0]] = 1
+        k = 0
+        while m[end[1]][end[0]] == 0 and k <= 150:
+            k += 1
+            for i in range(len(m)):
+                for j in range(len(m[i])):
+                    if m[i][j] == k:
+                        for ni, nj in ((i - 1, j), (i, j - 1), (i + 1, j), (i, j + 1)):
+                            if 0 <= ni < len(m) and 0 <= nj < len(m[i]) and m[ni][nj] == 0 and maze[ni][nj] == 0:
+                                m[ni][nj] = k + 1
+        length = m[end[1]][end[0]]
+        if length and (best is None or length < best):
+            best = length
+    return best or 0
+
+
+def main(personas: int = 25, moves: int = 40, legacy_moves: int = 10, seed: int = 0):
+    env = StanfordTownExtEnv(maze_asset_path=MAZE_ASSET_PATH)
+    rnd = random.Random(seed)
+
+    start = time.perf_counter()
+    path_finder = env.path_finder
+    logger.info(f"grid of {path_finder.walkable.shape} built in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    # the personas start on spawn locations and head to random addresses reachable from there
+    spawn = sorted(next(iter(tiles)) for address, tiles in env.address_tiles.items() if address.startswith("<spawn"))
+    reachable = path_finder.distance_field(spawn) >= 0
+    addresses = [
+        address
+        for address, tiles in sorted(env.address_tiles.items())
+        if any(reachable[y * path_finder.width + x] for x, y in tiles)
+    ]
+    positions = [spawn[i % len(spawn)] for i in range(personas)]
+    queries = []
+    for _ in range(moves):
+        for i in range(personas):
+            tiles = sorted(env.address_tiles[rnd.choice(addresses)])
+            queries.append((i, rnd.sample(tiles, min(4, len(tiles)))))
+
+    latencies, lengths = [], []
+    for i, targets in queries:
+        start = time.perf_counter()
+        path = env.find_path(positions[i], targets)
+        latencies.append(time.perf_counter() - start)
+        lengths.append(len(path))
+        positions[i] = path[-1]
+    logger.info(
+        f"{len(queries)} queries of {personas} personas: p50 {np.percentile(latencies, 50) * 1000:.2f}ms, "
+        f"p99 {np.percentile(latencies, 99) * 1000:.2f}ms, mean path {np.mean(lengths):.1f} tiles, "
+        f"{len(path_finder._fields)} distance fields cached"
+    )
+
+    # replay the first moves with the former wavefront, from the same starts
+    positions = [spawn[i % len(spawn)] for i in range(personas)]
+    legacy_latencies, mismatched = [], 0
+    for (i, targets), length in list(zip(queries, lengths))[:legacy_moves]:
+        start = time.perf_counter()
+        legacy_length = _wavefront_path(env.collision_maze, positions[i], targets)
+        legacy_latencies.append(time.perf_counter() - start)
+        mismatched += 0 < legacy_length != length and length <= 150
+        positions[i] = env.find_path(positions[i], targets)[-1]
+    if legacy_latencies:
+        logger.info(
+            f"wavefront: mean {np.mean(legacy_latencies) * 1000:.1f}ms, "
+            f"speedup {np.mean(legacy_latencies) / np.mean(latencies):.0f}x, "
+            f"path lengths differ in {mismatched}/{len(legacy_latencies)}"
+        )
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : st_retrieve_bm.py
+@Desc    : Benchmark the stanford town `agent_retrieve` over a large AgentMemory against the former per-node scoring
+           loop. The query embedding is random, so no API key is needed.
+"""
+
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import fire
+import numpy as np
+
+from metagpt.ext.stanford_town.memory.agent_memory import AgentMemory
+from metagpt.ext.stanford_town.memory.retrieve import agent_retrieve, new_agent_retrieve
+from metagpt.logs import logger
+
+START_TIME = datetime(2023, 2, 13)
+
+
+def _memory(size: int, dims: int) -> AgentMemory:
+    rng = np.random.default_rng(0)
+    memory = AgentMemory()
+    embeddings = rng.standard_normal((size, dims), dtype=np.float32)
+    hours = rng.integers(0, 24 * 365, size)
+    poignancy = rng.integers(1, 10, size)
+    for i in range(size):
+        description = f"Isabella is doing thing {i}"
+        memory.add_event(
+            START_TIME + timedelta(hours=int(hours[i])), None, "Isabella", "is", f"doing thing {i}", description,
+            {"thing"}, int(poignancy[i]), (description, embeddings[i].tolist()), [],
+        )  # fmt: skip
+    return memory
+
+
+def _loop_retrieve(memory, curr_time, memory_forget, query_embedding, nodes, topk):
+    """The per-node scoring replaced by the vectorized one"""
+
+    def normalize(values):
+        min_val, max_val = min(values), max(values)
+        if max_val == min_val:
+            return [0.5] * len(values)
+        return [(v - min_val) / (max_val - min_val) for v in values]
+
+    nodes = sorted(nodes, key=lambda node: node.last_accessed, reverse=True)
+    importance = normalize([node.poignancy for node in nodes])
+    recency = normalize([memory_forget ** (curr_time - node.created).days for node in nodes])
+    relevance = []
+    for node in nodes:
+        embedding = memory.embeddings[node.embedding_key]
+        norms = np.linalg.norm(embedding) * np.linalg.norm(query_embedding)
+        relevance.append(np.dot(embedding, query_embedding) / norms)
+    relevance = normalize(relevance)
+    scores = {node.memory_id: importance[i] + recency[i] + relevance[i] for i, node in enumerate(nodes)}
+    return [k for k, _ in sorted(scores.items(), key=lambda item: item[1], reverse=True)[:topk]]
+
+
+def main(size: int = 50_000, dims: int = 256, queries: int = 20, topk: int = 30, loop_queries: int = 2):
+    start = time.perf_counter()
+    memory = _memory(size, dims)
+    logger.info(f"built {size} memories of {dims} dims in {time.perf_counter() - start:.2f}s")
+
+    rng = np.random.default_rng(1)
+    query_embeddings = [rng.standard_normal(dims).tolist() for _ in range(queries)]
+    nodes = memory.event_list
+    curr_time = START_TIME + timedelta(days=400)
+
+    latencies, results = [], []
+    with patch("metagpt.ext.stanford_town.memory.retrieve.get_embedding", side_effect=query_embeddings):
+        for _ in range(queries):
+            start = time.perf_counter()
+            results.append(agent_retrieve(memory, curr_time, 0.99, "query", nodes, topk))
+            latencies.append(time.perf_counter() - start)
+    logger.info(
+        f"agent_retrieve: p50 {np.percentile(latencies, 50) * 1000:.1f}ms, "
+        f"p99 {np.percentile(latencies, 99) * 1000:.1f}ms"
+    )
+
+    role = SimpleNamespace(memory=memory, scratch=SimpleNamespace(curr_time=curr_time, recency_decay=0.99))
+    with patch("metagpt.ext.stanford_town.memory.retrieve.get_embedding", side_effect=query_embeddings):
+        start = time.perf_counter()
+        new_agent_retrieve(role, [f"focal point {i}" for i in range(queries)], topk)
+    logger.info(f"new_agent_retrieve: {(time.perf_counter() - start) / queries * 1000:.1f}ms per focal point")
+
+    loop_latencies, matched = [], 0
+    for i, query_embedding in enumerate(query_embeddings[:loop_queries]):
+        start = time.perf_counter()
+        loop_results = _loop_retrieve(memory, curr_time, 0.99, query_embedding, nodes, topk)
+        loop_latencies.append(time.perf_counter() - start)
+        matched += loop_results == results[i]
+    if loop_latencies:
+        logger.info(f"loop: mean {np.mean(loop_latencies) * 1000:.1f}ms, same top {topk} {matched}/{loop_queries}")
+        logger.info(f"speedup: {np.mean(loop_latencies) / np.mean(latencies):.1f}x")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : token_counter_bm.py
+@Desc    : Benchmark `generate_prompt_chunk` and batch token counting on a large research corpus.
+           Pass `--path` to chunk a real corpus, otherwise a synthetic one of `size_mb` is generated.
+"""
+
+import random
+import time
+from pathlib import Path
+
+import fire
+
+from metagpt.logs import logger
+from metagpt.utils.text import generate_prompt_chunk
+from metagpt.utils.token_counter import count_string_tokens, count_strings_tokens
+
+WORDS = "agent memory retrieval planning reflection language model prompt token context research paper".split()
+
+
+def _synthetic_corpus(size_mb: int) -> str:
+    rnd = random.Random(0)
+    lines, size = [], 0
+    while size < size_mb * 1024 * 1024:
+        line = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(5, 200))) + ".\n"
+        lines.append(line)
+        size += len(line)
+    return "".join(lines)
+
+
+def main(path: str = "", size_mb: int = 10, model_name: str = "gpt-3.5-turbo-16k"):
+    text = Path(path).read_text() if path else _synthetic_corpus(size_mb)
+    lines = text.splitlines(keepends=True)
+    logger.info(f"corpus: {len(text) / 1024 / 1024:.1f}MB, {len(lines)} lines")
+
+    start = time.perf_counter()
+    one_by_one = sum(count_string_tokens(i, model_name) for i in lines)
+    logger.info(f"count_string_tokens x {len(lines)}: {one_by_one} tokens, {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    batch = sum(count_strings_tokens(lines, model_name))
+    logger.info(f"count_strings_tokens: {batch} tokens, {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    chunks = list(generate_prompt_chunk(text, "### Reference\n{}", model_name, "System", 3000))
+    logger.info(f"generate_prompt_chunk: {len(chunks)} chunks, {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -19,10 +19,12 @@ from tenacity import retry, stop_after_attempt, wait_random_exponential
 from metagpt.actions.action_outcls_registry import register_action_outcls
 from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.llm import BaseLLM
-from metagpt.logs import logger
+from metagpt.logs import llm_stream_consumer, logger
+from metagpt.provider.llm_cache import cache_on_accept
 from metagpt.provider.postprocess.llm_output_postprocess import llm_output_postprocess
 from metagpt.utils.common import OutputParser, general_after_log
 from metagpt.utils.human_interaction import HumanInteraction
+from metagpt.utils.stream_output_parser import StreamOutputParser
 
 
 class ReviewMode(Enum):
@@ -417,19 +419,26 @@ class ActionNode:
         timeout=USE_CONFIG_TIMEOUT,
     ) -> (str, BaseModel):
         """Use ActionOutput to wrap the output of aask"""
-        content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
-        logger.debug(f"llm raw output:\n{content}")
         output_class = self.create_model_class(output_class_name, output_data_mapping)
-
-        if schema == "json":
-            parsed_data = llm_output_postprocess(
-                output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
-            )
-        else:  # using markdown parser
-            parsed_data = OutputParser.parse_data_with_mapping(content, output_data_mapping)
-
-        logger.debug(f"parsed_data:\n{parsed_data}")
-        instruct_content = output_class(**parsed_data)
+        async with cache_on_accept():  # a response failing to parse is not cached, so the retry asks the llm again
+            if schema == "json":
+                # validate the fields while streaming, abort the generation (and retry) as soon as it is unusable
+                parser = StreamOutputParser(output_class, tag=TAG)
+                with llm_stream_consumer(parser.feed):
+                    content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
+            else:
+                content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
+            logger.debug(f"llm raw output:\n{content}")
+
+            if schema == "json":
+                parsed_data = llm_output_postprocess(
+                    output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
+                )
+            else:  # using markdown parser
+                parsed_data = OutputParser.parse_data_with_mapping(content, output_data_mapping)
+
+            logger.debug(f"parsed_data:\n{parsed_data}")
+            instruct_content = output_class(**parsed_data)
         return content, instruct_content
 
     def get(self, key):
@@ -218,31 +218,30 @@ class WebBrowseAndSummarize(Action):
         if not urls:
             contents = [contents]
 
-        summaries = {}
+        # the chunks of all the pages, then the merges of the pages, are asked in one bounded pool each
+        page_prompts = [self._chunk_prompts(content.inner_text, query, system_text) for content in contents]
+        responses = iter(await self.llm.aask_many([p for prompts in page_prompts for p in prompts], [system_text]))
+        page_summaries = [[next(responses) for _ in prompts] for prompts in page_prompts]
+        page_summaries = [[i for i in summaries if i != "Not relevant."] for summaries in page_summaries]
+
+        to_merge = [idx for idx, summaries in enumerate(page_summaries) if len(summaries) > 1]
+        merge_prompts = [
+            WEB_BROWSE_AND_SUMMARIZE_PROMPT.format(query=query, content="\n".join(page_summaries[idx]))
+            for idx in to_merge
+        ]
+        merged = dict(zip(to_merge, await self.llm.aask_many(merge_prompts, [system_text])))
+        summaries = [
+            merged.get(idx, summaries[0] if summaries else None) for idx, summaries in enumerate(page_summaries)
+        ]
+        return dict(zip([url, *urls], summaries))
+
+    def _chunk_prompts(self, content: str, query: str, system_text: str) -> list[str]:
+        """The prompts summarizing the chunks of one page"""
         prompt_template = WEB_BROWSE_AND_SUMMARIZE_PROMPT.format(query=query, content="{}")
-        for u, content in zip([url, *urls], contents):
-            content = content.inner_text
-            chunk_summaries = []
-            for prompt in generate_prompt_chunk(content, prompt_template, self.llm.model, system_text, 4096):
-                logger.debug(prompt)
-                summary = await self._aask(prompt, [system_text])
-                if summary == "Not relevant.":
-                    continue
-                chunk_summaries.append(summary)
-
-            if not chunk_summaries:
-                summaries[u] = None
-                continue
-
-            if len(chunk_summaries) == 1:
-                summaries[u] = chunk_summaries[0]
-                continue
-
-            content = "\n".join(chunk_summaries)
-            prompt = WEB_BROWSE_AND_SUMMARIZE_PROMPT.format(query=query, content=content)
-            summary = await self._aask(prompt, [system_text])
-            summaries[u] = summary
-        return summaries
+        prompts = list(generate_prompt_chunk(content, prompt_template, self.llm.model, system_text, 4096))
+        for prompt in prompts:
+            logger.debug(prompt)
+        return prompts
 
 
 class ConductResearch(Action):
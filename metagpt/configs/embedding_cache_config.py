@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : embedding_cache_config.py
+"""
+from typing import Optional
+
+from metagpt.utils.yaml_model import YamlModel
+
+
+class EmbeddingCacheConfig(YamlModel):
+    """Config for the embedding cache, keyed by the hash of the model name and the text.
+
+    Examples:
+    ---------
+    path: "~/.metagpt/embedding_cache.db"
+    max_size: 100000
+    max_concurrency: 4
+    """
+
+    enabled: bool = True
+    max_size: int = 100000  # max embeddings kept in the sqlite database, least recently used are evicted
+    path: Optional[str] = None  # sqlite database file, default to CONFIG_ROOT / "embedding_cache.db"
+    max_concurrency: int = 4  # max in-flight batches when embedding the cache misses asynchronously
@@ -3,6 +3,7 @@ from typing import Optional
 
 from pydantic import field_validator
 
+from metagpt.configs.embedding_cache_config import EmbeddingCacheConfig
 from metagpt.utils.yaml_model import YamlModel
 
 
@@ -41,6 +42,7 @@ class EmbeddingConfig(YamlModel):
 
     model: Optional[str] = None
     embed_batch_size: Optional[int] = None
+    cache: Optional[EmbeddingCacheConfig] = None
 
     @field_validator("api_type", mode="before")
     @classmethod
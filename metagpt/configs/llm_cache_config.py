@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : llm_cache_config.py
+"""
+from enum import Enum
+from typing import Optional
+
+from metagpt.configs.redis_config import RedisConfig
+from metagpt.utils.yaml_model import YamlModel
+
+
+class LLMCacheBackend(Enum):
+    MEMORY = "memory"
+    SQLITE = "sqlite"
+    REDIS = "redis"
+
+
+class LLMCacheConfig(YamlModel):
+    """Config for the LLM response cache. An in-memory LRU layer always sits in front of the chosen backend.
+
+    Examples:
+    ---------
+    backend: "sqlite"
+    path: "~/.metagpt/llm_cache.db"
+    ttl: 86400
+
+    backend: "redis"
+    redis:
+      host: "YOUR_HOST"
+      port: 6379
+      password: "YOUR_PASSWORD"
+      db: "0"
+    """
+
+    enabled: bool = True
+    backend: LLMCacheBackend = LLMCacheBackend.MEMORY
+    max_size: int = 1024  # max entries kept by the in-memory layer and the sqlite backend
+    ttl: int = 0  # seconds, 0 means never expire
+    path: Optional[str] = None  # sqlite database file, default to CONFIG_ROOT / "llm_cache.db"
+    redis: Optional[RedisConfig] = None
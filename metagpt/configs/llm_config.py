@@ -10,6 +10,7 @@ from typing import Optional
 
 from pydantic import field_validator
 
+from metagpt.configs.llm_cache_config import LLMCacheConfig
 from metagpt.const import LLM_API_TIMEOUT
 from metagpt.utils.yaml_model import YamlModel
 
@@ -80,10 +81,22 @@ class LLMConfig(YamlModel):
 
     # For Network
     proxy: Optional[str] = None
+    # limits of the http client pool shared by the same endpoint, None keeps the defaults of the sdk / http library
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = None
+    keepalive_expiry: Optional[float] = None  # seconds an idle connection is kept for reuse
 
     # Cost Control
     calc_usage: bool = True
 
+    # Admission Control, shared by all LLM instances of the same provider
+    max_concurrency: int = 0  # max in-flight requests, 0 means unlimited
+    rpm: int = 0  # max requests per minute, 0 means unlimited
+    tpm: int = 0  # max prompt tokens per minute, 0 means unlimited
+
+    # Response Cache, opt-in
+    cache: Optional[LLMCacheConfig] = None
+
     @field_validator("api_key")
     @classmethod
     def check_llm_key(cls, v):
@@ -128,6 +128,9 @@ REDIS_KEY = "REDIS_KEY"
 # Message id
 IGNORED_MESSAGE_ID = "0"
 
+# Environment
+ENV_HISTORY_SIZE = 1000  # max number of messages kept in `Environment.history`
+
 # Class Relationship
 GENERALIZATION = "Generalize"
 COMPOSITION = "Composite"
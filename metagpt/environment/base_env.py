@@ -3,14 +3,25 @@
 # @Desc   : base env of executing environment
 
 import asyncio
+import time
 from abc import abstractmethod
+from collections import deque
 from enum import Enum
 from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set, Union
 
 from gymnasium import spaces
 from gymnasium.core import ActType, ObsType
-from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SerializeAsAny,
+    computed_field,
+    model_validator,
+)
 
+from metagpt.const import ENV_HISTORY_SIZE, MESSAGE_ROUTE_TO_ALL
 from metagpt.context import Context
 from metagpt.environment.api.env_api import (
     EnvAPIAbstract,
@@ -20,7 +31,7 @@ from metagpt.environment.api.env_api import (
 from metagpt.environment.base_env_space import BaseEnvAction, BaseEnvObsParams
 from metagpt.logs import logger
 from metagpt.schema import Message
-from metagpt.utils.common import get_function_schema, is_coroutine_func, is_send_to
+from metagpt.utils.common import get_function_schema, is_coroutine_func
 
 if TYPE_CHECKING:
     from metagpt.roles.role import Role  # noqa: F401
@@ -131,9 +142,33 @@ class Environment(ExtEnv):
     desc: str = Field(default="")  # 环境描述
     roles: dict[str, SerializeAsAny["Role"]] = Field(default_factory=dict, validate_default=True)
     member_addrs: Dict["Role", Set] = Field(default_factory=dict, exclude=True)
-    history: str = ""  # For debug
+    history_size: int = ENV_HISTORY_SIZE  # max number of messages kept in history, ring buffer
+    history_buffer: deque = Field(default_factory=deque, exclude=True)  # For debug
+    round_costs: deque = Field(default_factory=lambda: deque(maxlen=ENV_HISTORY_SIZE), exclude=True)  # seconds/round
     context: Context = Field(default_factory=Context, exclude=True)
 
+    _addr_index: Dict[str, Dict["Role", None]] = PrivateAttr(default_factory=dict)  # address -> roles, ordered set
+
+    @model_validator(mode="before")
+    @classmethod
+    def load_history(cls, data: Any) -> Any:
+        if isinstance(data, dict) and "history" in data:
+            data = dict(data)
+            history = data.pop("history")
+            data["history_buffer"] = [history] if history else []
+        return data
+
+    @model_validator(mode="after")
+    def bound_history(self):
+        self.history_buffer = deque(self.history_buffer, maxlen=self.history_size)
+        return self
+
+    @computed_field
+    @property
+    def history(self) -> str:
+        """The latest `history_size` messages, for debug"""
+        return "".join(self.history_buffer)
+
     def reset(
         self,
         *,
@@ -182,30 +217,37 @@ class Environment(ExtEnv):
         in RFC 113.
         """
         logger.debug(f"publish_message: {message.dump()}")
-        found = False
         # According to the routing feature plan in Chapter 2.2.3.2 of RFC 113
-        for role, addrs in self.member_addrs.items():
-            if is_send_to(message, addrs):
-                role.put_message(message)
-                found = True
-        if not found:
+        if MESSAGE_ROUTE_TO_ALL in message.send_to:
+            recipients = self.member_addrs.keys()
+        else:
+            recipients = {}
+            for addr in message.send_to:
+                recipients.update(self._addr_index.get(addr, {}))
+        for role in recipients:
+            role.put_message(message)
+        if not recipients:
             logger.warning(f"Message no recipients: {message.dump()}")
-        self.history += f"\n{message}"  # For debug
+        self.history_buffer.append(f"\n{message}")  # For debug
 
         return True
 
     async def run(self, k=1):
         """处理一次所有信息的运行
-        Process all Role runs at once
+        Process all Role runs at once, roles without pending news or todo are skipped
         """
         for _ in range(k):
+            start = time.perf_counter()
             futures = []
             for role in self.roles.values():
+                if not role.is_awake:
+                    continue
                 future = role.run()
                 futures.append(future)
 
             await asyncio.gather(*futures)
-            logger.debug(f"is idle: {self.is_idle}")
+            self.round_costs.append(time.perf_counter() - start)
+            logger.debug(f"is idle: {self.is_idle}, awake roles: {len(futures)}, cost: {self.round_costs[-1]:.3f}s")
 
     def get_roles(self) -> dict[str, "Role"]:
         """获得环境内的所有角色
@@ -235,8 +277,12 @@ class Environment(ExtEnv):
         return self.member_addrs.get(obj, {})
 
     def set_addresses(self, obj, addresses):
-        """Set the addresses of the object"""
+        """Set the addresses of the object, while updating the address routing index"""
+        for addr in self.member_addrs.get(obj, set()):
+            self._addr_index.get(addr, {}).pop(obj, None)
         self.member_addrs[obj] = addresses
+        for addr in addresses:
+            self._addr_index.setdefault(addr, {})[obj] = None
 
     def archive(self, auto_archive=True):
         if auto_archive and self.context.git_repo:
@@ -55,6 +55,9 @@ class EnvObsType(BaseEnvObsType):
     GET_TITLE = 1  # get the tile detail dictionary with given tile coord
     TILE_PATH = 2  # get the tile address with given tile coord
     TILE_NBR = 3  # get the neighbors of given tile coord and its vision radius
+    PATH = 4  # get the shortest path from given tile coord to the nearest of the target tiles
+    REGION = 5  # get the spaces and the same-arena events around given tile coord within its vision radius
+    ADDRESS_PATH = 6  # get the shortest path from given tile coord to the nearest tile of the address
 
 
 class EnvObsParams(BaseEnvObsParams):
@@ -68,6 +71,8 @@ class EnvObsParams(BaseEnvObsParams):
     )
     level: str = Field(default="", description="different level of title")
     vision_radius: int = Field(default=0, description="the vision radius of current tile")
+    targets: list[tuple[int, int]] = Field(default_factory=list, description="the target tile coords of a path")
+    address: str = Field(default="", description="the target string address of a path")
 
     @field_validator("coord", mode="before")
     @classmethod
@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : array-backed maze of the StanfordTown env, refs to `generative_agents maze.py`
+
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+from metagpt.logs import logger
+
+MAZE_CACHE_VERSION = 1
+LAYERS = ("sector", "arena", "game_object", "spawning_location")
+_BLOCK_FILES = {
+    "sector": "sector_blocks.csv",
+    "arena": "arena_blocks.csv",
+    "game_object": "game_object_blocks.csv",
+    "spawning_location": "spawning_location_blocks.csv",
+}
+_MAZE_FILES = {
+    "sector": "sector_maze.csv",
+    "arena": "arena_maze.csv",
+    "game_object": "game_object_maze.csv",
+    "spawning_location": "spawning_location_maze.csv",
+    "collision": "collision_maze.csv",
+}
+
+Tile = tuple[int, int]  # (x, y)
+Event = tuple[str, Optional[str], Optional[str], Optional[str]]
+
+
+class AddressTiles(Mapping):
+    """Read-only `address -> set of (x, y) tiles`, the tiles of an address are kept as flat indices and turned into a
+    set when looked up."""
+
+    def __init__(self, width: int, index: dict[str, np.ndarray]):
+        self.width = width
+        self._index = index
+
+    def __getitem__(self, address: str) -> set[Tile]:
+        ys, xs = np.divmod(self._index[address], self.width)
+        return set(zip(xs.tolist(), ys.tolist()))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, address: object) -> bool:
+        return address in self._index
+
+
+class TileRow:
+    """A row of the maze, `maze_tiles[y][x]` gives the tile details dict as the former list of dicts did"""
+
+    def __init__(self, maze: "Maze", y: int):
+        self.maze = maze
+        self.y = y
+
+    def __getitem__(self, x: int) -> dict:
+        return self.maze.tile_details((x, self.y))
+
+    def __len__(self) -> int:
+        return self.maze.width
+
+
+class Maze:
+    """The layers of the maze as integer arrays of shape (height, width).
+
+    The sector/arena/game_object/spawning_location layers hold codes into `names`, the interned block names, 0 being
+    the empty name. `collision` holds the raw collision block ids, 0 if walkable. Only the tiles with events are kept
+    in `events`.
+    """
+
+    def __init__(self, world: str, names: list[str], layers: dict[str, np.ndarray], collision: np.ndarray):
+        self.world = sys.intern(world)
+        self.names = [sys.intern(name) for name in names]
+        self.sector = layers["sector"]
+        self.arena = layers["arena"]
+        self.game_object = layers["game_object"]
+        self.spawning_location = layers["spawning_location"]
+        self.collision = collision
+        self.height, self.width = collision.shape
+
+        self._addresses: dict[tuple, str] = {}  # codes -> interned address
+        self.address_tiles = AddressTiles(self.width, self._build_address_index())
+
+        # each game object occupies an event in its tiles, `event_mask` marks the tiles with events
+        self.events: dict[Tile, set[Event]] = {}
+        self.event_mask = self.game_object != 0
+        for y, x in np.argwhere(self.event_mask).tolist():
+            codes = (int(self.sector[y, x]), int(self.arena[y, x]), int(self.game_object[y, x]))
+            self.events[(x, y)] = {(self._address(codes), None, None, None)}
+
+    @property
+    def tiles(self) -> list[TileRow]:
+        return [TileRow(self, y) for y in range(self.height)]
+
+    def _address(self, codes: tuple) -> str:
+        """The interned address of the sector, arena and game object codes, as many as given"""
+        address = self._addresses.get(codes)
+        if address is None:
+            address = sys.intern(":".join([self.world] + [self.names[code] for code in codes]))
+            self._addresses[codes] = address
+        return address
+
+    def _build_address_index(self) -> dict[str, np.ndarray]:
+        """Group the tiles by address. Addresses are ordered by their first tile in row-major order, then by level."""
+        sector, arena, game_object = self.sector.ravel(), self.arena.ravel(), self.game_object.ravel()
+        spawning_location = self.spawning_location.ravel()
+        levels = [
+            (sector != 0, [sector]),
+            (arena != 0, [sector, arena]),
+            (game_object != 0, [sector, arena, game_object]),
+            (spawning_location != 0, [spawning_location]),
+        ]
+
+        base = len(self.names)
+        groups = []  # (first flat index, level, address, flat indices)
+        for level, (present, layers) in enumerate(levels):
+            flat = np.flatnonzero(present)
+            if not len(flat):
+                continue
+            # pack the codes of a tile into one integer key, so the tiles are grouped by a 1-d unique
+            keys = np.zeros(len(flat), dtype=np.int64)
+            for layer in layers:
+                keys = keys * base + layer[flat]
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.flatnonzero(np.diff(inverse[order])) + 1
+            for key, tiles in zip(unique_keys.tolist(), np.split(flat[order], bounds)):
+                codes = []
+                for _ in layers:
+                    key, code = divmod(key, base)
+                    codes.insert(0, code)
+                if level == 3:
+                    address = sys.intern(f"<spawn_loc>{self.names[codes[0]]}")
+                else:
+                    address = self._address(tuple(codes))
+                groups.append((int(tiles[0]), level, address, tiles))
+
+        index = {}
+        for _, _, address, tiles in sorted(groups, key=lambda group: group[:2]):
+            # the same address from different codes can not happen with distinct names, merge to be safe
+            index[address] = np.union1d(index[address], tiles) if address in index else tiles
+        return index
+
+    def tile_details(self, tile: Tile) -> dict:
+        x, y = int(tile[0]), int(tile[1])
+        return {
+            "world": self.world,
+            "sector": self.names[self.sector[y, x]],
+            "arena": self.names[self.arena[y, x]],
+            "game_object": self.names[self.game_object[y, x]],
+            "spawning_location": self.names[self.spawning_location[y, x]],
+            "collision": bool(self.collision[y, x]),
+            "events": self.tile_events(tile),
+        }
+
+    def tile_events(self, tile: Tile) -> set[Event]:
+        """The events of the tile, a new empty set if it has none"""
+        return self.events.get((int(tile[0]), int(tile[1])), set())
+
+    def add_event(self, event: Event, tile: Tile):
+        x, y = int(tile[0]), int(tile[1])
+        self.events.setdefault((x, y), set()).add(event)
+        self.event_mask[y, x] = True
+
+    def remove_events(self, tile: Tile, match) -> list[Event]:
+        """Remove the events of the tile for which `match(event)` is true, return them"""
+        key = (int(tile[0]), int(tile[1]))
+        events = self.events.get(key)
+        if not events:
+            return []
+        removed = [event for event in events if match(event)]
+        events.difference_update(removed)
+        if not events:
+            del self.events[key]
+            self.event_mask[key[1], key[0]] = False
+        return removed
+
+    def window(self, tile: Tile, vision_r: int) -> tuple[slice, slice]:
+        """The (rows, columns) slices of the square around the tile within the vision radius. As the former
+        `get_nearby_tiles`, the last row and column of the maze are left out."""
+        x, y = int(tile[0]), int(tile[1])
+        columns = slice(max(x - vision_r, 0), min(x + vision_r + 1, self.width - 1))
+        rows = slice(max(y - vision_r, 0), min(y + vision_r + 1, self.height - 1))
+        return rows, columns
+
+    def observe_region(self, tile: Tile, vision_r: int) -> dict:
+        """Observe the square around the tile within the vision radius in one go.
+
+        Returns a dict of
+          "spaces": the distinct world/sector/arena/game_object of the tiles, by first tile in the column-major order
+            of `get_nearby_tiles`.
+          "arena_path": the arena address of the tile.
+          "events": (distance, event) of the events in the same arena as the tile, closest first. An event spanning
+            several tiles is kept once, at the distance of its first tile in the column-major order.
+        """
+        x, y = int(tile[0]), int(tile[1])
+        rows, columns = self.window(tile, vision_r)
+        # transpose the window so that raveling it follows the column-major order of the tiles
+        sector, arena = self.sector[rows, columns].T, self.arena[rows, columns].T
+        game_object = self.game_object[rows, columns].T
+
+        base = len(self.names)
+        keys = (sector.astype(np.int64) * base + arena) * base + game_object
+        unique_keys, first = np.unique(keys.ravel(), return_index=True)
+        spaces = []
+        for key in unique_keys[np.argsort(first)].tolist():
+            key, game_object_code = divmod(key, base)
+            sector_code, arena_code = divmod(key, base)
+            spaces.append(
+                {
+                    "world": self.world,
+                    "sector": self.names[sector_code],
+                    "arena": self.names[arena_code],
+                    "game_object": self.names[game_object_code],
+                }
+            )
+
+        same_arena = (sector == self.sector[y, x]) & (arena == self.arena[y, x])
+        xs, ys = np.nonzero(self.event_mask[rows, columns].T & same_arena)
+        xs, ys = xs + columns.start, ys + rows.start
+        distances = np.hypot(xs - x, ys - y)
+        seen, events, event_distances = set(), [], []
+        for tile_x, tile_y, distance in zip(xs.tolist(), ys.tolist(), distances.tolist()):
+            for event in self.events[(tile_x, tile_y)]:
+                if event not in seen:
+                    seen.add(event)
+                    events.append(event)
+                    event_distances.append(distance)
+        order = np.argsort(event_distances, kind="stable").tolist()
+
+        arena_path = self._address((int(self.sector[y, x]), int(self.arena[y, x])))
+        return {"spaces": spaces, "arena_path": arena_path, "events": [(event_distances[i], events[i]) for i in order]}
+
+    @classmethod
+    def load(cls, maze_asset_path: Path, cache_dir: Optional[Path] = None) -> tuple["Maze", dict]:
+        """Load the maze and its meta info from the `matrix` folder of the assets.
+
+        The parsed layers are cached in `cache_dir` as a `.npz` named by the hash of the asset files, a later load of
+        the same assets reads it instead of parsing the csv files.
+        """
+        matrix_path = Path(maze_asset_path).joinpath("matrix")
+        files = {"meta": matrix_path.joinpath("maze_meta_info.json")}
+        files["world"] = matrix_path.joinpath("special_blocks", "world_blocks.csv")
+        files.update({f"{k}_blocks": matrix_path.joinpath("special_blocks", v) for k, v in _BLOCK_FILES.items()})
+        files.update({f"{k}_maze": matrix_path.joinpath("maze", v) for k, v in _MAZE_FILES.items()})
+        contents = {key: path.read_bytes() for key, path in files.items()}
+        meta_info = json.loads(contents["meta"])
+
+        digest = hashlib.sha256(str(MAZE_CACHE_VERSION).encode())
+        for key in sorted(contents):
+            digest.update(key.encode() + b"\0" + contents[key])
+        cache_file = Path(cache_dir).joinpath(f"maze_{digest.hexdigest()[:32]}.npz") if cache_dir else None
+
+        maze = cls._load_cache(cache_file) if cache_file and cache_file.exists() else None
+        if maze is None:
+            maze = cls._parse(contents, int(meta_info["maze_width"]))
+            if cache_file:
+                maze._save_cache(cache_file)
+        return maze, meta_info
+
+    @classmethod
+    def _parse(cls, contents: dict[str, bytes], width: int) -> "Maze":
+        world = _read_blocks(contents["world"])[0][-1]
+        names = [""]
+        name_codes = {"": 0}
+        layers = {}
+        for layer in LAYERS:
+            raw = _read_matrix(contents[f"{layer}_maze"], width)
+            block_ids, inverse = np.unique(raw, return_inverse=True)
+            block_codes = {}
+            for row in _read_blocks(contents[f"{layer}_blocks"]):
+                name = row[-1]
+                if name not in name_codes:
+                    name_codes[name] = len(names)
+                    names.append(name)
+                block_codes[int(row[0])] = name_codes[name]
+            codes = np.array([block_codes.get(int(block_id), 0) for block_id in block_ids], dtype=np.int32)
+            layers[layer] = codes[inverse.ravel()].reshape(raw.shape)
+
+        dtype = np.min_scalar_type(len(names))
+        layers = {layer: codes.astype(dtype) for layer, codes in layers.items()}
+        collision = _read_matrix(contents["collision_maze"], width).astype(np.int32)
+        return cls(world, names, layers, collision)
+
+    @classmethod
+    def _load_cache(cls, cache_file: Path) -> Optional["Maze"]:
+        try:
+            with np.load(cache_file, allow_pickle=False) as data:
+                layers = {layer: data[layer] for layer in LAYERS}
+                return cls(str(data["world"]), data["names"].tolist(), layers, data["collision"])
+        except Exception as e:
+            logger.warning(f"failed to load maze cache {cache_file}, parse the assets instead: {e}")
+            return None
+
+    def _save_cache(self, cache_file: Path):
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_name(f"{cache_file.stem}.{os.getpid()}.tmp.npz")
+            np.savez(
+                tmp_file,
+                world=np.array(self.world),
+                names=np.array(self.names),
+                collision=self.collision,
+                **{layer: getattr(self, layer) for layer in LAYERS},
+            )
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning(f"failed to save maze cache {cache_file}: {e}")
+
+
+def _read_blocks(content: bytes) -> list[list[str]]:
+    """Rows of a special blocks csv, e.g. ["25331", "Double Studio", "Studio", "Bedroom 2", "Painting"]"""
+    rows = csv.reader(io.StringIO(content.decode("utf-8")), delimiter=",")
+    return [[i.strip() for i in row] for row in rows if row]
+
+
+def _read_matrix(content: bytes, width: int) -> np.ndarray:
+    """A maze csv is a single row of width x height block ids exported from the Tiled map, reshaped to rows here"""
+    first_row = content.decode("utf-8").split("\n", 1)[0]
+    return np.array(first_row.split(","), dtype=np.int64).reshape(-1, width)
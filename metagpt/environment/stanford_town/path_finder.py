@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : shortest paths on the collision grid of the StanfordTown maze
+
+from collections import OrderedDict
+from typing import Iterable
+
+import numpy as np
+
+Tile = tuple[int, int]  # (x, y)
+
+
+class PathFinder:
+    """Breadth-first search over the walkable tiles of the maze.
+
+    The collision maze is turned into an adjacency array once. A query runs a multi-source BFS from the target tiles,
+    the resulting distance field gives the distance from every tile to the nearest target, so a path from any start
+    is found by walking down the field. Fields are cached by target set, the personas heading to the same address reuse
+    them.
+    """
+
+    def __init__(self, walkable: np.ndarray, cache_size: int = 256):
+        self.walkable = np.asarray(walkable, dtype=bool)
+        self.height, self.width = self.walkable.shape
+        self.cache_size = cache_size
+        self._fields: OrderedDict[frozenset[Tile], np.ndarray] = OrderedDict()
+
+        # the walkable 4-neighbours of each tile by flat index `y * width + x`, -1 if none; ordered up, left, down,
+        # right, which decides the path taken among the shortest ones
+        ys, xs = np.divmod(np.arange(self.walkable.size), self.width)
+        neighbors = np.full((self.walkable.size, 4), -1, dtype=np.int64)
+        for k, (dy, dx) in enumerate(((-1, 0), (0, -1), (1, 0), (0, 1))):
+            ny, nx = ys + dy, xs + dx
+            inside = (ny >= 0) & (ny < self.height) & (nx >= 0) & (nx < self.width)
+            flat = np.where(inside, ny * self.width + nx, 0)
+            neighbors[:, k] = np.where(inside & self.walkable.ravel()[flat], flat, -1)
+        self.neighbors = neighbors
+
+    @classmethod
+    def from_collision_maze(cls, collision_maze: list[list[str]], collision_block_char: str) -> "PathFinder":
+        return cls(np.asarray(collision_maze) != collision_block_char)
+
+    def _flat(self, tile: Tile) -> int:
+        return tile[1] * self.width + tile[0]
+
+    def _tile(self, flat: int) -> Tile:
+        y, x = divmod(int(flat), self.width)
+        return x, y
+
+    def _inside(self, tile: Tile) -> bool:
+        return 0 <= tile[0] < self.width and 0 <= tile[1] < self.height
+
+    def distance_field(self, targets: Iterable[Tile]) -> np.ndarray:
+        """Steps from each tile to the nearest walkable target by flat index, -1 if unreachable"""
+        key = frozenset((int(tile[0]), int(tile[1])) for tile in targets)
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            return field
+
+        field = np.full(self.walkable.size, -1, dtype=np.int32)
+        frontier = np.array([self._flat(tile) for tile in key if self._inside(tile)], dtype=np.int64)
+        frontier = frontier[self.walkable.ravel()[frontier]] if len(frontier) else frontier
+        distance = 0
+        while len(frontier):
+            field[frontier] = distance
+            distance += 1
+            candidates = self.neighbors[frontier].ravel()
+            candidates = candidates[candidates >= 0]
+            frontier = np.unique(candidates[field[candidates] < 0])
+
+        self._fields[key] = field
+        if len(self._fields) > self.cache_size:
+            self._fields.popitem(last=False)
+        return field
+
+    def find_path(self, start: Tile, targets: Iterable[Tile]) -> list[Tile]:
+        """The shortest path from start to the nearest of targets, both ends included. `[start]` if no target is
+        reachable.
+        """
+        field = self.distance_field(targets)
+        start = (int(start[0]), int(start[1]))
+        if not self._inside(start):
+            return [start]
+
+        path = [start]
+        current = self._flat(start)
+        distance = field[current]
+        if distance < 0 and not self.walkable.flat[current]:
+            # leaving a blocked tile, as a persona may be placed on one
+            reachable = [n for n in self.neighbors[current] if n >= 0 and field[n] >= 0]
+            if reachable:
+                current = min(reachable, key=lambda n: field[n])
+                distance = field[current]
+                path.append(self._tile(current))
+        if distance < 0:
+            return [start]
+
+        while distance > 0:
+            for neighbor in self.neighbors[current]:
+                if neighbor >= 0 and field[neighbor] == distance - 1:
+                    current = neighbor
+                    break
+            distance -= 1
+            path.append(self._tile(current))
+        return path
+
+    def clear_cache(self):
+        self._fields.clear()
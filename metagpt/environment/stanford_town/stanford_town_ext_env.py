@@ -7,8 +7,9 @@ import math
 from pathlib import Path
 from typing import Any, Optional
 
-from pydantic import ConfigDict, Field, model_validator
+from pydantic import ConfigDict, Field, PrivateAttr, model_validator
 
+from metagpt.const import CONFIG_ROOT
 from metagpt.environment.base_env import ExtEnv, mark_as_readable, mark_as_writeable
 from metagpt.environment.stanford_town.env_space import (
     EnvAction,
@@ -19,7 +20,8 @@ from metagpt.environment.stanford_town.env_space import (
     get_action_space,
     get_observation_space,
 )
-from metagpt.utils.common import read_csv_to_list, read_json_file
+from metagpt.environment.stanford_town.maze import AddressTiles, Maze, TileRow
+from metagpt.environment.stanford_town.path_finder import PathFinder
 
 
 class StanfordTownExtEnv(ExtEnv):
@@ -32,9 +34,14 @@ class StanfordTownExtEnv(ExtEnv):
     special_constraint: str = Field(
         default="", description="a string description of any relevant special constraints " "the world might have"
     )
-    tiles: list[list[dict]] = Field(default=[])
-    address_tiles: dict[str, set] = Field(default=dict())
-    collision_maze: list[list] = Field(default=[])
+    maze_cache_dir: Optional[Path] = Field(
+        default=CONFIG_ROOT / "maze_cache",
+        description="the dir of the parsed maze assets cache, default ~/.metagpt/maze_cache, None to disable",
+    )
+    maze: Optional[Maze] = Field(default=None, exclude=True, description="the array-backed maze")
+
+    _collision_maze: Optional[list[list[str]]] = PrivateAttr(default=None)
+    _path_finder: Optional[PathFinder] = PrivateAttr(default=None)
 
     @model_validator(mode="before")
     @classmethod
@@ -43,174 +50,46 @@ class StanfordTownExtEnv(ExtEnv):
         assert maze_asset_path
         maze_asset_path = Path(maze_asset_path)
 
-        maze_matrix_path = maze_asset_path.joinpath("matrix")
-        meta_info = read_json_file(maze_matrix_path.joinpath("maze_meta_info.json"))
-
-        maze_width = int(meta_info["maze_width"])
-        maze_height = int(meta_info["maze_height"])
-        values["maze_width"] = maze_width
-        values["maze_height"] = maze_height
+        # The special blocks (the colored blocks in the Tiled map) name the sector, arena, game object and spawning
+        # location layers of the maze, e.g, "25331, Double Studio, Studio, Bedroom 2, Painting". The layers are kept
+        # as integer coded arrays, see `Maze`.
+        maze, meta_info = Maze.load(maze_asset_path, values.get("maze_cache_dir", CONFIG_ROOT / "maze_cache"))
+        values["maze"] = maze
+        values["maze_width"] = maze.width
+        values["maze_height"] = maze.height
         values["sq_tile_size"] = int(meta_info["sq_tile_size"])
         values["special_constraint"] = meta_info["special_constraint"]
 
-        # READING IN SPECIAL BLOCKS
-        # Special blocks are those that are colored in the Tiled map.
-        # Here is an example row for the arena block file:
-        # e.g, "25331, Double Studio, Studio, Bedroom 2, Painting"
-
-        blocks_folder = maze_matrix_path.joinpath("special_blocks")
-
-        _wb = blocks_folder.joinpath("world_blocks.csv")
-        wb_rows = read_csv_to_list(_wb, header=False)
-        wb = wb_rows[0][-1]
-
-        _sb = blocks_folder.joinpath("sector_blocks.csv")
-        sb_rows = read_csv_to_list(_sb, header=False)
-        sb_dict = dict()
-        for i in sb_rows:
-            sb_dict[i[0]] = i[-1]
-
-        _ab = blocks_folder.joinpath("arena_blocks.csv")
-        ab_rows = read_csv_to_list(_ab, header=False)
-        ab_dict = dict()
-        for i in ab_rows:
-            ab_dict[i[0]] = i[-1]
-
-        _gob = blocks_folder.joinpath("game_object_blocks.csv")
-        gob_rows = read_csv_to_list(_gob, header=False)
-        gob_dict = dict()
-        for i in gob_rows:
-            gob_dict[i[0]] = i[-1]
-
-        _slb = blocks_folder.joinpath("spawning_location_blocks.csv")
-        slb_rows = read_csv_to_list(_slb, header=False)
-        slb_dict = dict()
-        for i in slb_rows:
-            slb_dict[i[0]] = i[-1]
-
-        # [SECTION 3] Reading in the matrices
-        # This is your typical two dimensional matrices. It's made up of 0s and
-        # the number that represents the color block from the blocks folder.
-        maze_folder = maze_matrix_path.joinpath("maze")
-
-        _cm = maze_folder.joinpath("collision_maze.csv")
-        collision_maze_raw = read_csv_to_list(_cm, header=False)[0]
-        _sm = maze_folder.joinpath("sector_maze.csv")
-        sector_maze_raw = read_csv_to_list(_sm, header=False)[0]
-        _am = maze_folder.joinpath("arena_maze.csv")
-        arena_maze_raw = read_csv_to_list(_am, header=False)[0]
-        _gom = maze_folder.joinpath("game_object_maze.csv")
-        game_object_maze_raw = read_csv_to_list(_gom, header=False)[0]
-        _slm = maze_folder.joinpath("spawning_location_maze.csv")
-        spawning_location_maze_raw = read_csv_to_list(_slm, header=False)[0]
-
-        # Loading the maze. The mazes are taken directly from the json exports of
-        # Tiled maps. They should be in csv format.
-        # Importantly, they are "not" in a 2-d matrix format -- they are single
-        # row matrices with the length of width x height of the maze. So we need
-        # to convert here.
-        # example format: [['0', '0', ... '25309', '0',...], ['0',...]...]
-        # 25309 is the collision bar number right now.
-        collision_maze = []
-        sector_maze = []
-        arena_maze = []
-        game_object_maze = []
-        spawning_location_maze = []
-        for i in range(0, len(collision_maze_raw), maze_width):
-            tw = maze_width
-            collision_maze += [collision_maze_raw[i : i + tw]]
-            sector_maze += [sector_maze_raw[i : i + tw]]
-            arena_maze += [arena_maze_raw[i : i + tw]]
-            game_object_maze += [game_object_maze_raw[i : i + tw]]
-            spawning_location_maze += [spawning_location_maze_raw[i : i + tw]]
-        values["collision_maze"] = collision_maze
-
-        tiles = []
-        for i in range(maze_height):
-            row = []
-            for j in range(maze_width):
-                tile_details = dict()
-                tile_details["world"] = wb
-
-                tile_details["sector"] = ""
-                if sector_maze[i][j] in sb_dict:
-                    tile_details["sector"] = sb_dict[sector_maze[i][j]]
-
-                tile_details["arena"] = ""
-                if arena_maze[i][j] in ab_dict:
-                    tile_details["arena"] = ab_dict[arena_maze[i][j]]
-
-                tile_details["game_object"] = ""
-                if game_object_maze[i][j] in gob_dict:
-                    tile_details["game_object"] = gob_dict[game_object_maze[i][j]]
-
-                tile_details["spawning_location"] = ""
-                if spawning_location_maze[i][j] in slb_dict:
-                    tile_details["spawning_location"] = slb_dict[spawning_location_maze[i][j]]
-
-                tile_details["collision"] = False
-                if collision_maze[i][j] != "0":
-                    tile_details["collision"] = True
-
-                tile_details["events"] = set()
-
-                row += [tile_details]
-            tiles += [row]
-        values["tiles"] = tiles
-
-        # Each game object occupies an event in the tile. We are setting up the
-        # default event value here.
-        for i in range(maze_height):
-            for j in range(maze_width):
-                if tiles[i][j]["game_object"]:
-                    object_name = ":".join(
-                        [tiles[i][j]["world"], tiles[i][j]["sector"], tiles[i][j]["arena"], tiles[i][j]["game_object"]]
-                    )
-                    go_event = (object_name, None, None, None)
-                    tiles[i][j]["events"].add(go_event)
-
-        # Reverse tile access.
-        # <address_tiles> -- given a string address, we return a set of all
-        # tile coordinates belonging to that address (this is opposite of
-        # tiles that give you the string address given a coordinate). This is
-        # an optimization component for finding paths for the personas' movement.
-        # address_tiles['<spawn_loc>bedroom-2-a'] == {(58, 9)}
-        # address_tiles['double studio:recreation:pool table']
-        #   == {(29, 14), (31, 11), (30, 14), (32, 11), ...},
-        address_tiles = dict()
-        for i in range(maze_height):
-            for j in range(maze_width):
-                addresses = []
-                if tiles[i][j]["sector"]:
-                    add = f'{tiles[i][j]["world"]}:'
-                    add += f'{tiles[i][j]["sector"]}'
-                    addresses += [add]
-                if tiles[i][j]["arena"]:
-                    add = f'{tiles[i][j]["world"]}:'
-                    add += f'{tiles[i][j]["sector"]}:'
-                    add += f'{tiles[i][j]["arena"]}'
-                    addresses += [add]
-                if tiles[i][j]["game_object"]:
-                    add = f'{tiles[i][j]["world"]}:'
-                    add += f'{tiles[i][j]["sector"]}:'
-                    add += f'{tiles[i][j]["arena"]}:'
-                    add += f'{tiles[i][j]["game_object"]}'
-                    addresses += [add]
-                if tiles[i][j]["spawning_location"]:
-                    add = f'<spawn_loc>{tiles[i][j]["spawning_location"]}'
-                    addresses += [add]
-
-                for add in addresses:
-                    if add in address_tiles:
-                        address_tiles[add].add((j, i))
-                    else:
-                        address_tiles[add] = set([(j, i)])
-        values["address_tiles"] = address_tiles
-
-        values["action_space"] = get_action_space((maze_width, maze_height))
+        values["action_space"] = get_action_space((maze.width, maze.height))
         values["observation_space"] = get_observation_space()
         return values
 
+    @property
+    def tiles(self) -> list[TileRow]:
+        """`tiles[y][x]` gives the tile details dict of (x, y), see `access_tile`"""
+        return self.maze.tiles
+
+    @property
+    def address_tiles(self) -> AddressTiles:
+        """
+        Reverse tile access.
+        <address_tiles> -- given a string address, we return a set of all
+        tile coordinates belonging to that address (this is opposite of
+        tiles that give you the string address given a coordinate). This is
+        an optimization component for finding paths for the personas' movement.
+        address_tiles['<spawn_loc>bedroom-2-a'] == {(58, 9)}
+        address_tiles['double studio:recreation:pool table']
+          == {(29, 14), (31, 11), (30, 14), (32, 11), ...},
+        """
+        return self.maze.address_tiles
+
+    @property
+    def collision_maze(self) -> list[list[str]]:
+        """The collision block ids by row as in the csv, "0" if walkable"""
+        if self._collision_maze is None:
+            self._collision_maze = self.maze.collision.astype(str).tolist()
+        return self._collision_maze
+
     def reset(
         self,
         *,
@@ -245,6 +124,12 @@ class StanfordTownExtEnv(ExtEnv):
             obs = self.get_tile_path(tile=obs_params.coord, level=obs_params.level)
         elif obs_type == EnvObsType.TILE_NBR:
             obs = self.get_nearby_tiles(tile=obs_params.coord, vision_r=obs_params.vision_radius)
+        elif obs_type == EnvObsType.PATH:
+            obs = self.find_path(start=obs_params.coord, targets=obs_params.targets)
+        elif obs_type == EnvObsType.ADDRESS_PATH:
+            obs = self.find_path_to_address(start=obs_params.coord, address=obs_params.address)
+        elif obs_type == EnvObsType.REGION:
+            obs = self.observe_region(tile=obs_params.coord, vision_r=obs_params.vision_radius)
         return obs
 
     def step(self, action: EnvAction) -> tuple[dict[str, EnvObsValType], float, bool, bool, dict[str, Any]]:
@@ -291,11 +176,42 @@ class StanfordTownExtEnv(ExtEnv):
     def get_address_tiles(self) -> dict:
         return self.address_tiles
 
+    @property
+    def path_finder(self) -> PathFinder:
+        """Built once from the collision maze, which does not change during a simulation"""
+        if self._path_finder is None:
+            self._path_finder = PathFinder(self.maze.collision == 0)
+        return self._path_finder
+
+    @mark_as_readable
+    def find_path(self, start: tuple[int, int], targets: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """
+        Find the shortest path from start to the nearest of the target tiles.
+
+        INPUT
+          start: The tile coordinate to start from in (x, y) form.
+          targets: The candidate tile coordinates to go to in (x, y) form.
+        OUTPUT
+          The tile coordinates of the path, start and end included. Only the start if no target is reachable.
+        EXAMPLE OUTPUT
+          Given start=(58, 9), targets=[(60, 9), (58, 30)],
+          [(58, 9), (59, 9), (60, 9)]
+        """
+        return self.path_finder.find_path(start, targets)
+
+    @mark_as_readable
+    def find_path_to_address(self, start: tuple[int, int], address: str) -> list[tuple[int, int]]:
+        """Find the shortest path from start to the nearest tile of the string address, e.g.
+        "the Ville:Hobbs Cafe:cafe". The distance field of an address is cached, so later queries only walk it.
+        """
+        return self.path_finder.find_path(start, self.address_tiles[address])
+
     @mark_as_readable
     def access_tile(self, tile: tuple[int, int]) -> dict:
         """
-        Returns the tiles details dictionary that is stored in self.tiles of the
-        designated x, y location.
+        Returns the tiles details dictionary of the designated x, y location,
+        built from the maze layers. Its "events" is the live event set of the tile,
+        or a new empty set if the tile has no event; change it through the env actions.
 
         INPUT
           tile: The tile coordinate of our interest in (x, y) form.
@@ -310,9 +226,7 @@ class StanfordTownExtEnv(ExtEnv):
                 'events': {('double studio:double studio:bedroom 2:bed',
                            None, None)}}
         """
-        x = tile[0]
-        y = tile[1]
-        return self.tiles[y][x]
+        return self.maze.tile_details(tile)
 
     @mark_as_readable
     def get_tile_path(self, tile: tuple[int, int], level: str) -> str:
@@ -329,9 +243,7 @@ class StanfordTownExtEnv(ExtEnv):
           Given tile=(58, 9), and level=arena,
           "double studio:double studio:bedroom 2"
         """
-        x = tile[0]
-        y = tile[1]
-        tile = self.tiles[y][x]
+        tile = self.maze.tile_details(tile)
 
         path = f"{tile['world']}"
         if level == "world":
@@ -392,6 +304,30 @@ class StanfordTownExtEnv(ExtEnv):
                 nearby_tiles += [(i, j)]
         return nearby_tiles
 
+    @mark_as_readable
+    def observe_region(self, tile: tuple[int, int], vision_r: int) -> dict:
+        """
+        Observe the tiles of `get_nearby_tiles` in one call, instead of a
+        `access_tile` and a `get_tile_path` per tile.
+
+        INPUT:
+          tile: The tile coordinate of our interest in (x, y) form.
+          vision_r: The radius of the persona's vision.
+        OUTPUT:
+          A dict of
+            spaces: the distinct world/sector/arena/game_object dicts of the nearby tiles.
+            arena_path: the arena address of the tile, as `get_tile_path(tile, "arena")`.
+            events: [distance, event] of the distinct events of the nearby tiles in
+              the same arena, sorted by their distance to the tile.
+        EXAMPLE OUTPUT
+          Given tile=(72, 14), vision_r=4,
+          {'spaces': [{'world': 'the Ville', 'sector': '', 'arena': '', 'game_object': ''}, ...],
+           'arena_path': "the Ville:Isabella Rodriguez's apartment:main room",
+           'events': [(0.0, ("the Ville:Isabella Rodriguez's apartment:main room:bed", None, None, None)),
+                      (2.23606797749979, (...main room:desk", None, None, None)), ...]}
+        """
+        return self.maze.observe_region(tile, vision_r)
+
     @mark_as_writeable
     def add_event_from_tile(self, curr_event: tuple[str], tile: tuple[int, int]) -> None:
         """
@@ -405,7 +341,7 @@ class StanfordTownExtEnv(ExtEnv):
         OUPUT:
           None
         """
-        self.tiles[tile[1]][tile[0]]["events"].add(curr_event)
+        self.maze.add_event(curr_event, tile)
 
     @mark_as_writeable
     def remove_event_from_tile(self, curr_event: tuple[str], tile: tuple[int, int]) -> None:
@@ -420,19 +356,12 @@ class StanfordTownExtEnv(ExtEnv):
         OUPUT:
           None
         """
-        curr_tile_ev_cp = self.tiles[tile[1]][tile[0]]["events"].copy()
-        for event in curr_tile_ev_cp:
-            if event == curr_event:
-                self.tiles[tile[1]][tile[0]]["events"].remove(event)
+        self.maze.remove_events(tile, lambda event: event == curr_event)
 
     @mark_as_writeable
     def turn_event_from_tile_idle(self, curr_event: tuple[str], tile: tuple[int, int]) -> None:
-        curr_tile_ev_cp = self.tiles[tile[1]][tile[0]]["events"].copy()
-        for event in curr_tile_ev_cp:
-            if event == curr_event:
-                self.tiles[tile[1]][tile[0]]["events"].remove(event)
-                new_event = (event[0], None, None, None)
-                self.tiles[tile[1]][tile[0]]["events"].add(new_event)
+        for event in self.maze.remove_events(tile, lambda event: event == curr_event):
+            self.maze.add_event((event[0], None, None, None), tile)
 
     @mark_as_writeable
     def remove_subject_events_from_tile(self, subject: str, tile: tuple[int, int]) -> None:
@@ -445,7 +374,4 @@ class StanfordTownExtEnv(ExtEnv):
         OUPUT:
           None
         """
-        curr_tile_ev_cp = self.tiles[tile[1]][tile[0]]["events"].copy()
-        for event in curr_tile_ev_cp:
-            if event[0] == subject:
-                self.tiles[tile[1]][tile[0]]["events"].remove(event)
+        self.maze.remove_events(tile, lambda event: event[0] == subject)
@@ -1,22 +1,27 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 # @Desc   : StanfordTown Action
+import asyncio
 import json
-import time
 from abc import abstractmethod
 from pathlib import Path
 from typing import Any, Optional, Union
 
+from pydantic import Field
+
 from metagpt.actions.action import Action
-from metagpt.config2 import config
 from metagpt.ext.stanford_town.utils.const import PROMPTS_DIR
 from metagpt.logs import logger
+from metagpt.provider.base_llm import BaseLLM
+from metagpt.provider.llm_provider_registry import create_llm_instance
 
 
 class STAction(Action):
     name: str = "STAction"
     prompt_dir: Path = PROMPTS_DIR
     fail_default_resp: Optional[str] = None
+    # max_tokens -> (the action llm it was copied from, the copy), see `_llm_with_max_tokens`
+    private_max_tokens_llms: dict[int, tuple[BaseLLM, BaseLLM]] = Field(default_factory=dict, exclude=True)
 
     @property
     def cls_name(self):
@@ -59,22 +64,34 @@ class STAction(Action):
     async def _aask(self, prompt: str) -> str:
         return await self.llm.aask(prompt)
 
+    def _llm_with_max_tokens(self, max_tokens: int) -> BaseLLM:
+        """A copy of the action llm answering in `max_tokens` at most. The shared llm config is left untouched, as
+        the other roles of the step may be requesting with it concurrently.
+
+        The copy is built once per action and `max_tokens`, and follows the priority and the system prompt of the
+        action llm."""
+        source, llm = self.private_max_tokens_llms.get(max_tokens, (None, None))
+        if source is not self.llm:
+            llm = create_llm_instance(self.llm.config.model_copy(update={"max_token": max_tokens}))
+            llm.use_system_prompt = False  # to make it behave like a non-chat completions
+            self.private_max_tokens_llms[max_tokens] = (self.llm, llm)
+        llm.cost_manager = self.llm.cost_manager
+        llm.priority = self.llm.priority
+        llm.system_prompt = self.llm.system_prompt
+        return llm
+
     async def _run_gpt35_max_tokens(self, prompt: str, max_tokens: int = 50, retry: int = 3):
+        llm = self._llm_with_max_tokens(max_tokens)
         for idx in range(retry):
             try:
-                tmp_max_tokens_rsp = getattr(config.llm, "max_token", 1500)
-                setattr(config.llm, "max_token", max_tokens)
-                self.llm.use_system_prompt = False  # to make it behave like a non-chat completions
-
-                llm_resp = await self._aask(prompt)
+                llm_resp = await llm.aask(prompt)
 
-                setattr(config.llm, "max_token", tmp_max_tokens_rsp)
                 logger.info(f"Action: {self.cls_name} llm _run_gpt35_max_tokens raw resp: {llm_resp}")
                 if self._func_validate(llm_resp, prompt):
                     return self._func_cleanup(llm_resp, prompt)
             except Exception as exp:
                 logger.warning(f"Action: {self.cls_name} _run_gpt35_max_tokens exp: {exp}")
-                time.sleep(5)
+                await asyncio.sleep(5)
         return self.fail_default_resp
 
     async def _run_gpt35(
@@ -98,7 +115,7 @@ class STAction(Action):
                     return self._func_cleanup(llm_resp, prompt)
             except Exception as exp:
                 logger.warning(f"Action: {self.cls_name} _run_gpt35 exp: {exp}")
-                time.sleep(5)  # usually avoid `Rate limit`
+                await asyncio.sleep(5)  # usually avoid `Rate limit`
         return False
 
     async def _run_gpt35_wo_extra_prompt(self, prompt: str, retry: int = 3) -> str:
@@ -111,7 +128,7 @@ class STAction(Action):
                     return self._func_cleanup(llm_resp, prompt)
             except Exception as exp:
                 logger.warning(f"Action: {self.cls_name} _run_gpt35_wo_extra_prompt exp: {exp}")
-                time.sleep(5)  # usually avoid `Rate limit`
+                await asyncio.sleep(5)  # usually avoid `Rate limit`
         return self.fail_default_resp
 
     async def run(self, *args, **kwargs):
@@ -2,12 +2,19 @@
 # -*- coding: utf-8 -*-
 # @Desc   : BasicMemory,AgentMemory实现
 
+import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterable, Optional
 
-from pydantic import Field, field_serializer, model_validator
+from pydantic import Field, PrivateAttr, field_serializer, model_validator
 
+from metagpt.ext.stanford_town.memory.memory_index import (
+    MEMORY_TYPES,
+    EmbeddingView,
+    MemoryIndex,
+)
+from metagpt.ext.stanford_town.memory.memory_store import MemoryStore, to_datetime
 from metagpt.logs import logger
 from metagpt.memory.memory import Memory
 from metagpt.schema import Message
@@ -98,6 +105,11 @@ class AgentMemory(Memory):
     1. embedding.json (Dict embedding_key:embedding)
     2. Node.json (Dict Node_id:Node)
     3. kw_strength.json
+
+    节点的embedding与打分字段同时保存在`MemoryIndex`的连续数组中，用于向量化的retrieve
+    `embeddings`为该矩阵的视图，仅在取值时转为list
+
+    save以二进制列式存储（见`MemoryStore`），每次仅追加上次save后新增的节点与embedding；load兼容GA的JSON
     """
 
     storage: list[BasicMemory] = []  # 重写Storage，存储BasicMemory所有节点
@@ -115,11 +127,48 @@ class AgentMemory(Memory):
     memory_saved: Optional[Path] = Field(default=None)
     embeddings: dict[str, list[float]] = dict()
 
+    _memory_index: MemoryIndex = PrivateAttr(default_factory=MemoryIndex)
+    _latest_events: dict[int, set[tuple]] = PrivateAttr(default_factory=dict)  # retention -> summaries
+    _store: Optional[MemoryStore] = PrivateAttr(default=None)  # the store in sync with the memory
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        for key, embedding in self.embeddings.items():
+            self._memory_index.set_embedding(key, embedding)
+        for memory_node in self.storage:
+            self._memory_index.add_node(memory_node)
+        self.embeddings = EmbeddingView(self._memory_index)
+
+    @field_serializer("embeddings")
+    def serialize_embeddings(self, embeddings: EmbeddingView) -> dict[str, list[float]]:
+        return dict(embeddings.items())
+
+    @property
+    def memory_index(self) -> MemoryIndex:
+        return self._memory_index
+
+    def get_node(self, memory_id: str) -> Optional[BasicMemory]:
+        return self._memory_index.nodes.get(memory_id)
+
+    def touch(self, memory_nodes: Iterable[BasicMemory], curr_time: datetime):
+        """更新节点的last_accessed，需要通过该方法修改，以同步MemoryIndex"""
+        self._memory_index.touch(memory_nodes, curr_time)
+
     def set_mem_path(self, memory_saved: Path):
         self.memory_saved = memory_saved
         self.load(memory_saved)
 
     def save(self, memory_saved: Path):
+        """
+        将记忆以二进制列式存储到memory_saved目录：embeddings.npy（float32）、nodes.npy（数值字段）、
+        node_texts.jsonl（文本字段）与kw_strength.json。对于上一次load或save的同一目录，仅追加新增部分
+        """
+        memory_saved = Path(memory_saved)
+        if self._store is None or self._store.path != memory_saved:
+            self._store = MemoryStore(memory_saved)  # 新目录，全部写入
+        self._store.save(self._memory_index, self._kw_strength())
+
+    def save_json(self, memory_saved: Path):
         """
         将MemoryBasic类存储为Nodes.json形式。复现GA中的Kw Strength.json形式
         这里添加一个路径即可
@@ -131,18 +180,85 @@ class AgentMemory(Memory):
             memory_node = memory_node.save_to_dict()
             memory_json.update(memory_node)
         write_json_file(memory_saved.joinpath("nodes.json"), memory_json)
-        write_json_file(memory_saved.joinpath("embeddings.json"), self.embeddings)
+        write_json_file(memory_saved.joinpath("embeddings.json"), dict(self.embeddings.items()))
+        write_json_file(memory_saved.joinpath("kw_strength.json"), self._kw_strength())
 
-        strength_json = dict()
-        strength_json["kw_strength_event"] = self.kw_strength_event
-        strength_json["kw_strength_thought"] = self.kw_strength_thought
-        write_json_file(memory_saved.joinpath("kw_strength.json"), strength_json)
+    def _kw_strength(self) -> dict:
+        return {"kw_strength_event": self.kw_strength_event, "kw_strength_thought": self.kw_strength_thought}
 
     def load(self, memory_saved: Path):
+        """
+        载入memory_saved目录的记忆，优先使用二进制列式存储，否则解析GA的JSON
+        """
+        if MemoryStore.exists(memory_saved):
+            self.load_store(MemoryStore.open(memory_saved))
+        else:
+            self.load_json(memory_saved)
+
+    def load_store(self, store: MemoryStore):
+        """
+        由二进制列式存储载入：embedding矩阵以mmap映射并直接作为MemoryIndex的矩阵，
+        节点由数值表与文本行直接构建，不再逐个经过add_event/add_chat/add_thought
+        """
+        assert not self.storage, "load into an empty memory"
+        keys, embeddings = store.read_embeddings()
+        self._memory_index.load_embeddings(keys, embeddings)
+        records, texts = store.read_nodes()
+
+        keyword_indexes = {"event": self.event_keywords, "thought": self.thought_keywords, "chat": self.chat_keywords}
+        type_lists = {"event": self.event_list, "thought": self.thought_list, "chat": self.chat_list}
+        for count, (record, text) in enumerate(zip(records.tolist(), texts), start=1):
+            memory_type_code, type_count, depth, poignancy, created, expiration = record
+            s, p, o, description, embedding_key, keywords, filling, cause_by = text
+            memory_type = MEMORY_TYPES[memory_type_code]
+            created = to_datetime(created)
+            # 字段与add_*创建的节点一致，跳过校验
+            memory_node = BasicMemory.model_construct(
+                id=uuid.uuid4().hex,
+                content=description,
+                cause_by=cause_by,
+                memory_id=f"node_{count}",
+                memory_count=count,
+                type_count=type_count,
+                memory_type=memory_type,
+                depth=depth,
+                created=created,
+                expiration=to_datetime(expiration),
+                last_accessed=created,
+                subject=s,
+                predicate=p,
+                object=o,
+                description=description,
+                embedding_key=embedding_key,
+                poignancy=poignancy,
+                keywords=keywords,
+                filling=filling,
+            )
+            self.storage.append(memory_node)
+            self._memory_index.add_node(memory_node)
+            type_lists[memory_type].append(memory_node)  # 新的在前，最后反转
+            for kw in keywords:
+                keyword_indexes[memory_type].setdefault(kw.lower(), []).append(memory_node)
+
+        for memory_list in type_lists.values():
+            memory_list.reverse()
+        for keyword_index in keyword_indexes.values():
+            for memory_list in keyword_index.values():
+                memory_list.reverse()
+        self._latest_events.clear()
+        self._memory_index.updated_embedding_rows.clear()
+
+        strength_keywords_load = read_json_file(store.path.joinpath("kw_strength.json"))
+        self.kw_strength_event = strength_keywords_load["kw_strength_event"]
+        self.kw_strength_thought = strength_keywords_load["kw_strength_thought"]
+        self._store = store
+
+    def load_json(self, memory_saved: Path):
         """
         将GA的JSON解析，填充到AgentMemory类之中
         """
-        self.embeddings = read_json_file(memory_saved.joinpath("embeddings.json"))
+        for key, embedding in read_json_file(memory_saved.joinpath("embeddings.json")).items():
+            self._set_embedding(key, embedding)
         memory_load = read_json_file(memory_saved.joinpath("nodes.json"))
         for count in range(len(memory_load.keys())):
             node_id = f"node_{str(count + 1)}"
@@ -182,9 +298,10 @@ class AgentMemory(Memory):
         Add a new message to storage, while updating the index
         重写add方法，修改原有的Message类为BasicMemory类，并添加不同的记忆类型添加方式
         """
-        if memory_basic.memory_id in self.storage:
+        if memory_basic.memory_id in self._memory_index.nodes:
             return
         self.storage.append(memory_basic)
+        self._memory_index.add_node(memory_basic)
         if memory_basic.memory_type == "chat":
             self.chat_list[0:0] = [memory_basic]
             return
@@ -193,6 +310,7 @@ class AgentMemory(Memory):
             return
         if memory_basic.memory_type == "event":
             self.event_list[0:0] = [memory_basic]
+            self._latest_events.clear()
             return
 
     def add_chat(
@@ -233,9 +351,8 @@ class AgentMemory(Memory):
             else:
                 self.chat_keywords[kw] = [memory_node]
 
+        self._set_embedding(*embedding_pair)
         self.add(memory_node)
-
-        self.embeddings[embedding_pair[0]] = embedding_pair[1]
         return memory_node
 
     def add_thought(self, created, expiration, s, p, o, content, keywords, poignancy, embedding_pair, filling):
@@ -281,6 +398,7 @@ class AgentMemory(Memory):
             else:
                 self.thought_keywords[kw] = [memory_node]
 
+        self._set_embedding(*embedding_pair)
         self.add(memory_node)
 
         if f"{p} {o}" != "is idle":
@@ -290,7 +408,6 @@ class AgentMemory(Memory):
                 else:
                     self.kw_strength_thought[kw] = 1
 
-        self.embeddings[embedding_pair[0]] = embedding_pair[1]
         return memory_node
 
     def add_event(self, created, expiration, s, p, o, content, keywords, poignancy, embedding_pair, filling):
@@ -331,6 +448,7 @@ class AgentMemory(Memory):
             else:
                 self.event_keywords[kw] = [memory_node]
 
+        self._set_embedding(*embedding_pair)
         self.add(memory_node)
 
         if f"{p} {o}" != "is idle":
@@ -340,13 +458,17 @@ class AgentMemory(Memory):
                 else:
                     self.kw_strength_event[kw] = 1
 
-        self.embeddings[embedding_pair[0]] = embedding_pair[1]
         return memory_node
 
-    def get_summarized_latest_events(self, retention):
-        ret_set = set()
-        for e_node in self.event_list[:retention]:
-            ret_set.add(e_node.summary())
+    def _set_embedding(self, embedding_key: str, embedding: list[float]):
+        self._memory_index.set_embedding(embedding_key, embedding)
+
+    def get_summarized_latest_events(self, retention) -> set:
+        """最近retention个event的(s, p, o)，缓存至下一次add event，返回的集合不应被修改"""
+        ret_set = self._latest_events.get(retention)
+        if ret_set is None:
+            ret_set = set(e_node.summary() for e_node in self.event_list[:retention])
+            self._latest_events[retention] = ret_set
         return ret_set
 
     def get_last_chat(self, target_role_name: str):
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : Columnar index of AgentMemory for the vectorized retrieval scoring
+
+from collections.abc import MutableMapping
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from metagpt.ext.stanford_town.memory.agent_memory import BasicMemory
+
+EPOCH = datetime(1970, 1, 1)  # naive, as the simulation times are
+MEMORY_TYPES = ("event", "thought", "chat")
+
+
+def to_seconds(time: Optional[datetime]) -> float:
+    return (time - EPOCH).total_seconds() if time else 0.0
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """Double the capacity of the first axis until it holds `size` rows, so appends are amortized O(1)"""
+    if size <= len(array):
+        return array
+    capacity = max(size, 2 * len(array), 64)
+    grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+class MemoryIndex:
+    """The embeddings of an AgentMemory in a contiguous float32 matrix, and the fields of the nodes used by the
+    retrieval scoring in arrays, by the row of the node in `AgentMemory.storage`.
+    """
+
+    def __init__(self):
+        self.nodes: dict[str, "BasicMemory"] = {}  # memory_id -> node
+        self.node_rows: dict[str, int] = {}  # memory_id -> row
+        self.node_list: list["BasicMemory"] = []  # row -> node
+        self.embedding_rows: dict[str, int] = {}  # embedding_key -> row in the embedding matrix
+        self.num_nodes = 0
+        self.num_embeddings = 0
+        self.updated_embedding_rows: set[int] = set()  # rows set again since the last save, see `MemoryStore`
+
+        self._embeddings = np.zeros((0, 0), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._poignancy = np.zeros(0, dtype=np.float64)
+        self._created = np.zeros(0, dtype=np.float64)  # seconds since EPOCH
+        self._last_accessed = np.zeros(0, dtype=np.float64)
+        self._embedding_row = np.zeros(0, dtype=np.int64)  # -1 if the embedding is unknown
+        self._memory_type = np.zeros(0, dtype=np.int8)  # index in MEMORY_TYPES, -1 if unknown
+        self._idle = np.zeros(0, dtype=bool)
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        return self._embeddings[: self.num_embeddings]
+
+    @property
+    def poignancy(self) -> np.ndarray:
+        return self._poignancy[: self.num_nodes]
+
+    @property
+    def created(self) -> np.ndarray:
+        return self._created[: self.num_nodes]
+
+    @property
+    def last_accessed(self) -> np.ndarray:
+        return self._last_accessed[: self.num_nodes]
+
+    def load_embeddings(self, keys: list[str], embeddings: np.ndarray):
+        """Take the embedding matrix as is, e.g. memory mapped from a file. It is copied on the first change."""
+        self.embedding_rows = {key: row for row, key in enumerate(keys)}
+        self.num_embeddings = len(keys)
+        self._embeddings = embeddings
+        self._norms = np.linalg.norm(embeddings, axis=1).astype(np.float32) if len(keys) else np.zeros(0, np.float32)
+
+    def set_embedding(self, key: str, embedding: list[float]):
+        vector = np.asarray(embedding, dtype=np.float32)
+        row = self.embedding_rows.get(key)
+        if row is not None:
+            if not self._embeddings.flags.writeable:
+                self._embeddings = np.array(self._embeddings)
+            self.updated_embedding_rows.add(row)
+        else:
+            if not self.num_embeddings:
+                self._embeddings = np.zeros((0, len(vector)), dtype=np.float32)
+            row = self.num_embeddings
+            self._embeddings = _grow(self._embeddings, row + 1)
+            self._norms = _grow(self._norms, row + 1)
+            self.embedding_rows[key] = row
+            self.num_embeddings += 1
+        self._embeddings[row] = vector
+        self._norms[row] = np.linalg.norm(vector)
+
+    def add_node(self, node: "BasicMemory"):
+        """Add a node, its embedding should be set before"""
+        row = self.num_nodes
+        for name in ("_poignancy", "_created", "_last_accessed", "_embedding_row", "_memory_type", "_idle"):
+            setattr(self, name, _grow(getattr(self, name), row + 1))
+        self._poignancy[row] = node.poignancy
+        self._created[row] = to_seconds(node.created)
+        self._last_accessed[row] = to_seconds(node.last_accessed)
+        self._embedding_row[row] = self.embedding_rows.get(node.embedding_key, -1)
+        self._memory_type[row] = MEMORY_TYPES.index(node.memory_type) if node.memory_type in MEMORY_TYPES else -1
+        self._idle[row] = "idle" in (node.embedding_key or "")
+        self.nodes[node.memory_id] = node
+        self.node_rows[node.memory_id] = row
+        self.node_list.append(node)
+        self.num_nodes += 1
+
+    def touch(self, nodes: Iterable["BasicMemory"], time: datetime):
+        """Set the last_accessed of the nodes, on the nodes and in the index"""
+        rows = []
+        for node in nodes:
+            node.last_accessed = time
+            rows.append(self.node_rows[node.memory_id])
+        self._last_accessed[rows] = to_seconds(time)
+
+    def rows_of(self, memory_ids: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.node_rows[memory_id] for memory_id in memory_ids), dtype=np.int64)
+
+    def retrievable_rows(self) -> np.ndarray:
+        """The rows of the event and thought nodes which are not idle, in the order of
+        `event_list + thought_list`, i.e. the events then the thoughts, newest first.
+        """
+        memory_type = self._memory_type[: self.num_nodes]
+        rows = np.flatnonzero((memory_type >= 0) & (memory_type < 2) & ~self._idle[: self.num_nodes])
+        return rows[np.lexsort((-rows, memory_type[rows]))]
+
+    def relevance(self, rows: np.ndarray, query_embedding: list[float]) -> np.ndarray:
+        """Cosine similarity of the nodes at rows with the query, 0 for the nodes without embedding"""
+        scores = np.zeros(len(rows), dtype=np.float64)
+        if not self.num_embeddings:
+            return scores
+        query = np.asarray(query_embedding, dtype=np.float32)
+        # one pass over the contiguous matrix, cheaper than gathering the rows of the nodes first
+        similarities = self.embeddings @ query
+        norms = self._norms[: self.num_embeddings] * np.linalg.norm(query)
+        np.divide(similarities, norms, out=similarities, where=norms > 0)  # a zero vector has 0 similarity
+
+        embedding_rows = self._embedding_row[rows]
+        known = embedding_rows >= 0
+        scores[known] = similarities[embedding_rows[known]]
+        return scores
+
+
+class EmbeddingView(MutableMapping):
+    """`embedding_key -> embedding` over the embedding matrix of a MemoryIndex, an embedding is turned into a list of
+    floats only when looked up"""
+
+    def __init__(self, memory_index: MemoryIndex):
+        self.memory_index = memory_index
+
+    def __getitem__(self, key: str) -> list[float]:
+        return self.memory_index.embeddings[self.memory_index.embedding_rows[key]].tolist()
+
+    def __setitem__(self, key: str, embedding: list[float]):
+        self.memory_index.set_embedding(key, embedding)
+
+    def __delitem__(self, key: str):
+        raise TypeError("the embeddings of the memory nodes can not be deleted")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.memory_index.embedding_rows)
+
+    def __len__(self) -> int:
+        return self.memory_index.num_embeddings
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.memory_index.embedding_rows
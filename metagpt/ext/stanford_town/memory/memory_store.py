@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : Binary columnar persistence of AgentMemory, appended incrementally on save
+
+import io
+import json
+import math
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import numpy as np
+
+from metagpt.ext.stanford_town.memory.memory_index import (
+    EPOCH,
+    MEMORY_TYPES,
+    MemoryIndex,
+)
+from metagpt.utils.common import read_json_file, write_json_file
+
+if TYPE_CHECKING:
+    from metagpt.ext.stanford_town.memory.agent_memory import BasicMemory
+
+MEMORY_STORE_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"  # float32 (num_embeddings, dim), the rows of `MemoryIndex.embeddings`
+EMBEDDING_KEYS_FILE = "embedding_keys.jsonl"  # the embedding key of each row, a json string per line
+NODES_FILE = "nodes.npy"  # NODE_DTYPE records, the numeric fields of the nodes by row of `AgentMemory.storage`
+NODE_TEXTS_FILE = "node_texts.jsonl"  # the text fields of each node, a json list per line, see `node_texts`
+
+NODE_DTYPE = np.dtype(
+    [
+        ("memory_type", np.int8),  # index in MEMORY_TYPES
+        ("type_count", np.int32),
+        ("depth", np.int32),
+        ("poignancy", np.int32),
+        ("created", np.float64),  # seconds since EPOCH, nan if None
+        ("expiration", np.float64),
+    ]
+)
+
+
+def _seconds(time: Optional[datetime]) -> float:
+    return (time - EPOCH).total_seconds() if time else math.nan
+
+
+def to_datetime(seconds: float) -> Optional[datetime]:
+    return None if math.isnan(seconds) else EPOCH + timedelta(seconds=seconds)
+
+
+def node_record(node: "BasicMemory") -> tuple:
+    return (
+        MEMORY_TYPES.index(node.memory_type),
+        node.type_count,
+        node.depth,
+        node.poignancy,
+        _seconds(node.created),
+        _seconds(node.expiration),
+    )
+
+
+def node_texts(node: "BasicMemory") -> list:
+    keywords, filling = list(node.keywords or []), list(node.filling or [])
+    return [
+        node.subject,
+        node.predicate,
+        node.object,
+        node.description,
+        node.embedding_key,
+        keywords,
+        filling,
+        node.cause_by,
+    ]
+
+
+def _append_npy(path: Path, count: int, rows: np.ndarray):
+    """Write the rows after the first `count` rows of the `.npy` file and set its length to `count + len(rows)`.
+
+    The header written by numpy leaves room for the length to grow, so it is rewritten in place. The file is
+    rewritten as a whole if it does not match the rows or the header does not fit.
+    """
+    shape = (count + len(rows),) + rows.shape[1:]
+    if count and path.exists():
+        with open(path, "r+b") as f:
+            version = np.lib.format.read_magic(f)
+            old_shape, fortran_order, dtype = (
+                np.lib.format.read_array_header_1_0(f) if version == (1, 0) else ((-1,), True, None)
+            )
+            offset = f.tell()
+            header = io.BytesIO()
+            np.lib.format.write_array_header_1_0(
+                header, {"descr": np.lib.format.dtype_to_descr(rows.dtype), "fortran_order": False, "shape": shape}
+            )
+            if (
+                dtype == rows.dtype
+                and not fortran_order
+                and old_shape[1:] == rows.shape[1:]
+                and old_shape[0] >= count
+                and len(header.getvalue()) == offset
+            ):
+                f.seek(offset + count * rows.dtype.itemsize * int(np.prod(rows.shape[1:], dtype=np.int64)))
+                f.write(np.ascontiguousarray(rows).tobytes())
+                f.truncate()
+                f.flush()
+                f.seek(0)
+                f.write(header.getvalue())  # the new length takes effect once the rows are written
+                return
+        rows = np.concatenate([np.load(path, mmap_mode="r")[:count], rows])
+    tmp_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_file, "wb") as f:
+        np.lib.format.write_array(f, np.ascontiguousarray(rows))
+    os.replace(tmp_file, path)
+
+
+def _append_lines(path: Path, size: int, items: Iterable) -> int:
+    """Write the items as json lines after the first `size` bytes of the file, return the new size"""
+    with open(path, "r+b" if path.exists() else "wb") as f:
+        f.truncate(size)  # drop the lines of an interrupted save
+        f.seek(size)
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n")
+        return f.tell()
+
+
+def _read_lines(path: Path, size: int) -> list:
+    with open(path, "rb") as f:
+        content = f.read(size)
+    return [json.loads(line) for line in content.splitlines()]
+
+
+class MemoryStore:
+    """The binary columnar files of an AgentMemory in a folder.
+
+    The embeddings are a float32 `.npy` matrix, memory mapped on load. The numeric fields of the nodes are a table of
+    NODE_DTYPE records, and their text fields json lines. A save appends only the nodes and embeddings added since the
+    last save, and the embeddings updated in place, then writes the manifest. The manifest holds the counts, so the
+    tail of an interrupted save is ignored on load and overwritten by the next save.
+    """
+
+    def __init__(self, path: Path, manifest: Optional[dict] = None):
+        self.path = Path(path)
+        self.manifest = manifest or {
+            "version": MEMORY_STORE_VERSION,
+            "num_nodes": 0,
+            "num_embeddings": 0,
+            "node_texts_size": 0,
+            "embedding_keys_size": 0,
+        }
+
+    @classmethod
+    def exists(cls, path: Path) -> bool:
+        return Path(path).joinpath(MANIFEST_FILE).exists()
+
+    @classmethod
+    def open(cls, path: Path) -> "MemoryStore":
+        manifest = read_json_file(Path(path).joinpath(MANIFEST_FILE))
+        if manifest.get("version") != MEMORY_STORE_VERSION:
+            raise ValueError(f"unsupported memory store version {manifest.get('version')} of {path}")
+        return cls(path, manifest)
+
+    @property
+    def num_nodes(self) -> int:
+        return self.manifest["num_nodes"]
+
+    @property
+    def num_embeddings(self) -> int:
+        return self.manifest["num_embeddings"]
+
+    def read_embeddings(self) -> tuple[list[str], np.ndarray]:
+        """The embedding keys and the read-only memory mapped embedding matrix"""
+        if not self.num_embeddings:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        keys = _read_lines(self.path.joinpath(EMBEDDING_KEYS_FILE), self.manifest["embedding_keys_size"])
+        embeddings = np.load(self.path.joinpath(EMBEDDINGS_FILE), mmap_mode="r")[: self.num_embeddings]
+        return keys, embeddings
+
+    def read_nodes(self) -> tuple[np.ndarray, list[list]]:
+        """The NODE_DTYPE records and the text fields of the nodes"""
+        if not self.num_nodes:
+            return np.zeros(0, dtype=NODE_DTYPE), []
+        records = np.array(np.load(self.path.joinpath(NODES_FILE), mmap_mode="r")[: self.num_nodes])
+        texts = _read_lines(self.path.joinpath(NODE_TEXTS_FILE), self.manifest["node_texts_size"])
+        return records, texts
+
+    def save(self, memory_index: MemoryIndex, kw_strength: dict):
+        """Append the nodes and embeddings of the index not saved yet, rewrite the updated embeddings"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        manifest = dict(self.manifest)
+
+        num_embeddings = memory_index.num_embeddings
+        if num_embeddings > self.num_embeddings:
+            keys = list(memory_index.embedding_rows)[self.num_embeddings : num_embeddings]
+            manifest["embedding_keys_size"] = _append_lines(
+                self.path.joinpath(EMBEDDING_KEYS_FILE), self.manifest["embedding_keys_size"], keys
+            )
+            new_rows = memory_index.embeddings[self.num_embeddings : num_embeddings]
+            _append_npy(self.path.joinpath(EMBEDDINGS_FILE), self.num_embeddings, new_rows)
+        updated_rows = sorted(row for row in memory_index.updated_embedding_rows if row < self.num_embeddings)
+        if updated_rows:
+            saved = np.load(self.path.joinpath(EMBEDDINGS_FILE), mmap_mode="r+")
+            saved[updated_rows] = memory_index.embeddings[updated_rows]
+            saved.flush()
+            del saved
+        manifest["num_embeddings"] = num_embeddings
+
+        nodes = memory_index.node_list[self.num_nodes :]
+        if nodes:
+            manifest["node_texts_size"] = _append_lines(
+                self.path.joinpath(NODE_TEXTS_FILE), self.manifest["node_texts_size"], map(node_texts, nodes)
+            )
+            records = np.array([node_record(node) for node in nodes], dtype=NODE_DTYPE)
+            _append_npy(self.path.joinpath(NODES_FILE), self.num_nodes, records)
+        manifest["num_nodes"] = memory_index.num_nodes
+
+        write_json_file(self.path.joinpath("kw_strength.json"), kw_strength)
+        tmp_file = self.path.joinpath(f"{MANIFEST_FILE}.{os.getpid()}.tmp")
+        write_json_file(tmp_file, manifest)
+        os.replace(tmp_file, self.path.joinpath(MANIFEST_FILE))
+        self.manifest = manifest
+        memory_index.updated_embedding_rows.clear()
@@ -4,12 +4,14 @@
 
 import datetime
 
-from numpy import dot
-from numpy.linalg import norm
+import numpy as np
 
 from metagpt.ext.stanford_town.memory.agent_memory import BasicMemory
+from metagpt.ext.stanford_town.memory.memory_index import MemoryIndex, to_seconds
 from metagpt.ext.stanford_town.utils.utils import get_embedding
 
+SECONDS_PER_DAY = 24 * 60 * 60
+
 
 def agent_retrieve(
     agent_memory,
@@ -18,41 +20,52 @@ def agent_retrieve(
     query: str,
     nodes: list[BasicMemory],
     topk: int = 4,
-) -> list[BasicMemory]:
+) -> list[str]:
     """
     Retrieve需要集合Role使用,原因在于Role才具有AgentMemory,scratch
     逻辑:Role调用该函数,self.rc.AgentMemory,self.rc.scratch.curr_time,self.rc.scratch.memory_forget
-    输入希望查询的内容与希望回顾的条数,返回TopK条高分记忆，即List[BasicMemory]
-
-    Score_lists示例
-    {
-        "memory": memories[i],             BasicMemory类
-        "importance": memories[i].poignancy
-        "recency": 衰减因子计算结果
-        "relevance": 搜索结果
-    }
+    输入希望查询的内容与希望回顾的条数,返回TopK条高分记忆的memory_id
+
+    打分在agent_memory.memory_index的数组上向量化计算:
+        importance: 节点的poignancy
+        recency: memory_forget ** 距创建的天数
+        relevance: 节点embedding与query embedding的余弦相似度
+    三项分别归一化后加权求和, 同分时按last_accessed从新到旧排序
     """
-    memories = nodes
-    agent_memory_embedding = agent_memory.embeddings
-    memories = sorted(memories, key=lambda memory_node: memory_node.last_accessed, reverse=True)
+    if not nodes:
+        return []
+    memory_index: MemoryIndex = agent_memory.memory_index
+    rows = memory_index.rows_of(node.memory_id for node in nodes)
+    top = retrieve_rows(memory_index, rows, curr_time, memory_forget, get_embedding(query), topk)
+    return [memory_index.node_list[row].memory_id for row in top]
 
-    score_list = []
-    score_list = extract_importance(memories, score_list)
-    score_list = extract_recency(curr_time, memory_forget, score_list)
-    score_list = extract_relevance(agent_memory_embedding, query, score_list)
-    score_list = normalize_score_floats(score_list, 0, 1)
 
-    total_dict = {}
-    gw = [1, 1, 1]  # 三个因素的权重,重要性,近因性,相关性,
-    for i in range(len(score_list)):
-        total_score = (
-            score_list[i]["importance"] * gw[0] + score_list[i]["recency"] * gw[1] + score_list[i]["relevance"] * gw[2]
-        )
-        total_dict[score_list[i]["memory"].memory_id] = total_score
+def retrieve_rows(
+    memory_index: MemoryIndex,
+    rows: np.ndarray,
+    curr_time: datetime.datetime,
+    memory_forget: float,
+    query_embedding: list[float],
+    topk: int,
+) -> np.ndarray:
+    """
+    对memory_index中rows行的节点打分, 返回TopK的行号
+    """
+    order = np.argsort(-memory_index.last_accessed[rows], kind="stable")
+    rows = rows[order]
 
-    result = top_highest_x_values(total_dict, topk)
+    importance = memory_index.poignancy[rows]
+    day_count = np.floor((to_seconds(curr_time) - memory_index.created[rows]) / SECONDS_PER_DAY)
+    recency = np.power(memory_forget, day_count)
+    relevance = memory_index.relevance(rows, query_embedding)
 
-    return result  # 返回的是一个BasicMemory列表
+    gw = [1, 1, 1]  # 三个因素的权重,重要性,近因性,相关性,
+    total_score = (
+        normalize_floats(importance, 0, 1) * gw[0]
+        + normalize_floats(recency, 0, 1) * gw[1]
+        + normalize_floats(relevance, 0, 1) * gw[2]
+    )
+    return rows[top_highest_x_indices(total_score, topk)]
 
 
 def new_agent_retrieve(role, focus_points: list, n_count=30) -> dict:
@@ -60,121 +73,49 @@ def new_agent_retrieve(role, focus_points: list, n_count=30) -> dict:
     输入为role，关注点列表,返回记忆数量
     输出为字典，键为focus_point，值为对应的记忆列表
     """
+    memory = role.memory
+    memory_index: MemoryIndex = memory.memory_index
+    rows = memory_index.retrievable_rows()  # 即event_list + thought_list中非idle的节点
+
     retrieved = dict()
     for focal_pt in focus_points:
-        nodes = [
-            [i.last_accessed, i]
-            for i in role.memory.event_list + role.memory.thought_list
-            if "idle" not in i.embedding_key
-        ]
-        nodes = sorted(nodes, key=lambda x: x[0])
-        nodes = [i for created, i in nodes]
-        results = agent_retrieve(
-            role.memory, role.scratch.curr_time, role.scratch.recency_decay, focal_pt, nodes, n_count
-        )
-        final_result = []
-        for n in results:
-            for i in role.memory.storage:
-                if i.memory_id == n:
-                    i.last_accessed = role.scratch.curr_time
-                    final_result.append(i)
-
+        if len(rows):
+            query_embedding = get_embedding(focal_pt)
+            top = retrieve_rows(
+                memory_index, rows, role.scratch.curr_time, role.scratch.recency_decay, query_embedding, n_count
+            )
+        else:
+            top = []
+        final_result = [memory_index.node_list[row] for row in top]
+        memory.touch(final_result, role.scratch.curr_time)
         retrieved[focal_pt] = final_result
 
     return retrieved
 
 
-def top_highest_x_values(d, x):
-    """
-    输入字典，Topx
-    返回以字典值排序，字典键组成的List[BasicMemory]
-    """
-    top_v = [item[0] for item in sorted(d.items(), key=lambda item: item[1], reverse=True)[:x]]
-    return top_v
-
-
-def extract_importance(memories, score_list):
-    """
-    抽取重要性
-    """
-    for i in range(len(memories)):
-        score = {"memory": memories[i], "importance": memories[i].poignancy}
-        score_list.append(score)
-    return score_list
-
-
-def extract_relevance(agent_memory_embedding, query, score_list):
+def top_highest_x_indices(scores: np.ndarray, x: int) -> np.ndarray:
     """
-    抽取相关性
+    返回scores中最大的x个值的下标, 按值从大到小排序, 同值时下标小的在前
     """
-    query_embedding = get_embedding(query)
-    # 进行
-    for i in range(len(score_list)):
-        node_embedding = agent_memory_embedding[score_list[i]["memory"].embedding_key]
-        result = cos_sim(node_embedding, query_embedding)
-        score_list[i]["relevance"] = result
-
-    return score_list
-
-
-def extract_recency(curr_time, memory_forget, score_list):
-    """
-    抽取近因性，目前使用的现实世界过一天走一个衰减因子
-    """
-    for i in range(len(score_list)):
-        day_count = (curr_time - score_list[i]["memory"].created).days
-        score_list[i]["recency"] = memory_forget**day_count
-    return score_list
-
-
-def cos_sim(a, b):
-    """
-    计算余弦相似度
-    """
-    return dot(a, b) / (norm(a) * norm(b))
-
-
-def normalize_list_floats(single_list, target_min, target_max):
-    """
-    单个列表归一化
-    """
-    if len(single_list) == 0:
-        return []
-
-    min_val = min(single_list)
-    max_val = max(single_list)
-    range_val = max_val - min_val
-
-    if range_val == 0:
-        for i in range(len(single_list)):
-            single_list[i] = (target_max - target_min) / 2
+    if x <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if x < len(scores):
+        threshold = scores[np.argpartition(scores, -x)[-x]]
+        candidates = np.flatnonzero(scores >= threshold)
     else:
-        for i in range(len(single_list)):
-            single_list[i] = (single_list[i] - min_val) * (target_max - target_min) / range_val + target_min
-    return single_list
+        candidates = np.arange(len(scores))
+    candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+    return candidates[:x]
 
 
-def normalize_score_floats(score_list, target_min, target_max):
+def normalize_floats(values: np.ndarray, target_min: float, target_max: float) -> np.ndarray:
     """
-    整体归一化
+    数组归一化, 所有值相同时取区间中值
     """
-    importance_list = []
-    relevance_list = []
-    recency_list = []
-
-    for i in range(len(score_list)):
-        importance_list.append(score_list[i]["importance"])
-        relevance_list.append(score_list[i]["relevance"])
-        recency_list.append(score_list[i]["recency"])
-
-    # 进行归一化操作
-    importance_list = normalize_list_floats(importance_list, target_min, target_max)
-    relevance_list = normalize_list_floats(relevance_list, target_min, target_max)
-    recency_list = normalize_list_floats(recency_list, target_min, target_max)
-
-    for i in range(len(score_list)):
-        score_list[i]["importance"] = importance_list[i]
-        score_list[i]["relevance"] = relevance_list[i]
-        score_list[i]["recency"] = recency_list[i]
-
-    return score_list
+    if len(values) == 0:
+        return values
+    min_val = values.min()
+    range_val = values.max() - min_val
+    if range_val == 0:
+        return np.full(len(values), (target_max - target_min) / 2)
+    return (values - min_val) * (target_max - target_min) / range_val + target_min
@@ -2,8 +2,8 @@
 # -*- coding: utf-8 -*-
 # @Desc   : Reflect function
 
+import asyncio
 import datetime
-import time
 
 from metagpt.ext.stanford_town.actions.run_reflect_action import (
     AgentChatPoignancy,
@@ -128,7 +128,7 @@ async def run_reflect(role: "STRole"):
                 created, expiration, s, p, o, thought, keywords, thought_poignancy, thought_embedding_pair, evidence
             )
             logger.info(f"add thought memory: {thought}, evidence: {evidence}")
-            time.sleep(2)  # avoid Rate limit
+            await asyncio.sleep(2)  # avoid Rate limit
 
 
 def reflection_trigger(role: "STRole"):
@@ -10,11 +10,9 @@ Do the steps following:
 - reflect, do the High-level thinking based on memories and re-add into the memory
 - execute, move or else in the Maze
 """
-import math
+import asyncio
 import random
-import time
 from datetime import datetime, timedelta
-from operator import itemgetter
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
@@ -37,13 +35,13 @@ from metagpt.ext.stanford_town.memory.scratch import Scratch
 from metagpt.ext.stanford_town.memory.spatial_memory import MemoryTree
 from metagpt.ext.stanford_town.plan.st_plan import plan
 from metagpt.ext.stanford_town.reflect.reflect import generate_poig_score, role_reflect
-from metagpt.ext.stanford_town.utils.const import STORAGE_PATH, collision_block_id
+from metagpt.ext.stanford_town.utils.const import STORAGE_PATH
 from metagpt.ext.stanford_town.utils.mg_ga_transform import (
     get_role_environment,
     save_environment,
     save_movement,
 )
-from metagpt.ext.stanford_town.utils.utils import get_embedding, path_finder
+from metagpt.ext.stanford_town.utils.utils import get_embedding
 from metagpt.logs import logger
 from metagpt.roles.role import Role, RoleContext
 from metagpt.schema import Message
@@ -181,17 +179,20 @@ class STRole(Role):
 
         logger.info(f"Role: {self.name} saved role's memory into {str(self.role_storage_path)}")
 
+    @property
+    def is_awake(self) -> bool:
+        """The role perceives and plans every simulation step, even without new messages"""
+        return bool(self.rc.env)
+
     async def _observe(self, ignore_memory=False) -> int:
         if not self.rc.env:
             return 0
         news = []
         if not news:
             news = self.rc.msg_buffer.pop_all()
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        unseen = self.rc.filter_unseen(news, ignore_memory=ignore_memory)
         # Filter out messages of interest.
-        self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.name in n.send_to) and n not in old_messages
-        ]
+        self.rc.news = [n for n in unseen if n.cause_by in self.rc.watch or self.name in n.send_to]
 
         if len(self.rc.news) == 1 and self.rc.news[0].cause_by == any_to_str(UserRequirement):
             logger.warning(f"Role: {self.name} add inner voice: {self.rc.news[0].content}")
@@ -238,60 +239,27 @@ class STRole(Role):
             ret_events: a list of <BasicMemory> that are perceived and new.
         """
         # PERCEIVE SPACE
-        # We get the nearby tiles given our current tile and the persona's vision
-        # radius.
-        nearby_tiles = self.rc.env.observe(
+        # We observe the nearby tiles given our current tile and the persona's vision
+        # radius in one region query: their spaces, and the events in our arena.
+        region = self.rc.env.observe(
             EnvObsParams(
-                obs_type=EnvObsType.TILE_NBR, coord=self.rc.scratch.curr_tile, vision_radius=self.rc.scratch.vision_r
+                obs_type=EnvObsType.REGION, coord=self.rc.scratch.curr_tile, vision_radius=self.rc.scratch.vision_r
             )
         )
 
         # We then store the perceived space. Note that the s_mem of the persona is
         # in the form of a tree constructed using dictionaries.
-        for tile in nearby_tiles:
-            tile_info = self.rc.env.observe(EnvObsParams(obs_type=EnvObsType.GET_TITLE, coord=tile))
+        for tile_info in region["spaces"]:
             self.rc.spatial_memory.add_tile_info(tile_info)
 
         # PERCEIVE EVENTS.
-        # We will perceive events that take place in the same arena as the
-        # persona's current arena.
-
-        curr_arena_path = self.rc.env.observe(
-            EnvObsParams(obs_type=EnvObsType.TILE_PATH, coord=self.rc.scratch.curr_tile, level="arena")
-        )
-
-        # We do not perceive the same event twice (this can happen if an object is
-        # extended across multiple tiles).
-        percept_events_set = set()
-        # We will order our percept based on the distance, with the closest ones
-        # getting priorities.
-        percept_events_list = []
-        # First, we put all events that are occuring in the nearby tiles into the
-        # percept_events_list
-        for tile in nearby_tiles:
-            tile_details = self.rc.env.observe(EnvObsParams(obs_type=EnvObsType.GET_TITLE, coord=tile))
-            if tile_details["events"]:
-                tmp_arena_path = self.rc.env.observe(
-                    EnvObsParams(obs_type=EnvObsType.TILE_PATH, coord=tile, level="arena")
-                )
-
-                if tmp_arena_path == curr_arena_path:
-                    # This calculates the distance between the persona's current tile,
-                    # and the target tile.
-                    dist = math.dist([tile[0], tile[1]], [self.rc.scratch.curr_tile[0], self.rc.scratch.curr_tile[1]])
-                    # Add any relevant events to our temp set/list with the distant info.
-                    for event in tile_details["events"]:
-                        if event not in percept_events_set:
-                            percept_events_list += [[dist, event]]
-                            percept_events_set.add(event)
-
-        # We sort, and perceive only self.rc.scratch.att_bandwidth of the closest
-        # events. If the bandwidth is larger, then it means the persona can perceive
-        # more elements within a small area.
-        percept_events_list = sorted(percept_events_list, key=itemgetter(0))
-        perceived_events = []
-        for dist, event in percept_events_list[: self.rc.scratch.att_bandwidth]:
-            perceived_events += [event]
+        # We perceive the events that take place in the same arena as the persona's
+        # current arena, each once even if the object extends across multiple tiles,
+        # ordered by their distance with the closest ones getting priorities.
+        # We perceive only self.rc.scratch.att_bandwidth of the closest events. If
+        # the bandwidth is larger, then it means the persona can perceive more
+        # elements within a small area.
+        perceived_events = [event for _, event in region["events"][: self.rc.scratch.att_bandwidth]]
 
         # Storing events.
         # <ret_events> is a list of <BasicMemory> instances from the persona's
@@ -307,9 +275,10 @@ class STRole(Role):
             desc = f"{s.split(':')[-1]} is {desc}"
             p_event = (s, p, o)
 
-            # We retrieve the latest self.rc.scratch.retention events. If there is
-            # something new that is happening (that is, p_event not in latest_events),
-            # then we add that event to the a_mem and return it.
+            # We retrieve the latest self.rc.scratch.retention events, cached by the
+            # memory until a new event is added. If there is something new that is
+            # happening (that is, p_event not in latest_events), then we add that
+            # event to the a_mem and return it.
             latest_events = self.rc.memory.get_summarized_latest_events(self.rc.scratch.retention)
             if p_event not in latest_events:
                 # We start by managing keywords.
@@ -422,36 +391,21 @@ class STRole(Role):
             # <target_tiles> is a list of tile coordinates where the persona may go
             # to execute the current action. The goal is to pick one of them.
             target_tiles = None
+            target_address = None
             logger.info(f"Role {self.name} plan: {plan}")
 
             if "<persona>" in plan:
                 # Executing persona-persona interaction.
                 target_p_tile = roles[plan.split("<persona>")[-1].strip()].scratch.curr_tile
-                collision_maze = self.rc.env.observe()["collision_maze"]
-                potential_path = path_finder(
-                    collision_maze, self.rc.scratch.curr_tile, target_p_tile, collision_block_id
+                potential_path = self.rc.env.observe(
+                    EnvObsParams(obs_type=EnvObsType.PATH, coord=self.rc.scratch.curr_tile, targets=[target_p_tile])
                 )
+                # Meet halfway. Every prefix of a shortest path is a shortest path, so the middle tile is the nearer
+                # one of the two middle candidates.
                 if len(potential_path) <= 2:
                     target_tiles = [potential_path[0]]
                 else:
-                    collision_maze = self.rc.env.observe()["collision_maze"]
-                    potential_1 = path_finder(
-                        collision_maze,
-                        self.rc.scratch.curr_tile,
-                        potential_path[int(len(potential_path) / 2)],
-                        collision_block_id,
-                    )
-
-                    potential_2 = path_finder(
-                        collision_maze,
-                        self.rc.scratch.curr_tile,
-                        potential_path[int(len(potential_path) / 2) + 1],
-                        collision_block_id,
-                    )
-                    if len(potential_1) <= len(potential_2):
-                        target_tiles = [potential_path[int(len(potential_path) / 2)]]
-                    else:
-                        target_tiles = [potential_path[int(len(potential_path) / 2 + 1)]]
+                    target_tiles = [potential_path[int(len(potential_path) / 2)]]
 
             elif "<waiting>" in plan:
                 # Executing interaction where the persona has decided to wait before
@@ -479,51 +433,60 @@ class STRole(Role):
                     address_tiles["Johnson Park:park:park garden"]  # ERRORRRRRRR
                 else:
                     target_tiles = address_tiles[plan]
-
-            # There are sometimes more than one tile returned from this (e.g., a tabe
-            # may stretch many coordinates). So, we sample a few here. And from that
-            # random sample, we will take the closest ones.
-            if len(target_tiles) < 4:
-                target_tiles = random.sample(list(target_tiles), len(target_tiles))
+                    target_address = plan
+
+            if target_address:
+                # An address may stretch many coordinates (e.g., a table). The env keeps the
+                # distance field of each address, so the personas heading to the same address
+                # share it, and the path leads to the closest tile of the address.
+                path = self.rc.env.observe(
+                    EnvObsParams(
+                        obs_type=EnvObsType.ADDRESS_PATH, coord=self.rc.scratch.curr_tile, address=target_address
+                    )
+                )
+                # If possible, we want personas to occupy different tiles when they are
+                # headed to the same location on the maze. It is ok if they end up on the
+                # same tile, but we try to lower that probability: if another persona
+                # stands on the closest tile, head to the closest of the free tiles instead.
+                occupied_tiles = {
+                    tuple(role.scratch.curr_tile)
+                    for name, role in roles.items()
+                    if name != self.name and role.scratch.curr_tile
+                }
+                if tuple(path[-1]) in occupied_tiles:
+                    free_tiles = [tile for tile in target_tiles if tuple(tile) not in occupied_tiles]
+                    if free_tiles:
+                        path = self.rc.env.observe(
+                            EnvObsParams(obs_type=EnvObsType.PATH, coord=self.rc.scratch.curr_tile, targets=free_tiles)
+                        )
             else:
-                target_tiles = random.sample(list(target_tiles), 4)
-            # If possible, we want personas to occupy different tiles when they are
-            # headed to the same location on the maze. It is ok if they end up on the
-            # same time, but we try to lower that probability.
-            # We take care of that overlap here.
-            persona_name_set = set(roles.keys())
-            new_target_tiles = []
-            for i in target_tiles:
-                access_tile = self.rc.env.observe(EnvObsParams(obs_type=EnvObsType.GET_TITLE, coord=i))
-                curr_event_set = access_tile["events"]
-                pass_curr_tile = False
-                for j in curr_event_set:
-                    if j[0] in persona_name_set:
-                        pass_curr_tile = True
-                if not pass_curr_tile:
-                    new_target_tiles += [i]
-            if len(new_target_tiles) == 0:
-                new_target_tiles = target_tiles
-            target_tiles = new_target_tiles
-
-            # Now that we've identified the target tile, we find the shortest path to
-            # one of the target tiles.
-            curr_tile = self.rc.scratch.curr_tile
-            closest_target_tile = None
-            path = None
-            for i in target_tiles:
-                # path_finder takes a collision_mze and the curr_tile coordinate as
-                # an input, and returns a list of coordinate tuples that becomes the
-                # path.
+                # If possible, we want personas to occupy different tiles when they are
+                # headed to the same location on the maze. It is ok if they end up on the
+                # same time, but we try to lower that probability.
+                # We take care of that overlap here.
+                persona_name_set = set(roles.keys())
+                new_target_tiles = []
+                for i in target_tiles:
+                    access_tile = self.rc.env.observe(EnvObsParams(obs_type=EnvObsType.GET_TITLE, coord=i))
+                    curr_event_set = access_tile["events"]
+                    pass_curr_tile = False
+                    for j in curr_event_set:
+                        if j[0] in persona_name_set:
+                            pass_curr_tile = True
+                    if not pass_curr_tile:
+                        new_target_tiles += [i]
+                if len(new_target_tiles) == 0:
+                    new_target_tiles = target_tiles
+                target_tiles = new_target_tiles
+
+                # Now that we've identified the target tile, we find the shortest path to
+                # one of the target tiles.
+                # The env searches from all the target tiles at once and returns a list of
+                # coordinate tuples to the closest one, that becomes the path.
                 # e.g., [(0, 1), (1, 1), (1, 2), (1, 3), (1, 4)...]
-                collision_maze = self.rc.env.observe()["collision_maze"]
-                curr_path = path_finder(collision_maze, curr_tile, i, collision_block_id)
-                if not closest_target_tile:
-                    closest_target_tile = i
-                    path = curr_path
-                elif len(curr_path) < len(path):
-                    closest_target_tile = i
-                    path = curr_path
+                path = self.rc.env.observe(
+                    EnvObsParams(obs_type=EnvObsType.PATH, coord=self.rc.scratch.curr_tile, targets=target_tiles)
+                )
 
             # Actually setting the <planned_path> and <act_path_set>. We cut the
             # first element in the planned_path because it includes the curr_tile.
@@ -543,21 +506,34 @@ class STRole(Role):
         execution = ret, self.rc.scratch.act_pronunciatio, description
         return execution
 
-    async def update_role_env(self) -> bool:
-        role_env = get_role_environment(self.sim_code, self.name, self.step)
-        ret = True
-        if role_env:
-            for key, val in self.game_obj_cleanup.items():
-                self.rc.env.step(EnvAction(action_type=EnvActionType.TURN_TILE_EVENT_IDLE, coord=val, event=key))
-
-            # reset game_obj_cleanup
-            self.game_obj_cleanup = dict()
-            curr_tile = self.role_tile
-            new_tile = (role_env["x"], role_env["y"])
-            self.rc.env.step(
-                EnvAction(action_type=EnvActionType.RM_TITLE_SUB_EVENT, coord=curr_tile, subject=self.name)
+    def role_env_actions(self, role_env: dict) -> list[EnvAction]:
+        """
+        The env actions moving the role to its tile of the step in `role_env`, e.g. {"x": 58, "y": 9},
+        in the order to apply them. The role's own state, its curr_tile and game objects to clean up, is
+        updated here.
+        """
+        actions = []
+        for key, val in self.game_obj_cleanup.items():
+            actions.append(EnvAction(action_type=EnvActionType.TURN_TILE_EVENT_IDLE, coord=val, event=key))
+
+        # reset game_obj_cleanup
+        self.game_obj_cleanup = dict()
+        curr_tile = self.role_tile
+        new_tile = (role_env["x"], role_env["y"])
+        actions.append(EnvAction(action_type=EnvActionType.RM_TITLE_SUB_EVENT, coord=curr_tile, subject=self.name))
+        actions.append(
+            EnvAction(
+                action_type=EnvActionType.ADD_TILE_EVENT,
+                coord=new_tile,
+                event=self.scratch.get_curr_event_and_desc(),
             )
-            self.rc.env.step(
+        )
+
+        # the persona will travel to get to their destination. *Once*
+        # the persona gets there, we activate the object action.
+        if not self.scratch.planned_path:
+            self.game_obj_cleanup[self.scratch.get_curr_event_and_desc()] = new_tile
+            actions.append(
                 EnvAction(
                     action_type=EnvActionType.ADD_TILE_EVENT,
                     coord=new_tile,
@@ -565,39 +541,29 @@ class STRole(Role):
                 )
             )
 
-            # the persona will travel to get to their destination. *Once*
-            # the persona gets there, we activate the object action.
-            if not self.scratch.planned_path:
-                self.game_obj_cleanup[self.scratch.get_curr_event_and_desc()] = new_tile
-                self.rc.env.step(
-                    EnvAction(
-                        action_type=EnvActionType.ADD_TILE_EVENT,
-                        coord=new_tile,
-                        event=self.scratch.get_curr_event_and_desc(),
-                    )
-                )
+            blank = (self.scratch.get_curr_obj_event_and_desc()[0], None, None, None)
+            actions.append(EnvAction(action_type=EnvActionType.RM_TILE_EVENT, coord=new_tile, event=blank))
 
-                blank = (self.scratch.get_curr_obj_event_and_desc()[0], None, None, None)
-                self.rc.env.step(EnvAction(action_type=EnvActionType.RM_TILE_EVENT, coord=new_tile, event=blank))
+        # update role's new tile
+        self.rc.scratch.curr_tile = new_tile
+        return actions
 
-            # update role's new tile
-            self.rc.scratch.curr_tile = new_tile
+    async def update_role_env(self) -> bool:
+        role_env = get_role_environment(self.sim_code, self.name, self.step)
+        ret = True
+        if role_env:
+            for action in self.role_env_actions(role_env):
+                self.rc.env.step(action)
         else:
             ret = False
-            time.sleep(1)
+            await asyncio.sleep(1)
             logger.warning(
                 f"{self.sim_code}/environment/{self.step}.json not exist or parses failed, " f"sleep 1s and re-check"
             )
         return ret
 
-    async def _react(self) -> Message:
-        # update role env
-        ret = await self.update_role_env()
-        if not ret:
-            # TODO add message
-            logger.info(f"Role: {self.name} update_role_env return False")
-            return DummyMessage()
-
+    async def think(self) -> dict:
+        """Perceive, retrieve, plan, reflect and execute for the current step, return the role's move of the step"""
         new_day = False
         if not self.scratch.curr_time or self.inner_voice:
             new_day = "First day"
@@ -624,16 +590,32 @@ class STRole(Role):
             "description": description,
             "chat": self.scratch.chat,
         }
-        save_movement(self.name, role_move, step=self.step, sim_code=self.sim_code, curr_time=self.curr_time)
+        return role_move
 
-        # step update
+    def advance_step(self):
+        """Move the role to the next step and its time"""
         logger.info(f"Role: {self.name} run at {self.step} step on {self.curr_time} at tile: {self.scratch.curr_tile}")
         self.step += 1
-        save_environment(self.name, self.step, self.sim_code, next_tile)
         self.curr_time += timedelta(seconds=self.sec_per_step)
         self.inner_voice = False
 
-        time.sleep(0.5)
+    async def _react(self) -> Message:
+        # update role env
+        ret = await self.update_role_env()
+        if not ret:
+            # TODO add message
+            logger.info(f"Role: {self.name} update_role_env return False")
+            return DummyMessage()
+
+        role_move = await self.think()
+        save_movement(self.name, role_move, step=self.step, sim_code=self.sim_code, curr_time=self.curr_time)
+
+        # step update
+        next_step = self.step + 1
+        save_environment(self.name, next_step, self.sim_code, role_move["movement"])
+        self.advance_step()
+
+        await asyncio.sleep(0.5)
         return DummyMessage()
 
 
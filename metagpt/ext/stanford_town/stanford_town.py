@@ -7,6 +7,7 @@ from typing import Any, Optional
 from metagpt.context import Context
 from metagpt.environment import StanfordTownEnv
 from metagpt.ext.stanford_town.roles.st_role import STRole
+from metagpt.ext.stanford_town.stepper import SimStepper
 from metagpt.ext.stanford_town.utils.const import MAZE_ASSET_PATH
 from metagpt.logs import logger
 from metagpt.team import Team
@@ -29,16 +30,19 @@ class StanfordTown(Team):
         for role in roles:
             await role.init_curr_tile()
 
-    async def run(self, n_round: int = 3):
-        """Run company until target round or no money"""
+    async def run(self, n_round: int = 3, max_concurrency: int = 8):
+        """Run company until target round or no money, a round is a simulation step of all the roles, see
+        `SimStepper`. At most `max_concurrency` roles think at a time."""
+        roles = self.env.get_roles()
+        stepper = SimStepper(self.env, list(roles.values()), max_concurrency=max_concurrency)
         while n_round > 0:
             n_round -= 1
             logger.debug(f"{n_round=}")
             self._check_balance()
-            await self.env.run()
+            await stepper.step()
+        logger.info(f"StanfordTown: {stepper.report}")
 
         # save simulation result including environment and roles after all rounds
-        roles = self.env.get_roles()
         for profile, role in roles.items():
             role.save_into()
 
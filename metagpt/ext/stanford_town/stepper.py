@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : step the StanfordTown roles together, their cognition concurrently and their env changes in a fixed order
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Optional
+
+from pydantic import BaseModel
+
+from metagpt.ext.stanford_town.utils.mg_ga_transform import (
+    get_environment,
+    save_environments,
+    save_movements,
+)
+from metagpt.logs import logger
+
+if TYPE_CHECKING:
+    from metagpt.environment.stanford_town.stanford_town_env import (  # noqa: F401
+        StanfordTownEnv,
+    )
+    from metagpt.ext.stanford_town.roles.st_role import STRole  # noqa: F401
+
+
+class StepFeed:
+    """The tiles of the roles per step, i.e. `environment/{step}.json`.
+
+    A step published here is also written to its file, and wakes up the waiters of the step at once, instead of
+    them re-checking the file every second. A step not published in the process, like the first one of a forked
+    simulation, is read from its file.
+
+    `SimStepper` publishes a step before waiting for it, so its waits return the published tiles without awaiting.
+    The events only wake up the waiters started before the publish, e.g. a task waiting for a step written by
+    another process.
+    """
+
+    def __init__(self, sim_code: str):
+        self.sim_code = sim_code
+        self._environments: dict[int, dict] = {}
+        self._published: dict[int, asyncio.Event] = {}
+
+    def _event(self, step: int) -> asyncio.Event:
+        return self._published.setdefault(step, asyncio.Event())
+
+    def publish(self, step: int, movements: dict[str, list[int]]):
+        """Save the tiles of the roles at the step, and wake up its waiters"""
+        self._environments[step] = save_environments(movements, step=step, sim_code=self.sim_code)
+        self._event(step).set()
+
+    async def wait(self, step: int, role_names: list[str], timeout: Optional[float] = 60) -> dict:
+        """Wait until the tiles of all the roles at the step are known, return the environment of the step"""
+        environment = self._environments.get(step) or get_environment(self.sim_code, step) or {}
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not all(name in environment for name in role_names):
+            event = self._event(step)
+            event.clear()
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                missing = [name for name in role_names if name not in environment]
+                raise TimeoutError(f"{self.sim_code}/environment/{step}.json misses the tiles of {missing}")
+            try:
+                await asyncio.wait_for(event.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+            environment = self._environments.get(step) or get_environment(self.sim_code, step) or {}
+        self._environments.pop(step - 1, None)
+        self._published.pop(step - 1, None)
+        return environment
+
+
+class StepReport(BaseModel):
+    steps: int = 0
+    personas: int = 0
+    merge_time: float = 0.0  # seconds applying the env actions
+    think_time: float = 0.0  # seconds of the concurrent cognition
+    save_time: float = 0.0  # seconds saving the movements and the next environment
+    elapsed: float = 0.0  # seconds
+
+    @property
+    def steps_per_sec(self) -> float:
+        return self.steps / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.steps} steps of {self.personas} personas in {self.elapsed:.2f}s, "
+            f"{self.steps_per_sec:.3f} sim-steps/sec (merge {self.merge_time:.2f}s, think {self.think_time:.2f}s, "
+            f"save {self.save_time:.2f}s)"
+        )
+
+
+class SimStepper:
+    """Run the simulation step by step, all the roles at the same step. A step has three phases:
+
+    1. merge: the env actions moving the roles to their tiles of the step are applied role by role, in the order of
+       their names, so the env every role perceives does not depend on which role is scheduled first.
+    2. think: the roles perceive, retrieve, plan, reflect and execute concurrently, at most `max_concurrency` of them
+       at a time. A role's cognition is a chain of LLM requests, so this bounds the in-flight requests of the
+       simulation, `LLMConfig.max_concurrency` further bounds them per provider.
+    3. save: the moves are saved into `movement/{step}.json` and the next tiles published to the `StepFeed`.
+    """
+
+    def __init__(self, env: "StanfordTownEnv", roles: list["STRole"], max_concurrency: int = 8):
+        assert roles, "no role to step"
+        assert len({role.step for role in roles}) == 1, "the roles should be at the same step"
+        self.env = env
+        self.roles = sorted(roles, key=lambda role: role.name)
+        self.max_concurrency = max_concurrency
+        self.feed = StepFeed(self.roles[0].sim_code)
+        self.report = StepReport(personas=len(self.roles))
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def step_no(self) -> int:
+        return self.roles[0].step
+
+    def merge(self, environment: dict):
+        for role in self.roles:
+            for action in role.role_env_actions(environment[role.name]):
+                self.env.step(action)
+
+    async def _think(self, role: "STRole") -> dict:
+        async with self._semaphore:
+            await role._observe()  # take the messages, e.g. the inner voice
+            return await role.think()
+
+    async def step(self):
+        start = time.perf_counter()
+        environment = await self.feed.wait(self.step_no, [role.name for role in self.roles])
+        self.merge(environment)
+        merged = time.perf_counter()
+
+        role_moves = await asyncio.gather(*(self._think(role) for role in self.roles))
+        thought = time.perf_counter()
+
+        role_moves = {role.name: role_move for role, role_move in zip(self.roles, role_moves)}
+        step_no, curr_time = self.step_no, self.roles[0].curr_time
+        save_movements(role_moves, step=step_no, sim_code=self.feed.sim_code, curr_time=curr_time)
+        self.feed.publish(step_no + 1, {name: role_move["movement"] for name, role_move in role_moves.items()})
+        for role in self.roles:
+            role.advance_step()
+        end = time.perf_counter()
+
+        self.report.steps += 1
+        self.report.merge_time += merged - start
+        self.report.think_time += thought - merged
+        self.report.save_time += end - thought
+        self.report.elapsed += end - start
+        logger.info(f"sim step {step_no} done in {end - start:.2f}s, {self.report.steps_per_sec:.3f} sim-steps/sec")
+
+    async def run(self, n_steps: int) -> StepReport:
+        for _ in range(n_steps):
+            await self.step()
+        logger.info(f"SimStepper: {self.report}")
+        return self.report
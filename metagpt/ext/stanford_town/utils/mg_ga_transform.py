@@ -17,6 +17,11 @@ def get_reverie_meta(sim_code: str) -> dict:
 
 
 def save_movement(role_name: str, role_move: dict, step: int, sim_code: str, curr_time: str):
+    save_movements({role_name: role_move}, step=step, sim_code=sim_code, curr_time=curr_time)
+
+
+def save_movements(role_moves: dict[str, dict], step: int, sim_code: str, curr_time: str):
+    """Save the moves of several roles of a step with one read and write of `movement/{step}.json`"""
     movement_path = STORAGE_PATH.joinpath(f"{sim_code}/movement/{step}.json")
     if not movement_path.parent.exists():
         movement_path.parent.mkdir(exist_ok=True)
@@ -24,7 +29,7 @@ def save_movement(role_name: str, role_move: dict, step: int, sim_code: str, cur
         movement = read_json_file(movement_path)
     else:
         movement = {"persona": dict(), "meta": dict()}
-    movement["persona"][role_name] = role_move
+    movement["persona"].update(role_moves)
     movement["meta"]["curr_time"] = curr_time.strftime("%B %d, %Y, %H:%M:%S")
 
     write_json_file(movement_path, movement)
@@ -32,6 +37,12 @@ def save_movement(role_name: str, role_move: dict, step: int, sim_code: str, cur
 
 
 def save_environment(role_name: str, step: int, sim_code: str, movement: list[int]):
+    save_environments({role_name: movement}, step=step, sim_code=sim_code)
+
+
+def save_environments(movements: dict[str, list[int]], step: int, sim_code: str) -> dict:
+    """Save the tiles of several roles of a step with one read and write of `environment/{step}.json`,
+    return the environment of the step"""
     environment_path = STORAGE_PATH.joinpath(f"{sim_code}/environment/{step}.json")
     if not environment_path.parent.exists():
         environment_path.parent.mkdir(exist_ok=True)
@@ -40,19 +51,22 @@ def save_environment(role_name: str, step: int, sim_code: str, movement: list[in
     else:
         environment = {}
 
-    environment[role_name] = {"maze": "the_ville", "x": movement[0], "y": movement[1]}
+    for role_name, movement in movements.items():
+        environment[role_name] = {"maze": "the_ville", "x": movement[0], "y": movement[1]}
     write_json_file(environment_path, environment)
     logger.info(f"save_environment at step: {step}")
+    return environment
 
 
 def get_role_environment(sim_code: str, role_name: str, step: int = 0) -> dict:
-    env_path = STORAGE_PATH.joinpath(f"{sim_code}/environment/{step}.json")
-    role_env = None
-    if env_path.exists():
-        env_info = read_json_file(env_path)
-        role_env = env_info.get(role_name, None)
+    env_info = get_environment(sim_code, step)
+    return env_info.get(role_name, None) if env_info else None
+
 
-    return role_env
+def get_environment(sim_code: str, step: int = 0) -> Optional[dict]:
+    """The tiles of all roles at the step, None if `environment/{step}.json` does not exist"""
+    env_path = STORAGE_PATH.joinpath(f"{sim_code}/environment/{step}.json")
+    return read_json_file(env_path) if env_path.exists() else None
 
 
 def write_curr_sim_code(curr_sim_code: dict, temp_storage_path: Optional[Path] = None):
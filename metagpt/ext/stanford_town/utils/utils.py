@@ -14,6 +14,7 @@ from typing import Union
 from openai import OpenAI
 
 from metagpt.config2 import config
+from metagpt.environment.stanford_town.path_finder import PathFinder
 from metagpt.logs import logger
 
 
@@ -57,6 +58,7 @@ def get_embedding(text, model: str = "text-embedding-ada-002"):
             embedding = (
                 OpenAI(api_key=config.llm.api_key).embeddings.create(input=[text], model=model).data[0].embedding
             )
+            break
         except Exception as exp:
             logger.info(f"get_embedding failed, exp: {exp}, will retry.")
             time.sleep(5)
@@ -87,71 +89,13 @@ def extract_first_json_dict(data_str: str) -> Union[None, dict]:
 
 
 def path_finder_v2(a, start, end, collision_block_char) -> list[int]:
-    def make_step(m, k):
-        for i in range(len(m)):
-            for j in range(len(m[i])):
-                if m[i][j] == k:
-                    if i > 0 and m[i - 1][j] == 0 and a[i - 1][j] == 0:
-                        m[i - 1][j] = k + 1
-                    if j > 0 and m[i][j - 1] == 0 and a[i][j - 1] == 0:
-                        m[i][j - 1] = k + 1
-                    if i < len(m) - 1 and m[i + 1][j] == 0 and a[i + 1][j] == 0:
-                        m[i + 1][j] = k + 1
-                    if j < len(m[i]) - 1 and m[i][j + 1] == 0 and a[i][j + 1] == 0:
-                        m[i][j + 1] = k + 1
-
-    new_maze = []
-    for row in a:
-        new_row = []
-        for j in row:
-            if j == collision_block_char:
-                new_row += [1]
-            else:
-                new_row += [0]
-        new_maze += [new_row]
-    a = new_maze
-
-    m = []
-    for i in range(len(a)):
-        m.append([])
-        for j in range(len(a[i])):
-            m[-1].append(0)
-    i, j = start
-    m[i][j] = 1
-
-    k = 0
-    except_handle = 150
-    while m[end[0]][end[1]] == 0:
-        k += 1
-        make_step(m, k)
-
-        if except_handle == 0:
-            break
-        except_handle -= 1
-
-    i, j = end
-    k = m[i][j]
-    the_path = [(i, j)]
-    while k > 1:
-        if i > 0 and m[i - 1][j] == k - 1:
-            i, j = i - 1, j
-            the_path.append((i, j))
-            k -= 1
-        elif j > 0 and m[i][j - 1] == k - 1:
-            i, j = i, j - 1
-            the_path.append((i, j))
-            k -= 1
-        elif i < len(m) - 1 and m[i + 1][j] == k - 1:
-            i, j = i + 1, j
-            the_path.append((i, j))
-            k -= 1
-        elif j < len(m[i]) - 1 and m[i][j + 1] == k - 1:
-            i, j = i, j + 1
-            the_path.append((i, j))
-            k -= 1
-
-    the_path.reverse()
-    return the_path
+    """Shortest path on the maze `a` with coordinates in (row, col) form.
+    The grid is rebuilt per call, a StanfordTownExtEnv keeps one for all the queries of a simulation, see
+    `StanfordTownExtEnv.find_path`.
+    """
+    path_finder = PathFinder.from_collision_maze(a, collision_block_char)
+    the_path = path_finder.find_path((start[1], start[0]), [(end[1], end[0])])
+    return [(i, j) for j, i in the_path]
 
 
 def path_finder(collision_maze: list, start: list[int], end: list[int], collision_block_char: str) -> list[int]:
@@ -58,16 +58,14 @@ class BasePlayer(Role):
         news = []
         if not news:
             news = self.rc.msg_buffer.pop_all()
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        unseen = self.rc.filter_unseen(news, ignore_memory=ignore_memory)
         for m in news:
             if len(m.restricted_to) and self.profile not in m.restricted_to and self.name not in m.restricted_to:
                 # if the msg is not send to the whole audience ("") nor this role (self.profile or self.name),
                 # then this role should not be able to receive it and record it into its memory
                 continue
             self.rc.memory.add(m)
-        self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.profile in n.send_to) and n not in old_messages
-        ]
+        self.rc.news = [n for n in unseen if n.cause_by in self.rc.watch or self.profile in n.send_to]
 
         # TODO to delete
         # await super()._observe()
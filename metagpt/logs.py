@@ -7,7 +7,10 @@
 """
 
 import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from typing import Callable, Iterator, Optional
 
 from loguru import logger as _logger
 
@@ -34,8 +37,26 @@ def define_log_level(print_level="INFO", logfile_level="DEBUG", name: str = None
 logger = define_log_level()
 
 
+# consumer of the llm stream chunks of the current task, e.g. an incremental output parser
+_llm_stream_consumer: ContextVar[Optional[Callable[[str], None]]] = ContextVar("llm_stream_consumer", default=None)
+
+
 def log_llm_stream(msg):
     _llm_stream_log(msg)
+    consumer = _llm_stream_consumer.get()
+    if consumer:
+        consumer(msg)
+
+
+@contextmanager
+def llm_stream_consumer(func: Callable[[str], None]) -> Iterator[None]:
+    """Feed the llm stream chunks of the current task to `func` as well, an exception raised by `func` aborts the
+    stream"""
+    token = _llm_stream_consumer.set(func)
+    try:
+        yield
+    finally:
+        _llm_stream_consumer.reset(token)
 
 
 def set_llm_stream_logfunc(func):
@@ -283,10 +283,11 @@ class BrainMemory(BaseModel):
             padding_size = 20 if max_token_count > 20 else 0
             text_windows = self.split_texts(text, window_size=max_token_count - padding_size)
             part_max_words = min(int(max_words / len(text_windows)) + 1, 100)
-            summaries = []
-            for ws in text_windows:
-                response = await self._get_summary(text=ws, max_words=part_max_words, keep_language=keep_language)
-                summaries.append(response)
+            # the windows are summarized concurrently, bounded by `aask_many`
+            system_msgs = self._summary_system_msgs(max_words=part_max_words, keep_language=keep_language)
+            long_windows = [ws for ws in text_windows if len(ws) >= part_max_words]
+            responses = iter(await self.llm.aask_many(long_windows, system_msgs=system_msgs))
+            summaries = [next(responses) if len(ws) >= part_max_words else ws for ws in text_windows]
             if len(summaries) == 1:
                 summary = summaries[0]
                 break
@@ -302,15 +303,20 @@ class BrainMemory(BaseModel):
         """Generate text summary"""
         if len(text) < max_words:
             return text
+        system_msgs = self._summary_system_msgs(max_words=max_words, keep_language=keep_language)
+        response = await self.llm.aask(msg=text, system_msgs=system_msgs, stream=False)
+        logger.debug(f"{text}\nsummary rsp: {response}")
+        return response
+
+    @staticmethod
+    def _summary_system_msgs(max_words: int, keep_language: bool) -> list[str]:
         system_msgs = [
             "You are a tool for summarizing and abstracting text.",
             f"Return the summarized text to less than {max_words} words.",
         ]
         if keep_language:
             system_msgs.append("The generated summary should be in the same language as the original text.")
-        response = await self.llm.aask(msg=text, system_msgs=system_msgs, stream=False)
-        logger.debug(f"{text}\nsummary rsp: {response}")
-        return response
+        return system_msgs
 
     @staticmethod
     def split_texts(text: str, window_size) -> List[str]:
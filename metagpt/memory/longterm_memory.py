@@ -4,7 +4,7 @@
 @Desc   : the implement of Long-term memory
 """
 
-from typing import Optional
+from typing import Iterable, Optional
 
 from pydantic import ConfigDict, Field
 
@@ -41,11 +41,20 @@ class LongTermMemory(Memory):
 
     def add(self, message: Message):
         super().add(message)
-        for action in self.rc.watch:
-            if message.cause_by == action and not self.msg_from_recover:
-                # currently, only add role's watching messages to its memory_storage
-                # and ignore adding messages from recover repeatedly
-                self.memory_storage.add(message)
+        if self._need_store(message):
+            self.memory_storage.add(message)
+
+    def add_batch(self, messages: Iterable[Message]):
+        """Add messages, the watched ones are embedded and stored in one batch"""
+        messages = list(messages)
+        for message in messages:
+            super().add(message)
+        self.memory_storage.add_batch([message for message in messages if self._need_store(message)])
+
+    def _need_store(self, message: Message) -> bool:
+        # currently, only add role's watching messages to its memory_storage
+        # and ignore adding messages from recover repeatedly
+        return message.cause_by in self.rc.watch and not self.msg_from_recover
 
     async def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """
@@ -7,9 +7,9 @@
 @Modified By: mashenquan, 2023-11-1. According to RFC 116: Updated the type of index key.
 """
 from collections import defaultdict
-from typing import DefaultDict, Iterable, Set
+from typing import Any, DefaultDict, Iterable, Set
 
-from pydantic import BaseModel, Field, SerializeAsAny
+from pydantic import BaseModel, Field, PrivateAttr, SerializeAsAny
 
 from metagpt.const import IGNORED_MESSAGE_ID
 from metagpt.schema import Message
@@ -17,21 +17,69 @@ from metagpt.utils.common import any_to_str, any_to_str_set
 
 
 class Memory(BaseModel):
-    """The most basic memory: super-memory"""
+    """The most basic memory: super-memory
+
+    `storage` is the insertion-ordered log. Membership, deletion and the role/sent_from lookups are served by private
+    indexes keyed by `Message.id`, so they do not scan the whole storage.
+    """
 
     storage: list[SerializeAsAny[Message]] = []
     index: DefaultDict[str, list[SerializeAsAny[Message]]] = Field(default_factory=lambda: defaultdict(list))
     ignore_id: bool = False
 
+    _id_index: dict[str, Message] = PrivateAttr(default_factory=dict)
+    _role_index: DefaultDict[str, list[Message]] = PrivateAttr(default_factory=lambda: defaultdict(list))
+    _sent_from_index: DefaultDict[str, list[Message]] = PrivateAttr(default_factory=lambda: defaultdict(list))
+
+    def model_post_init(self, __context: Any) -> None:
+        """Rebuild the indexes after init or deserialization"""
+        if self.storage:
+            self._rebuild_index()
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare the stored fields only, the private indexes are derived from them"""
+        if not isinstance(other, Memory):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
+
+    def _rebuild_index(self):
+        self.index = defaultdict(list, {k: [] for k in self.index})  # keep the keys, refill with stored objects
+        self._id_index = {}
+        self._role_index = defaultdict(list)
+        self._sent_from_index = defaultdict(list)
+        for message in self.storage:
+            self._index_message(message)
+
+    def _message_key(self, message: Message) -> str:
+        """Messages are identified by id; when ids are ignored they all share one, so fall back to the full dump."""
+        return message.dump() if self.ignore_id else message.id
+
+    def _index_message(self, message: Message):
+        self._id_index[self._message_key(message)] = message
+        self._role_index[message.role].append(message)
+        self._sent_from_index[message.sent_from].append(message)
+        if message.cause_by:
+            self.index[message.cause_by].append(message)
+
+    def _unindex_message(self, message: Message):
+        self._id_index.pop(self._message_key(message), None)
+        _remove_identical(self._role_index.get(message.role, []), message)
+        _remove_identical(self._sent_from_index.get(message.sent_from, []), message)
+        if message.cause_by:
+            _remove_identical(self.index.get(message.cause_by, []), message)
+
+    def contains(self, message: Message) -> bool:
+        """Return True if the message has already been stored"""
+        return self._message_key(message) in self._id_index
+
     def add(self, message: Message):
         """Add a new message to storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        if message in self.storage:
+        if self.contains(message):
             return
         self.storage.append(message)
-        if message.cause_by:
-            self.index[message.cause_by].append(message)
+        self._index_message(message)
 
     def add_batch(self, messages: Iterable[Message]):
         for message in messages:
@@ -39,7 +87,11 @@ class Memory(BaseModel):
 
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        return list(self._role_index.get(role, []))
+
+    def get_by_sent_from(self, sent_from: str) -> list[Message]:
+        """Return all messages sent from a specified role"""
+        return list(self._sent_from_index.get(any_to_str(sent_from), []))
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
@@ -49,8 +101,7 @@ class Memory(BaseModel):
         """delete the newest message from the storage"""
         if len(self.storage) > 0:
             newest_msg = self.storage.pop()
-            if newest_msg.cause_by and newest_msg in self.index[newest_msg.cause_by]:
-                self.index[newest_msg.cause_by].remove(newest_msg)
+            self._unindex_message(newest_msg)
         else:
             newest_msg = None
         return newest_msg
@@ -59,14 +110,18 @@ class Memory(BaseModel):
         """Delete the specified message from storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        self.storage.remove(message)
-        if message.cause_by and message in self.index[message.cause_by]:
-            self.index[message.cause_by].remove(message)
+        stored = self._id_index.get(self._message_key(message))
+        if stored is None or not _remove_identical(self.storage, stored):
+            raise ValueError(f"{message} not in memory")
+        self._unindex_message(stored)
 
     def clear(self):
         """Clear storage and index"""
         self.storage = []
         self.index = defaultdict(list)
+        self._id_index = {}
+        self._role_index = defaultdict(list)
+        self._sent_from_index = defaultdict(list)
 
     def count(self) -> int:
         """Return the number of messages in storage"""
@@ -82,13 +137,11 @@ class Memory(BaseModel):
 
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """find news (previously unseen messages) from the the most recent k memories, from all memories when k=0"""
-        already_observed = self.get(k)
-        news: list[Message] = []
-        for i in observed:
-            if i in already_observed:
-                continue
-            news.append(i)
-        return news
+        if k == 0 or k >= len(self.storage):
+            already_observed = self._id_index
+        else:
+            already_observed = {self._message_key(i) for i in self.storage[-k:]}
+        return [i for i in observed if self._message_key(i) not in already_observed]
 
     def get_by_action(self, action) -> list[Message]:
         """Return all messages triggered by a specified Action"""
@@ -104,3 +157,12 @@ class Memory(BaseModel):
                 continue
             rsp += self.index[action]
         return rsp
+
+
+def _remove_identical(messages: list[Message], message: Message) -> bool:
+    """Remove `message` from `messages` by identity, scanning from the newest end; avoids pydantic `__eq__`."""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i] is message:
+            del messages[i]
+            return True
+    return False
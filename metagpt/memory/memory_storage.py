@@ -3,24 +3,41 @@
 """
 @Desc   : the implement of memory storage
 """
+import json
+import os
 import shutil
+import threading
 from pathlib import Path
+from typing import Optional
 
 from llama_index.core.embeddings import BaseEmbedding
 
 from metagpt.const import DATA_PATH, MEM_TTL
 from metagpt.logs import logger
+from metagpt.memory.memory_wal import MEMORY_WAL_FILE, MemoryWAL
 from metagpt.rag.engines.simple import SimpleEngine
 from metagpt.rag.schema import FAISSIndexConfig, FAISSRetrieverConfig
 from metagpt.schema import Message
+from metagpt.utils.common import read_json_file, write_json_file
 from metagpt.utils.embedding import get_embedding
 
+MEMORY_SNAPSHOT_META = "memory_snapshot.json"  # the last log segment folded into the snapshot, and the one being folded
+
 
 class MemoryStorage(object):
     """
     The memory storage with Faiss as ANN search engine
+
+    `persist` appends the messages added since the last persist, with their embeddings, to a write-ahead log.
+    When the log grows over `compact_ratio` of the snapshot, the log is moved to a numbered segment and folded into
+    a new snapshot in a background thread: the former snapshot is loaded into a separate engine, the segment is
+    replayed into it and it is saved, so the engine in use is never locked. `recover_memory` loads the snapshot and
+    replays the segments not folded into it yet, then the log.
     """
 
+    compact_ratio: float = 0.5
+    min_compact_records: int = 256
+
     def __init__(self, mem_ttl: int = MEM_TTL, embedding: BaseEmbedding = None):
         self.role_id: str = None
         self.role_mem_path: str = None
@@ -30,6 +47,11 @@ class MemoryStorage(object):
         self.embedding = embedding or get_embedding()
 
         self.faiss_engine = None
+        self.wal: Optional[MemoryWAL] = None
+        self._snapshot_size = 0
+        self._segment_no = 0  # the number of the last log segment
+        self._unsaved: list[tuple[Message, list[float]]] = []  # added since the last persist
+        self._compaction: Optional[threading.Thread] = None
 
     @property
     def is_initialized(self) -> bool:
@@ -41,22 +63,38 @@ class MemoryStorage(object):
         self.role_mem_path.mkdir(parents=True, exist_ok=True)
         self.cache_dir = self.role_mem_path
 
-        if self.role_mem_path.joinpath("default__vector_store.json").exists():
-            self.faiss_engine = SimpleEngine.from_index(
-                index_config=FAISSIndexConfig(persist_path=self.cache_dir),
-                retriever_configs=[FAISSRetrieverConfig()],
-                embed_model=self.embedding,
-            )
-        else:
-            self.faiss_engine = SimpleEngine.from_objs(
-                objs=[], retriever_configs=[FAISSRetrieverConfig()], embed_model=self.embedding
-            )
+        self.faiss_engine = self._load_snapshot()
+        self._snapshot_size = len(self.faiss_engine.retriever._index.docstore.docs)
+        self._unsaved = []
+
+        # the segments up to the one recorded in the snapshot are in it, left over by a compaction interrupted
+        # before deleting them. The later ones are replayed and folded into a new snapshot.
+        meta = self._read_snapshot_meta()
+        folded_no = meta.get("segment_no", 0)
+        segments = self._list_segments()
+        self._drop_segments([path for no, path in segments if no <= folded_no])
+        segments = [(no, path) for no, path in segments if no > folded_no]
+        self._segment_no = max([folded_no] + [no for no, _ in segments])
+
+        self.wal = MemoryWAL(self.role_mem_path / MEMORY_WAL_FILE)
+        self._replay_segments(self.faiss_engine, segments, meta)
+        self._replay(self.faiss_engine, self.wal.path)
+        if segments:
+            self._start_compaction(segments)
         self._initialized = True
 
     def add(self, message: Message) -> bool:
         """add message into memory storage"""
-        self.faiss_engine.add_objs([message])
-        logger.info(f"Role {self.role_id}'s memory_storage add a message")
+        self.add_batch([message])
+
+    def add_batch(self, messages: list[Message]):
+        """add messages into memory storage, embedded in one batch"""
+        if not messages:
+            return
+        embeddings = self.embedding.get_text_embedding_batch([message.rag_key() for message in messages])
+        self.faiss_engine.add_objs(messages, embeddings=embeddings)
+        self._unsaved.extend(zip(messages, embeddings))
+        logger.info(f"Role {self.role_id}'s memory_storage add {len(messages)} messages")
 
     async def search_similar(self, message: Message, k=4) -> list[Message]:
         """search for similar messages"""
@@ -69,9 +107,102 @@ class MemoryStorage(object):
         return filtered_resp
 
     def clean(self):
+        self.wait_compaction()
         shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self._unsaved = []
         self._initialized = False
 
     def persist(self):
-        if self.faiss_engine:
-            self.faiss_engine.retriever._index.storage_context.persist(self.cache_dir)
+        """Append the new messages to the log, O(new messages). Compact the log in the background when it's large."""
+        if not self.faiss_engine:
+            return
+        self.wal.append([(message.model_dump_json(), embedding) for message, embedding in self._unsaved])
+        self._unsaved = []
+        if self._need_compaction():
+            self._segment_no += 1
+            segment = self.wal.rotate(self.role_mem_path / f"{MEMORY_WAL_FILE}.{self._segment_no}")
+            self._start_compaction([(self._segment_no, segment)])
+
+    def wait_compaction(self):
+        if self._compaction:
+            self._compaction.join()
+            self._compaction = None
+
+    def _need_compaction(self) -> bool:
+        if self._compaction and self._compaction.is_alive():
+            return False
+        return self.wal.num_records >= max(self.min_compact_records, self.compact_ratio * self._snapshot_size)
+
+    def _start_compaction(self, segments: list[tuple[int, Path]]):
+        self.wait_compaction()
+        self._compaction = threading.Thread(target=self._compact, args=(segments,), daemon=True)
+        self._compaction.start()
+
+    def _compact(self, segments: list[tuple[int, Path]]):
+        """Fold the segments into a new snapshot, with an engine of its own, the engine in use is not touched."""
+        engine = self._load_snapshot()
+        meta = self._read_snapshot_meta()
+        self._replay_segments(engine, segments, meta)
+        segment_no = segments[-1][0]
+        self._write_snapshot_meta({**meta, "folding_no": segment_no})
+        engine.persist(self.cache_dir)
+        self._write_snapshot_meta({"segment_no": segment_no})
+        self._drop_segments([path for _, path in segments])
+        self._snapshot_size = len(engine.retriever._index.docstore.docs)
+        logger.info(f"Role {self.role_id}'s memory_storage compacted, {self._snapshot_size} messages")
+
+    def _load_snapshot(self) -> SimpleEngine:
+        if self.cache_dir.joinpath("default__vector_store.json").exists():
+            return SimpleEngine.from_index(
+                index_config=FAISSIndexConfig(persist_path=self.cache_dir),
+                retriever_configs=[FAISSRetrieverConfig()],
+                embed_model=self.embedding,
+            )
+        return SimpleEngine.from_objs(objs=[], retriever_configs=[FAISSRetrieverConfig()], embed_model=self.embedding)
+
+    def _replay_segments(self, engine: SimpleEngine, segments: list[tuple[int, Path]], meta: dict):
+        for no, path in segments:
+            # a compaction interrupted while saving the snapshot may have saved some of the messages of its segment
+            skipped_ids = self._held_message_ids(engine) if no == meta.get("folding_no") else None
+            self._replay(engine, path, skipped_ids)
+
+    def _replay(self, engine: SimpleEngine, wal_path: Path, skipped_ids: Optional[set[str]] = None):
+        wal_records = MemoryWAL(wal_path).read()
+        records = [(Message.model_validate_json(message_json), vector) for message_json, vector in wal_records]
+        if skipped_ids:
+            records = [(message, vector) for message, vector in records if message.id not in skipped_ids]
+        if records:
+            engine.add_objs([message for message, _ in records], embeddings=[vector for _, vector in records])
+            logger.info(f"Role {self.role_id}'s memory_storage replay {len(records)} messages of {wal_path.name}")
+
+    @staticmethod
+    def _held_message_ids(engine: SimpleEngine) -> set[str]:
+        """The ids of the messages in the engine, read from the objects of all the nodes, so only used to recover"""
+        ids = set()
+        for node_id in engine.retriever._index.docstore.docs:
+            obj_json = engine._object_store.get(node_id)
+            if obj_json:
+                ids.add(json.loads(obj_json).get("id"))
+        return ids
+
+    def _read_snapshot_meta(self) -> dict:
+        meta_path = self.cache_dir / MEMORY_SNAPSHOT_META
+        return read_json_file(meta_path) if meta_path.exists() else {}
+
+    def _write_snapshot_meta(self, meta: dict):
+        tmp_path = self.cache_dir / f"{MEMORY_SNAPSHOT_META}.tmp"
+        write_json_file(tmp_path, meta)
+        os.replace(tmp_path, self.cache_dir / MEMORY_SNAPSHOT_META)
+
+    def _list_segments(self) -> list[tuple[int, Path]]:
+        segments = []
+        for path in self.role_mem_path.glob(f"{MEMORY_WAL_FILE}.*"):
+            suffix = path.name[len(MEMORY_WAL_FILE) + 1 :]
+            if suffix.isdigit():
+                segments.append((int(suffix), path))
+        return sorted(segments)
+
+    @staticmethod
+    def _drop_segments(segments: list[Path]):
+        for segment in segments:
+            segment.unlink(missing_ok=True)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Desc   : append-only log of the messages added to a memory storage
+"""
+
+import os
+import struct
+from pathlib import Path
+from typing import Iterator, Union
+
+import numpy as np
+
+from metagpt.logs import logger
+
+MEMORY_WAL_FILE = "memory.wal"
+
+_HEADER = struct.Struct("<II")  # length of the message json, dimensions of the embedding
+
+
+class MemoryWAL:
+    """Write-ahead log of (message json, embedding) records.
+
+    Records are appended and fsynced, so persisting costs O(new messages). Replaying the records restores the
+    messages added after the last snapshot of the index, without embedding them again.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = Path(path)
+        self.num_records = sum(1 for _ in self.read()) if self.path.exists() else 0
+
+    def append(self, records: list[tuple[str, list[float]]]):
+        if not records:
+            return
+        chunks = []
+        for message_json, embedding in records:
+            data = message_json.encode("utf-8")
+            vector = np.asarray(embedding, dtype=np.float32)
+            chunks.append(_HEADER.pack(len(data), len(vector)) + data + vector.tobytes())
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(chunks))
+            f.flush()
+            os.fsync(f.fileno())
+        self.num_records += len(records)
+
+    def read(self) -> Iterator[tuple[str, np.ndarray]]:
+        """Yield the records in order, a truncated record at the end, left by an interrupted append, is dropped."""
+        if not self.path.exists():
+            return
+        content = self.path.read_bytes()
+        offset = 0
+        while offset + _HEADER.size <= len(content):
+            json_len, dims = _HEADER.unpack_from(content, offset)
+            end = offset + _HEADER.size + json_len + dims * 4
+            if end > len(content):
+                break
+            start = offset + _HEADER.size
+            message_json = content[start : start + json_len].decode("utf-8")
+            yield message_json, np.frombuffer(content, dtype=np.float32, count=dims, offset=start + json_len)
+            offset = end
+
+        if offset != len(content):
+            logger.warning(f"memory wal {self.path} has a truncated record, ignored")
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def rotate(self, segment_path: Union[str, os.PathLike]) -> Path:
+        """Move the records to a segment file to compact, the log continues empty."""
+        segment_path = Path(segment_path)
+        if self.path.exists():
+            os.replace(self.path, segment_path)
+        self.num_records = 0
+        return segment_path
+
+    def clear(self):
+        """Drop the records, after they are saved in a snapshot of the index."""
+        self.path.unlink(missing_ok=True)
+        self.num_records = 0
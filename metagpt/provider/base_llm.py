@@ -8,9 +8,10 @@
 """
 from __future__ import annotations
 
+import asyncio
 import json
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from typing import AsyncIterator, Optional, Union
 
 from openai import AsyncOpenAI
 from pydantic import BaseModel
@@ -24,10 +25,18 @@ from tenacity import (
 
 from metagpt.configs.llm_config import LLMConfig
 from metagpt.const import LLM_API_TIMEOUT, USE_CONFIG_TIMEOUT
-from metagpt.logs import logger
+from metagpt.logs import log_llm_stream, logger
+from metagpt.provider.llm_cache import (
+    cache_response,
+    get_response_cache,
+    make_cache_key,
+    on_cache_hit,
+)
+from metagpt.provider.llm_limiter import llm_concurrency
 from metagpt.schema import Message
 from metagpt.utils.common import log_and_reraise
 from metagpt.utils.cost_manager import CostManager, Costs
+from metagpt.utils.token_counter import count_message_tokens, count_string_tokens
 
 
 class BaseLLM(ABC):
@@ -42,6 +51,7 @@ class BaseLLM(ABC):
     cost_manager: Optional[CostManager] = None
     model: Optional[str] = None  # deprecated
     pricing_plan: Optional[str] = None
+    priority: int = 0  # admission priority when the provider is rate limited, lower is served first
 
     @abstractmethod
     def __init__(self, config: LLMConfig):
@@ -163,6 +173,44 @@ class BaseLLM(ABC):
             context.append(self._assistant_msg(rsp_text))
         return self._extract_assistant_rsp(context)
 
+    async def aask_many(
+        self,
+        msgs: list,
+        system_msgs: Optional[list[str]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+        concurrency: int = 8,
+    ) -> list[str]:
+        """Concurrent questioning of independent prompts, the responses are in the same order as `msgs`.
+        At most `concurrency` prompts are in flight, `LLMConfig.max_concurrency` further bounds the provider."""
+        semaphore = asyncio.Semaphore(concurrency)
+        futures = [self._aask_bounded(semaphore, msg, system_msgs, timeout) for msg in msgs]
+        return list(await asyncio.gather(*futures))
+
+    async def aask_as_completed(
+        self,
+        msgs: list,
+        system_msgs: Optional[list[str]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+        concurrency: int = 8,
+    ) -> AsyncIterator[tuple[int, str]]:
+        """Same as `aask_many`, but yield (index of the prompt, response) as soon as each response is ready"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def ask(idx: int, msg) -> tuple[int, str]:
+            return idx, await self._aask_bounded(semaphore, msg, system_msgs, timeout)
+
+        tasks = [asyncio.create_task(ask(idx, msg)) for idx, msg in enumerate(msgs)]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield await done
+        finally:
+            for task in tasks:  # the caller stops early, or a prompt fails
+                task.cancel()
+
+    async def _aask_bounded(self, semaphore: asyncio.Semaphore, msg, system_msgs: Optional[list[str]], timeout) -> str:
+        async with semaphore:
+            return await self.aask(msg, system_msgs=system_msgs, timeout=timeout, stream=False)
+
     async def aask_code(self, messages: Union[str, Message, list[dict]], timeout=USE_CONFIG_TIMEOUT, **kwargs) -> dict:
         raise NotImplementedError
 
@@ -196,10 +244,43 @@ class BaseLLM(ABC):
         self, messages: list[dict], stream: bool = False, timeout: int = USE_CONFIG_TIMEOUT
     ) -> str:
         """Asynchronous version of completion. Return str. Support stream-print"""
-        if stream:
-            return await self._achat_completion_stream(messages, timeout=self.get_timeout(timeout))
-        resp = await self._achat_completion(messages, timeout=self.get_timeout(timeout))
-        return self.get_choice_text(resp)
+        cache = get_response_cache(self.config.cache) if self.config else None
+        if cache:
+            cache_key = self._cache_key(messages)
+            rsp = await cache.get(cache_key)
+            if self.cost_manager:
+                self.cost_manager.update_cache_stats(hit=rsp is not None)
+            if rsp is not None:
+                on_cache_hit(cache, cache_key)
+                if stream:
+                    log_llm_stream(rsp)
+                    log_llm_stream("\n")
+                return rsp
+
+        tokens = self._estimate_prompt_tokens(messages) if self.config and self.config.tpm else 0
+        async with llm_concurrency(self.config, tokens=tokens, priority=self.priority):
+            if stream:
+                rsp = await self._achat_completion_stream(messages, timeout=self.get_timeout(timeout))
+            else:
+                resp = await self._achat_completion(messages, timeout=self.get_timeout(timeout))
+                rsp = self.get_choice_text(resp)
+        if cache:
+            await cache_response(cache, cache_key, rsp)
+        return rsp
+
+    def _cache_key(self, messages: list[dict]) -> str:
+        """Key of the cached response of `messages`, providers sending more request fields override it"""
+        return make_cache_key(
+            self.model or self.config.model, messages, self.config.temperature, max_token=self.config.max_token
+        )
+
+    def _estimate_prompt_tokens(self, messages: list[dict]) -> int:
+        """Estimate the prompt tokens of a request before sending it, for tokens/minute admission control"""
+        model = self.model or self.config.model or ""
+        try:
+            return count_message_tokens(messages, model=model)
+        except NotImplementedError:
+            return count_string_tokens(self.messages_to_prompt(messages), model)
 
     def get_choice_text(self, rsp: dict) -> str:
         """Required to provide the first text of choice"""
@@ -13,6 +13,7 @@ import time
 from contextlib import asynccontextmanager
 from enum import Enum
 from typing import (
+    AsyncContextManager,
     AsyncGenerator,
     AsyncIterator,
     Dict,
@@ -388,7 +389,7 @@ class APIRequestor:
         request_id: Optional[str] = None,
         request_timeout: Optional[Union[float, Tuple[float, float]]] = None,
     ) -> Tuple[Union[OpenAIResponse, AsyncGenerator[OpenAIResponse, None]], bool, str]:
-        ctx = aiohttp_session()
+        ctx = self._aiohttp_session()
         session = await ctx.__aenter__()
         try:
             result = await self.arequest_raw(
@@ -420,6 +421,9 @@ class APIRequestor:
             await ctx.__aexit__(None, None, None)
             return resp, got_stream, self.api_key
 
+    def _aiohttp_session(self) -> AsyncContextManager[aiohttp.ClientSession]:
+        return aiohttp_session()
+
     def request_headers(self, method: str, extra, request_id: Optional[str]) -> Dict[str, str]:
         user_agent = "LLM/v1 PythonBindings/%s" % (version.VERSION,)
 
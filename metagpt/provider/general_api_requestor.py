@@ -3,13 +3,24 @@
 # @Desc   : General Async API for http-based LLM model
 
 import asyncio
-from typing import AsyncGenerator, Generator, Iterator, Tuple, Union
+from contextlib import asynccontextmanager
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Generator,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import aiohttp
 import requests
 
+from metagpt.configs.llm_config import LLMConfig
 from metagpt.logs import logger
 from metagpt.provider.general_api_base import APIRequestor
+from metagpt.provider.http_client_pool import get_aiohttp_session
 
 
 def parse_stream_helper(line: bytes) -> Union[bytes, None]:
@@ -50,6 +61,15 @@ class GeneralAPIRequestor(APIRequestor):
         )
     """
 
+    def __init__(self, *args, llm_config: Optional[LLMConfig] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.llm_config = llm_config  # pool limits of the shared session, defaults of LLMConfig if not set
+
+    @asynccontextmanager
+    async def _aiohttp_session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        # requests to the same endpoint share one pooled session, which is kept open after the request
+        yield get_aiohttp_session(self.base_url, config=self.llm_config)
+
     def _interpret_response_line(self, rbody: bytes, rcode: int, rheaders, stream: bool) -> bytes:
         # just do nothing to meet the APIRequestor process and return the raw data
         # due to the openai sdk will convert the data into OpenAIResponse which we don't need in general cases.
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : http_client_pool.py
+@Desc    : Process-wide HTTP client pool, so LLM instances of the same endpoint share connections and TLS sessions.
+"""
+import asyncio
+import math
+import weakref
+from typing import Optional
+
+import aiohttp
+import httpx
+from openai._base_client import AsyncHttpxClientWrapper
+from openai._constants import DEFAULT_LIMITS, DEFAULT_TIMEOUT
+from pydantic import BaseModel
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.logs import logger
+
+
+class HTTPPoolStats(BaseModel):
+    clients: int = 0  # clients created
+    reused: int = 0  # client lookups served by an existing client
+    requests: int = 0  # requests sent through the pooled clients
+    connections: int = 0  # open connections, filled in by `get_pool_stats`
+    idle_connections: int = 0  # open connections waiting for reuse, filled in by `get_pool_stats`
+
+
+# the clients are bound to the event loop they are created in, so keep one pool of clients per loop.
+class _LoopPool:
+    """The pooled clients of an event loop, closed by `aclose` or when the loop cancels its pending tasks on shutdown,
+    as `asyncio.run` does.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.httpx_clients: dict[tuple, AsyncHttpxClientWrapper] = {}
+        self.aiohttp_sessions: dict[tuple, aiohttp.ClientSession] = {}
+        # the sleeping task is held by the timer of the loop, so only a weak reference is kept here: the pool is the
+        # value of a weak-keyed dict and must not keep the loop alive
+        self._closer = weakref.ref(loop.create_task(self._close_on_cancel(loop)))
+
+    async def _close_on_cancel(self, loop: asyncio.AbstractEventLoop):
+        try:
+            await asyncio.sleep(math.inf)
+        except asyncio.CancelledError:
+            await self._close_clients()
+            if _loop_pools.get(loop) is self:
+                del _loop_pools[loop]
+            raise
+
+    async def _close_clients(self):
+        # pop the clients one by one, `aclose` and the closer may run at the same time
+        while self.httpx_clients:
+            await self.httpx_clients.popitem()[1].aclose()
+        while self.aiohttp_sessions:
+            await self.aiohttp_sessions.popitem()[1].close()
+
+    async def aclose(self):
+        closer = self._closer()
+        if closer:
+            closer.cancel()
+        await self._close_clients()
+
+
+_loop_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopPool]" = weakref.WeakKeyDictionary()
+_stats: dict[str, HTTPPoolStats] = {}  # keyed by base_url, api keys are never exposed
+
+
+def _pool_limits(config: Optional[LLMConfig]) -> tuple[Optional[int], Optional[int], Optional[float]]:
+    config = config or LLMConfig()
+    return config.max_connections, config.max_keepalive_connections, config.keepalive_expiry
+
+
+def _get_stats(base_url: str) -> HTTPPoolStats:
+    return _stats.setdefault(base_url, HTTPPoolStats())
+
+
+def running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _get_loop_pool(loop: asyncio.AbstractEventLoop) -> _LoopPool:
+    if loop not in _loop_pools:
+        _loop_pools[loop] = _LoopPool(loop)
+    return _loop_pools[loop]
+
+
+def get_httpx_client(
+    base_url: str, api_key: str = "", proxy: Optional[str] = None, config: Optional[LLMConfig] = None
+) -> AsyncHttpxClientWrapper:
+    """Return the shared httpx client of the endpoint in the running event loop, used as the `http_client` of the
+    openai sdk clients. Out of an event loop the client is not pooled, see `OpenAILLM.aclient`.
+    """
+    limits = _pool_limits(config)
+    key = (base_url, api_key, proxy, limits)
+    stats = _get_stats(base_url)
+    loop = running_loop()
+    loop_clients = _get_loop_pool(loop).httpx_clients if loop else {}
+    client = loop_clients.get(key)
+    if client and not client.is_closed:
+        stats.reused += 1
+        return client
+
+    async def on_request(request: httpx.Request):
+        stats.requests += 1
+
+    # the unset limits are the ones the openai sdk gives the http clients it creates itself
+    max_connections, max_keepalive_connections, keepalive_expiry = limits
+    client = AsyncHttpxClientWrapper(
+        proxies=proxy,
+        timeout=DEFAULT_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=max_connections or DEFAULT_LIMITS.max_connections,
+            max_keepalive_connections=max_keepalive_connections or DEFAULT_LIMITS.max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry or DEFAULT_LIMITS.keepalive_expiry,
+        ),
+        follow_redirects=True,
+        event_hooks={"request": [on_request]},
+    )
+    loop_clients[key] = client
+    stats.clients += 1
+    logger.debug(f"New http client for {base_url}, pooled clients: {len(loop_clients)}")
+    return client
+
+
+def get_httpx_client_from_config(config: LLMConfig) -> AsyncHttpxClientWrapper:
+    return get_httpx_client(config.base_url, api_key=config.api_key, proxy=config.proxy, config=config)
+
+
+def get_aiohttp_session(base_url: str, config: Optional[LLMConfig] = None) -> aiohttp.ClientSession:
+    """Return the shared aiohttp session of the endpoint in the running event loop"""
+    limits = _pool_limits(config)
+    key = (base_url, limits)
+    stats = _get_stats(base_url)
+    loop_sessions = _get_loop_pool(asyncio.get_running_loop()).aiohttp_sessions
+    session = loop_sessions.get(key)
+    if session and not session.closed:
+        stats.reused += 1
+        return session
+
+    async def on_request_start(session, trace_config_ctx, params):
+        stats.requests += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    # the unset limits keep the aiohttp defaults
+    max_connections, _, keepalive_expiry = limits
+    connector_kwargs = {"limit": max_connections, "keepalive_timeout": keepalive_expiry}
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(**{k: v for k, v in connector_kwargs.items() if v is not None}),
+        trace_configs=[trace_config],
+    )
+    loop_sessions[key] = session
+    stats.clients += 1
+    logger.debug(f"New aiohttp session for {base_url}, pooled sessions: {len(loop_sessions)}")
+    return session
+
+
+def _httpx_connections(client: httpx.AsyncClient) -> tuple[int, int]:
+    # httpx does not expose pool usage, read it from the httpcore pool and report nothing if the internals change
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", [])
+    return len(connections), sum(1 for conn in connections if conn.is_idle())
+
+
+def _aiohttp_connections(session: aiohttp.ClientSession) -> tuple[int, int]:
+    # same as above, `_conns` holds the idle connections and `_acquired` the ones in use
+    connector = session.connector
+    idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+    return idle + len(getattr(connector, "_acquired", ())), idle
+
+
+def get_pool_stats() -> dict[str, HTTPPoolStats]:
+    """Pool utilization of each endpoint"""
+    result = {url: stats.model_copy(update={"connections": 0, "idle_connections": 0}) for url, stats in _stats.items()}
+    usages = []
+    for pool in list(_loop_pools.values()):
+        usages += [(key[0], _httpx_connections(c)) for key, c in pool.httpx_clients.items() if not c.is_closed]
+        usages += [(key[0], _aiohttp_connections(s)) for key, s in pool.aiohttp_sessions.items() if not s.closed]
+    for base_url, (connections, idle) in usages:
+        result[base_url].connections += connections
+        result[base_url].idle_connections += idle
+    return result
+
+
+async def close_http_clients():
+    """Close the pooled clients of the running event loop. `asyncio.run` closes them when it cancels the pending tasks
+    on shutdown, loops closed without cancelling their tasks should await this before closing.
+    """
+    pool = _loop_pools.pop(asyncio.get_running_loop(), None)
+    if pool:
+        await pool.aclose()
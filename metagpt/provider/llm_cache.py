@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : llm_cache.py
+@Desc    : Content-addressed LLM response cache, an in-memory LRU layer in front of a sqlite or redis backend.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from metagpt.configs.llm_cache_config import LLMCacheBackend, LLMCacheConfig
+from metagpt.const import CONFIG_ROOT
+from metagpt.logs import logger
+from metagpt.utils.lru_cache import LRUCache
+
+LLM_CACHE_KEY_PREFIX = "metagpt:llm_cache:"
+
+
+def make_cache_key(
+    model: Optional[str],
+    messages: list[dict],
+    temperature: float,
+    tools: Optional[list] = None,
+    tool_choice: Optional[object] = None,
+    max_token: Optional[int] = None,
+) -> str:
+    """Hash everything that determines the response of a request"""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "tools": tools,
+        "tool_choice": tool_choice,
+        "max_token": max_token,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SQLiteCache:
+    """On-disk backend, evicts expired rows and the least recently used rows beyond `max_size`"""
+
+    def __init__(self, path: Path, max_size: int = 1024, ttl: int = 0):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.ttl = ttl
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT, created REAL, accessed REAL)"
+        )
+        # the eviction looks rows up by age and by last access
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_created ON llm_cache(created)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[tuple[float, str]]:
+        row = self._conn.execute("SELECT created, value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if self.ttl and time.time() - row[0] > self.ttl:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        self._conn.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return row
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        self._conn.execute("REPLACE INTO llm_cache VALUES (?, ?, ?, ?)", (key, value, now, now))
+        if self.ttl:
+            self._conn.execute("DELETE FROM llm_cache WHERE created < ?", (now - self.ttl,))
+        overflow = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_size
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed LIMIT ?)", (overflow,)
+            )
+        self._conn.commit()
+
+    def delete(self, key: str):
+        self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        self._conn.commit()
+
+
+class LLMResponseCache:
+    """Two-level response cache. Lookups hit the LRU layer first, then the persistent backend."""
+
+    def __init__(self, config: LLMCacheConfig):
+        self.config = config
+        self.memory = LRUCache(max_size=config.max_size, ttl=config.ttl)
+        self.sqlite: Optional[SQLiteCache] = None
+        self.redis = None
+        if config.backend == LLMCacheBackend.SQLITE:
+            path = Path(config.path).expanduser() if config.path else CONFIG_ROOT / "llm_cache.db"
+            self.sqlite = SQLiteCache(path, max_size=config.max_size, ttl=config.ttl)
+        elif config.backend == LLMCacheBackend.REDIS:
+            from metagpt.utils.redis import Redis
+
+            self.redis = Redis(config.redis)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.sqlite:
+            row = self.sqlite.get(key)
+            if row is not None:
+                created, value = row
+                self.memory.set(key, value, created=created)
+        elif self.redis:
+            value = await self.redis.get(LLM_CACHE_KEY_PREFIX + key)
+            if value is not None:
+                value = value.decode("utf-8") if isinstance(value, bytes) else value
+                self.memory.set(key, value)
+        return value
+
+    async def set(self, key: str, value: str):
+        self.memory.set(key, value)
+        if self.sqlite:
+            self.sqlite.set(key, value)
+        elif self.redis:
+            await self.redis.set(LLM_CACHE_KEY_PREFIX + key, value, timeout_sec=self.config.ttl or None)
+
+    async def delete(self, key: str):
+        self.memory.delete(key)
+        if self.sqlite:
+            self.sqlite.delete(key)
+        elif self.redis:
+            await self.redis.delete(LLM_CACHE_KEY_PREFIX + key)
+
+
+class _Acceptance:
+    """The responses of a `cache_on_accept` block, cached or evicted when the block ends"""
+
+    def __init__(self):
+        self.responses: list[tuple[LLMResponseCache, str, str]] = []  # new responses, cached on accept
+        self.hits: list[tuple[LLMResponseCache, str]] = []  # cached responses, evicted on reject
+
+
+_acceptance: ContextVar[Optional[_Acceptance]] = ContextVar("llm_cache_acceptance", default=None)
+
+
+@asynccontextmanager
+async def cache_on_accept() -> AsyncIterator[None]:
+    """Cache the responses of the block only if the caller accepts them, i.e. the block does not raise.
+
+    A caller validating the response and retrying on failure, like `ActionNode._aask_v1`, would otherwise get the
+    same rejected response from the cache on every retry. A rejected response that was a cache hit is evicted.
+    """
+    acceptance = _Acceptance()
+    token = _acceptance.set(acceptance)
+    try:
+        yield
+    except BaseException:
+        for cache, key in acceptance.hits:
+            await cache.delete(key)
+        raise
+    else:
+        for cache, key, value in acceptance.responses:
+            await cache.set(key, value)
+    finally:
+        _acceptance.reset(token)
+
+
+def on_cache_hit(cache: LLMResponseCache, key: str):
+    acceptance = _acceptance.get()
+    if acceptance:
+        acceptance.hits.append((cache, key))
+
+
+async def cache_response(cache: LLMResponseCache, key: str, value: str):
+    """Cache a new response, deferred to the end of the `cache_on_accept` block if any"""
+    acceptance = _acceptance.get()
+    if acceptance:
+        acceptance.responses.append((cache, key, value))
+    else:
+        await cache.set(key, value)
+
+
+_caches: dict[str, LLMResponseCache] = {}
+
+
+def get_response_cache(config: Optional[LLMCacheConfig]) -> Optional[LLMResponseCache]:
+    """LLM instances configured with the same cache share one process-wide cache"""
+    if not config or not config.enabled:
+        return None
+    key = config.model_dump_json()
+    if key not in _caches:
+        _caches[key] = LLMResponseCache(config)
+        logger.info(f"LLM response cache enabled, backend: {config.backend.value}")
+    return _caches[key]
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : llm_limiter.py
+@Desc    : Process-wide admission control shared by all LLM instances of the same provider.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from pydantic import BaseModel
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.logs import logger
+
+# asyncio primitives are bound to one event loop, so keep one set of limiters per loop.
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+_rate_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, RateLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def provider_key(config: LLMConfig) -> str:
+    """LLM instances sharing the same api type, endpoint and key share one provider quota"""
+    return f"{config.api_type.value}|{config.base_url}|{config.api_key}"
+
+
+def get_semaphore(config: LLMConfig) -> Optional[asyncio.Semaphore]:
+    """Return the semaphore limiting the in-flight requests of the provider, None if unlimited"""
+    if not config.max_concurrency:
+        return None
+    loop_semaphores = _semaphores.setdefault(asyncio.get_running_loop(), {})
+    key = provider_key(config)
+    if key not in loop_semaphores:
+        loop_semaphores[key] = asyncio.Semaphore(config.max_concurrency)
+    return loop_semaphores[key]
+
+
+class TokenBucket:
+    """Bucket refilled continuously at `rate_per_minute`, holding at most one minute of quota"""
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = rate_per_minute
+        self.level = float(rate_per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds to wait until `amount` is available, amounts beyond the capacity wait for a full bucket"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) * 60 / self.capacity)
+
+    def consume(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiterStats(BaseModel):
+    requests: int = 0
+    tokens: int = 0
+    waited_requests: int = 0
+    total_wait: float = 0.0  # seconds
+    max_wait: float = 0.0  # seconds
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.requests if self.requests else 0.0
+
+
+class RateLimiter:
+    """Requests/minute and tokens/minute buckets of a provider. Waiters are served by priority (lower first),
+    then in arrival order, so a burst queues up instead of hitting 429 and retrying all at once."""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self.stats = RateLimiterStats()
+        self._waiters: list[tuple[int, int]] = []  # heap of (priority, arrival)
+        self._arrival = itertools.count()
+        self._cond = asyncio.Condition()
+
+    def _delay(self, tokens: int) -> float:
+        delay = 0.0
+        if self.request_bucket:
+            delay = max(delay, self.request_bucket.delay(1))
+        if self.token_bucket:
+            delay = max(delay, self.token_bucket.delay(tokens))
+        return delay
+
+    def _consume(self, tokens: int):
+        if self.request_bucket:
+            self.request_bucket.consume(1)
+        if self.token_bucket:
+            self.token_bucket.consume(tokens)
+
+    async def acquire(self, tokens: int = 0, priority: int = 0) -> float:
+        """Wait for the quota of one request of `tokens` tokens, return the seconds waited"""
+        start = time.monotonic()
+        waiter = (priority, next(self._arrival))
+        async with self._cond:
+            heapq.heappush(self._waiters, waiter)
+            self._cond.notify_all()  # a waiter of higher priority may have arrived, let the head re-check
+            try:
+                while True:
+                    if self._waiters[0] != waiter:
+                        await self._cond.wait()
+                        continue
+                    delay = self._delay(tokens)
+                    if delay <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                self._consume(tokens)
+            finally:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+        wait = time.monotonic() - start
+        self._update_stats(tokens, wait)
+        return wait
+
+    def _update_stats(self, tokens: int, wait: float):
+        self.stats.requests += 1
+        self.stats.tokens += tokens
+        self.stats.total_wait += wait
+        self.stats.max_wait = max(self.stats.max_wait, wait)
+        if wait > 0.001:
+            self.stats.waited_requests += 1
+            logger.debug(f"LLM rate limited, waited {wait:.3f}s, queued: {len(self._waiters)}")
+
+
+def get_rate_limiter(config: LLMConfig) -> Optional[RateLimiter]:
+    """Return the rate limiter of the provider, None if neither rpm nor tpm is limited"""
+    if not config.rpm and not config.tpm:
+        return None
+    loop_limiters = _rate_limiters.setdefault(asyncio.get_running_loop(), {})
+    key = provider_key(config)
+    if key not in loop_limiters:
+        loop_limiters[key] = RateLimiter(rpm=config.rpm, tpm=config.tpm)
+    return loop_limiters[key]
+
+
+@asynccontextmanager
+async def llm_concurrency(config: Optional[LLMConfig], tokens: int = 0, priority: int = 0) -> AsyncIterator[None]:
+    """Wait for the rate quota and a free request slot of the provider described by `config`
+
+    Args:
+        config: The LLM config of the provider.
+        tokens: The estimated tokens of the request, counted against `config.tpm`.
+        priority: Lower values are admitted first when the rate quota is exhausted.
+    """
+    limiter = get_rate_limiter(config) if config else None
+    if limiter:
+        await limiter.acquire(tokens=tokens, priority=priority)
+    semaphore = get_semaphore(config) if config else None
+    if not semaphore:
+        yield
+        return
+    async with semaphore:
+        yield
@@ -21,7 +21,7 @@ class OllamaLLM(BaseLLM):
 
     def __init__(self, config: LLMConfig):
         self.__init_ollama(config)
-        self.client = GeneralAPIRequestor(base_url=config.base_url)
+        self.client = GeneralAPIRequestor(base_url=config.base_url, llm_config=config)
         self.config = config
         self.suffix_url = "/chat"
         self.http_method = "post"
@@ -13,7 +13,6 @@ import re
 from typing import Optional, Union
 
 from openai import APIConnectionError, AsyncOpenAI, AsyncStream
-from openai._base_client import AsyncHttpxClientWrapper
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from tenacity import (
@@ -29,6 +28,8 @@ from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.logs import log_llm_stream, logger
 from metagpt.provider.base_llm import BaseLLM
 from metagpt.provider.constant import GENERAL_FUNCTION_SCHEMA
+from metagpt.provider.http_client_pool import get_httpx_client_from_config, running_loop
+from metagpt.provider.llm_cache import make_cache_key
 from metagpt.provider.llm_provider_registry import register_provider
 from metagpt.utils.common import CodeParser, decode_image, log_and_reraise
 from metagpt.utils.cost_manager import CostManager
@@ -65,26 +66,33 @@ class OpenAILLM(BaseLLM):
         """https://github.com/openai/openai-python#async-usage"""
         self.model = self.config.model  # Used in _calc_usage & _cons_kwargs
         self.pricing_plan = self.config.pricing_plan or self.model
-        kwargs = self._make_client_kwargs()
-        self.aclient = AsyncOpenAI(**kwargs)
+        self._aclient: Optional[AsyncOpenAI] = None
+        self._aclient_loop = None
+
+    def _make_client(self) -> AsyncOpenAI:
+        return AsyncOpenAI(**self._make_client_kwargs())
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        # the pooled http clients are bound to an event loop, so build the sdk client lazily, and again in another
+        # running loop, e.g. in every `asyncio.run`, or once the pool closed its http client
+        loop = running_loop()
+        stale = loop is not None and (loop is not self._aclient_loop or self._aclient._client.is_closed)
+        if self._aclient is None or stale:
+            if self._aclient is not None and self._aclient_loop is None:
+                # built out of any loop, its http client is not pooled
+                loop.create_task(self._aclient.close())
+            self._aclient = self._make_client()
+            self._aclient_loop = loop
+        return self._aclient
 
     def _make_client_kwargs(self) -> dict:
-        kwargs = {"api_key": self.config.api_key, "base_url": self.config.base_url}
-
-        # to use proxy, openai v1 needs http_client
-        if proxy_params := self._get_proxy_params():
-            kwargs["http_client"] = AsyncHttpxClientWrapper(**proxy_params)
-
-        return kwargs
-
-    def _get_proxy_params(self) -> dict:
-        params = {}
-        if self.config.proxy:
-            params = {"proxies": self.config.proxy}
-            if self.config.base_url:
-                params["base_url"] = self.config.base_url
-
-        return params
+        # LLM instances of the same endpoint share one pooled http client, which also carries the proxy
+        return {
+            "api_key": self.config.api_key,
+            "base_url": self.config.base_url,
+            "http_client": get_httpx_client_from_config(self.config),
+        }
 
     async def _achat_completion_stream(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> str:
         response: AsyncStream[ChatCompletionChunk] = await self.aclient.chat.completions.create(
@@ -133,6 +141,18 @@ class OpenAILLM(BaseLLM):
             kwargs.update(extra_kwargs)
         return kwargs
 
+    def _cache_key(self, messages: list[dict]) -> str:
+        # hash the request as sent, with the tools a subclass may add in `_cons_kwargs`
+        kwargs = self._cons_kwargs(messages)
+        return make_cache_key(
+            kwargs["model"],
+            messages,
+            kwargs["temperature"],
+            tools=kwargs.get("tools"),
+            tool_choice=kwargs.get("tool_choice"),
+            max_token=kwargs["max_tokens"],
+        )
+
     async def _achat_completion(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> ChatCompletion:
         kwargs = self._cons_kwargs(messages, timeout=self.get_timeout(timeout))
         rsp: ChatCompletion = await self.aclient.chat.completions.create(**kwargs)
@@ -151,11 +171,8 @@ class OpenAILLM(BaseLLM):
     )
     async def acompletion_text(self, messages: list[dict], stream=False, timeout=USE_CONFIG_TIMEOUT) -> str:
         """when streaming, print each token in place."""
-        if stream:
-            return await self._achat_completion_stream(messages, timeout=timeout)
-
-        rsp = await self._achat_completion(messages, timeout=self.get_timeout(timeout))
-        return self.get_choice_text(rsp)
+        # the base class applies the admission control and the response cache
+        return await super().acompletion_text(messages, stream=stream, timeout=timeout)
 
     async def _achat_completion_function(
         self, messages: list[dict], timeout: int = USE_CONFIG_TIMEOUT, **chat_configs
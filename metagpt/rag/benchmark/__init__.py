@@ -1,3 +1,4 @@
 from metagpt.rag.benchmark.base import RAGBenchmark
+from metagpt.rag.benchmark.runner import BenchmarkCase, BenchmarkReport, RAGBenchmarkRunner
 
-__all__ = ["RAGBenchmark"]
+__all__ = ["RAGBenchmark", "RAGBenchmarkRunner", "BenchmarkCase", "BenchmarkReport"]
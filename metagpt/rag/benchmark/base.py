@@ -1,8 +1,6 @@
 import asyncio
 from typing import List, Tuple, Union
 
-import evaluate
-import jieba
 from llama_index.core.embeddings import BaseEmbedding
 from llama_index.core.evaluation import SemanticSimilarityEvaluator
 from llama_index.core.schema import NodeWithScore
@@ -73,6 +71,10 @@ class RAGBenchmark:
         return {"metrics": metrics, "log": log}
 
     def bleu_score(self, response: str, reference: str, with_penalty=False) -> Union[float, Tuple[float]]:
+        # imported here, so the retrieval metrics and the benchmark runner work without the nlp dependencies
+        import evaluate
+        import jieba
+
         f = lambda text: list(jieba.cut(text))
         bleu = evaluate.load(path="bleu")
         results = bleu.compute(predictions=[response], references=[[reference]], tokenizer=f)
@@ -91,6 +93,9 @@ class RAGBenchmark:
 
     def rougel_score(self, response: str, reference: str) -> float:
         # pip install rouge_score
+        import evaluate
+        import jieba
+
         f = lambda text: list(jieba.cut(text))
         rouge = evaluate.load(path="rouge")
 
@@ -116,7 +121,7 @@ class RAGBenchmark:
 
         for i, node in enumerate(nodes, start=1):
             for doc in reference_docs:
-                if text in doc:
+                if node.text in doc:
                     mrr_sum += 1.0 / i
                     return mrr_sum
 
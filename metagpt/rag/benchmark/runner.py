@@ -0,0 +1,281 @@
+"""Benchmark runner measuring the latency, throughput and token cost of RAG pipelines."""
+
+import asyncio
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+from llama_index.core.callbacks.base_handler import BaseCallbackHandler
+from llama_index.core.callbacks.schema import CBEventType, EventPayload
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.llms import LLM
+from llama_index.core.schema import QueryBundle, TransformComponent
+from pydantic import BaseModel, ConfigDict, Field
+
+from metagpt.logs import logger
+from metagpt.rag.benchmark.base import DatasetInfo, RAGBenchmark
+from metagpt.rag.embeddings import CachedEmbedding
+from metagpt.rag.engines import SimpleEngine
+from metagpt.rag.factories import get_rag_embedding, get_rag_llm
+from metagpt.rag.schema import BaseRankerConfig, BaseRetrieverConfig
+from metagpt.utils.common import write_json_file
+from metagpt.utils.token_counter import TOKEN_COSTS, count_string_tokens
+
+_current_record: ContextVar[Optional["QueryRecord"]] = ContextVar("rag_benchmark_record", default=None)
+
+
+class BenchmarkCase(BaseModel):
+    """A retriever/ranker config to compare."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    retriever_configs: list[BaseRetrieverConfig] = Field(default_factory=list)
+    ranker_configs: list[BaseRankerConfig] = Field(default_factory=list)
+
+
+class LatencyStats(BaseModel):
+    mean_ms: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> "LatencyStats":
+        """Samples are in seconds."""
+        if not samples:
+            return cls()
+        ms = np.asarray(samples) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        return cls(mean_ms=float(ms.mean()), p50_ms=float(p50), p95_ms=float(p95), p99_ms=float(p99))
+
+
+class QueryRecord(BaseModel):
+    question: str
+    retrieve_latency: float = 0.0
+    synthesize_latency: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    num_nodes: int = 0
+    recall: float = 0.0
+    hit_rate: float = 0.0
+    mrr: float = 0.0
+    error: str = ""
+
+
+class CaseResult(BaseModel):
+    dataset: str
+    case: str
+    num_queries: int = 0
+    num_errors: int = 0
+    wall_time: float = 0.0
+    throughput: float = 0.0  # queries per second
+    retrieve: LatencyStats = Field(default_factory=LatencyStats)
+    synthesize: LatencyStats = Field(default_factory=LatencyStats)
+    total: LatencyStats = Field(default_factory=LatencyStats)
+    prompt_tokens_per_query: float = 0.0
+    completion_tokens_per_query: float = 0.0
+    cost_per_query: float = 0.0  # USD, 0 if the model is not in TOKEN_COSTS
+    recall: float = 0.0
+    hit_rate: float = 0.0
+    mrr: float = 0.0
+    records: list[QueryRecord] = Field(default_factory=list)
+
+    @classmethod
+    def from_records(
+        cls, dataset: str, case: str, records: list[QueryRecord], wall_time: float, model_name: str = ""
+    ) -> "CaseResult":
+        ok = [r for r in records if not r.error]
+        num_ok = len(ok) or 1
+        prompt_tokens = sum(r.prompt_tokens for r in ok) / num_ok
+        completion_tokens = sum(r.completion_tokens for r in ok) / num_ok
+        costs = TOKEN_COSTS.get(model_name, {"prompt": 0.0, "completion": 0.0})
+
+        return cls(
+            dataset=dataset,
+            case=case,
+            num_queries=len(records),
+            num_errors=len(records) - len(ok),
+            wall_time=wall_time,
+            throughput=len(ok) / wall_time if wall_time else 0.0,
+            retrieve=LatencyStats.from_samples([r.retrieve_latency for r in ok]),
+            synthesize=LatencyStats.from_samples([r.synthesize_latency for r in ok]),
+            total=LatencyStats.from_samples([r.retrieve_latency + r.synthesize_latency for r in ok]),
+            prompt_tokens_per_query=prompt_tokens,
+            completion_tokens_per_query=completion_tokens,
+            cost_per_query=(prompt_tokens * costs["prompt"] + completion_tokens * costs["completion"]) / 1000,
+            recall=sum(r.recall for r in ok) / num_ok,
+            hit_rate=sum(r.hit_rate for r in ok) / num_ok,
+            mrr=sum(r.mrr for r in ok) / num_ok,
+            records=records,
+        )
+
+
+class BenchmarkReport(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    created_at: str = Field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    model_name: str = ""
+    concurrency: int = 1
+    results: list[CaseResult] = Field(default_factory=list)
+
+    def save(self, path: Union[str, Path], with_records: bool = True):
+        """Save as json, for tracking regressions between runs."""
+        exclude = None if with_records else {"results": {"__all__": {"records"}}}
+        write_json_file(str(path), self.model_dump(exclude=exclude), "utf-8")
+
+    def log_summary(self):
+        def _fmt(stats: LatencyStats) -> str:
+            return f"p50/p95/p99 {stats.p50_ms:.1f}/{stats.p95_ms:.1f}/{stats.p99_ms:.1f} ms"
+
+        for r in self.results:
+            logger.info(
+                f"{r.dataset}/{r.case}: {r.throughput:.2f} qps, "
+                f"retrieve {_fmt(r.retrieve)}, synthesize {_fmt(r.synthesize)}, "
+                f"{r.prompt_tokens_per_query:.0f}+{r.completion_tokens_per_query:.0f} tokens/query, "
+                f"recall {r.recall:.3f}, mrr {r.mrr:.3f}, errors {r.num_errors}/{r.num_queries}"
+            )
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Add the tokens of each LLM call to the record of the query run by the current task.
+
+    Queries run concurrently, so the tokens are attributed through a context variable instead of a shared counter.
+    """
+
+    def __init__(self, token_counter: Callable[[str], int]):
+        super().__init__(event_starts_to_ignore=[], event_ends_to_ignore=[])
+        self.token_counter = token_counter
+
+    def on_event_start(
+        self,
+        event_type: CBEventType,
+        payload: Optional[dict[str, Any]] = None,
+        event_id: str = "",
+        parent_id: str = "",
+        **kwargs: Any,
+    ) -> str:
+        return event_id
+
+    def on_event_end(
+        self,
+        event_type: CBEventType,
+        payload: Optional[dict[str, Any]] = None,
+        event_id: str = "",
+        **kwargs: Any,
+    ) -> None:
+        record = _current_record.get()
+        if event_type != CBEventType.LLM or not payload or record is None:
+            return
+
+        if EventPayload.PROMPT in payload:
+            prompt, completion = payload[EventPayload.PROMPT], payload.get(EventPayload.COMPLETION)
+        else:
+            prompt = "\n".join(str(m) for m in payload.get(EventPayload.MESSAGES, []))
+            completion = payload.get(EventPayload.RESPONSE)
+        record.prompt_tokens += self.token_counter(str(prompt))
+        record.completion_tokens += self.token_counter(str(completion or ""))
+
+    def start_trace(self, trace_id: Optional[str] = None) -> None:
+        pass
+
+    def end_trace(self, trace_id: Optional[str] = None, trace_map: Optional[dict[str, list[str]]] = None) -> None:
+        pass
+
+
+class RAGBenchmarkRunner:
+    """Run the datasets of `RAGBenchmark.load_dataset` against several retriever/ranker configs.
+
+    Up to `concurrency` queries run at once. Documents are embedded once for all the cases, through an in-memory
+    embedding cache. Pass a `MockLLM` and a `FakeEmbedding` to run offline, e.g. to track the retrieval latency in CI.
+    """
+
+    def __init__(
+        self,
+        cases: list[BenchmarkCase],
+        llm: LLM = None,
+        embed_model: BaseEmbedding = None,
+        transformations: Optional[list[TransformComponent]] = None,
+        concurrency: int = 8,
+        synthesize: bool = True,
+        token_counter: Callable[[str], int] = None,
+    ):
+        self.cases = cases
+        self.llm = llm or get_rag_llm()
+        self.embed_model = CachedEmbedding(embed_model or get_rag_embedding())
+        self.transformations = transformations
+        self.concurrency = concurrency
+        self.synthesize = synthesize
+
+        self.model_name = self.llm.metadata.model_name
+        self.token_counter = token_counter or (lambda text: count_string_tokens(text, self.model_name))
+        self.metrics = RAGBenchmark(embed_model=self.embed_model)
+
+    async def run(self, ds_names: list[str] = ["all"]) -> BenchmarkReport:
+        """Run the datasets found in EXAMPLE_BENCHMARK_PATH."""
+        return await self.run_datasets(RAGBenchmark.load_dataset(ds_names).datasets)
+
+    async def run_datasets(self, datasets: list[DatasetInfo]) -> BenchmarkReport:
+        report = BenchmarkReport(model_name=self.model_name, concurrency=self.concurrency)
+        for dataset in datasets:
+            for case in self.cases:
+                result = await self.run_case(dataset, case)
+                report.results.append(result)
+                logger.info(f"{dataset.name}/{case.name} finished, {result.throughput:.2f} qps")
+        return report
+
+    async def run_case(self, dataset: DatasetInfo, case: BenchmarkCase) -> CaseResult:
+        engine = SimpleEngine.from_docs(
+            input_files=dataset.document_files,
+            transformations=self.transformations,
+            embed_model=self.embed_model,
+            llm=self.llm,
+            retriever_configs=case.retriever_configs,
+            ranker_configs=case.ranker_configs,
+        )
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _run(gt_info: dict) -> QueryRecord:
+            async with semaphore:
+                return await self._run_query(engine, gt_info)
+
+        handler = TokenUsageHandler(self.token_counter)
+        self.llm.callback_manager.add_handler(handler)
+        try:
+            start = time.perf_counter()
+            records = await asyncio.gather(*[_run(gt_info) for gt_info in dataset.gt_info])
+            wall_time = time.perf_counter() - start
+        finally:
+            self.llm.callback_manager.remove_handler(handler)
+
+        return CaseResult.from_records(dataset.name, case.name, records, wall_time, self.model_name)
+
+    async def _run_query(self, engine: SimpleEngine, gt_info: dict) -> QueryRecord:
+        record = QueryRecord(question=gt_info["question"])
+        _current_record.set(record)  # gathered coroutines run in their own tasks, each with a copy of the context
+
+        try:
+            start = time.perf_counter()
+            nodes = await engine.aretrieve(record.question)
+            record.retrieve_latency = time.perf_counter() - start
+
+            if self.synthesize:
+                start = time.perf_counter()
+                await engine.asynthesize(QueryBundle(record.question), nodes)
+                record.synthesize_latency = time.perf_counter() - start
+        except Exception as e:
+            logger.error(f"benchmark query failed: {record.question}, {e}")
+            record.error = str(e)
+            return record
+
+        reference_docs = gt_info.get("gt_reference", [])
+        if isinstance(reference_docs, str):
+            reference_docs = [reference_docs]
+        record.num_nodes = len(nodes)
+        record.recall = self.metrics.recall(nodes, reference_docs)
+        record.hit_rate = self.metrics.hit_rate(nodes, reference_docs)
+        record.mrr = self.metrics.mean_reciprocal_rank(nodes, reference_docs)
+        return record
@@ -0,0 +1,6 @@
+"""Embeddings init."""
+
+from metagpt.rag.embeddings.cached_embedding import CachedEmbedding, EmbeddingCache
+from metagpt.rag.embeddings.fake_embedding import FakeEmbedding
+
+__all__ = ["CachedEmbedding", "EmbeddingCache", "FakeEmbedding"]
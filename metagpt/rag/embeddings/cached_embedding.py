@@ -0,0 +1,205 @@
+"""Cached embedding."""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from pydantic import BaseModel
+
+from metagpt.configs.embedding_cache_config import EmbeddingCacheConfig
+from metagpt.const import CONFIG_ROOT
+
+
+class EmbeddingCache:
+    """SQLite store of embeddings as float32 blobs, evicts the least recently used rows beyond `max_size`.
+
+    The connection is shared by threads, as llama-index may embed in a thread pool.
+    """
+
+    def __init__(self, path: Path, max_size: int = 100000):
+        if str(path) != ":memory:":
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache (key TEXT PRIMARY KEY, value BLOB, accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embedding_cache_accessed ON embedding_cache(accessed)")
+        self._conn.commit()
+
+    def get_many(self, keys: list[str]) -> dict[str, Embedding]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):  # keep under the sqlite variable limit
+                batch = keys[i : i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM embedding_cache WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update((key, np.frombuffer(value, dtype=np.float32).tolist()) for key, value in rows)
+            if found:
+                now = time.time()
+                rows = [(now, key) for key in found]
+                self._conn.executemany("UPDATE embedding_cache SET accessed = ? WHERE key = ?", rows)
+                self._conn.commit()
+        return found
+
+    def set_many(self, items: dict[str, Embedding]):
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, np.asarray(value, dtype=np.float32).tobytes(), now) for key, value in items.items()]
+        with self._lock:
+            self._conn.executemany("REPLACE INTO embedding_cache VALUES (?, ?, ?)", rows)
+            overflow = self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0] - self.max_size
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embedding_cache WHERE key IN "
+                    "(SELECT key FROM embedding_cache ORDER BY accessed LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+
+class EmbeddingCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    embedded: int = 0  # texts sent to the wrapped model, the duplicated misses of a batch are embedded once
+    embed_time: float = 0.0  # seconds spent in the wrapped model
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def embeddings_per_sec(self) -> float:
+        return self.embedded / self.embed_time if self.embed_time else 0.0
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Wrap any embedding model with a content-hash keyed cache.
+
+    Only the cache misses of a batch are embedded, deduplicated and split into batches of the wrapped model's
+    `embed_batch_size`. The async path embeds up to `max_concurrency` batches at a time.
+    """
+
+    embed_model: BaseEmbedding = Field(description="The wrapped embedding model.")
+    max_concurrency: int = Field(default=4, gt=0, description="Max in-flight batches of the wrapped model.")
+
+    _cache: EmbeddingCache = PrivateAttr()
+    _stats: EmbeddingCacheStats = PrivateAttr()
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        cache: Optional[EmbeddingCache] = None,
+        max_concurrency: int = 4,
+        embed_batch_size: int = 2048,
+        **kwargs,
+    ):
+        super().__init__(
+            embed_model=embed_model,
+            max_concurrency=max_concurrency,
+            model_name=embed_model.model_name,
+            # large batches reach `_get_text_embeddings` at once, the wrapped model splits them by its own size
+            embed_batch_size=embed_batch_size,
+            **kwargs,
+        )
+        self._cache = cache if cache is not None else EmbeddingCache(Path(":memory:"))
+        self._stats = EmbeddingCacheStats()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @classmethod
+    def from_config(cls, embed_model: BaseEmbedding, config: EmbeddingCacheConfig) -> "CachedEmbedding":
+        path = Path(config.path).expanduser() if config.path else CONFIG_ROOT / "embedding_cache.db"
+        cache = EmbeddingCache(path, max_size=config.max_size)
+        return cls(embed_model, cache=cache, max_concurrency=config.max_concurrency)
+
+    @property
+    def stats(self) -> EmbeddingCacheStats:
+        return self._stats
+
+    def _make_key(self, text: str, kind: str = "text") -> str:
+        # some models embed queries and texts differently
+        raw = f"{self.embed_model.class_name()}\0{self.model_name}\0{kind}\0{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _lookup(self, texts: list[str], kind: str) -> tuple[list[str], dict[str, Embedding], dict[str, str]]:
+        keys = [self._make_key(text, kind) for text in texts]
+        found = self._cache.get_many(list(set(keys)))
+        misses = {key: text for key, text in zip(keys, texts) if key not in found}  # deduplicated
+        num_misses = sum(1 for key in keys if key not in found)
+        self._stats.hits += len(keys) - num_misses
+        self._stats.misses += num_misses
+        return keys, found, misses
+
+    def _save(self, misses: dict[str, str], embeddings: list[Embedding], found: dict[str, Embedding], cost: float):
+        new = dict(zip(misses, embeddings))
+        self._cache.set_many(new)
+        found.update(new)
+        self._stats.embedded += len(misses)
+        self._stats.embed_time += cost
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        keys, found, misses = self._lookup(texts, "text")
+        if misses:
+            start = time.perf_counter()
+            embeddings = self.embed_model.get_text_embedding_batch(list(misses.values()))
+            self._save(misses, embeddings, found, time.perf_counter() - start)
+        return [found[key] for key in keys]
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        keys, found, misses = self._lookup(texts, "text")
+        if misses:
+            start = time.perf_counter()
+            pending = list(misses.values())
+            batch_size = self.embed_model.embed_batch_size
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def _embed(batch: list[str]) -> list[Embedding]:
+                async with semaphore:
+                    return await self.embed_model.aget_text_embedding_batch(batch)
+
+            batches = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+            results = await asyncio.gather(*[_embed(batch) for batch in batches])
+            embeddings = [embedding for result in results for embedding in result]
+            self._save(misses, embeddings, found, time.perf_counter() - start)
+        return [found[key] for key in keys]
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        keys, found, misses = self._lookup([query], "query")
+        if misses:
+            start = time.perf_counter()
+            embedding = self.embed_model.get_query_embedding(query)
+            self._save(misses, [embedding], found, time.perf_counter() - start)
+        return found[keys[0]]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        keys, found, misses = self._lookup([query], "query")
+        if misses:
+            start = time.perf_counter()
+            embedding = await self.embed_model.aget_query_embedding(query)
+            self._save(misses, [embedding], found, time.perf_counter() - start)
+        return found[keys[0]]
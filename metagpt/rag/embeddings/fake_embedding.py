@@ -0,0 +1,44 @@
+"""Fake embedding."""
+
+import hashlib
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import Field
+
+
+class FakeEmbedding(BaseEmbedding):
+    """Local embedding for offline tests and benchmarks.
+
+    Identical texts get identical unit vectors, seeded by the hash of the text, so no model or network is needed.
+    """
+
+    embed_dim: int = Field(default=8, gt=0, description="Dimension of the embeddings.")
+    num_calls: int = Field(default=0, description="Number of embedding requests, each batch counts once.")
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FakeEmbedding"
+
+    def _embed(self, text: str) -> Embedding:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.embed_dim)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        self.num_calls += 1
+        return self._embed(query)
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        self.num_calls += 1
+        return self._embed(text)
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        self.num_calls += 1
+        return [self._embed(text) for text in texts]
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        return self._get_text_embeddings(texts)
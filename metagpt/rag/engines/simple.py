@@ -1,7 +1,10 @@
 """Simple Engine."""
 
+import asyncio
+import copy
 import json
 import os
+from pathlib import Path
 from typing import Any, Optional, Union
 
 from llama_index.core import SimpleDirectoryReader
@@ -28,6 +31,7 @@ from llama_index.core.schema import (
     TransformComponent,
 )
 
+from metagpt.logs import logger
 from metagpt.rag.factories import (
     get_index,
     get_rag_embedding,
@@ -35,7 +39,9 @@ from metagpt.rag.factories import (
     get_rankers,
     get_retriever,
 )
+from metagpt.rag.ingestion import StreamingIngestion, list_input_files
 from metagpt.rag.interface import NoEmbedding, RAGObject
+from metagpt.rag.object_store import OBJECT_STORE_FILE, ObjectStore
 from metagpt.rag.retrievers.base import ModifiableRAGRetriever, PersistableRAGRetriever
 from metagpt.rag.retrievers.hybrid_retriever import SimpleHybridRetriever
 from metagpt.rag.schema import (
@@ -43,9 +49,14 @@ from metagpt.rag.schema import (
     BaseRankerConfig,
     BaseRetrieverConfig,
     BM25RetrieverConfig,
+    FAISSRetrieverConfig,
     ObjectNode,
+    StreamingIngestionConfig,
 )
 from metagpt.utils.common import import_class
+from metagpt.utils.lru_cache import LRUCache
+
+OBJ_CACHE_SIZE = 4096
 
 
 class SimpleEngine(RetrieverQueryEngine):
@@ -64,6 +75,8 @@ class SimpleEngine(RetrieverQueryEngine):
         node_postprocessors: Optional[list[BaseNodePostprocessor]] = None,
         callback_manager: Optional[CallbackManager] = None,
         transformations: Optional[list[TransformComponent]] = None,
+        query_cache_size: int = 0,
+        object_store: Optional[ObjectStore] = None,
     ) -> None:
         super().__init__(
             retriever=retriever,
@@ -72,6 +85,11 @@ class SimpleEngine(RetrieverQueryEngine):
             callback_manager=callback_manager,
         )
         self._transformations = transformations or self._default_transformations()
+        # retrieved nodes by normalized query, cleared when nodes are added. 0, the default, disables the cache.
+        self._query_cache = LRUCache(max_size=query_cache_size) if query_cache_size else None
+        self._index_version = 0
+        self._obj_cache = LRUCache(max_size=OBJ_CACHE_SIZE)  # reconstructed objects by node id, of the index version
+        self._object_store = object_store if object_store is not None else ObjectStore()
 
     @classmethod
     def from_docs(
@@ -83,6 +101,8 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        ingestion_config: StreamingIngestionConfig = None,
+        query_cache_size: int = 0,
     ) -> "SimpleEngine":
         """From docs.
 
@@ -96,10 +116,24 @@ class SimpleEngine(RetrieverQueryEngine):
             llm: Must supported by llama index. Default OpenAI.
             retriever_configs: Configuration for retrievers. If more than one config, will use SimpleHybridRetriever.
             ranker_configs: Configuration for rankers.
+            ingestion_config: Read, split and embed files in batches, checkpointed to resume. Default load all at once.
+            query_cache_size: Number of queries whose retrieved nodes are cached. Default 0, no cache.
         """
         if not input_dir and not input_files:
             raise ValueError("Must provide either `input_dir` or `input_files`.")
 
+        if ingestion_config:
+            return cls._from_streaming_ingestion(
+                list_input_files(input_dir=input_dir, input_files=input_files),
+                ingestion_config=ingestion_config,
+                transformations=transformations,
+                embed_model=embed_model,
+                llm=llm,
+                retriever_configs=retriever_configs,
+                ranker_configs=ranker_configs,
+                query_cache_size=query_cache_size,
+            )
+
         documents = SimpleDirectoryReader(input_dir=input_dir, input_files=input_files).load_data()
         cls._fix_document_metadata(documents)
 
@@ -113,6 +147,7 @@ class SimpleEngine(RetrieverQueryEngine):
             llm=llm,
             retriever_configs=retriever_configs,
             ranker_configs=ranker_configs,
+            query_cache_size=query_cache_size,
         )
 
     @classmethod
@@ -124,6 +159,7 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        query_cache_size: int = 0,
     ) -> "SimpleEngine":
         """From objs.
 
@@ -134,6 +170,7 @@ class SimpleEngine(RetrieverQueryEngine):
             llm: Must supported by llama index. Default OpenAI.
             retriever_configs: Configuration for retrievers. If more than one config, will use SimpleHybridRetriever.
             ranker_configs: Configuration for rankers.
+            query_cache_size: Number of queries whose retrieved nodes are cached. Default 0, no cache.
         """
         objs = objs or []
         retriever_configs = retriever_configs or []
@@ -141,7 +178,8 @@ class SimpleEngine(RetrieverQueryEngine):
         if not objs and any(isinstance(config, BM25RetrieverConfig) for config in retriever_configs):
             raise ValueError("In BM25RetrieverConfig, Objs must not be empty.")
 
-        nodes = [ObjectNode(text=obj.rag_key(), metadata=ObjectNode.get_obj_metadata(obj)) for obj in objs]
+        object_store = ObjectStore()
+        nodes = cls._get_obj_nodes(objs, object_store)
 
         return cls._from_nodes(
             nodes=nodes,
@@ -150,6 +188,8 @@ class SimpleEngine(RetrieverQueryEngine):
             llm=llm,
             retriever_configs=retriever_configs,
             ranker_configs=ranker_configs,
+            object_store=object_store,
+            query_cache_size=query_cache_size,
         )
 
     @classmethod
@@ -160,10 +200,19 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        query_cache_size: int = 0,
     ) -> "SimpleEngine":
         """Load from previously maintained index by self.persist(), index_config contains persis_path."""
         index = get_index(index_config, embed_model=cls._resolve_embed_model(embed_model, [index_config]))
-        return cls._from_index(index, llm=llm, retriever_configs=retriever_configs, ranker_configs=ranker_configs)
+        return cls._from_index(
+            index,
+            llm=llm,
+            retriever_configs=retriever_configs,
+            ranker_configs=ranker_configs,
+            persist_path=index_config.persist_path,
+            object_store=ObjectStore.from_persist_dir(index_config.persist_path),
+            query_cache_size=query_cache_size,
+        )
 
     async def asearch(self, content: str, **kwargs) -> str:
         """Inplement tools.SearchInterface"""
@@ -172,17 +221,46 @@ class SimpleEngine(RetrieverQueryEngine):
     def retrieve(self, query: QueryType) -> list[NodeWithScore]:
         query_bundle = QueryBundle(query) if isinstance(query, str) else query
 
-        nodes = super().retrieve(query_bundle)
-        self._try_reconstruct_obj(nodes)
+        cache_key = self._query_cache_key(query_bundle)
+        nodes = self._get_cached_nodes(cache_key)
+        if nodes is None:
+            nodes = super().retrieve(query_bundle)
+            self._set_cached_nodes(cache_key, nodes)
+        self._try_reconstruct_obj(nodes, self._obj_cache, self._object_store)
         return nodes
 
     async def aretrieve(self, query: QueryType) -> list[NodeWithScore]:
         """Allow query to be str."""
         query_bundle = QueryBundle(query) if isinstance(query, str) else query
 
-        nodes = await super().aretrieve(query_bundle)
-        self._try_reconstruct_obj(nodes)
-        return nodes
+        return await self._aretrieve_cached(query_bundle, self._query_cache_key(query_bundle))
+
+    async def aretrieve_many(self, queries: list[QueryType]) -> list[list[NodeWithScore]]:
+        """Retrieve for a batch of queries, the results are in the same order as the queries.
+
+        Duplicated queries are retrieved once. If the retrievers embedding the queries share one embed model, the
+        queries not cached are embedded in one batch before the searches run concurrently.
+        """
+        bundles = [QueryBundle(q) if isinstance(q, str) else copy.copy(q) for q in queries]
+        keys = [self._query_cache_key(bundle) for bundle in bundles]
+        unique = {}  # cache key, or position if not cacheable -> (bundle, cache key)
+        for idx, (bundle, key) in enumerate(zip(bundles, keys)):
+            unique.setdefault(key or idx, (bundle, key))
+
+        pending = [
+            bundle
+            for bundle, key in unique.values()
+            if self._get_cached_nodes(key) is None and bundle.embedding is None and not bundle.custom_embedding_strs
+        ]
+        embed_model = self._get_embed_model()
+        if embed_model and pending:
+            embeddings = await embed_model.aget_text_embedding_batch([b.query_str for b in pending])
+            for bundle, embedding in zip(pending, embeddings):
+                bundle.embedding = embedding
+
+        results = await asyncio.gather(*[self._aretrieve_cached(bundle, key) for bundle, key in unique.values()])
+        by_key = dict(zip(unique, results))
+        return [[NodeWithScore(node=n.node, score=n.score) for n in by_key[key or idx]] for idx, key in enumerate(keys)]
 
     def add_docs(self, input_files: list[str]):
         """Add docs to retriever. retriever must has add_nodes func."""
@@ -194,11 +272,14 @@ class SimpleEngine(RetrieverQueryEngine):
         nodes = run_transformations(documents, transformations=self._transformations)
         self._save_nodes(nodes)
 
-    def add_objs(self, objs: list[RAGObject]):
-        """Adds objects to the retriever, storing each object's original form in metadata for future reference."""
+    def add_objs(self, objs: list[RAGObject], embeddings: Optional[list[list[float]]] = None):
+        """Adds objects to the retriever, storing each object's original form in metadata for future reference.
+
+        embeddings: The embeddings of `obj.rag_key()` computed beforehand, e.g. replayed from a log. Default embed them.
+        """
         self._ensure_retriever_modifiable()
 
-        nodes = [ObjectNode(text=obj.rag_key(), metadata=ObjectNode.get_obj_metadata(obj)) for obj in objs]
+        nodes = self._get_obj_nodes(objs, self._object_store, embeddings)
         self._save_nodes(nodes)
 
     def persist(self, persist_dir: Union[str, os.PathLike], **kwargs):
@@ -216,6 +297,8 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        object_store: Optional[ObjectStore] = None,
+        query_cache_size: int = 0,
     ) -> "SimpleEngine":
         embed_model = cls._resolve_embed_model(embed_model, retriever_configs)
         llm = llm or get_rag_llm()
@@ -228,6 +311,51 @@ class SimpleEngine(RetrieverQueryEngine):
             node_postprocessors=rankers,
             response_synthesizer=get_response_synthesizer(llm=llm),
             transformations=transformations,
+            object_store=object_store,
+            query_cache_size=query_cache_size,
+        )
+
+    @classmethod
+    def _from_streaming_ingestion(
+        cls,
+        input_files: list[str],
+        ingestion_config: StreamingIngestionConfig,
+        transformations: Optional[list[TransformComponent]] = None,
+        embed_model: BaseEmbedding = None,
+        llm: LLM = None,
+        retriever_configs: list[BaseRetrieverConfig] = None,
+        ranker_configs: list[BaseRankerConfig] = None,
+        query_cache_size: int = 0,
+    ) -> "SimpleEngine":
+        # the retrievers are built on the ingested index: faiss keeps its vectors, bm25 reads its docstore
+        retriever_configs = retriever_configs or []
+        unsupported = [c for c in retriever_configs if not isinstance(c, (FAISSRetrieverConfig, BM25RetrieverConfig))]
+        faiss_configs = [c for c in retriever_configs if isinstance(c, FAISSRetrieverConfig)]
+        if unsupported or len(faiss_configs) > 1:
+            raise ValueError(
+                "Streaming ingestion supports at most one FAISSRetrieverConfig and BM25RetrieverConfigs, "
+                f"got {[type(c).__name__ for c in retriever_configs]}."
+            )
+
+        transformations = transformations or cls._default_transformations()
+        embed_model = cls._resolve_embed_model(embed_model, retriever_configs)
+
+        ingestion = StreamingIngestion(
+            ingestion_config,
+            transformations=transformations,
+            embed_model=embed_model,
+            faiss_config=faiss_configs[0] if faiss_configs else None,
+        )
+        index = ingestion.run(input_files)
+
+        return cls._from_index(
+            index,
+            llm=llm,
+            retriever_configs=retriever_configs,
+            ranker_configs=ranker_configs,
+            persist_path=ingestion_config.persist_path,
+            transformations=transformations,
+            query_cache_size=query_cache_size,
         )
 
     @classmethod
@@ -237,16 +365,24 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        persist_path: Union[str, os.PathLike] = None,
+        transformations: Optional[list[TransformComponent]] = None,
+        object_store: Optional[ObjectStore] = None,
+        query_cache_size: int = 0,
     ) -> "SimpleEngine":
         llm = llm or get_rag_llm()
 
-        retriever = get_retriever(configs=retriever_configs, index=index)  # Default index.as_retriever
+        # persist_path lets the bm25 retriever reload its index instead of re-tokenizing every node
+        retriever = get_retriever(configs=retriever_configs, index=index, persist_path=persist_path)
         rankers = get_rankers(configs=ranker_configs, llm=llm)  # Default []
 
         return cls(
             retriever=retriever,
             node_postprocessors=rankers,
             response_synthesizer=get_response_synthesizer(llm=llm),
+            transformations=transformations,
+            object_store=object_store,
+            query_cache_size=query_cache_size,
         )
 
     def _ensure_retriever_modifiable(self):
@@ -272,18 +408,115 @@ class SimpleEngine(RetrieverQueryEngine):
 
     def _save_nodes(self, nodes: list[BaseNode]):
         self.retriever.add_nodes(nodes)
+        self._invalidate_query_cache()
+
+    def _invalidate_query_cache(self):
+        self._index_version += 1
+        self._obj_cache = LRUCache(max_size=OBJ_CACHE_SIZE)
+        if self._query_cache is not None:
+            self._query_cache = LRUCache(max_size=self._query_cache.max_size)
+
+    def _query_cache_key(self, query_bundle: QueryBundle) -> Optional[str]:
+        """Normalized query and index version, None if the query is not cacheable, e.g. with a custom embedding"""
+        if self._query_cache is None or query_bundle.custom_embedding_strs or query_bundle.embedding is not None:
+            return None
+        normalized = " ".join(query_bundle.query_str.casefold().split())
+        return f"{self._index_version}:{normalized}"
+
+    def _get_cached_nodes(self, cache_key: Optional[str]) -> Optional[list[NodeWithScore]]:
+        nodes = self._query_cache.get(cache_key) if cache_key else None
+        # copies, so callers changing the scores or the metadata do not change the cache
+        return self._copy_nodes(nodes) if nodes is not None else None
+
+    def _set_cached_nodes(self, cache_key: Optional[str], nodes: list[NodeWithScore]):
+        if cache_key:
+            self._query_cache.set(cache_key, self._copy_nodes(nodes))
+
+    @staticmethod
+    def _copy_nodes(nodes: list[NodeWithScore]) -> list[NodeWithScore]:
+        return [
+            NodeWithScore(node=n.node.copy(update={"metadata": dict(n.node.metadata)}), score=n.score) for n in nodes
+        ]
+
+    async def _aretrieve_cached(self, query_bundle: QueryBundle, cache_key: Optional[str]) -> list[NodeWithScore]:
+        nodes = self._get_cached_nodes(cache_key)
+        if nodes is None:
+            nodes = await super().aretrieve(query_bundle)
+            self._set_cached_nodes(cache_key, nodes)
+        self._try_reconstruct_obj(nodes, self._obj_cache, self._object_store)
+        return nodes
+
+    def _get_embed_model(self) -> Optional[BaseEmbedding]:
+        """The embed model of the retrievers, None if they use different ones, as a query embedding is not shared."""
+        retrievers = [self.retriever]
+        if isinstance(self.retriever, SimpleHybridRetriever):
+            retrievers = self.retriever.retrievers
+        embed_models = {}
+        for retriever in retrievers:
+            embed_model = getattr(retriever, "_embed_model", None)
+            if isinstance(embed_model, BaseEmbedding):
+                embed_models[id(embed_model)] = embed_model
+        return next(iter(embed_models.values())) if len(embed_models) == 1 else None
 
     def _persist(self, persist_dir: str, **kwargs):
         self.retriever.persist(persist_dir, **kwargs)
+        self._object_store.persist(Path(persist_dir) / OBJECT_STORE_FILE)
+
+    def _apply_node_postprocessors(self, nodes: list[NodeWithScore], query_bundle: QueryBundle) -> list[NodeWithScore]:
+        if self._node_postprocessors:
+            self._load_obj_json(nodes)  # rankers may read obj_json, e.g. ObjectSortPostprocessor
+        return super()._apply_node_postprocessors(nodes, query_bundle=query_bundle)
+
+    def _load_obj_json(self, nodes: list[NodeWithScore]):
+        """Set obj_json of the retrieved object nodes kept in the object store, on copies of the nodes."""
+        for node in nodes:
+            if not node.metadata.get("is_obj", False) or node.metadata.get("obj_json") is not None:
+                continue
+            obj_json = self._object_store.get(node.node.node_id)
+            if obj_json is not None:
+                node.node = node.node.copy(update={"metadata": {**node.node.metadata, "obj_json": obj_json}})
+
+    @staticmethod
+    def _get_obj_nodes(
+        objs: list[RAGObject], object_store: ObjectStore, embeddings: Optional[list[list[float]]] = None
+    ) -> list[ObjectNode]:
+        """Object nodes only keep the object's class, the json is saved in the object store."""
+        nodes = []
+        for i, obj in enumerate(objs):
+            node = ObjectNode(text=obj.rag_key(), metadata=ObjectNode.get_obj_metadata(obj, with_json=False))
+            if embeddings is not None:
+                node.embedding = list(embeddings[i])  # the index does not embed nodes having an embedding
+            object_store.add(node.node_id, obj.model_dump_json())
+            nodes.append(node)
+        return nodes
 
     @staticmethod
-    def _try_reconstruct_obj(nodes: list[NodeWithScore]):
-        """If node is object, then dynamically reconstruct object, and save object to node.metadata["obj"]."""
+    def _try_reconstruct_obj(
+        nodes: list[NodeWithScore], obj_cache: Optional[LRUCache] = None, object_store: Optional[ObjectStore] = None
+    ):
+        """If node is object, then dynamically reconstruct object, and save object to node.metadata["obj"].
+
+        Objects are memoized in obj_cache by node id, as parsing obj_json is much slower than the retrieval, and each
+        node gets its own copy, callers may modify them. obj_json not in the metadata is read from object_store.
+        """
         for node in nodes:
-            if node.metadata.get("is_obj", False):
+            if not node.metadata.get("is_obj", False):
+                continue
+            obj = obj_cache.get(node.node.node_id) if obj_cache is not None else None
+            if obj is None:
+                obj_json = node.metadata.get("obj_json")
+                if obj_json is None and object_store is not None:
+                    obj_json = object_store.get(node.node.node_id)
+                if obj_json is None:
+                    logger.warning(f"object of node {node.node.node_id} not found")
+                    continue
                 obj_cls = import_class(node.metadata["obj_cls_name"], node.metadata["obj_mod_name"])
-                obj_dict = json.loads(node.metadata["obj_json"])
-                node.metadata["obj"] = obj_cls(**obj_dict)
+                obj_dict = json.loads(obj_json)
+                obj = obj_cls(**obj_dict)
+                if obj_cache is not None:
+                    obj_cache.set(node.node.node_id, obj)
+            # on a copy of the node, the retriever and the query cache keep theirs
+            node.node = node.node.copy(update={"metadata": {**node.node.metadata, "obj": copy.deepcopy(obj)}})
 
     @staticmethod
     def _fix_document_metadata(documents: list[Document]):
@@ -12,6 +12,7 @@ from llama_index.embeddings.openai import OpenAIEmbedding
 from metagpt.config2 import config
 from metagpt.configs.embedding_config import EmbeddingType
 from metagpt.configs.llm_config import LLMType
+from metagpt.rag.embeddings import CachedEmbedding
 from metagpt.rag.factories.base import GenericFactory
 
 
@@ -31,8 +32,17 @@ class RAGEmbeddingFactory(GenericFactory):
         super().__init__(creators)
 
     def get_rag_embedding(self, key: EmbeddingType = None) -> BaseEmbedding:
-        """Key is EmbeddingType."""
-        return super().get_instance(key or self._resolve_embedding_type())
+        """Key is EmbeddingType.
+
+        Wrapped by CachedEmbedding if the embedding cache is enabled.
+        """
+        embedding = super().get_instance(key or self._resolve_embedding_type())
+
+        cache_config = config.embedding.cache
+        if cache_config and cache_config.enabled:
+            return CachedEmbedding.from_config(embedding, cache_config)
+
+        return embedding
 
     def _resolve_embedding_type(self) -> EmbeddingType | LLMType:
         """Resolves the embedding type.
@@ -7,7 +7,6 @@ from llama_index.core.indices.base import BaseIndex
 from llama_index.core.vector_stores.types import BasePydanticVectorStore
 from llama_index.vector_stores.chroma import ChromaVectorStore
 from llama_index.vector_stores.elasticsearch import ElasticsearchStore
-from llama_index.vector_stores.faiss import FaissVectorStore
 
 from metagpt.rag.factories.base import ConfigBasedFactory
 from metagpt.rag.schema import (
@@ -18,6 +17,7 @@ from metagpt.rag.schema import (
     ElasticsearchKeywordIndexConfig,
     FAISSIndexConfig,
 )
+from metagpt.rag.vector_stores import FAISSVectorStore
 
 
 class RAGIndexFactory(ConfigBasedFactory):
@@ -36,7 +36,9 @@ class RAGIndexFactory(ConfigBasedFactory):
         return super().get_instance(config, **kwargs)
 
     def _create_faiss(self, config: FAISSIndexConfig, **kwargs) -> VectorStoreIndex:
-        vector_store = FaissVectorStore.from_persist_dir(str(config.persist_path))
+        vector_store = FAISSVectorStore.from_persist_dir(
+            str(config.persist_path), mmap=config.mmap, search_params=config.search_params
+        )
         storage_context = StorageContext.from_defaults(vector_store=vector_store, persist_dir=config.persist_path)
 
         return self._index_from_storage(storage_context=storage_context, config=config, **kwargs)
@@ -4,14 +4,12 @@
 from functools import wraps
 
 import chromadb
-import faiss
 from llama_index.core import StorageContext, VectorStoreIndex
 from llama_index.core.embeddings import BaseEmbedding
 from llama_index.core.schema import BaseNode
 from llama_index.core.vector_stores.types import BasePydanticVectorStore
 from llama_index.vector_stores.chroma import ChromaVectorStore
 from llama_index.vector_stores.elasticsearch import ElasticsearchStore
-from llama_index.vector_stores.faiss import FaissVectorStore
 
 from metagpt.rag.factories.base import ConfigBasedFactory
 from metagpt.rag.retrievers.base import RAGRetriever
@@ -27,7 +25,9 @@ from metagpt.rag.schema import (
     ElasticsearchKeywordRetrieverConfig,
     ElasticsearchRetrieverConfig,
     FAISSRetrieverConfig,
+    HybridRetrieverConfig,
 )
+from metagpt.rag.vector_stores import FAISSVectorStore
 
 
 def get_or_build_index(build_index_func):
@@ -59,17 +59,19 @@ class RetrieverFactory(ConfigBasedFactory):
         }
         super().__init__(creators)
 
-    def get_retriever(self, configs: list[BaseRetrieverConfig] = None, **kwargs) -> RAGRetriever:
+    def get_retriever(
+        self, configs: list[BaseRetrieverConfig] = None, hybrid_config: HybridRetrieverConfig = None, **kwargs
+    ) -> RAGRetriever:
         """Creates and returns a retriever instance based on the provided configurations.
 
-        If multiple retrievers, using SimpleHybridRetriever.
+        If multiple retrievers, using SimpleHybridRetriever, configured by hybrid_config.
         """
         if not configs:
             return self._create_default(**kwargs)
 
         retrievers = super().get_instances(configs, **kwargs)
 
-        return SimpleHybridRetriever(*retrievers) if len(retrievers) > 1 else retrievers[0]
+        return SimpleHybridRetriever(*retrievers, config=hybrid_config) if len(retrievers) > 1 else retrievers[0]
 
     def _create_default(self, **kwargs) -> RAGRetriever:
         index = self._extract_index(None, **kwargs) or self._build_default_index(**kwargs)
@@ -84,8 +86,10 @@ class RetrieverFactory(ConfigBasedFactory):
     def _create_bm25_retriever(self, config: BM25RetrieverConfig, **kwargs) -> DynamicBM25Retriever:
         index = self._extract_index(config, **kwargs)
         nodes = list(index.docstore.docs.values()) if index else self._extract_nodes(config, **kwargs)
+        persist_path = self._val_from_config_or_kwargs("persist_path", config, **kwargs)
+        bm25_index = DynamicBM25Retriever.load_bm25_index(persist_path) if persist_path else None
 
-        return DynamicBM25Retriever(nodes=nodes, **config.model_dump())
+        return DynamicBM25Retriever(nodes=nodes, bm25_index=bm25_index, **config.model_dump())
 
     def _create_chroma_retriever(self, config: ChromaRetrieverConfig, **kwargs) -> ChromaRetriever:
         config.index = self._build_chroma_index(config, **kwargs)
@@ -116,7 +120,12 @@ class RetrieverFactory(ConfigBasedFactory):
 
     @get_or_build_index
     def _build_faiss_index(self, config: FAISSRetrieverConfig, **kwargs) -> VectorStoreIndex:
-        vector_store = FaissVectorStore(faiss_index=faiss.IndexFlatL2(config.dimensions))
+        vector_store = FAISSVectorStore.from_factory(
+            config.dimensions,
+            index_factory=config.index_factory,
+            train_size=config.train_size,
+            search_params=config.search_params,
+        )
 
         return self._build_index_from_vector_store(config, vector_store, **kwargs)
 
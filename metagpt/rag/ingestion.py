@@ -0,0 +1,171 @@
+"""Streaming ingestion of document directories."""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+from llama_index.core import (
+    SimpleDirectoryReader,
+    StorageContext,
+    VectorStoreIndex,
+    load_index_from_storage,
+)
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.ingestion.pipeline import run_transformations
+from llama_index.core.schema import BaseNode, TransformComponent
+
+from metagpt.logs import logger
+from metagpt.rag.schema import FAISSRetrieverConfig, StreamingIngestionConfig
+from metagpt.rag.vector_stores import FAISSVectorStore
+
+INGEST_CHECKPOINT_FILE = "ingest_checkpoint.json"
+
+
+def load_and_transform(input_file: str, transformations: list[TransformComponent]) -> list[BaseNode]:
+    """Read one file and parse it to nodes, run in the worker processes.
+
+    Document ids are derived from the file path, so nodes of an unfinished file can be found when resuming.
+    """
+    documents = SimpleDirectoryReader(input_files=[input_file], filename_as_id=True).load_data()
+    for doc in documents:
+        # LlamaIndex keep metadata['file_path'], which is unnecessary, see SimpleEngine._fix_document_metadata
+        doc.excluded_embed_metadata_keys.append("file_path")
+
+    return run_transformations(documents, transformations=transformations)
+
+
+class StreamingIngestion:
+    """Ingest files batch by batch instead of loading the whole directory at once.
+
+    Files are read and split in a process pool while the previous batch is embedded and inserted into the index.
+    Every `config.batches_per_checkpoint` batches and at the end, the index and a checkpoint of the finished files
+    are saved to `config.persist_path`, running again with the same files resumes from there.
+    The vectors are kept in a faiss index built by `faiss_config` if given, else in the default vector store.
+    """
+
+    def __init__(
+        self,
+        config: StreamingIngestionConfig,
+        transformations: list[TransformComponent],
+        embed_model: BaseEmbedding,
+        faiss_config: Optional[FAISSRetrieverConfig] = None,
+    ):
+        self.config = config
+        self.transformations = transformations
+        self.embed_model = embed_model
+        self.faiss_config = faiss_config
+        self.persist_path = Path(config.persist_path)
+        self.checkpoint_path = self.persist_path / INGEST_CHECKPOINT_FILE
+
+    def run(self, input_files: list[str]) -> VectorStoreIndex:
+        finished = self._load_checkpoint()
+        index = self._load_or_create_index(resume=self.checkpoint_path.exists())
+
+        pending = [str(f) for f in input_files if finished.get(str(f)) != self._file_key(f)]
+        self._delete_unfinished(index, finished, pending)
+        logger.info(f"ingesting {len(pending)} files, {len(input_files) - len(pending)} already finished")
+
+        unsaved = 0
+        for batch, nodes in self._iter_batches(pending):
+            index.insert_nodes(nodes)
+            finished.update({file: self._file_key(file) for file in batch})
+            unsaved += 1
+            logger.info(f"ingested {len(batch)} files, {len(nodes)} nodes")
+            if unsaved >= self.config.batches_per_checkpoint:
+                self._save(index, finished)
+                unsaved = 0
+        if unsaved or not self.checkpoint_path.exists():
+            self._save(index, finished)
+
+        return index
+
+    def _save(self, index: VectorStoreIndex, finished: dict[str, list]):
+        index.storage_context.persist(str(self.persist_path))
+        self._save_checkpoint(finished)
+
+    def _iter_batches(self, files: list[str]) -> Iterator[tuple[list[str], list[BaseNode]]]:
+        """Yield the nodes batch by batch, the next batch is parsed while the current one is inserted"""
+        size = self.config.files_per_batch
+        batches = [files[i : i + size] for i in range(0, len(files), size)]
+        with self._get_executor() as executor:
+            window: deque[tuple[list[str], list[Future]]] = deque()
+            for batch in batches:
+                window.append((batch, [executor.submit(load_and_transform, f, self.transformations) for f in batch]))
+                if len(window) > 1:
+                    yield self._collect(*window.popleft())
+            while window:
+                yield self._collect(*window.popleft())
+
+    @staticmethod
+    def _collect(batch: list[str], futures: list[Future]) -> tuple[list[str], list[BaseNode]]:
+        return batch, [node for future in futures for node in future.result()]
+
+    def _get_executor(self) -> Executor:
+        if self.config.num_workers == 0:
+            return ThreadPoolExecutor(max_workers=1)  # no process pool, convenient for debugging
+        return ProcessPoolExecutor(max_workers=self.config.num_workers)
+
+    def _load_or_create_index(self, resume: bool) -> VectorStoreIndex:
+        if resume:
+            vector_store = None
+            if self.faiss_config:
+                vector_store = FAISSVectorStore.from_persist_dir(
+                    str(self.persist_path),
+                    train_size=self.faiss_config.train_size,
+                    search_params=self.faiss_config.search_params,
+                )
+            storage_context = StorageContext.from_defaults(
+                persist_dir=str(self.persist_path), vector_store=vector_store
+            )
+            return load_index_from_storage(storage_context=storage_context, embed_model=self.embed_model)
+
+        storage_context = None
+        if self.faiss_config:
+            vector_store = FAISSVectorStore.from_factory(
+                self.faiss_config.dimensions,
+                index_factory=self.faiss_config.index_factory,
+                train_size=self.faiss_config.train_size,
+                search_params=self.faiss_config.search_params,
+            )
+            storage_context = StorageContext.from_defaults(vector_store=vector_store)
+        return VectorStoreIndex(nodes=[], storage_context=storage_context, embed_model=self.embed_model)
+
+    @staticmethod
+    def _delete_unfinished(index: VectorStoreIndex, finished: dict[str, list], pending: list[str]):
+        """Remove the nodes of modified files, and of a batch saved but not checkpointed before an interruption"""
+        pending = set(pending)
+        for ref_doc_id in list(index.ref_doc_info):
+            input_file = ref_doc_id.rsplit("_part_", 1)[0]
+            if input_file in pending or input_file not in finished:
+                try:
+                    index.delete_ref_doc(ref_doc_id, delete_from_docstore=True)
+                except NotImplementedError:
+                    raise ValueError(
+                        f"The vector store can not delete the nodes of {input_file}, which was modified or not "
+                        f"checkpointed, ingest into a new persist_path."
+                    )
+
+    @staticmethod
+    def _file_key(input_file: str) -> list:
+        """A finished file is ingested again if it has been modified"""
+        stat = os.stat(input_file)
+        return [stat.st_mtime, stat.st_size]
+
+    def _load_checkpoint(self) -> dict[str, list]:
+        if not self.checkpoint_path.exists():
+            return {}
+        return json.loads(self.checkpoint_path.read_text())
+
+    def _save_checkpoint(self, finished: dict[str, list]):
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(finished, ensure_ascii=False))
+        os.replace(tmp_path, self.checkpoint_path)
+
+
+def list_input_files(input_dir: Optional[str] = None, input_files: Optional[list[str]] = None) -> list[str]:
+    """The files SimpleDirectoryReader would read, without reading them."""
+    reader = SimpleDirectoryReader(input_dir=input_dir, input_files=input_files)
+    return [str(f) for f in reader.input_files]
@@ -0,0 +1,124 @@
+"""Append-only store of the ObjectNode payloads."""
+
+import os
+import shutil
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from metagpt.logs import logger
+
+OBJECT_STORE_FILE = "object_store.bin"
+
+_HEADER = struct.Struct("<II")  # length of the node id, length of the compressed payload
+
+
+class ObjectStore:
+    """The `obj_json` of ObjectNodes kept out of the node metadata, zlib compressed and keyed by node id.
+
+    The file is a log of (node id, payload) records. Loading only reads the record headers to find the offset of each
+    payload, a payload is read when its node is retrieved. `persist` appends the records added since the last persist,
+    a record of the same node id appended later overrides the former one.
+    """
+
+    def __init__(self, persist_path: Optional[Union[str, os.PathLike]] = None):
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._offsets: dict[str, tuple[int, int]] = {}  # node id -> (offset, length) of the payload in the file
+        self._unsaved: dict[str, bytes] = {}  # node id -> compressed payload
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+
+        if self.persist_path and self.persist_path.exists():
+            self._read_offsets()
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: Union[str, os.PathLike]) -> "ObjectStore":
+        return cls(Path(persist_dir) / OBJECT_STORE_FILE)
+
+    def __len__(self) -> int:
+        return len(self._offsets.keys() | self._unsaved.keys())
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._unsaved or node_id in self._offsets
+
+    def add(self, node_id: str, obj_json: str):
+        self._unsaved[node_id] = zlib.compress(obj_json.encode("utf-8"))
+
+    def get(self, node_id: str) -> Optional[str]:
+        """The obj_json of node_id, None if not found."""
+        payload = self._unsaved.get(node_id)
+        if payload is None:
+            payload = self._read_payload(node_id)
+        return zlib.decompress(payload).decode("utf-8") if payload is not None else None
+
+    def persist(self, persist_path: Union[str, os.PathLike]):
+        """Append the new records, or copy the whole store if persisting to another path."""
+        persist_path = Path(persist_path)
+        with self._lock:
+            if self.persist_path != persist_path:
+                self._copy_to(persist_path)
+            if self._unsaved:
+                self._append(self._unsaved)
+                self._unsaved = {}
+
+    def _append(self, records: dict[str, bytes]):
+        self._close()
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.persist_path, "ab") as f:
+            offset = f.tell()
+            for node_id, payload in records.items():
+                key = node_id.encode("utf-8")
+                f.write(_HEADER.pack(len(key), len(payload)) + key + payload)
+                offset += _HEADER.size + len(key)
+                self._offsets[node_id] = (offset, len(payload))
+                offset += len(payload)
+
+    def _copy_to(self, persist_path: Path):
+        persist_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.persist_path and self.persist_path.exists():
+            # records are copied as they are, so the offsets stay valid
+            self._close()
+            tmp_path = persist_path.with_suffix(".tmp")
+            shutil.copyfile(self.persist_path, tmp_path)
+            os.replace(tmp_path, persist_path)
+        else:
+            persist_path.unlink(missing_ok=True)
+        self.persist_path = persist_path
+
+    def _read_offsets(self):
+        size = self.persist_path.stat().st_size
+        with open(self.persist_path, "rb") as f:
+            offset = 0
+            while offset + _HEADER.size <= size:
+                key_len, payload_len = _HEADER.unpack(f.read(_HEADER.size))
+                if offset + _HEADER.size + key_len + payload_len > size:
+                    break
+                node_id = f.read(key_len).decode("utf-8")
+                offset += _HEADER.size + key_len
+                self._offsets[node_id] = (offset, payload_len)
+                offset += payload_len
+                f.seek(offset)
+
+        if offset != size:
+            # a record partly written when the process was interrupted, it was not persisted
+            logger.warning(f"object store {self.persist_path} has a truncated record, ignored")
+            with open(self.persist_path, "r+b") as f:
+                f.truncate(offset)
+
+    def _read_payload(self, node_id: str) -> Optional[bytes]:
+        location = self._offsets.get(node_id)
+        if location is None:
+            return None
+        offset, length = location
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.persist_path, "rb")
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,113 @@
+"""Incremental BM25 index."""
+
+import json
+import math
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+BM25_INDEX_FILE = "bm25_index.json"
+
+
+class BM25Index:
+    """Inverted index with BM25Okapi scoring, updated in place on add and delete.
+
+    Scores are the same as `rank_bm25.BM25Okapi`, including the epsilon floor of negative idf values.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        self.doc_freqs: dict[str, dict[str, int]] = {}  # doc id -> term -> term frequency
+        self.doc_len: dict[str, int] = {}
+        self.postings: dict[str, dict[str, int]] = {}  # term -> doc id -> term frequency
+        self.total_len = 0
+
+        self._average_idf = None  # depends on every document frequency, computed lazily after changes
+
+    @property
+    def corpus_size(self) -> int:
+        return len(self.doc_len)
+
+    @property
+    def avgdl(self) -> float:
+        return self.total_len / self.corpus_size if self.corpus_size else 0.0
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_len
+
+    def add(self, doc_id: str, tokens: list[str]):
+        """Add a tokenized document, replacing the document of the same id"""
+        self._add_frequencies(doc_id, dict(Counter(tokens)))
+
+    def _add_frequencies(self, doc_id: str, frequencies: dict[str, int]):
+        if doc_id in self:
+            self.delete(doc_id)
+
+        doc_len = sum(frequencies.values())
+        self.doc_freqs[doc_id] = frequencies
+        self.doc_len[doc_id] = doc_len
+        self.total_len += doc_len
+        for term, freq in frequencies.items():
+            self.postings.setdefault(term, {})[doc_id] = freq
+        self._average_idf = None
+
+    def delete(self, doc_id: str):
+        frequencies = self.doc_freqs.pop(doc_id, None)
+        if frequencies is None:
+            return
+        self.total_len -= self.doc_len.pop(doc_id)
+        for term in frequencies:
+            docs = self.postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+        self._average_idf = None
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        if not df:
+            return 0.0
+        idf = math.log(self.corpus_size - df + 0.5) - math.log(df + 0.5)
+        return idf if idf >= 0 else self.epsilon * self._get_average_idf()
+
+    def _get_average_idf(self) -> float:
+        if self._average_idf is None:
+            dfs = np.fromiter((len(docs) for docs in self.postings.values()), dtype=float, count=len(self.postings))
+            idfs = np.log(self.corpus_size - dfs + 0.5) - np.log(dfs + 0.5)
+            self._average_idf = float(idfs.mean()) if len(idfs) else 0.0
+        return self._average_idf
+
+    def get_scores(self, query: list[str]) -> dict[str, float]:
+        """Scores of the documents containing any query term, the other documents score 0"""
+        scores: dict[str, float] = {}
+        avgdl = self.avgdl
+        for term in query:
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = self.idf(term)
+            for doc_id, freq in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+        return scores
+
+    def persist(self, persist_path: Union[str, os.PathLike]):
+        """Save the term frequencies, so the index can be reloaded without re-tokenizing"""
+        persist_path = Path(persist_path)
+        persist_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"k1": self.k1, "b": self.b, "epsilon": self.epsilon, "docs": self.doc_freqs}
+        persist_path.write_text(json.dumps(data, ensure_ascii=False))
+
+    @classmethod
+    def from_persist_path(cls, persist_path: Union[str, os.PathLike]) -> "BM25Index":
+        data = json.loads(Path(persist_path).read_text())
+        index = cls(k1=data["k1"], b=data["b"], epsilon=data["epsilon"])
+        for doc_id, frequencies in data["docs"].items():
+            index._add_frequencies(doc_id, frequencies)
+        return index
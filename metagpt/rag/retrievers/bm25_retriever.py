@@ -1,16 +1,26 @@
 """BM25 retriever."""
-from typing import Callable, Optional
+import heapq
+import itertools
+import os
+from pathlib import Path
+from typing import Callable, Optional, Union
 
 from llama_index.core import VectorStoreIndex
+from llama_index.core.base.base_retriever import BaseRetriever
 from llama_index.core.callbacks.base import CallbackManager
 from llama_index.core.constants import DEFAULT_SIMILARITY_TOP_K
-from llama_index.core.schema import BaseNode, IndexNode
+from llama_index.core.schema import BaseNode, IndexNode, NodeWithScore
 from llama_index.retrievers.bm25 import BM25Retriever
-from rank_bm25 import BM25Okapi
+from llama_index.retrievers.bm25.base import tokenize_remove_stopwords
+
+from metagpt.rag.retrievers.bm25_index import BM25_INDEX_FILE, BM25Index
 
 
 class DynamicBM25Retriever(BM25Retriever):
-    """BM25 retriever."""
+    """BM25 retriever.
+
+    Backed by an incremental inverted index, so adding or deleting nodes only tokenizes the changed nodes.
+    """
 
     def __init__(
         self,
@@ -22,11 +32,18 @@ class DynamicBM25Retriever(BM25Retriever):
         object_map: Optional[dict] = None,
         verbose: bool = False,
         index: VectorStoreIndex = None,
+        bm25_index: Optional[BM25Index] = None,
     ) -> None:
-        super().__init__(
-            nodes=nodes,
-            tokenizer=tokenizer,
-            similarity_top_k=similarity_top_k,
+        self._tokenizer = tokenizer or tokenize_remove_stopwords
+        self._similarity_top_k = similarity_top_k
+        self._node_map: dict[str, BaseNode] = {}
+        self._node_seq: dict[str, int] = {}  # insertion order of the nodes
+        self._seq = itertools.count()
+        self._bm25 = bm25_index or BM25Index()
+        self._add_to_bm25(nodes, restored=bm25_index is not None)
+        self._drop_stale_docs()
+        BaseRetriever.__init__(
+            self,
             callback_manager=callback_manager,
             object_map=object_map,
             objects=objects,
@@ -34,14 +51,60 @@ class DynamicBM25Retriever(BM25Retriever):
         )
         self._index = index
 
+    @property
+    def _nodes(self) -> list[BaseNode]:
+        return list(self._node_map.values())
+
     def add_nodes(self, nodes: list[BaseNode], **kwargs) -> None:
         """Support add nodes."""
-        self._nodes.extend(nodes)
-        self._corpus = [self._tokenizer(node.get_content()) for node in self._nodes]
-        self.bm25 = BM25Okapi(self._corpus)
+        self._add_to_bm25(nodes)
 
         self._index.insert_nodes(nodes, **kwargs)
 
+    def delete_nodes(self, node_ids: list[str], **kwargs) -> None:
+        """Support delete nodes."""
+        for node_id in node_ids:
+            self._node_map.pop(node_id, None)
+            self._node_seq.pop(node_id, None)
+            self._bm25.delete(node_id)
+
+        if self._index:
+            self._index.delete_nodes(node_ids, **kwargs)
+
     def persist(self, persist_dir: str, **kwargs) -> None:
         """Support persist."""
         self._index.storage_context.persist(persist_dir)
+        self._bm25.persist(Path(persist_dir) / BM25_INDEX_FILE)
+
+    @staticmethod
+    def load_bm25_index(persist_dir: Union[str, os.PathLike]) -> Optional[BM25Index]:
+        """Load the bm25 index saved by `persist`, None if not found."""
+        persist_path = Path(persist_dir) / BM25_INDEX_FILE
+        return BM25Index.from_persist_path(persist_path) if persist_path.exists() else None
+
+    def _add_to_bm25(self, nodes: list[BaseNode], restored: bool = False):
+        """Index the nodes, `restored` means the nodes already in the bm25 index are the ones it was persisted with"""
+        for node in nodes:
+            if node.node_id not in self._node_map:
+                self._node_seq[node.node_id] = next(self._seq)
+            self._node_map[node.node_id] = node
+            if restored and node.node_id in self._bm25:  # loaded from disk, no need to tokenize
+                continue
+            # a node added again may have changed text, `add` replaces its term frequencies
+            self._bm25.add(node.node_id, self._tokenizer(node.get_content()))
+
+    def _drop_stale_docs(self):
+        """A loaded bm25 index may contain nodes deleted after it was persisted"""
+        for doc_id in [doc_id for doc_id in self._bm25.doc_len if doc_id not in self._node_map]:
+            self._bm25.delete(doc_id)
+
+    def _get_scored_nodes(self, query: str) -> list[NodeWithScore]:
+        scores = self._bm25.get_scores(self._tokenizer(query))
+
+        # only the documents containing query terms are scored, ties are broken by insertion order as BM25Okapi does
+        top_ids = heapq.nlargest(self._similarity_top_k, scores, key=lambda i: (scores[i], -self._node_seq[i]))
+        if len(top_ids) == self._similarity_top_k and scores[top_ids[-1]] > 0:
+            return [NodeWithScore(node=self._node_map[i], score=scores[i]) for i in top_ids]
+
+        # not enough positive scores, the documents without any query term (score 0) fill up the top k
+        return [NodeWithScore(node=node, score=scores.get(node_id, 0.0)) for node_id, node in self._node_map.items()]
@@ -1,41 +1,140 @@
 """Hybrid retriever."""
 
+import asyncio
 import copy
+import time
+from typing import Callable, Optional
 
-from llama_index.core.schema import BaseNode, QueryType
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryType
+from pydantic import BaseModel, Field
 
+from metagpt.logs import logger
 from metagpt.rag.retrievers.base import RAGRetriever
+from metagpt.rag.schema import HybridRetrieverConfig
+
+FusionFunc = Callable[[list[list[NodeWithScore]], list[float]], list[NodeWithScore]]
+
+
+def dedup_fusion(results: list[list[NodeWithScore]], weights: list[float]) -> list[NodeWithScore]:
+    """Keep the first seen node of each node id, in retriever order."""
+    fused = {}
+    for nodes in results:
+        for n in nodes:
+            fused.setdefault(n.node.node_id, n)
+    return list(fused.values())
+
+
+def reciprocal_rank_fusion(
+    results: list[list[NodeWithScore]], weights: list[float], k: int = 60
+) -> list[NodeWithScore]:
+    """Score each node by the sum of weight / (k + rank) over the retrievers, ignoring the raw scores."""
+    fused: dict[str, NodeWithScore] = {}
+    scores: dict[str, float] = {}
+    for nodes, weight in zip(results, weights):
+        for rank, n in enumerate(nodes, start=1):
+            node_id = n.node.node_id
+            fused.setdefault(node_id, n)
+            scores[node_id] = scores.get(node_id, 0.0) + weight / (k + rank)
+    return _sorted_by_scores(fused, scores)
+
+
+def weighted_score_fusion(results: list[list[NodeWithScore]], weights: list[float]) -> list[NodeWithScore]:
+    """Score each node by the weighted sum of its min-max normalized scores, as retrievers use different scales."""
+    fused: dict[str, NodeWithScore] = {}
+    scores: dict[str, float] = {}
+    for nodes, weight in zip(results, weights):
+        raw = [n.score or 0.0 for n in nodes]
+        low, high = min(raw, default=0.0), max(raw, default=0.0)
+        for n, score in zip(nodes, raw):
+            node_id = n.node.node_id
+            fused.setdefault(node_id, n)
+            norm = (score - low) / (high - low) if high > low else 1.0
+            scores[node_id] = scores.get(node_id, 0.0) + weight * norm
+    return _sorted_by_scores(fused, scores)
+
+
+def _sorted_by_scores(fused: dict[str, NodeWithScore], scores: dict[str, float]) -> list[NodeWithScore]:
+    ranked = sorted(fused, key=lambda node_id: scores[node_id], reverse=True)
+    return [NodeWithScore(node=fused[node_id].node, score=scores[node_id]) for node_id in ranked]
+
+
+class RetrieverLatency(BaseModel):
+    name: str
+    latency: float = 0.0
+    num_nodes: int = 0
+    timed_out: bool = False
+
+
+class HybridRetrieveStats(BaseModel):
+    """Latency of a retrieve, the total is close to the slowest retriever as they run concurrently."""
+
+    latency: float = 0.0
+    retrievers: list[RetrieverLatency] = Field(default_factory=list)
 
 
 class SimpleHybridRetriever(RAGRetriever):
-    """A composite retriever that aggregates search results from multiple retrievers."""
+    """A composite retriever that aggregates search results from multiple retrievers.
+
+    The retrievers run concurrently, their results are merged by `config.fusion_mode` or a custom `fusion` function.
+    `aretrieve_with_stats` also returns the latency of each retriever.
+    """
 
-    def __init__(self, *retrievers):
+    def __init__(self, *retrievers, config: HybridRetrieverConfig = None, fusion: Optional[FusionFunc] = None):
         self.retrievers: list[RAGRetriever] = retrievers
+        self.config = config or HybridRetrieverConfig()
+        self.weights = self.config.get_weights(len(retrievers))
+        self.fusion = fusion or self._get_fusion(self.config)
         super().__init__()
 
     async def _aretrieve(self, query: QueryType, **kwargs):
         """Asynchronously retrieves and aggregates search results from all configured retrievers.
 
-        This method queries each retriever in the `retrievers` list with the given query and
-        additional keyword arguments. It then combines the results, ensuring that each node is
-        unique, based on the node's ID.
+        This method queries all retrievers in the `retrievers` list concurrently with the given query and
+        additional keyword arguments. A retriever exceeding `config.timeout` contributes no nodes.
+        The results are then fused into unique nodes, based on the node's ID.
         """
-        all_nodes = []
-        for retriever in self.retrievers:
-            # Prevent retriever changing query
-            query_copy = copy.deepcopy(query)
-            nodes = await retriever.aretrieve(query_copy, **kwargs)
-            all_nodes.extend(nodes)
-
-        # combine all nodes
-        result = []
-        node_ids = set()
-        for n in all_nodes:
-            if n.node.node_id not in node_ids:
-                result.append(n)
-                node_ids.add(n.node.node_id)
-        return result
+        nodes, _ = await self.aretrieve_with_stats(query, **kwargs)
+        return nodes
+
+    async def aretrieve_with_stats(self, query: QueryType, **kwargs) -> tuple[list[NodeWithScore], HybridRetrieveStats]:
+        """Same as `_aretrieve`, also return the stats of this retrieve."""
+        start = time.perf_counter()
+        outputs = await asyncio.gather(*[self._timed_retrieve(r, query, **kwargs) for r in self.retrievers])
+        results = [nodes for nodes, _ in outputs]
+        stats = HybridRetrieveStats(latency=time.perf_counter() - start, retrievers=[latency for _, latency in outputs])
+
+        result = self.fusion(results, self.weights)
+        return (result[: self.config.similarity_top_k] if self.config.similarity_top_k else result), stats
+
+    async def _timed_retrieve(
+        self, retriever: RAGRetriever, query: QueryType, **kwargs
+    ) -> tuple[list[NodeWithScore], RetrieverLatency]:
+        latency = RetrieverLatency(name=type(retriever).__name__)
+        # Prevent retriever changing query, retrievers assign attributes such as the embedding instead of mutating
+        query_copy = copy.copy(query)
+        start = time.perf_counter()
+        if getattr(type(retriever), "_aretrieve", None) is BaseRetriever._aretrieve:
+            # only sync retrieval implemented, such as bm25, run it in a thread to not block the others
+            coro = asyncio.to_thread(retriever.retrieve, query_copy, **kwargs)
+        else:
+            coro = retriever.aretrieve(query_copy, **kwargs)
+        try:
+            nodes = await asyncio.wait_for(coro, timeout=self.config.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{latency.name} timed out after {self.config.timeout}s, its results are skipped")
+            nodes, latency.timed_out = [], True
+        latency.latency = time.perf_counter() - start
+        latency.num_nodes = len(nodes)
+        return nodes, latency
+
+    @staticmethod
+    def _get_fusion(config: HybridRetrieverConfig) -> FusionFunc:
+        if config.fusion_mode == "rrf":
+            return lambda results, weights: reciprocal_rank_fusion(results, weights, k=config.rrf_k)
+        if config.fusion_mode == "weighted":
+            return weighted_score_fusion
+        return dedup_fusion
 
     def add_nodes(self, nodes: list[BaseNode]) -> None:
         """Support add nodes."""
@@ -35,6 +35,14 @@ class FAISSRetrieverConfig(IndexRetrieverConfig):
     """Config for FAISS-based retrievers."""
 
     dimensions: int = Field(default=0, description="Dimensionality of the vectors for FAISS index construction.")
+    index_factory: str = Field(
+        default="Flat",
+        description="The faiss.index_factory string, e.g. HNSW32, IVF1024,Flat, IVF1024,PQ32 or IVF256,SQ8.",
+    )
+    train_size: int = Field(
+        default=0, description="Vectors buffered before training IVF/PQ/SQ indexes, 0 means decided by the index."
+    )
+    search_params: dict = Field(default_factory=dict, description="Faiss search params, e.g. nprobe, efSearch.")
 
     _embedding_type_to_dimensions: ClassVar[dict[EmbeddingType, int]] = {
         EmbeddingType.GEMINI: 768,
@@ -94,6 +102,56 @@ class ElasticsearchKeywordRetrieverConfig(ElasticsearchRetrieverConfig):
     )
 
 
+class HybridRetrieverConfig(BaseModel):
+    """Config for SimpleHybridRetriever, used when there are multiple retrievers."""
+
+    fusion_mode: Literal["dedup", "rrf", "weighted"] = Field(
+        default="dedup",
+        description="dedup keeps the first seen node, rrf is reciprocal rank fusion, "
+        "weighted sums the min-max normalized scores.",
+    )
+    weights: Optional[list[float]] = Field(
+        default=None, description="Weight of each retriever, in the order of the retrievers, default all 1.0."
+    )
+    rrf_k: int = Field(default=60, description="The rank constant of reciprocal rank fusion.")
+    timeout: Optional[float] = Field(
+        default=None, description="Seconds to wait for each retriever, results of a timed out retriever are skipped."
+    )
+    similarity_top_k: Optional[int] = Field(default=None, description="Number of fused results, default all.")
+
+    @model_validator(mode="after")
+    def check_weights(self):
+        if self.weights is not None and (not self.weights or any(w < 0 for w in self.weights)):
+            raise ValueError(f"weights must be non-empty and non-negative, got {self.weights}.")
+
+        return self
+
+    def get_weights(self, num_retrievers: int) -> list[float]:
+        """The weight of each retriever, raise ValueError if the weights are not one per retriever."""
+        if self.weights is None:
+            return [1.0] * num_retrievers
+        if len(self.weights) != num_retrievers:
+            raise ValueError(f"Got {len(self.weights)} weights for {num_retrievers} retrievers.")
+        return list(self.weights)
+
+
+class StreamingIngestionConfig(BaseModel):
+    """Config for streaming ingestion of large document directories."""
+
+    persist_path: Union[str, Path] = Field(
+        ..., description="The directory to save the index and the checkpoint, ingesting again resumes from it."
+    )
+    num_workers: Optional[int] = Field(
+        default=None, description="Processes reading and splitting files, default cpu count, 0 means no process pool."
+    )
+    files_per_batch: int = Field(default=16, description="Files embedded and inserted into the index at a time.")
+    batches_per_checkpoint: int = Field(
+        default=8,
+        description="Batches between saves of the index and the checkpoint, the index is also saved at the end. "
+        "A save rewrites the whole index, resuming redoes the batches after the last save.",
+    )
+
+
 class BaseRankerConfig(BaseModel):
     """Common config for rankers.
 
@@ -153,6 +211,9 @@ class VectorIndexConfig(BaseIndexConfig):
 class FAISSIndexConfig(VectorIndexConfig):
     """Config for faiss-based index."""
 
+    mmap: bool = Field(default=False, description="Map the inverted lists of IVF indexes instead of reading them.")
+    search_params: dict = Field(default_factory=dict, description="Faiss search params, e.g. nprobe, efSearch.")
+
 
 class ChromaIndexConfig(VectorIndexConfig):
     """Config for chroma-based index."""
@@ -187,7 +248,9 @@ class ObjectNodeMetadata(BaseModel):
 
     is_obj: bool = Field(default=True)
     obj: Any = Field(default=None, description="When rag retrieve, will reconstruct obj from obj_json")
-    obj_json: str = Field(..., description="The json of object, e.g. obj.model_dump_json()")
+    obj_json: Optional[str] = Field(
+        default=None, description="The json of object, e.g. obj.model_dump_json(). None if kept in an ObjectStore"
+    )
     obj_cls_name: str = Field(..., description="The class name of object, e.g. obj.__class__.__name__")
     obj_mod_name: str = Field(..., description="The module name of class, e.g. obj.__class__.__module__")
 
@@ -201,9 +264,12 @@ class ObjectNode(TextNode):
         self.excluded_embed_metadata_keys = self.excluded_llm_metadata_keys
 
     @staticmethod
-    def get_obj_metadata(obj: RAGObject) -> dict:
+    def get_obj_metadata(obj: RAGObject, with_json: bool = True) -> dict:
+        """with_json=False leaves out obj_json, which is then saved in an ObjectStore by node id."""
         metadata = ObjectNodeMetadata(
-            obj_json=obj.model_dump_json(), obj_cls_name=obj.__class__.__name__, obj_mod_name=obj.__class__.__module__
+            obj_json=obj.model_dump_json() if with_json else None,
+            obj_cls_name=obj.__class__.__name__,
+            obj_mod_name=obj.__class__.__module__,
         )
 
         return metadata.model_dump()
@@ -0,0 +1,5 @@
+"""Vector stores init."""
+
+from metagpt.rag.vector_stores.faiss_store import FAISSVectorStore
+
+__all__ = ["FAISSVectorStore"]
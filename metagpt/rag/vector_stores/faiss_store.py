@@ -0,0 +1,239 @@
+"""FAISS vector store."""
+
+import os
+from typing import Any, List, Optional
+
+import faiss
+import fsspec
+import numpy as np
+from fsspec.implementations.local import LocalFileSystem
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+from llama_index.vector_stores.faiss import FaissVectorStore
+from llama_index.vector_stores.faiss.base import (
+    DEFAULT_PERSIST_DIR,
+    DEFAULT_PERSIST_FNAME,
+    DEFAULT_PERSIST_PATH,
+    DEFAULT_VECTOR_STORE,
+    NAMESPACE_SEP,
+)
+
+from metagpt.logs import logger
+
+DELTA_SUFFIX = ".delta"  # raw float32 vectors appended since the last full write of the index
+
+
+class FAISSVectorStore(FaissVectorStore):
+    """Faiss vector store supporting any `faiss.index_factory` index, such as "HNSW32", "IVF1024,PQ32" or "IVF256,SQ8".
+
+    - Indexes that need training buffer the added vectors, searched exactly, until `train_size` vectors are added.
+    - `persist` writes the faiss binary format, then only appends the new vectors to a delta file until the delta
+      grows over `compact_ratio` of the index, when the index is fully written again.
+    - `from_persist_path(mmap=True)` maps the inverted lists of IVF indexes instead of reading them into memory.
+      The vectors of the delta file are searched in a separate flat index, and the results of both are merged.
+      The index is read into memory on the first add, as mapped lists are read-only, and the delta is added to it.
+    """
+
+    compact_ratio: float = 0.2
+
+    _train_size: int = PrivateAttr()
+    _search_params: dict = PrivateAttr()
+    _pending: list = PrivateAttr()  # vectors waiting for the training
+    _unsaved: list = PrivateAttr()  # vectors added since the last persist
+    _persisted: Optional[tuple] = PrivateAttr()  # (path, vectors in the index file, vectors in the delta file)
+    _mmap_path: Optional[str] = PrivateAttr()
+    _delta: Any = PrivateAttr()  # flat index of the delta vectors, while the index is mapped
+
+    def __init__(self, faiss_index: Any, train_size: int = 0, search_params: Optional[dict] = None) -> None:
+        super().__init__(faiss_index=faiss_index)
+        self._train_size = train_size or self._default_train_size(faiss_index)
+        self._search_params = search_params or {}
+        self._pending = []
+        self._unsaved = []
+        self._persisted = None
+        self._mmap_path = None
+        self._delta = None
+        self._set_search_params()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FAISSVectorStore"
+
+    @classmethod
+    def from_factory(
+        cls, dimensions: int, index_factory: str = "Flat", train_size: int = 0, search_params: Optional[dict] = None
+    ) -> "FAISSVectorStore":
+        """Create an empty index by `faiss.index_factory`, "Flat" is the same as `faiss.IndexFlatL2`."""
+        return cls(faiss.index_factory(dimensions, index_factory), train_size=train_size, search_params=search_params)
+
+    @classmethod
+    def from_persist_dir(
+        cls, persist_dir: str = DEFAULT_PERSIST_DIR, fs: Optional[fsspec.AbstractFileSystem] = None, **kwargs
+    ) -> "FAISSVectorStore":
+        persist_path = os.path.join(persist_dir, f"{DEFAULT_VECTOR_STORE}{NAMESPACE_SEP}{DEFAULT_PERSIST_FNAME}")
+        return cls.from_persist_path(persist_path, fs=fs, **kwargs)
+
+    @classmethod
+    def from_persist_path(
+        cls,
+        persist_path: str,
+        fs: Optional[fsspec.AbstractFileSystem] = None,
+        mmap: bool = False,
+        train_size: int = 0,
+        search_params: Optional[dict] = None,
+    ) -> "FAISSVectorStore":
+        if fs and not isinstance(fs, LocalFileSystem):
+            raise NotImplementedError("FAISS only supports local storage for now.")
+        if not os.path.exists(persist_path):
+            raise ValueError(f"No existing {__name__} found at {persist_path}.")
+
+        faiss_index = faiss.read_index(persist_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0)
+        store = cls(faiss_index, train_size=train_size, search_params=search_params)
+        if mmap and cls._is_ivf(faiss_index):
+            store._mmap_path = persist_path
+
+        delta = cls._read_delta(persist_path + DELTA_SUFFIX, faiss_index.d)
+        if len(delta) and store._mmap_path and faiss_index.is_trained:
+            # adding to the mapped index would read it into memory
+            store._delta = faiss.IndexFlat(faiss_index.d, faiss_index.metric_type)
+            store._delta.add(delta)
+        elif len(delta):
+            store._add_vectors(delta)
+        store._persisted = (persist_path, faiss_index.ntotal, len(delta))
+        return store
+
+    @property
+    def ntotal(self) -> int:
+        delta_count = self._delta.ntotal if self._delta is not None else 0
+        return self._faiss_index.ntotal + delta_count + sum(len(i) for i in self._pending)
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        """Add nodes to index, in one batch. Ids are the positions of the vectors, as FaissVectorStore does."""
+        if not nodes:
+            return []
+        start = self.ntotal
+        vectors = np.array([node.get_embedding() for node in nodes], dtype="float32")
+        self._add_vectors(vectors)
+        self._unsaved.append(vectors)
+        return [str(i) for i in range(start, start + len(nodes))]
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        if self._delta is not None:
+            return self._query_with_delta(query, **kwargs)
+        if not self._pending:
+            return super().query(query, **kwargs)
+        if query.filters is not None:
+            raise ValueError("Metadata filters not implemented for Faiss yet.")
+
+        # not trained yet, exact search of the buffered vectors
+        vectors = np.concatenate(self._pending)
+        query_np = np.array(query.query_embedding, dtype="float32")
+        if self._faiss_index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            dists = vectors @ query_np
+            idxs = np.argsort(-dists)[: query.similarity_top_k]
+        else:
+            dists = ((vectors - query_np) ** 2).sum(axis=1)
+            idxs = np.argsort(dists)[: query.similarity_top_k]
+        return VectorStoreQueryResult(similarities=[float(dists[i]) for i in idxs], ids=[str(i) for i in idxs])
+
+    def _query_with_delta(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Merge the results of the mapped index and of the flat index of the delta, whose ids follow the index's."""
+        result = super().query(query, **kwargs)
+        query_np = np.array(query.query_embedding, dtype="float32")[np.newaxis, :]
+        dists, idxs = self._delta.search(query_np, query.similarity_top_k)
+        offset = self._faiss_index.ntotal
+        hits = list(zip(result.similarities, result.ids))
+        hits += [(float(dist), str(idx + offset)) for dist, idx in zip(dists[0], idxs[0]) if idx >= 0]
+        hits.sort(key=lambda hit: hit[0], reverse=self._faiss_index.metric_type == faiss.METRIC_INNER_PRODUCT)
+        hits = hits[: query.similarity_top_k]
+        return VectorStoreQueryResult(similarities=[dist for dist, _ in hits], ids=[idx for _, idx in hits])
+
+    def persist(self, persist_path: str = DEFAULT_PERSIST_PATH, fs: Optional[fsspec.AbstractFileSystem] = None) -> None:
+        """Append the new vectors to the delta file, or write the whole index if the delta grows too large."""
+        if fs and not isinstance(fs, LocalFileSystem):
+            raise NotImplementedError("FAISS only supports local storage for now.")
+
+        unsaved = np.concatenate(self._unsaved) if self._unsaved else np.empty((0, self._faiss_index.d), "float32")
+        if self._persisted and self._persisted[0] == persist_path and os.path.exists(persist_path):
+            _, index_count, delta_count = self._persisted
+            if delta_count + len(unsaved) <= self.compact_ratio * max(index_count, 1) or not len(unsaved):
+                with open(persist_path + DELTA_SUFFIX, "ab") as f:
+                    f.write(unsaved.tobytes())
+                self._persisted = (persist_path, index_count, delta_count + len(unsaved))
+                self._unsaved = []
+                return
+
+        self._write_index(persist_path)
+
+    def _write_index(self, persist_path: str):
+        self._ensure_writable()
+        os.makedirs(os.path.dirname(persist_path) or ".", exist_ok=True)
+
+        tmp_path = persist_path + ".tmp"
+        faiss.write_index(self._faiss_index, tmp_path)
+        os.replace(tmp_path, persist_path)
+
+        # an untrained index is written empty, the buffered vectors go to the delta file
+        pending = np.concatenate(self._pending) if self._pending else np.empty((0, self._faiss_index.d), "float32")
+        with open(persist_path + DELTA_SUFFIX, "wb") as f:
+            f.write(pending.tobytes())
+
+        self._persisted = (persist_path, self._faiss_index.ntotal, len(pending))
+        self._unsaved = []
+        logger.debug(f"faiss index written to {persist_path}, {self.ntotal} vectors")
+
+    def _add_vectors(self, vectors: np.ndarray):
+        self._ensure_writable()
+        if self._faiss_index.is_trained:
+            self._faiss_index.add(vectors)
+            return
+
+        self._pending.append(vectors)
+        if sum(len(i) for i in self._pending) >= self._train_size:
+            pending = np.concatenate(self._pending)
+            logger.info(f"training faiss index on {len(pending)} vectors")
+            self._faiss_index.train(pending)
+            self._faiss_index.add(pending)
+            self._pending = []
+            self._set_search_params()
+
+    def _ensure_writable(self):
+        if self._mmap_path:
+            # adding to the mapped inverted lists aborts the process
+            self._faiss_index = faiss.read_index(self._mmap_path)
+            self._mmap_path = None
+            self._set_search_params()
+        if self._delta is not None:
+            self._faiss_index.add(self._delta.reconstruct_n(0, self._delta.ntotal))
+            self._delta = None
+
+    def _set_search_params(self):
+        params = faiss.ParameterSpace()
+        for name, value in self._search_params.items():
+            params.set_index_parameter(self._faiss_index, name, value)
+
+    @staticmethod
+    def _read_delta(delta_path: str, dimensions: int) -> np.ndarray:
+        if not os.path.exists(delta_path):
+            return np.empty((0, dimensions), "float32")
+        return np.fromfile(delta_path, dtype="float32").reshape(-1, dimensions)
+
+    @classmethod
+    def _is_ivf(cls, faiss_index: Any) -> bool:
+        try:
+            faiss.extract_index_ivf(faiss_index)
+            return True
+        except RuntimeError:
+            return False
+
+    @classmethod
+    def _default_train_size(cls, faiss_index: Any) -> int:
+        if faiss_index.is_trained:
+            return 0
+        # faiss suggests at least 39 training vectors per IVF centroid, PQ codebooks need thousands
+        nlist = faiss.extract_index_ivf(faiss_index).nlist if cls._is_ivf(faiss_index) else 0
+        return max(39 * nlist, 10000)
@@ -107,6 +107,8 @@ class RoleContext(BaseModel):
         RoleReactMode.REACT
     )  # see `Role._set_react_mode` for definitions of the following two attributes
     max_react_loop: int = 1
+    observe_rounds: int = Field(default=0, exclude=True)  # number of `_observe` calls
+    observe_scanned: int = Field(default=0, exclude=True)  # total number of messages scanned by `_observe`
 
     @property
     def important_memory(self) -> list[Message]:
@@ -117,6 +119,16 @@ class RoleContext(BaseModel):
     def history(self) -> list[Message]:
         return self.memory.get()
 
+    def filter_unseen(self, news: list[Message], ignore_memory: bool = False) -> list[Message]:
+        """Return the messages of `news` not in memory yet, must be called before adding `news` to memory.
+        The memory id index acts as the role's observe cursor, so this costs O(len(news)) instead of scanning history.
+        """
+        self.observe_rounds += 1
+        self.observe_scanned += len(news)
+        if ignore_memory:
+            return list(news)
+        return [n for n in news if not self.memory.contains(n)]
+
     @classmethod
     def model_rebuild(cls, **kwargs):
         from metagpt.environment.base_env import Environment  # noqa: F401
@@ -149,6 +161,7 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
     rc: RoleContext = Field(default_factory=RoleContext)
     addresses: set[str] = set()
     planner: Planner = Field(default_factory=Planner)
+    llm_priority: int = 0  # admission priority of the role's LLM requests under rate limits, lower is served first
 
     # builtin variables
     recovered: bool = False  # to tag if a recovered role
@@ -170,6 +183,7 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         self._check_actions()
         self.llm.system_prompt = self._get_prefix()
         self.llm.cost_manager = self.context.cost_manager
+        self.llm.priority = self.llm_priority
         self._watch(kwargs.pop("watch", [UserRequirement]))
 
         if self.latest_observed_msg:
@@ -333,6 +347,7 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
             env.set_addresses(self, self.addresses)
             self.llm.system_prompt = self._get_prefix()
             self.llm.cost_manager = self.context.cost_manager
+            self.llm.priority = self.llm_priority
             self.set_actions(self.actions)  # reset actions to update llm and prefix
 
     @property
@@ -419,13 +434,11 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
             news = [self.latest_observed_msg] if self.latest_observed_msg else []
         if not news:
             news = self.rc.msg_buffer.pop_all()
+        unseen = self.rc.filter_unseen(news, ignore_memory=ignore_memory)
         # Store the read messages in your own memory to prevent duplicate processing.
-        old_messages = [] if ignore_memory else self.rc.memory.get()
         self.rc.memory.add_batch(news)
         # Filter out messages of interest.
-        self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.name in n.send_to) and n not in old_messages
-        ]
+        self.rc.news = [n for n in unseen if n.cause_by in self.rc.watch or self.name in n.send_to]
         self.latest_observed_msg = self.rc.news[-1] if self.rc.news else None  # record the latest observed msg
 
         # Design Rules:
@@ -565,6 +578,11 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         """If true, all actions have been executed."""
         return not self.rc.news and not self.rc.todo and self.rc.msg_buffer.empty()
 
+    @property
+    def is_awake(self) -> bool:
+        """If true, the role has something to observe or do, and should be scheduled by the environment."""
+        return not self.is_idle or bool(self.recovered and self.latest_observed_msg)
+
     async def think(self) -> Action:
         """
         Export SDK API, used by AgentStore RPC.
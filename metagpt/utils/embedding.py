@@ -5,15 +5,22 @@
 @Author  : alexanderwu
 @File    : embedding.py
 """
+from llama_index.core.embeddings import BaseEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
 
 from metagpt.config2 import config
 
 
-def get_embedding() -> OpenAIEmbedding:
+def get_embedding() -> BaseEmbedding:
     llm = config.get_openai_llm()
     if llm is None:
         raise ValueError("To use OpenAIEmbedding, please ensure that config.llm.api_type is correctly set to 'openai'.")
 
     embedding = OpenAIEmbedding(api_key=llm.api_key, api_base=llm.base_url)
+
+    cache_config = config.embedding.cache
+    if cache_config and cache_config.enabled:
+        from metagpt.rag.embeddings import CachedEmbedding
+
+        return CachedEmbedding.from_config(embedding, cache_config)
     return embedding
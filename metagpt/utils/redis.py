@@ -56,6 +56,14 @@ class Redis:
         except Exception as e:
             logger.exception(f"{e}, stack:{traceback.format_exc()}")
 
+    async def delete(self, key: str):
+        if not await self._connect() or not key:
+            return
+        try:
+            await self._client.delete(key)
+        except Exception as e:
+            logger.exception(f"{e}, stack:{traceback.format_exc()}")
+
     async def close(self):
         if not self._client:
             return
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : stream_output_parser.py
+@Desc    : Incremental parser of the `[CONTENT]` json output of ActionNode, validating each field as soon as it is
+           complete, so an unusable generation can be aborted before the LLM finishes it.
+"""
+import json
+from typing import Any, Callable, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from metagpt.logs import logger
+
+
+class StreamOutputAbort(Exception):
+    """The streamed output can not produce a valid instance of the output class, even after repair"""
+
+
+class StreamOutputParser:
+    """Consume the llm stream chunk by chunk.
+
+    Fields are validated against `output_class` once their value is complete. A field that is valid json but fails the
+    validation can not be fixed by `repair_llm_raw_output` either, so `StreamOutputAbort` is raised to stop the stream.
+    Values that are not valid json yet are left to the repair of the full output.
+    """
+
+    def __init__(
+        self,
+        output_class: Type[BaseModel],
+        tag: str = "CONTENT",
+        on_field: Optional[Callable[[str, Any], None]] = None,
+    ):
+        self.output_class = output_class
+        self.start_tag = f"[{tag}]"
+        self.end_tag = f"[/{tag}]"
+        self.on_field = on_field
+        self.fields: dict[str, Any] = {}  # validated fields, in arrival order
+
+        self._text = ""
+        self._pos = 0  # next char to scan
+        self._stage = "tag"  # tag -> object -> members -> done
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+        self._adapters: dict[str, TypeAdapter] = {}
+
+    @property
+    def done(self) -> bool:
+        return self._stage == "done"
+
+    def feed(self, chunk: str):
+        self._text += chunk
+        if self._stage == "tag":
+            self._seek_tag()
+        if self._stage == "object":
+            self._seek_object()
+        if self._stage == "members":
+            self._scan_members()
+
+    def _seek_tag(self):
+        idx = self._text.find(self.start_tag, max(0, self._pos - len(self.start_tag)))
+        if idx < 0:
+            self._pos = len(self._text)
+            return
+        self._pos = idx + len(self.start_tag)
+        self._stage = "object"
+
+    def _seek_object(self):
+        idx = self._text.find("{", self._pos)
+        end_idx = self._text.find(self.end_tag, self._pos)
+        if 0 <= end_idx and (idx < 0 or end_idx < idx):
+            raise StreamOutputAbort(f"No json object inside {self.start_tag}{self.end_tag}")
+        if idx < 0:
+            return
+        self._pos = self._member_start = idx + 1
+        self._depth = 1
+        self._stage = "members"
+
+    def _scan_members(self):
+        text = self._text
+        for idx in range(self._pos, len(text)):
+            char = text[idx]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end_member(idx)
+                    self._stage = "done"
+                    self._pos = idx + 1
+                    return
+            elif char == "," and self._depth == 1:
+                self._end_member(idx)
+        self._pos = len(text)
+
+    def _end_member(self, idx: int):
+        member = self._text[self._member_start : idx].strip()
+        self._member_start = idx + 1
+        if not member:
+            return
+        try:
+            data = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return  # maybe repairable, leave it to the repair of the full output
+        for key, value in data.items():
+            self._validate_field(key, value)
+
+    def _validate_field(self, key: str, value: Any):
+        field = self.output_class.model_fields.get(key)
+        if not field:
+            return
+        if key not in self._adapters:
+            self._adapters[key] = TypeAdapter(field.annotation)
+        try:
+            value = self._adapters[key].validate_python(value)
+        except ValidationError as e:
+            raise StreamOutputAbort(f"Invalid field `{key}` of {self.output_class.__name__}: {e}")
+        self.fields[key] = value
+        logger.debug(f"stream field ready: {key}")
+        if self.on_field:
+            self.on_field(key, value)
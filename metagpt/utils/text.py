@@ -1,6 +1,12 @@
+from bisect import bisect_right
+from itertools import accumulate
 from typing import Generator, Sequence
 
-from metagpt.utils.token_counter import TOKEN_MAX, count_string_tokens
+from metagpt.utils.token_counter import (
+    TOKEN_MAX,
+    count_string_tokens,
+    count_strings_tokens,
+)
 
 
 def reduce_message_length(
@@ -50,30 +56,19 @@ def generate_prompt_chunk(
     Yields:
         The chunk of text.
     """
-    paragraphs = text.splitlines(keepends=True)
-    current_token = 0
-    current_lines = []
-
     reserved = reserved + count_string_tokens(prompt_template + system_text, model_name)
     # 100 is a magic number to ensure the maximum context length is not exceeded
     max_token = TOKEN_MAX.get(model_name, 2048) - reserved - 100
 
-    while paragraphs:
-        paragraph = paragraphs.pop(0)
-        token = count_string_tokens(paragraph, model_name)
-        if current_token + token <= max_token:
-            current_lines.append(paragraph)
-            current_token += token
-        elif token > max_token:
-            paragraphs = split_paragraph(paragraph) + paragraphs
-            continue
-        else:
-            yield prompt_template.format("".join(current_lines))
-            current_lines = [paragraph]
-            current_token = token
+    paragraphs, tokens = _fit_paragraphs(text.splitlines(keepends=True), model_name, max_token)
+    # offsets[i] is the token offset of paragraph i, chunks are sliced by offsets instead of re-counting paragraphs
+    offsets = list(accumulate(tokens, initial=0))
 
-    if current_lines:
-        yield prompt_template.format("".join(current_lines))
+    start = 0
+    while start < len(paragraphs):
+        end = bisect_right(offsets, offsets[start] + max_token, lo=start + 1) - 1
+        yield prompt_template.format("".join(paragraphs[start:end]))
+        start = end
 
 
 def split_paragraph(paragraph: str, sep: str = ".,", count: int = 2) -> list[str]:
@@ -108,6 +103,22 @@ def decode_unicode_escape(text: str) -> str:
     return text.encode("utf-8").decode("unicode_escape", "ignore")
 
 
+def _fit_paragraphs(paragraphs: list[str], model_name: str, max_token: int) -> tuple[list[str], list[int]]:
+    """Tokenize the paragraphs in one batch, splitting the ones longer than `max_token` until every part fits."""
+    fitted, tokens = [], []
+    pending = list(zip(paragraphs, count_strings_tokens(paragraphs, model_name)))
+    pending.reverse()
+    while pending:
+        paragraph, token = pending.pop()
+        if token <= max_token:
+            fitted.append(paragraph)
+            tokens.append(token)
+            continue
+        parts = split_paragraph(paragraph)
+        pending.extend(reversed(list(zip(parts, count_strings_tokens(parts, model_name)))))
+    return fitted, tokens
+
+
 def _split_by_count(lst: Sequence, count: int):
     avg = len(lst) // count
     remainder = len(lst) % count
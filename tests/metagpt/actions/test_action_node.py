@@ -15,6 +15,7 @@ from metagpt.actions import Action
 from metagpt.actions.action_node import ActionNode, ReviewMode, ReviseMode
 from metagpt.environment import Environment
 from metagpt.llm import LLM
+from metagpt.logs import log_llm_stream
 from metagpt.roles import Role
 from metagpt.schema import Message
 from metagpt.team import Team
@@ -277,6 +278,31 @@ class Tasks(BaseModel):
     tasks: List[Task] = Field(default=[], description="tasks", examples=[])
 
 
+@pytest.mark.asyncio
+async def test_action_node_stream_abort(mocker):
+    outputs = [
+        '[CONTENT]\n{"key-a": ["not", "a", "str"], "key-b": "never streamed"}\n[/CONTENT]',
+        '[CONTENT]\n{"key-a": "value-a"}\n[/CONTENT]',
+    ]
+    streamed = []
+
+    async def mock_llm_aask(self, msg, system_msgs=None, images=None, timeout=3, stream=True):
+        output = outputs[len(streamed)]
+        streamed.append("")
+        for i in range(0, len(output), 4):
+            streamed[-1] += output[i : i + 4]
+            log_llm_stream(output[i : i + 4])
+        return output
+
+    mocker.patch("metagpt.provider.base_llm.BaseLLM.aask", mock_llm_aask)
+    node = ActionNode(key="key-a", expected_type=str, instruction="instruction-b", example="example-c")
+    await node.fill(context="123", llm=LLM(), schema="json")
+
+    assert node.instruct_content.model_dump() == {"key-a": "value-a"}
+    assert len(streamed) == 2
+    assert "never streamed" not in streamed[0]  # the invalid generation is aborted early and retried
+
+
 def test_action_node_from_pydantic_and_print_everything():
     node = ActionNode.from_pydantic(Task)
     print("1. Tasks")
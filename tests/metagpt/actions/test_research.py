@@ -6,6 +6,8 @@
 @File    : test_research.py
 """
 
+import asyncio
+
 import pytest
 
 from metagpt.actions import research
@@ -59,6 +61,31 @@ async def test_collect_links_with_rank_func(mocker, search_engine_mocker, contex
         assert [i["link"] for i in y] == z
 
 
+@pytest.mark.asyncio
+async def test_web_browse_and_summarize_bounded(mocker, context):
+    in_flight, peak = 0, 0
+
+    async def mock_llm_ask(self, msg, system_msgs=None, timeout=3, stream=True):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "Not relevant." if "page 0" in msg else "metagpt"
+
+    mocker.patch("metagpt.provider.base_llm.BaseLLM.aask", mock_llm_ask)
+    mocker.patch.object(research, "generate_prompt_chunk", lambda text, template, *args: [template.format(text)])
+    urls = [f"https://example.com/{i}" for i in range(20)]
+    contents = [mocker.MagicMock(inner_text=f"page {i}") for i in range(20)]
+    action = research.WebBrowseAndSummarize(context=context)
+    mocker.patch.object(type(action.web_browser_engine), "run", mocker.AsyncMock(return_value=contents))
+
+    resp = await action.run(*urls, query="What's new in metagpt")
+
+    assert resp == {url: None if i == 0 else "metagpt" for i, url in enumerate(urls)}
+    assert peak == 8  # one pool across the pages
+
+
 @pytest.mark.asyncio
 async def test_web_browse_and_summarize(mocker, context):
     async def mock_llm_ask(*args, **kwargs):
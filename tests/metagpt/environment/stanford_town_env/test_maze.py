@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the array-backed Maze
+
+import math
+import shutil
+from operator import itemgetter
+from pathlib import Path
+
+import pytest
+
+from metagpt.environment.stanford_town.env_space import EnvObsParams, EnvObsType
+from metagpt.environment.stanford_town.maze import Maze
+from metagpt.environment.stanford_town.stanford_town_ext_env import StanfordTownExtEnv
+
+maze_asset_path = (
+    Path(__file__)
+    .absolute()
+    .parent.joinpath("..", "..", "..", "..", "metagpt/ext/stanford_town/static_dirs/assets/the_ville")
+)
+
+
+@pytest.fixture
+def maze():
+    maze, _ = Maze.load(maze_asset_path)
+    return maze
+
+
+def test_maze_layers(maze):
+    assert (maze.width, maze.height) == (140, 100)
+    assert maze.tile_details((58, 9))["world"] == "the Ville"
+    assert len(maze.address_tiles) == 306
+    assert all(len(events) == 1 for events in maze.events.values())
+    assert len(maze.events) == int((maze.game_object != 0).sum())
+
+
+def test_maze_addresses_interned(maze):
+    tile = next(iter(maze.events))
+    address = next(iter(maze.events[tile]))[0]
+
+    assert address in maze.address_tiles
+    assert next(a for a in maze.address_tiles if a == address) is address
+    assert tile in maze.address_tiles[address]
+
+
+def test_maze_events_sparse(maze):
+    tile = (0, 0)
+    event = ("Isabella Rodriguez", "is", "idle", "idle")
+
+    assert maze.tile_events(tile) == set()
+    maze.add_event(event, tile)
+    assert maze.tile_events(tile) == {event}
+    assert maze.remove_events(tile, lambda e: e[0] == "Isabella Rodriguez") == [event]
+    assert tile not in maze.events
+
+
+def test_maze_cache(tmp_path, mocker):
+    cache_dir = tmp_path / "cache"
+    maze, _ = Maze.load(maze_asset_path, cache_dir)
+    assert len(list(cache_dir.glob("maze_*.npz"))) == 1
+
+    parse = mocker.patch.object(Maze, "_parse", side_effect=AssertionError("should load the cache"))
+    cached, meta_info = Maze.load(maze_asset_path, cache_dir)
+
+    parse.assert_not_called()
+    assert meta_info["maze_width"] == 140
+    assert cached.names == maze.names
+    assert dict(cached.address_tiles.items()) == dict(maze.address_tiles.items())
+    assert cached.events == maze.events
+
+
+def test_maze_cache_keyed_by_assets(tmp_path):
+    asset_path = tmp_path / "the_ville"
+    shutil.copytree(maze_asset_path / "matrix", asset_path / "matrix")
+    cache_dir = tmp_path / "cache"
+    Maze.load(asset_path, cache_dir)
+
+    collision_file = asset_path / "matrix" / "maze" / "collision_maze.csv"
+    assert collision_file.read_text().startswith("0, ")
+    collision_file.write_text("32125" + collision_file.read_text()[1:])  # block the first tile
+    maze, _ = Maze.load(asset_path, cache_dir)
+
+    assert len(list(cache_dir.glob("maze_*.npz"))) == 2
+    assert maze.collision[0, 0] == 32125
+
+
+def test_ext_env_events():
+    ext_env = StanfordTownExtEnv(maze_asset_path=maze_asset_path, maze_cache_dir=None)
+    tile = (58, 9)
+    event = ("Isabella Rodriguez", "is", "sleeping", "sleeping")
+
+    ext_env.add_event_from_tile(event, tile)
+    ext_env.turn_event_from_tile_idle(event, tile)
+
+    assert ("Isabella Rodriguez", None, None, None) in ext_env.access_tile(tile)["events"]
+    assert ext_env.tiles[tile[1]][tile[0]]["events"] == ext_env.access_tile(tile)["events"]
+    assert ext_env.collision_maze[0][0] == "0"
+    assert ext_env.path_finder.walkable[0, 0]
+
+
+def former_observe(ext_env: StanfordTownExtEnv, tile, vision_r):
+    """The per-tile observation of the former `STRole.observe`"""
+    nearby_tiles = ext_env.get_nearby_tiles(tile, vision_r)
+    spaces = []
+    for nearby_tile in nearby_tiles:
+        details = ext_env.access_tile(nearby_tile)
+        space = {key: details[key] for key in ("world", "sector", "arena", "game_object")}
+        if space not in spaces:
+            spaces.append(space)
+    arena_path = ext_env.get_tile_path(tile, "arena")
+    events, seen = [], set()
+    for nearby_tile in nearby_tiles:
+        details = ext_env.access_tile(nearby_tile)
+        if details["events"] and ext_env.get_tile_path(nearby_tile, "arena") == arena_path:
+            dist = math.dist(nearby_tile, tile)
+            for event in details["events"]:
+                if event not in seen:
+                    events.append((dist, event))
+                    seen.add(event)
+    return {"spaces": spaces, "arena_path": arena_path, "events": sorted(events, key=itemgetter(0))}
+
+
+def test_observe_region():
+    ext_env = StanfordTownExtEnv(maze_asset_path=maze_asset_path, maze_cache_dir=None)
+    ext_env.add_event_from_tile(("Isabella Rodriguez", "is", "sleeping", "sleeping"), (72, 14))
+    ext_env.add_event_from_tile(("Isabella Rodriguez", "is", "sleeping", "sleeping"), (73, 14))
+    ext_env.remove_subject_events_from_tile("the Ville:Isabella Rodriguez's apartment:main room:desk", (73, 16))
+
+    for tile in [(72, 14), (0, 0), (139, 99), (58, 9), (30, 65), (126, 46)]:
+        for vision_r in [0, 4, 8]:
+            assert ext_env.observe_region(tile, vision_r) == former_observe(ext_env, tile, vision_r)
+
+    region = ext_env.observe(EnvObsParams(obs_type=EnvObsType.REGION, coord=(72, 14), vision_radius=4))
+    assert (0.0, ("Isabella Rodriguez", "is", "sleeping", "sleeping")) in region["events"][:2]
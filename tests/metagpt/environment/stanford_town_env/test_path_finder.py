@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of PathFinder
+
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from metagpt.environment.stanford_town.env_space import EnvObsParams, EnvObsType
+from metagpt.environment.stanford_town.path_finder import PathFinder
+from metagpt.environment.stanford_town.stanford_town_ext_env import StanfordTownExtEnv
+
+maze_asset_path = (
+    Path(__file__)
+    .absolute()
+    .parent.joinpath("..", "..", "..", "..", "metagpt/ext/stanford_town/static_dirs/assets/the_ville")
+)
+
+MAZE = [
+    "00000",
+    "01110",
+    "00010",
+    "11010",
+    "00000",
+]
+
+
+def bfs_distance(walkable: np.ndarray, start, target) -> int:
+    """Plain BFS over the tiles, the reference of the path lengths"""
+    seen = {start}
+    queue = deque([(start, 0)])
+    while queue:
+        (x, y), distance = queue.popleft()
+        if (x, y) == target:
+            return distance
+        for nx, ny in ((x, y - 1), (x - 1, y), (x, y + 1), (x + 1, y)):
+            inside = 0 <= ny < walkable.shape[0] and 0 <= nx < walkable.shape[1]
+            if inside and walkable[ny, nx] and (nx, ny) not in seen:
+                seen.add((nx, ny))
+                queue.append(((nx, ny), distance + 1))
+    return -1
+
+
+def assert_valid_path(path_finder: PathFinder, path: list):
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        assert abs(x0 - x1) + abs(y0 - y1) == 1
+        assert path_finder.walkable[y1, x1]
+
+
+@pytest.fixture
+def path_finder():
+    return PathFinder.from_collision_maze([list(row) for row in MAZE], "1")
+
+
+def test_find_path(path_finder):
+    path = path_finder.find_path((0, 0), [(2, 2)])
+
+    assert path[0] == (0, 0)
+    assert path[-1] == (2, 2)
+    assert len(path) == 5
+    assert_valid_path(path_finder, path)
+
+
+def test_find_path_nearest_target(path_finder):
+    path = path_finder.find_path((0, 4), [(4, 0), (2, 4)])
+
+    assert path[-1] == (2, 4)
+    assert len(path) == 3
+
+
+def test_find_path_unreachable(path_finder):
+    assert path_finder.find_path((0, 0), [(2, 1)]) == [(0, 0)]  # the target is blocked
+    assert path_finder.find_path((0, 0), [(9, 9)]) == [(0, 0)]
+    assert path_finder.find_path((0, 0), [(0, 0)]) == [(0, 0)]
+
+
+def test_find_path_from_blocked_tile(path_finder):
+    path = path_finder.find_path((1, 1), [(0, 0)])
+
+    assert path == [(1, 1), (1, 0), (0, 0)]
+
+
+def test_distance_field_cached(path_finder):
+    field = path_finder.distance_field([(0, 0), (4, 4)])
+
+    assert path_finder.distance_field([(4, 4), (0, 0)]) is field
+    assert field[0] == 0
+    path_finder.clear_cache()
+    assert path_finder.distance_field([(0, 0), (4, 4)]) is not field
+
+
+def test_random_mazes():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        walkable = rng.random((12, 15)) > 0.3
+        path_finder = PathFinder(walkable)
+        tiles = [(int(x), int(y)) for y, x in np.argwhere(walkable)]
+        start, target = tiles[0], tiles[-1]
+
+        path = path_finder.find_path(start, [target])
+
+        distance = bfs_distance(walkable, start, target)
+        if distance < 0:
+            assert path == [start]
+        else:
+            assert len(path) == distance + 1
+            assert path[-1] == target
+            assert_valid_path(path_finder, path)
+
+
+def test_ext_env_find_path():
+    ext_env = StanfordTownExtEnv(maze_asset_path=maze_asset_path, maze_cache_dir=None)
+    address = "the Ville:Hobbs Cafe:cafe"
+    start = (16, 18)  # <spawn_loc>sp-A
+
+    path = ext_env.find_path_to_address(start, address)
+
+    assert path[0] == start
+    assert len(path) == 81
+    assert path[-1] in ext_env.address_tiles[address]
+    assert_valid_path(ext_env.path_finder, path)
+    obs = ext_env.observe(EnvObsParams(obs_type=EnvObsType.PATH, coord=start, targets=[path[-1]]))
+    assert len(obs) == len(path)
+    assert ext_env.observe(EnvObsParams(obs_type=EnvObsType.ADDRESS_PATH, coord=start, address=address)) == path
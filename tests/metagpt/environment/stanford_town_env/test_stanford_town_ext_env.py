@@ -20,7 +20,7 @@ maze_asset_path = (
 
 
 def test_stanford_town_ext_env():
-    ext_env = StanfordTownExtEnv(maze_asset_path=maze_asset_path)
+    ext_env = StanfordTownExtEnv(maze_asset_path=maze_asset_path, maze_cache_dir=None)
 
     tile_coord = ext_env.turn_coordinate_to_tile((64, 64))
     assert tile_coord == (2, 2)
@@ -46,7 +46,7 @@ def test_stanford_town_ext_env():
 
 
 def test_stanford_town_ext_env_observe_step():
-    ext_env = StanfordTownExtEnv(maze_asset_path=maze_asset_path)
+    ext_env = StanfordTownExtEnv(maze_asset_path=maze_asset_path, maze_cache_dir=None)
     obs, info = ext_env.reset()
     assert len(info) == 0
     assert len(obs["address_tiles"]) == 306
@@ -25,7 +25,7 @@ async def test_gen_action_details():
         curr_time="February 13, 2023, 00:00:00",
         sim_code="base_the_ville_isabella_maria_klaus",
     )
-    role.set_env(StanfordTownEnv(maze_asset_path=MAZE_ASSET_PATH))
+    role.set_env(StanfordTownEnv(maze_asset_path=MAZE_ASSET_PATH, maze_cache_dir=None))
     await role.init_curr_tile()
 
     act_desp = "sleeping"
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of actions/st_action
+
+from metagpt.ext.stanford_town.actions.wake_up import WakeUp
+from metagpt.provider.llm_provider_registry import create_llm_instance
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+
+
+def test_llm_with_max_tokens():
+    action = WakeUp(llm=create_llm_instance(mock_llm_config))
+    action.llm.priority = 3
+    action.llm.system_prompt = "You are Isabella."
+
+    llm = action._llm_with_max_tokens(5)
+    assert llm.config.max_token == 5
+    assert action.llm.config.max_token == mock_llm_config.max_token
+    assert (llm.priority, llm.system_prompt, llm.use_system_prompt) == (3, "You are Isabella.", False)
+    assert llm.cost_manager is action.llm.cost_manager
+
+    action.llm.priority = 1
+    assert action._llm_with_max_tokens(5) is llm  # built once per action and max_tokens
+    assert llm.priority == 1
+    assert action._llm_with_max_tokens(50) is not llm
+
+    action.llm = create_llm_instance(mock_llm_config)
+    assert action._llm_with_max_tokens(5) is not llm
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the binary columnar persistence of AgentMemory
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from metagpt.ext.stanford_town.memory import memory_store
+from metagpt.ext.stanford_town.memory.agent_memory import AgentMemory
+from metagpt.ext.stanford_town.memory.memory_store import MemoryStore
+from metagpt.utils.common import write_json_file
+
+DIMS = 8
+START_TIME = datetime(2023, 2, 13, 8)
+
+
+def add_nodes(memory: AgentMemory, start: int, stop: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    for i in range(start, stop):
+        created = START_TIME + timedelta(minutes=i)
+        expiration = created + timedelta(days=30) if i % 5 == 0 else None
+        embedding_pair = (f"Isabella is doing {i % 40}", rng.standard_normal(DIMS).tolist())
+        keywords = {"Isabella", f"Kw{i % 3}"}
+        args = (created, expiration, "Isabella", "is", f"doing {i}", f"Isabella is doing {i}", keywords)
+        if i % 4 == 3:
+            memory.add_chat(*args, int(rng.integers(1, 10)), embedding_pair, [["Isabella", "hi"]], cause_by="chat")
+        elif i % 4 == 2:
+            filling = [f"node_{i - 1}"] if i > 2 else None
+            memory.add_thought(*args, int(rng.integers(1, 10)), embedding_pair, filling)
+        else:
+            memory.add_event(*args, int(rng.integers(1, 10)), embedding_pair, [])
+
+
+def dump_nodes(memory_list) -> list[dict]:
+    return [node.model_dump(exclude={"id"}) for node in memory_list]
+
+
+def assert_same_memory(loaded: AgentMemory, memory: AgentMemory):
+    for field in ("storage", "event_list", "thought_list", "chat_list"):
+        assert dump_nodes(getattr(loaded, field)) == dump_nodes(getattr(memory, field))
+    for field in ("event_keywords", "thought_keywords", "chat_keywords"):
+        assert {kw: [node.memory_id for node in nodes] for kw, nodes in getattr(loaded, field).items()} == {
+            kw: [node.memory_id for node in nodes] for kw, nodes in getattr(memory, field).items()
+        }
+    assert loaded.kw_strength_event == memory.kw_strength_event
+    assert loaded.kw_strength_thought == memory.kw_strength_thought
+    assert list(loaded.embeddings) == list(memory.embeddings)
+    assert np.array_equal(loaded.memory_index.embeddings, memory.memory_index.embeddings)
+    assert np.array_equal(loaded.memory_index.retrievable_rows(), memory.memory_index.retrievable_rows())
+
+
+def test_save_load(tmp_path):
+    memory = AgentMemory()
+    add_nodes(memory, 0, 60)
+    memory.save(tmp_path)
+
+    loaded = AgentMemory()
+    loaded.set_mem_path(tmp_path)
+    assert_same_memory(loaded, memory)
+    assert isinstance(loaded.memory_index.embeddings, np.memmap)  # mapped, not read into lists
+    assert loaded.embeddings["Isabella is doing 3"] == memory.embeddings["Isabella is doing 3"]
+    assert loaded.get_summarized_latest_events(5) == memory.get_summarized_latest_events(5)
+
+
+def test_save_incremental(tmp_path, mocker):
+    memory = AgentMemory()
+    add_nodes(memory, 0, 40)
+    memory.save(tmp_path)
+    saved_nodes = (tmp_path / "nodes.npy").read_bytes()
+
+    add_nodes(memory, 40, 50, seed=1)
+    memory._set_embedding("Isabella is doing 0", [1.0] * DIMS)  # updated in place
+    append_npy = mocker.spy(memory_store, "_append_npy")
+    memory.save(tmp_path)
+
+    assert [(call.args[0].name, call.args[1], len(call.args[2])) for call in append_npy.call_args_list] == [
+        ("nodes.npy", 40, 10)
+    ]  # no new embedding key, only the 10 new nodes appended
+    assert len((tmp_path / "node_texts.jsonl").read_text().splitlines()) == 50
+    offset = np.load(tmp_path / "nodes.npy", mmap_mode="r").offset
+    assert (tmp_path / "nodes.npy").read_bytes()[offset:].startswith(saved_nodes[offset:])  # appended in place
+    assert MemoryStore.open(tmp_path).num_nodes == 50
+
+    loaded = AgentMemory()
+    loaded.set_mem_path(tmp_path)
+    assert_same_memory(loaded, memory)
+    assert loaded.embeddings["Isabella is doing 0"] == [1.0] * DIMS
+
+    # the loaded memory keeps saving incrementally into its folder
+    add_nodes(loaded, 50, 55, seed=2)
+    loaded.save(tmp_path)
+    assert MemoryStore.open(tmp_path).num_nodes == 55
+
+
+def test_interrupted_save_ignored(tmp_path):
+    memory = AgentMemory()
+    add_nodes(memory, 0, 20)
+    memory.save(tmp_path)
+    with open(tmp_path / "node_texts.jsonl", "ab") as f:
+        f.write(b'["a partial')  # the tail of a save interrupted before the manifest
+    with open(tmp_path / "nodes.npy", "ab") as f:
+        f.write(b"\0" * 7)
+
+    loaded = AgentMemory()
+    loaded.set_mem_path(tmp_path)
+    assert_same_memory(loaded, memory)
+
+    add_nodes(loaded, 20, 25, seed=1)
+    loaded.save(tmp_path)
+    reloaded = AgentMemory()
+    reloaded.set_mem_path(tmp_path)
+    assert_same_memory(reloaded, loaded)
+
+
+def test_load_json_save_binary(tmp_path):
+    rng = np.random.default_rng(0)
+    nodes, embeddings = {}, {}
+    for count in range(1, 13):
+        created = START_TIME + timedelta(minutes=count)
+        nodes[f"node_{count}"] = {
+            "node_count": count,
+            "type_count": count,
+            "type": ["event", "thought", "chat"][count % 3],
+            "depth": 0,
+            "created": created.strftime("%Y-%m-%d %H:%M:%S"),
+            "expiration": None,
+            "subject": "Isabella",
+            "predicate": "is",
+            "object": f"doing {count}",
+            "description": f"Isabella is doing {count}",
+            "embedding_key": f"Isabella is doing {count}",
+            "poignancy": count % 10,
+            "keywords": ["Isabella", f"Kw{count % 3}"],
+            "filling": [],
+        }
+        embeddings[f"Isabella is doing {count}"] = rng.standard_normal(DIMS).tolist()
+    write_json_file(tmp_path / "nodes.json", nodes)  # the GA format
+    write_json_file(tmp_path / "embeddings.json", embeddings)
+    write_json_file(tmp_path / "kw_strength.json", {"kw_strength_event": {"isabella": 3}, "kw_strength_thought": {}})
+    assert not MemoryStore.exists(tmp_path)
+
+    from_json = AgentMemory()
+    from_json.set_mem_path(tmp_path)
+    assert len(from_json.storage) == 12
+    from_json.save(tmp_path)
+    assert MemoryStore.exists(tmp_path)
+
+    loaded = AgentMemory()
+    loaded.set_mem_path(tmp_path)
+    assert_same_memory(loaded, from_json)
+    assert loaded.kw_strength_event == {"isabella": 3}
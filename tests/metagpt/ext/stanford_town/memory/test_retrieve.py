@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of the vectorized retrieve
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from metagpt.ext.stanford_town.memory.agent_memory import AgentMemory
+from metagpt.ext.stanford_town.memory.memory_index import to_seconds
+from metagpt.ext.stanford_town.memory.retrieve import (
+    agent_retrieve,
+    new_agent_retrieve,
+    top_highest_x_indices,
+)
+
+DIMS = 8
+START_TIME = datetime(2023, 2, 13, 8)
+
+
+def build_memory(num_nodes: int, seed: int = 0) -> AgentMemory:
+    rng = np.random.default_rng(seed)
+    memory = AgentMemory()
+    for i in range(num_nodes):
+        created = START_TIME + timedelta(hours=int(rng.integers(0, 24 * 30)))
+        embedding = rng.standard_normal(DIMS).tolist()
+        add = memory.add_thought if i % 3 == 2 else memory.add_event
+        o = "idle" if i % 7 == 6 else f"event {i}"
+        add(
+            created, None, "Isabella", "is", o, f"Isabella is {o}", {"event"},
+            int(rng.integers(1, 10)), (f"Isabella is {o} {i}", embedding), [],
+        )  # fmt: skip
+    return memory
+
+
+def retrievable_nodes(memory: AgentMemory):
+    return [i for i in memory.event_list + memory.thought_list if "idle" not in i.embedding_key]
+
+
+def reference_retrieve(memory, curr_time, memory_forget, query_embedding, nodes, topk):
+    """The scalar scoring the vectorized one replaces"""
+
+    def normalize(values):
+        min_val, max_val = min(values), max(values)
+        if max_val == min_val:
+            return [0.5] * len(values)
+        return [(v - min_val) / (max_val - min_val) for v in values]
+
+    nodes = sorted(nodes, key=lambda node: node.last_accessed, reverse=True)
+    importance = normalize([node.poignancy for node in nodes])
+    recency = normalize([memory_forget ** (curr_time - node.created).days for node in nodes])
+    relevance = []
+    for node in nodes:
+        embedding = np.array(memory.embeddings[node.embedding_key])
+        relevance.append(embedding @ query_embedding / (np.linalg.norm(embedding) * np.linalg.norm(query_embedding)))
+    relevance = normalize(relevance)
+    scores = {node.memory_id: importance[i] + recency[i] + relevance[i] for i, node in enumerate(nodes)}
+    return [k for k, _ in sorted(scores.items(), key=lambda item: item[1], reverse=True)[:topk]]
+
+
+class TestRetrieve:
+    def test_agent_retrieve_matches_reference(self, mocker):
+        memory = build_memory(200)
+        query_embedding = np.random.default_rng(1).standard_normal(DIMS)
+        mocker.patch("metagpt.ext.stanford_town.memory.retrieve.get_embedding", return_value=query_embedding.tolist())
+        memory.touch(memory.event_list[:20], START_TIME + timedelta(days=40))
+        curr_time = START_TIME + timedelta(days=45)
+
+        results = agent_retrieve(memory, curr_time, 0.99, "query", memory.event_list, 10)
+
+        assert results == reference_retrieve(memory, curr_time, 0.99, query_embedding, memory.event_list, 10)
+
+    def test_agent_retrieve_empty(self):
+        assert agent_retrieve(AgentMemory(), START_TIME, 0.99, "query", [], 4) == []
+
+    def test_new_agent_retrieve(self, mocker):
+        memory = build_memory(50)
+        query_embedding = np.random.default_rng(2).standard_normal(DIMS)
+        mocker.patch("metagpt.ext.stanford_town.memory.retrieve.get_embedding", return_value=query_embedding.tolist())
+        role = mocker.MagicMock()
+        role.memory = memory
+        role.scratch.curr_time = curr_time = START_TIME + timedelta(days=60)
+        role.scratch.recency_decay = 0.99
+        expected = reference_retrieve(memory, curr_time, 0.99, query_embedding, retrievable_nodes(memory), 5)
+
+        retrieved = new_agent_retrieve(role, ["focal point"], 5)
+
+        nodes = retrieved["focal point"]
+        assert [n.memory_id for n in nodes] == expected
+        assert all(n.last_accessed == curr_time for n in nodes)
+        rows = memory.memory_index.rows_of(n.memory_id for n in nodes)
+        assert (memory.memory_index.last_accessed[rows] == to_seconds(curr_time)).all()
+
+    def test_retrievable_rows(self):
+        memory = build_memory(30)
+
+        rows = memory.memory_index.retrievable_rows()
+
+        assert [memory.memory_index.node_list[row] for row in rows] == retrievable_nodes(memory)
+
+    def test_top_highest_x_indices(self):
+        scores = np.array([0.1, 0.9, 0.5, 0.9, 0.5, 0.2])
+
+        assert top_highest_x_indices(scores, 3).tolist() == [1, 3, 2]
+        assert top_highest_x_indices(scores, 10).tolist() == [1, 3, 2, 4, 5, 0]
+        assert top_highest_x_indices(scores, 0).tolist() == []
+
+    def test_add_dedup(self):
+        memory = build_memory(3)
+
+        memory.add(memory.storage[0])
+
+        assert len(memory.storage) == 3
+        assert memory.get_node("node_2") is memory.storage[1]
+        assert memory.memory_index.embeddings.shape == (3, DIMS)
+
+
+@pytest.mark.parametrize("num_nodes", [1, 5])
+def test_memory_index_rebuilt(num_nodes):
+    memory = build_memory(num_nodes)
+
+    copied = AgentMemory(storage=memory.storage, embeddings=memory.embeddings)
+
+    assert copied.memory_index.num_nodes == num_nodes
+    assert np.array_equal(copied.memory_index.embeddings, memory.memory_index.embeddings)
+
+
+def test_summarized_latest_events_cached():
+    memory = build_memory(30)
+    latest_events = memory.get_summarized_latest_events(5)
+    assert latest_events is memory.get_summarized_latest_events(5)
+    assert latest_events == set(node.summary() for node in memory.event_list[:5])
+
+    memory.add_event(
+        START_TIME, None, "Klaus", "is", "reading", "Klaus is reading", {"Klaus"},
+        3, ("Klaus is reading", [0.0] * DIMS), [],
+    )  # fmt: skip
+    assert ("Klaus", "is", "reading") in memory.get_summarized_latest_events(5)
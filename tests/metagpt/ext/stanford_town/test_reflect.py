@@ -24,7 +24,7 @@ async def test_reflect():
         start_time="February 13, 2023",
         curr_time="February 13, 2023, 00:00:00",
     )
-    role.set_env(StanfordTownEnv(maze_asset_path=MAZE_ASSET_PATH))
+    role.set_env(StanfordTownEnv(maze_asset_path=MAZE_ASSET_PATH, maze_cache_dir=None))
     role.init_curr_tile()
 
     run_focus = AgentFocusPt()
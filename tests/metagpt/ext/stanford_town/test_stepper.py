@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of SimStepper
+
+import asyncio
+import random
+import shutil
+
+import pytest
+
+from metagpt.environment import StanfordTownEnv
+from metagpt.ext.stanford_town.roles.st_role import STRole
+from metagpt.ext.stanford_town.stepper import SimStepper, StepFeed
+from metagpt.ext.stanford_town.utils import mg_ga_transform
+from metagpt.ext.stanford_town.utils.const import MAZE_ASSET_PATH, STORAGE_PATH
+from metagpt.utils.common import read_json_file
+
+SIM_CODE = "base_the_ville_isabella_maria_klaus"
+ROLE_NAMES = ["Isabella Rodriguez", "Maria Lopez", "Klaus Mueller"]
+
+
+@pytest.fixture
+def storage_path(tmp_path, mocker):
+    shutil.copytree(STORAGE_PATH / SIM_CODE / "environment", tmp_path / SIM_CODE / "environment")
+    mocker.patch.object(mg_ga_transform, "STORAGE_PATH", tmp_path)
+    return tmp_path / SIM_CODE
+
+
+async def init_roles() -> tuple[StanfordTownEnv, list[STRole]]:
+    env = StanfordTownEnv(maze_asset_path=MAZE_ASSET_PATH, maze_cache_dir=None)
+    roles = [
+        STRole(
+            name=name,
+            profile=name,
+            sim_code=SIM_CODE,
+            start_time="February 13, 2023",
+            curr_time="February 13, 2023, 00:00:00",
+        )
+        for name in ROLE_NAMES
+    ]
+    env.add_roles(roles)
+    for role in roles:
+        await role.init_curr_tile()
+    return env, roles
+
+
+async def run_steps(mocker, n_steps: int, seed: int, max_concurrency: int):
+    env, roles = await init_roles()
+    rnd = random.Random(seed)
+    thinking, max_thinking = set(), [0]
+
+    async def think(role: STRole) -> dict:
+        thinking.add(role.name)
+        max_thinking[0] = max(max_thinking[0], len(thinking))
+        await asyncio.sleep(rnd.random() / 100)  # finish in a random order
+        thinking.discard(role.name)
+        x, y = role.scratch.curr_tile
+        return {"movement": (x, y + 1), "pronunciatio": "", "description": "", "chat": None}
+
+    mocker.patch.object(STRole, "think", new=think)
+    stepper = SimStepper(env, roles, max_concurrency=max_concurrency)
+    report = await stepper.run(n_steps)
+    return env, roles, report, max_thinking[0]
+
+
+@pytest.mark.asyncio
+async def test_sim_stepper(storage_path, mocker):
+    env, roles, report, max_thinking = await run_steps(mocker, n_steps=3, seed=0, max_concurrency=2)
+
+    assert report.steps == 3 and report.personas == 3 and report.steps_per_sec > 0
+    assert max_thinking == 2
+    assert all(role.step == 3 for role in roles)
+    assert roles[0].curr_time.strftime("%H:%M:%S") == "00:00:30"
+
+    movement = read_json_file(storage_path / "movement" / "0.json")
+    assert sorted(movement["persona"]) == sorted(ROLE_NAMES)
+    environment = read_json_file(storage_path / "environment" / "3.json")
+    assert environment["Isabella Rodriguez"] == {"maze": "the_ville", "x": 72, "y": 17}  # a tile down per step
+
+    # the persona events moved with the roles, at their tiles of the last merged step
+    for role in roles:
+        tile = role.scratch.curr_tile
+        assert any(event[0] == role.name for event in env.access_tile(tile)["events"])
+
+
+@pytest.mark.asyncio
+async def test_sim_stepper_deterministic(storage_path, mocker):
+    env_a, _, _, _ = await run_steps(mocker, n_steps=2, seed=1, max_concurrency=3)
+    shutil.rmtree(storage_path / "movement")
+    for step_file in (storage_path / "environment").glob("*.json"):
+        if step_file.name != "0.json":
+            step_file.unlink()
+    env_b, _, _, _ = await run_steps(mocker, n_steps=2, seed=2, max_concurrency=3)
+
+    assert env_a.maze.events == env_b.maze.events
+
+
+@pytest.mark.asyncio
+async def test_step_feed_wait(storage_path):
+    feed = StepFeed(SIM_CODE)
+    assert set(await feed.wait(0, ROLE_NAMES)) == set(ROLE_NAMES)
+
+    waiter = asyncio.create_task(feed.wait(1, ROLE_NAMES))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    feed.publish(1, {name: [i, i] for i, name in enumerate(ROLE_NAMES)})
+    assert (await asyncio.wait_for(waiter, timeout=1))["Klaus Mueller"] == {"maze": "the_ville", "x": 2, "y": 2}
+
+    with pytest.raises(TimeoutError):
+        await feed.wait(5, ROLE_NAMES, timeout=0.01)
@@ -55,3 +55,28 @@ def test_memory():
     memory.clear()
     assert memory.count() == 0
     assert len(memory.index) == 0
+
+
+def test_memory_index():
+    memory = Memory()
+
+    message1 = Message(content="test message1", role="user1", sent_from="Alice")
+    message2 = Message(content="test message2", role="user2", sent_from="Bob")
+    memory.add_batch([message1, message2, message1])
+    assert memory.count() == 2
+    assert memory.contains(message1)
+    assert memory.get_by_sent_from("Alice") == [message1]
+
+    messages = memory.find_news([message1, Message(content="test message3")])
+    assert len(messages) == 1
+    messages = memory.find_news([message1], k=1)
+    assert len(messages) == 1
+
+    memory.delete(message1)
+    assert not memory.contains(message1)
+    assert memory.get_by_role("user1") == []
+    assert memory.get_by_sent_from("Alice") == []
+
+    new_memory = Memory(**memory.model_dump())
+    assert new_memory.contains(message2)
+    assert new_memory.get_by_role("user2")[0].content == message2.content
@@ -5,6 +5,7 @@
 """
 
 import shutil
+import threading
 from pathlib import Path
 from typing import List
 
@@ -13,8 +14,11 @@ import pytest
 from metagpt.actions import UserRequirement, WritePRD
 from metagpt.actions.action_node import ActionNode
 from metagpt.const import DATA_PATH
-from metagpt.memory.memory_storage import MemoryStorage
+from metagpt.memory.memory_storage import MEMORY_SNAPSHOT_META, MemoryStorage
+from metagpt.memory.memory_wal import MEMORY_WAL_FILE
+from metagpt.rag.engines.simple import SimpleEngine
 from metagpt.schema import Message
+from metagpt.utils.common import write_json_file
 from tests.metagpt.memory.mock_text_embed import (
     mock_openai_aembed_document,
     mock_openai_embed_document,
@@ -99,3 +103,136 @@ async def test_actionout_message(mocker):
 
     memory_storage.clean()
     assert memory_storage.is_initialized is False
+
+
+@pytest.mark.asyncio
+async def test_persist_and_recover(mocker):
+    mocker.patch("llama_index.embeddings.openai.base.OpenAIEmbedding._get_text_embeddings", mock_openai_embed_documents)
+    mocker.patch("llama_index.embeddings.openai.base.OpenAIEmbedding._get_text_embedding", mock_openai_embed_document)
+    mocker.patch(
+        "llama_index.embeddings.openai.base.OpenAIEmbedding._aget_query_embedding", mock_openai_aembed_document
+    )
+
+    role_id = "UTUser3(Product Manager)"
+    shutil.rmtree(Path(DATA_PATH / f"role_mem/{role_id}/"), ignore_errors=True)
+    messages = [Message(role="User", content=text_embed_arr[i].get("text"), cause_by=UserRequirement) for i in (0, 2)]
+
+    mocker.patch.object(MemoryStorage, "min_compact_records", 2)
+    memory_storage = MemoryStorage()
+    memory_storage.recover_memory(role_id)
+    memory_storage.add(messages[0])
+    memory_storage.persist()
+    assert memory_storage.wal.num_records == 1
+    assert not memory_storage.cache_dir.joinpath("default__vector_store.json").exists()
+
+    # replayed from the log
+    recovered = MemoryStorage()
+    recovered.recover_memory(role_id)
+    sim_message = Message(role="User", content=text_embed_arr[1].get("text"), cause_by=UserRequirement)
+    assert [m.content for m in await recovered.search_similar(sim_message)] == [messages[0].content]
+
+    # compacted to a snapshot
+    recovered.add_batch(messages[1:])
+    recovered.persist()
+    recovered.wait_compaction()
+    assert recovered.wal.num_records == 0
+    assert recovered.cache_dir.joinpath("default__vector_store.json").exists()
+
+    from_snapshot = MemoryStorage()
+    from_snapshot.recover_memory(role_id)
+    assert len(from_snapshot.faiss_engine.retriever._index.docstore.docs) == 2
+    assert len(await from_snapshot.search_similar(sim_message)) == 1
+
+    from_snapshot.clean()
+
+
+def _mock_embeddings(mocker):
+    mocker.patch("llama_index.embeddings.openai.base.OpenAIEmbedding._get_text_embeddings", mock_openai_embed_documents)
+    mocker.patch("llama_index.embeddings.openai.base.OpenAIEmbedding._get_text_embedding", mock_openai_embed_document)
+    mocker.patch(
+        "llama_index.embeddings.openai.base.OpenAIEmbedding._aget_query_embedding", mock_openai_aembed_document
+    )
+
+
+def _new_storage(mocker, role_id: str, clean: bool = False) -> MemoryStorage:
+    if clean:
+        shutil.rmtree(Path(DATA_PATH / f"role_mem/{role_id}/"), ignore_errors=True)
+    mocker.patch.object(MemoryStorage, "min_compact_records", 2)
+    memory_storage = MemoryStorage()
+    memory_storage.recover_memory(role_id)
+    return memory_storage
+
+
+def _num_docs(memory_storage: MemoryStorage) -> int:
+    return len(memory_storage.faiss_engine.retriever._index.docstore.docs)
+
+
+@pytest.mark.asyncio
+async def test_compaction_does_not_block(mocker):
+    _mock_embeddings(mocker)
+    role_id = "UTUser4(Product Manager)"
+    memory_storage = _new_storage(mocker, role_id, clean=True)
+
+    # the snapshot write waits until the engine in use is changed and persisted
+    writing, resume = threading.Event(), threading.Event()
+    persist = SimpleEngine.persist
+
+    def blocked_persist(engine, *args, **kwargs):
+        writing.set()
+        resume.wait(10)
+        persist(engine, *args, **kwargs)
+
+    mocker.patch.object(SimpleEngine, "persist", blocked_persist)
+    for i in (0, 2):
+        memory_storage.add(Message(role="User", content=text_embed_arr[i]["text"], cause_by=UserRequirement))
+    memory_storage.persist()
+    assert writing.wait(10)
+
+    memory_storage.add(Message(role="User", content=text_embed_arr[3]["text"], cause_by=UserRequirement))
+    memory_storage.persist()
+    assert memory_storage.wal.num_records == 1  # not blocked by the compaction
+    assert _num_docs(memory_storage) == 3
+    resume.set()
+    memory_storage.wait_compaction()
+
+    recovered = _new_storage(mocker, role_id)
+    assert _num_docs(recovered) == 3
+    recovered.clean()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("crash_after", ["rotate", "snapshot", "meta"])
+async def test_recover_interrupted_compaction(mocker, crash_after):
+    _mock_embeddings(mocker)
+    role_id = "UTUser5(Product Manager)"
+    memory_storage = _new_storage(mocker, role_id, clean=True)
+    messages = [Message(role="User", content=text_embed_arr[i]["text"], cause_by=UserRequirement) for i in (0, 2)]
+    for message in messages:
+        memory_storage.add(message)
+
+    if crash_after == "rotate":  # the snapshot is not written
+        mocker.patch.object(MemoryStorage, "_compact")
+    elif crash_after == "snapshot":  # the snapshot is written, the meta still says the segment is being folded
+
+        def write_meta(self, meta: dict):
+            if "segment_no" not in meta:
+                write_json_file(self.cache_dir / MEMORY_SNAPSHOT_META, meta)
+
+        mocker.patch.object(MemoryStorage, "_write_snapshot_meta", write_meta)
+        mocker.patch.object(MemoryStorage, "_drop_segments")
+    else:  # the snapshot and the meta are written, the segment is not deleted
+        mocker.patch.object(MemoryStorage, "_drop_segments")
+    memory_storage.persist()
+    memory_storage.wait_compaction()
+    assert memory_storage.role_mem_path.joinpath(f"{MEMORY_WAL_FILE}.1").exists()
+    mocker.stopall()
+    _mock_embeddings(mocker)
+
+    recovered = _new_storage(mocker, role_id)
+    assert _num_docs(recovered) == 2  # no message lost or replayed twice
+    recovered.wait_compaction()
+    assert not recovered.role_mem_path.joinpath(f"{MEMORY_WAL_FILE}.1").exists()
+
+    from_snapshot = _new_storage(mocker, role_id)
+    assert _num_docs(from_snapshot) == 2
+    from_snapshot.clean()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Desc   : unittest of `metagpt/memory/memory_wal.py`
+"""
+
+from metagpt.memory.memory_wal import MemoryWAL
+
+
+def test_append_and_read(tmp_path):
+    wal = MemoryWAL(tmp_path / "memory.wal")
+    wal.append([('{"content": "a"}', [1.0, 2.0]), ('{"content": "b"}', [3.0, 4.0])])
+    size = wal.path.stat().st_size
+    wal.append([('{"content": "c"}', [5.0, 6.0])])
+
+    records = list(MemoryWAL(wal.path).read())
+
+    assert [record[0] for record in records] == ['{"content": "a"}', '{"content": "b"}', '{"content": "c"}']
+    assert records[2][1].tolist() == [5.0, 6.0]
+    assert wal.num_records == MemoryWAL(wal.path).num_records == 3
+    assert wal.path.stat().st_size < 2 * size  # appended, not rewritten
+
+
+def test_truncated_record(tmp_path):
+    wal = MemoryWAL(tmp_path / "memory.wal")
+    wal.append([("{}", [1.0])])
+    size = wal.path.stat().st_size
+    with open(wal.path, "ab") as f:
+        f.write(b"\x02\x00\x00\x00\x01")
+
+    assert len(list(MemoryWAL(wal.path).read())) == 1
+    assert wal.path.stat().st_size == size
+
+
+def test_clear(tmp_path):
+    wal = MemoryWAL(tmp_path / "memory.wal")
+    wal.append([("{}", [1.0])])
+
+    wal.clear()
+
+    assert not wal.path.exists()
+    assert wal.num_records == 0
+    assert list(wal.read()) == []
+
+
+def test_rotate(tmp_path):
+    wal = MemoryWAL(tmp_path / "memory.wal")
+    wal.append([("{}", [1.0])])
+
+    segment = wal.rotate(tmp_path / "memory.wal.1")
+    wal.append([("[]", [2.0])])
+
+    assert [record[0] for record in MemoryWAL(segment).read()] == ["{}"]
+    assert [record[0] for record in MemoryWAL(wal.path).read()] == ["[]"]
+    assert wal.num_records == 1
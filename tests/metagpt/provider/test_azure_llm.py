@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 # @Desc   :
 
+from openai import AsyncAzureOpenAI
+
 from metagpt.provider import AzureOpenAILLM
 from tests.metagpt.provider.mock_llm_config import mock_llm_config_azure
 
@@ -10,3 +12,4 @@ def test_azure_llm():
     llm = AzureOpenAILLM(mock_llm_config_azure)
     kwargs = llm._make_client_kwargs()
     assert kwargs["azure_endpoint"] == mock_llm_config_azure.base_url
+    assert isinstance(llm.aclient, AsyncAzureOpenAI)
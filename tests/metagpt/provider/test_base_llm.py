@@ -5,6 +5,7 @@
 @Author  : alexanderwu
 @File    : test_base_llm.py
 """
+import asyncio
 
 import pytest
 
@@ -104,3 +105,45 @@ async def test_async_base_llm():
 
     # resp = await base_llm.aask_code([prompt])
     # assert resp == default_resp_cont
+
+
+@pytest.mark.asyncio
+async def test_aask_many(mocker):
+    async def mock_aask(self, msg, system_msgs=None, timeout=3, stream=True):
+        await asyncio.sleep(0.01 * (3 - int(msg)))  # later prompts finish first
+        return f"rsp {msg}"
+
+    mocker.patch("metagpt.provider.base_llm.BaseLLM.aask", mock_aask)
+    base_llm = MockBaseLLM()
+
+    resp = await base_llm.aask_many(["0", "1", "2"])
+    assert resp == ["rsp 0", "rsp 1", "rsp 2"]
+
+    resp = [i async for i in base_llm.aask_as_completed(["0", "1", "2"])]
+    assert resp == [(2, "rsp 2"), (1, "rsp 1"), (0, "rsp 0")]
+
+
+@pytest.mark.asyncio
+async def test_aask_many_concurrency(mocker):
+    in_flight, peak = 0, 0
+
+    async def mock_aask(self, msg, system_msgs=None, timeout=3, stream=True):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return f"rsp {msg}"
+
+    mocker.patch("metagpt.provider.base_llm.BaseLLM.aask", mock_aask)
+    base_llm = MockBaseLLM()
+    msgs = [str(i) for i in range(10)]
+
+    resp = await base_llm.aask_many(msgs, concurrency=3)
+    assert resp == [f"rsp {i}" for i in msgs]
+    assert peak == 3
+
+    peak = 0
+    resp = [i async for i in base_llm.aask_as_completed(msgs, concurrency=2)]
+    assert sorted(resp) == [(int(i), f"rsp {i}") for i in msgs]
+    assert peak == 2
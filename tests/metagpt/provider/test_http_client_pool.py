@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of http_client_pool
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from metagpt.provider.http_client_pool import (
+    close_http_clients,
+    get_aiohttp_session,
+    get_httpx_client,
+    get_httpx_client_from_config,
+    get_pool_stats,
+)
+from metagpt.provider.openai_api import OpenAILLM
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+
+CHAT_COMPLETION = {
+    "id": "chatcmpl-pool",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-3.5-turbo",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "hello"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class ChatCompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep the connections alive, so the clients pool them
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps(CHAT_COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def chat_server(monkeypatch):
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "http_proxy", "https_proxy", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChatCompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_httpx_client_pool():
+    base_url = "https://pool.test/v1"
+    client = get_httpx_client(base_url, api_key="key")
+    assert get_httpx_client(base_url, api_key="key") is client
+    assert get_httpx_client(base_url, api_key="other key") is not client
+    assert get_httpx_client(base_url, api_key="key", proxy="http://127.0.0.1:7890") is not client
+
+    config = mock_llm_config.model_copy(update={"max_connections": 10, "keepalive_expiry": 30})
+    assert get_httpx_client_from_config(config) is get_httpx_client_from_config(config.model_copy())
+    assert get_httpx_client_from_config(config) is not get_httpx_client_from_config(mock_llm_config)
+
+    stats = get_pool_stats()[base_url]
+    assert stats.clients == 3
+    assert stats.reused == 1
+    assert stats.connections == 0
+
+    await close_http_clients()
+    assert client.is_closed
+    assert get_httpx_client(base_url, api_key="key") is not client
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_session_pool():
+    base_url = "https://pool.test/aiohttp"
+    session = get_aiohttp_session(base_url)
+    assert get_aiohttp_session(base_url) is session
+    assert session.connector.limit == 100  # the aiohttp default when unset
+    limited = get_aiohttp_session(base_url, config=mock_llm_config.model_copy(update={"max_connections": 1}))
+    assert limited is not session
+    assert limited.connector.limit == 1
+
+    await close_http_clients()
+    assert session.closed
+    assert get_aiohttp_session(base_url) is not session
+    await close_http_clients()
+
+
+def test_httpx_client_per_event_loop(chat_server):
+    config = mock_llm_config.model_copy(update={"api_type": "openai", "base_url": chat_server, "proxy": None})
+    llm = OpenAILLM(config)  # created out of any event loop
+    clients = []
+
+    async def ask() -> str:
+        rsp = await llm.acompletion_text([{"role": "user", "content": "hi"}], stream=False)
+        clients.append(get_httpx_client_from_config(config))
+        return rsp
+
+    assert asyncio.run(ask()) == "hello"
+    assert asyncio.run(ask()) == "hello"  # the connection pooled in the first loop is not reused
+    assert clients[0] is not clients[1]
+    assert clients[0].is_closed  # closed when its loop shut down
+
+
+@pytest.mark.asyncio
+async def test_aclient_rebuilt_after_close():
+    llm = OpenAILLM(mock_llm_config)
+    aclient = llm.aclient
+    assert llm.aclient is aclient
+    assert aclient._client is get_httpx_client_from_config(mock_llm_config)
+
+    await close_http_clients()
+    assert llm.aclient is not aclient
+    assert not llm.aclient._client.is_closed
+    await close_http_clients()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of llm_cache
+
+import pytest
+
+from metagpt.actions.action_node import ActionNode
+from metagpt.configs.llm_cache_config import LLMCacheBackend, LLMCacheConfig
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.provider.base_llm import BaseLLM
+from metagpt.provider.llm_cache import (
+    SQLiteCache,
+    cache_on_accept,
+    get_response_cache,
+    make_cache_key,
+)
+from metagpt.provider.openai_api import OpenAILLM
+from metagpt.utils.cost_manager import CostManager
+from metagpt.utils.lru_cache import LRUCache
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+from tests.metagpt.provider.req_resp_const import get_part_chat_completion, messages
+
+
+class CountingLLM(BaseLLM):
+    def __init__(self, config: LLMConfig):
+        self.config = config
+        self.calls = 0
+
+    async def _achat_completion(self, messages: list[dict], timeout=3):
+        self.calls += 1
+        return get_part_chat_completion(f"GPT{self.calls}")
+
+    async def acompletion(self, messages: list[dict], timeout=3):
+        return await self._achat_completion(messages, timeout)
+
+    async def _achat_completion_stream(self, messages: list[dict], timeout: int = 3) -> str:
+        rsp = await self._achat_completion(messages, timeout)
+        return self.get_choice_text(rsp)
+
+
+def test_make_cache_key():
+    assert make_cache_key("gpt-4", messages, 0.0) == make_cache_key("gpt-4", list(messages), 0.0)
+    assert make_cache_key("gpt-4", messages, 0.0) != make_cache_key("gpt-4", messages, 0.5)
+    assert make_cache_key("gpt-4", messages, 0.0) != make_cache_key("gpt-3.5-turbo", messages, 0.0)
+    key = make_cache_key("gpt-4", messages, 0.0)
+    assert key != make_cache_key("gpt-4", messages, 0.0, tools=[{"type": "function"}])
+    assert key != make_cache_key("gpt-4", messages, 0.0, tool_choice="auto")
+    assert key != make_cache_key("gpt-4", messages, 0.0, max_token=100)
+
+
+def test_openai_cache_key_tools():
+    class ToolLLM(OpenAILLM):
+        def _cons_kwargs(self, messages: list[dict], **extra_kwargs) -> dict:
+            return super()._cons_kwargs(messages, tools=[{"type": "function"}], **extra_kwargs)
+
+    assert ToolLLM(mock_llm_config)._cache_key(messages) != OpenAILLM(mock_llm_config)._cache_key(messages)
+
+
+def test_sqlite_cache_eviction(tmp_path):
+    cache = SQLiteCache(tmp_path / "llm_cache.db", max_size=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("a", "1")  # replaced, within capacity
+    assert cache.get("b")[1] == "2"  # the most recently accessed
+    cache.set("c", "3")
+    assert cache.get("a") is None
+    assert cache.get("b")[1] == "2"
+    assert cache.get("c")[1] == "3"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", [LLMCacheBackend.MEMORY, LLMCacheBackend.SQLITE])
+async def test_acompletion_text_cache(backend, tmp_path):
+    cache_config = LLMCacheConfig(backend=backend, path=str(tmp_path / "llm_cache.db"))
+    llm = CountingLLM(mock_llm_config.model_copy(update={"cache": cache_config}))
+    llm.cost_manager = CostManager()
+
+    assert await llm.acompletion_text(messages) == "I'm GPT1"
+    assert await llm.acompletion_text(messages, stream=True) == "I'm GPT1"
+    assert llm.calls == 1
+    assert llm.cost_manager.cache_hits == 1
+    assert llm.cost_manager.cache_misses == 1
+
+    if backend == LLMCacheBackend.SQLITE:
+        get_response_cache(cache_config).memory = LRUCache()  # drop the memory layer, read from disk
+        assert await llm.acompletion_text(messages) == "I'm GPT1"
+        assert llm.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_acompletion_text_no_cache():
+    llm = CountingLLM(mock_llm_config)
+    assert await llm.acompletion_text(messages) == "I'm GPT1"
+    assert await llm.acompletion_text(messages) == "I'm GPT2"
+
+
+@pytest.mark.asyncio
+async def test_cache_on_accept(tmp_path):
+    cache_config = LLMCacheConfig(backend=LLMCacheBackend.SQLITE, path=str(tmp_path / "llm_cache.db"))
+    llm = CountingLLM(mock_llm_config.model_copy(update={"cache": cache_config}))
+
+    with pytest.raises(ValueError):
+        async with cache_on_accept():
+            assert await llm.acompletion_text(messages) == "I'm GPT1"
+            raise ValueError("rejected")
+    async with cache_on_accept():
+        assert await llm.acompletion_text(messages) == "I'm GPT2"  # the rejected response was not cached
+    assert await llm.acompletion_text(messages) == "I'm GPT2"
+
+    with pytest.raises(ValueError):
+        async with cache_on_accept():
+            assert await llm.acompletion_text(messages) == "I'm GPT2"
+            raise ValueError("rejected")
+    assert await llm.acompletion_text(messages) == "I'm GPT3"  # the rejected cache hit was evicted
+    assert llm.calls == 3
+
+    max_token_llm = CountingLLM(llm.config.model_copy(update={"max_token": 7}))
+    assert await max_token_llm.acompletion_text(messages) == "I'm GPT1"
+
+
+class ScriptedLLM(CountingLLM):
+    outputs = ['[CONTENT]\n{"key-a": ["not", "a", "str"]}\n[/CONTENT]', '[CONTENT]\n{"key-a": "value-a"}\n[/CONTENT]']
+
+    def get_choice_text(self, rsp: dict) -> str:
+        return self.outputs[self.calls - 1]
+
+
+@pytest.mark.asyncio
+async def test_action_node_retry_skips_rejected_cache(tmp_path):
+    cache_config = LLMCacheConfig(backend=LLMCacheBackend.SQLITE, path=str(tmp_path / "llm_cache.db"))
+    llm = ScriptedLLM(mock_llm_config.model_copy(update={"cache": cache_config}))
+
+    node = ActionNode(key="key-a", expected_type=str, instruction="instruction-b", example="example-c")
+    await node.fill(context="123", llm=llm, schema="json")
+    assert node.instruct_content.model_dump() == {"key-a": "value-a"}
+    assert llm.calls == 2  # the retry asked the llm again instead of reading the rejected output
+
+    await node.fill(context="123", llm=llm, schema="json")
+    assert llm.calls == 2  # the accepted output was cached
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of llm_limiter
+
+import asyncio
+
+import pytest
+
+from metagpt.provider.llm_limiter import (
+    TokenBucket,
+    get_rate_limiter,
+    get_semaphore,
+    llm_concurrency,
+)
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+
+
+@pytest.mark.asyncio
+async def test_llm_concurrency():
+    assert get_semaphore(mock_llm_config) is None
+
+    config = mock_llm_config.model_copy(update={"max_concurrency": 2})
+    assert get_semaphore(config) is get_semaphore(config.model_copy())
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def request():
+        nonlocal in_flight, max_in_flight
+        async with llm_concurrency(config):
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*[request() for _ in range(6)])
+    assert max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_priority():
+    assert get_rate_limiter(mock_llm_config) is None
+
+    config = mock_llm_config.model_copy(update={"rpm": 600, "tpm": 6000})
+    limiter = get_rate_limiter(config)
+    assert limiter is get_rate_limiter(config.model_copy())
+
+    # drain the buckets, then every request has to wait for the refill
+    limiter.request_bucket.level = 0
+    limiter.token_bucket.level = 0
+
+    order = []
+
+    async def request(name: str, priority: int):
+        async with llm_concurrency(config, tokens=10, priority=priority):
+            order.append(name)
+
+    tasks = [asyncio.create_task(request("low", 1))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(request("high", 0)))
+    await asyncio.gather(*tasks)
+
+    assert order == ["high", "low"]
+    assert limiter.stats.requests == 2
+    assert limiter.stats.tokens == 20
+    assert limiter.stats.waited_requests == 2
+    assert limiter.stats.max_wait >= 0.1
+
+
+def test_token_bucket():
+    bucket = TokenBucket(60)
+    assert bucket.delay(1) == 0
+    bucket.consume(60)
+    assert 0.9 < bucket.delay(1) <= 1
+    assert bucket.delay(600) <= 60  # amounts beyond the capacity wait for a full bucket only
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from openai.types.chat import (
     ChatCompletion,
@@ -92,17 +94,20 @@ def json_decode_error():
 
 
 class TestOpenAI:
-    def test_make_client_kwargs_without_proxy(self):
+    @pytest.mark.asyncio
+    async def test_make_client_kwargs_without_proxy(self):
         instance = OpenAILLM(mock_llm_config)
         kwargs = instance._make_client_kwargs()
         assert kwargs["api_key"] == "mock_api_key"
         assert kwargs["base_url"] == "mock_base_url"
-        assert "http_client" not in kwargs
+        # shared within the running event loop
+        assert kwargs["http_client"] is OpenAILLM(mock_llm_config)._make_client_kwargs()["http_client"]
 
     def test_make_client_kwargs_with_proxy(self):
         instance = OpenAILLM(mock_llm_config_proxy)
         kwargs = instance._make_client_kwargs()
         assert "http_client" in kwargs
+        assert kwargs["http_client"] is not OpenAILLM(mock_llm_config)._make_client_kwargs()["http_client"]
 
     def test_get_choice_function_arguments_for_aask_code(self, tool_calls_rsp):
         instance = OpenAILLM(mock_llm_config_proxy)
@@ -164,3 +169,24 @@ async def test_openai_acompletion(mocker):
     assert resp.usage == usage
 
     await llm_general_chat_funcs_test(llm, prompt, messages, resp_cont)
+
+
+@pytest.mark.asyncio
+async def test_openai_acompletion_text_concurrency(mocker):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def create(self, stream: bool = False, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return default_resp
+
+    mocker.patch("openai.resources.chat.completions.AsyncCompletions.create", create)
+    llm = OpenAILLM(mock_llm_config.model_copy(update={"max_concurrency": 1}))
+
+    rsps = await asyncio.gather(*[llm.acompletion_text(messages) for _ in range(3)])
+    assert rsps == [resp_cont] * 3
+    assert max_in_flight == 1
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+from llama_index.core.llms import MockLLM
+
+from metagpt.rag.benchmark import BenchmarkCase, RAGBenchmarkRunner
+from metagpt.rag.benchmark.base import DatasetInfo
+from metagpt.rag.benchmark.runner import CaseResult, LatencyStats, QueryRecord
+from metagpt.rag.embeddings import FakeEmbedding
+from metagpt.rag.schema import BM25RetrieverConfig, FAISSRetrieverConfig
+
+
+class TestRAGBenchmarkRunner:
+    @pytest.fixture
+    def dataset(self, tmp_path):
+        docs = ["apples are red", "bananas are yellow", "the sky is blue"]
+        doc_files = [tmp_path / f"doc_{i}.txt" for i in range(len(docs))]
+        for doc_file, doc in zip(doc_files, docs):
+            doc_file.write_text(doc)
+        gt_info = [
+            {"question": "what color are apples", "gt_answer": "red", "gt_reference": [docs[0]]},
+            {"question": "what color is the sky", "gt_answer": "blue", "gt_reference": docs[2]},
+        ]
+        return DatasetInfo(name="fake", document_files=[str(f) for f in doc_files], gt_info=gt_info)
+
+    @pytest.fixture
+    def runner(self):
+        cases = [
+            BenchmarkCase(name="faiss", retriever_configs=[FAISSRetrieverConfig(dimensions=8)]),
+            BenchmarkCase(name="bm25", retriever_configs=[BM25RetrieverConfig()]),
+        ]
+        return RAGBenchmarkRunner(
+            cases,
+            llm=MockLLM(max_tokens=4),
+            embed_model=FakeEmbedding(embed_dim=8),
+            concurrency=2,
+            token_counter=lambda text: len(text.split()),
+        )
+
+    @pytest.mark.asyncio
+    async def test_run_datasets(self, runner, dataset, tmp_path):
+        report = await runner.run_datasets([dataset])
+
+        assert [(r.dataset, r.case) for r in report.results] == [("fake", "faiss"), ("fake", "bm25")]
+        for result in report.results:
+            assert result.num_queries == 2
+            assert result.num_errors == 0
+            assert result.throughput > 0
+            assert result.retrieve.p99_ms >= result.retrieve.p50_ms > 0
+            assert result.synthesize.p50_ms > 0
+            assert result.completion_tokens_per_query == 4
+            assert result.prompt_tokens_per_query > 0
+            assert result.hit_rate == 1.0  # every doc is retrieved, as the top k is larger than the corpus
+
+        report_file = tmp_path / "report.json"
+        report.save(report_file, with_records=False)
+        saved = json.loads(report_file.read_text())
+        assert saved["concurrency"] == 2
+        assert "records" not in saved["results"][0]
+
+    @pytest.mark.asyncio
+    async def test_run_query_error(self, runner, mocker):
+        engine = mocker.MagicMock()
+        engine.aretrieve = mocker.AsyncMock(side_effect=ValueError("boom"))
+
+        record = await runner._run_query(engine, {"question": "q"})
+
+        assert record.error == "boom"
+
+    def test_latency_stats(self):
+        stats = LatencyStats.from_samples([i / 1000 for i in range(1, 101)])
+
+        assert stats.p50_ms == pytest.approx(50.5)
+        assert stats.p99_ms == pytest.approx(99.01)
+        assert LatencyStats.from_samples([]).p95_ms == 0
+
+    def test_case_result_cost(self):
+        records = [
+            QueryRecord(question="q", prompt_tokens=1000, completion_tokens=500),
+            QueryRecord(question="e", error="x"),
+        ]
+
+        result = CaseResult.from_records("ds", "case", records, wall_time=2.0, model_name="gpt-4-turbo")
+
+        assert result.num_errors == 1
+        assert result.throughput == 0.5
+        assert result.cost_per_query == pytest.approx(0.01 + 0.015)
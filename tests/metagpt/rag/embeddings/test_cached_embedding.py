@@ -0,0 +1,70 @@
+import pytest
+
+from metagpt.configs.embedding_cache_config import EmbeddingCacheConfig
+from metagpt.rag.embeddings import CachedEmbedding, EmbeddingCache, FakeEmbedding
+
+
+class TestCachedEmbedding:
+    @pytest.fixture
+    def fake_embedding(self):
+        return FakeEmbedding(embed_dim=4, embed_batch_size=2)
+
+    @pytest.fixture
+    def cached_embedding(self, fake_embedding):
+        return CachedEmbedding(fake_embedding)
+
+    def test_get_text_embedding_batch(self, fake_embedding, cached_embedding):
+        texts = ["a", "b", "a", "c"]
+
+        first = cached_embedding.get_text_embedding_batch(texts)
+        second = cached_embedding.get_text_embedding_batch(texts)
+
+        expected = fake_embedding.get_text_embedding_batch(texts)
+        assert first == expected
+        assert second == [pytest.approx(i, abs=1e-6) for i in expected]
+        assert cached_embedding.stats.embedded == 3
+        assert cached_embedding.stats.hits == 4
+        assert cached_embedding.stats.hit_rate == 0.5
+
+    @pytest.mark.asyncio
+    async def test_aget_text_embedding_batch(self, fake_embedding, cached_embedding):
+        texts = [str(i) for i in range(10)]
+        cached_embedding.get_text_embedding("0")
+        fake_embedding.num_calls = 0
+
+        embeddings = await cached_embedding.aget_text_embedding_batch(texts)
+
+        assert fake_embedding.num_calls == 5  # 9 misses in batches of 2
+        assert embeddings[1:] == fake_embedding.get_text_embedding_batch(texts[1:])
+        assert cached_embedding.stats.embedded == 10
+
+    @pytest.mark.asyncio
+    async def test_query_embedding(self, fake_embedding, cached_embedding):
+        cached_embedding.get_query_embedding("query")
+        await cached_embedding.aget_query_embedding("query")
+
+        assert fake_embedding.num_calls == 1
+        assert cached_embedding.stats.hits == 1
+
+    def test_from_config_persist(self, fake_embedding, tmp_path):
+        config = EmbeddingCacheConfig(path=str(tmp_path / "cache.db"))
+        CachedEmbedding.from_config(fake_embedding, config).get_text_embedding_batch(["a", "b"])
+
+        reloaded = CachedEmbedding.from_config(fake_embedding, config)
+        reloaded.get_text_embedding_batch(["a", "b"])
+
+        assert reloaded.stats.hits == 2
+        assert reloaded.stats.embedded == 0
+
+
+def test_embedding_cache_evicts_least_recently_used():
+    cache = EmbeddingCache(":memory:", max_size=2)
+    cache.set_many({"a": [1.0], "b": [2.0]})
+    cache.set_many({"b": [2.0]})  # replaced within capacity, nothing evicted
+    assert len(cache) == 2
+    cache.get_many(["a"])
+
+    cache.set_many({"c": [3.0]})
+
+    assert len(cache) == 2
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
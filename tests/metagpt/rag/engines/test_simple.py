@@ -2,14 +2,28 @@ import json
 
 import pytest
 from llama_index.core import VectorStoreIndex
-from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.embeddings import BaseEmbedding, MockEmbedding
 from llama_index.core.llms import MockLLM
-from llama_index.core.schema import Document, NodeWithScore, TextNode
+from llama_index.core.schema import Document, NodeWithScore, QueryBundle, TextNode
+from pydantic import BaseModel
 
 from metagpt.rag.engines import SimpleEngine
+from metagpt.rag.factories import get_retriever
 from metagpt.rag.retrievers import SimpleHybridRetriever
 from metagpt.rag.retrievers.base import ModifiableRAGRetriever, PersistableRAGRetriever
-from metagpt.rag.schema import BM25RetrieverConfig, ObjectNode
+from metagpt.rag.schema import (
+    BM25RetrieverConfig,
+    FAISSIndexConfig,
+    FAISSRetrieverConfig,
+    ObjectNode,
+)
+
+
+class Obj(BaseModel):
+    key: str
+
+    def rag_key(self):
+        return self.key
 
 
 class TestSimpleEngine:
@@ -113,6 +127,30 @@ class TestSimpleEngine:
         assert isinstance(engine, SimpleEngine)
         assert engine._transformations is not None
 
+    def test_objs_persist_and_load(self, tmp_path):
+        # Setup
+        embed_model = MockEmbedding(embed_dim=8)
+        retriever_configs = [FAISSRetrieverConfig(dimensions=8)]
+        engine = SimpleEngine.from_objs(
+            objs=[Obj(key="a")], llm=MockLLM(), embed_model=embed_model, retriever_configs=retriever_configs
+        )
+        engine.add_objs([Obj(key="b")])
+
+        # Exec
+        engine.persist(tmp_path)
+        loaded = SimpleEngine.from_index(
+            index_config=FAISSIndexConfig(persist_path=tmp_path),
+            llm=MockLLM(),
+            embed_model=embed_model,
+            retriever_configs=retriever_configs,
+        )
+        nodes = loaded.retrieve("a")
+
+        # Assert
+        docstore = json.loads((tmp_path / "docstore.json").read_text())
+        assert all(doc["__data__"]["metadata"]["obj_json"] is None for doc in docstore["docstore/data"].values())
+        assert sorted(node.metadata["obj"].key for node in nodes) == ["a", "b"]
+
     def test_from_objs_with_bm25_config(self):
         # Setup
         retriever_configs = [BM25RetrieverConfig()]
@@ -126,16 +164,17 @@ class TestSimpleEngine:
                 ranker_configs=[],
             )
 
-    def test_from_index(self, mocker, mock_llm, mock_embedding):
+    def test_from_index(self, mocker, mock_llm, mock_embedding, tmp_path):
         # Mock
         mock_index = mocker.MagicMock(spec=VectorStoreIndex)
         mock_index.as_retriever.return_value = "retriever"
         mock_get_index = mocker.patch("metagpt.rag.engines.simple.get_index")
         mock_get_index.return_value = mock_index
+        mock_get_retriever = mocker.patch("metagpt.rag.engines.simple.get_retriever", wraps=get_retriever)
 
         # Exec
         engine = SimpleEngine.from_index(
-            index_config=mock_index,
+            index_config=FAISSIndexConfig(persist_path=tmp_path),
             embed_model=mock_embedding,
             llm=mock_llm,
         )
@@ -143,6 +182,7 @@ class TestSimpleEngine:
         # Assert
         assert isinstance(engine, SimpleEngine)
         assert engine._retriever == "retriever"
+        assert mock_get_retriever.call_args.kwargs["persist_path"] == tmp_path
 
     @pytest.mark.asyncio
     async def test_asearch(self, mocker):
@@ -165,11 +205,14 @@ class TestSimpleEngine:
     @pytest.mark.asyncio
     async def test_aretrieve(self, mocker):
         # Mock
-        mock_query_bundle = mocker.patch("metagpt.rag.engines.simple.QueryBundle", return_value="query_bundle")
+        query_bundle = QueryBundle("test query")
+        mock_query_bundle = mocker.patch("metagpt.rag.engines.simple.QueryBundle", return_value=query_bundle)
         mock_super_aretrieve = mocker.patch(
             "metagpt.rag.engines.simple.RetrieverQueryEngine.aretrieve", new_callable=mocker.AsyncMock
         )
-        mock_super_aretrieve.return_value = [TextNode(text="node_with_score", metadata={"is_obj": False})]
+        mock_super_aretrieve.return_value = [
+            NodeWithScore(node=TextNode(text="node_with_score", metadata={"is_obj": False}))
+        ]
 
         # Setup
         engine = SimpleEngine(retriever=mocker.MagicMock())
@@ -180,9 +223,88 @@ class TestSimpleEngine:
 
         # Assert
         mock_query_bundle.assert_called_once_with(test_query)
-        mock_super_aretrieve.assert_called_once_with("query_bundle")
+        mock_super_aretrieve.assert_called_once_with(query_bundle)
         assert result[0].text == "node_with_score"
 
+    @pytest.mark.asyncio
+    async def test_aretrieve_cached(self, mocker):
+        # Mock
+        mock_super_aretrieve = mocker.patch(
+            "metagpt.rag.engines.simple.RetrieverQueryEngine.aretrieve", new_callable=mocker.AsyncMock
+        )
+        mock_super_aretrieve.return_value = [NodeWithScore(node=TextNode(text="node"), score=1.0)]
+
+        # Setup
+        engine = SimpleEngine(retriever=mocker.MagicMock(), query_cache_size=8)
+        uncached_engine = SimpleEngine(retriever=mocker.MagicMock())
+
+        # Exec
+        await uncached_engine.aretrieve("test query")
+        await uncached_engine.aretrieve("test query")
+        assert mock_super_aretrieve.call_count == 2
+        mock_super_aretrieve.reset_mock()
+        first = await engine.aretrieve("Test  Query")
+        first[0].score = 0.0
+        second = await engine.aretrieve("test query")
+        engine._save_nodes([TextNode(text="new node")])
+        await engine.aretrieve("test query")
+
+        # Assert
+        assert second[0].score == 1.0
+        assert mock_super_aretrieve.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_many(self, mocker):
+        # Mock
+        async def mock_aretrieve(query_bundle):
+            return [NodeWithScore(node=TextNode(text=query_bundle.query_str), score=1.0)]
+
+        mock_super_aretrieve = mocker.patch(
+            "metagpt.rag.engines.simple.RetrieverQueryEngine.aretrieve", side_effect=mock_aretrieve
+        )
+        mock_embed_model = mocker.MagicMock(spec=BaseEmbedding)
+        mock_embed_model.aget_text_embedding_batch = mock_embed = mocker.AsyncMock(return_value=[[1.0], [2.0]])
+        retriever = mocker.MagicMock()
+        retriever._embed_model = mock_embed_model
+
+        # Setup
+        engine = SimpleEngine(retriever=retriever, query_cache_size=8)
+        await engine.aretrieve("cached")
+
+        # Exec
+        results = await engine.aretrieve_many(["a", "b", "A", "cached"])
+
+        # Assert
+        assert [r[0].text for r in results] == ["a", "b", "a", "cached"]
+        assert mock_super_aretrieve.call_count == 3
+        mock_embed.assert_awaited_once_with(["a", "b"])  # one batch of the queries not cached
+        assert await engine.aretrieve("b") == results[1]
+        assert mock_super_aretrieve.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_many_different_embed_models(self, mocker):
+        # Mock
+        mocker.patch(
+            "metagpt.rag.engines.simple.RetrieverQueryEngine.aretrieve",
+            side_effect=lambda query_bundle: [NodeWithScore(node=TextNode(text=query_bundle.query_str), score=1.0)],
+        )
+        embed_models = [mocker.MagicMock(spec=BaseEmbedding) for _ in range(2)]
+        for embed_model in embed_models:
+            embed_model.aget_text_embedding_batch = mocker.AsyncMock(return_value=[[1.0], [2.0]])
+        retriever = mocker.MagicMock(spec=SimpleHybridRetriever)
+        retriever.retrievers = [mocker.MagicMock(_embed_model=embed_model) for embed_model in embed_models]
+
+        # Setup
+        engine = SimpleEngine(retriever=retriever)
+
+        # Exec
+        results = await engine.aretrieve_many(["a", "b"])
+
+        # Assert
+        assert [r[0].text for r in results] == ["a", "b"]
+        for embed_model in embed_models:
+            embed_model.aget_text_embedding_batch.assert_not_called()  # each retriever embeds with its own model
+
     def test_add_docs(self, mocker):
         # Mock
         mock_simple_directory_reader = mocker.patch("metagpt.rag.engines.simple.SimpleDirectoryReader")
@@ -298,3 +420,48 @@ class TestSimpleEngine:
         # Assert
         assert "obj" in node.node.metadata
         assert node.node.metadata["obj"] == expected_obj
+
+    def test_with_obj_metadata_memoized(self, mocker):
+        # Mock
+        metadata = {"is_obj": True, "obj_cls_name": "dict", "obj_mod_name": "builtins", "obj_json": "{}"}
+        nodes = [NodeWithScore(node=ObjectNode(text="example", metadata=dict(metadata))) for _ in range(2)]
+        nodes[1].node.id_ = nodes[0].node.node_id
+        mock_import_class = mocker.patch("metagpt.rag.engines.simple.import_class", return_value=dict)
+
+        # Setup
+        engine = SimpleEngine(retriever=mocker.MagicMock())
+
+        # Exec
+        engine._try_reconstruct_obj(nodes, engine._obj_cache)
+        nodes[0].metadata["obj"]["key"] = "changed by a caller"
+
+        # Assert
+        mock_import_class.assert_called_once()
+        assert nodes[1].metadata["obj"] == {}
+        engine._save_nodes([])
+        engine._try_reconstruct_obj(nodes, engine._obj_cache)
+        assert mock_import_class.call_count == 2  # invalidated with the index version
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_cached_obj_not_shared(self, mocker):
+        # Mock
+        metadata = {"is_obj": True, "obj_cls_name": "dict", "obj_mod_name": "builtins", "obj_json": "{}"}
+        mocker.patch(
+            "metagpt.rag.engines.simple.RetrieverQueryEngine.aretrieve",
+            return_value=[NodeWithScore(node=ObjectNode(text="example", metadata=metadata), score=1.0)],
+        )
+        mocker.patch("metagpt.rag.engines.simple.import_class", return_value=dict)
+
+        # Setup
+        engine = SimpleEngine(retriever=mocker.MagicMock(), query_cache_size=8)
+
+        # Exec
+        first = await engine.aretrieve("query")
+        first[0].metadata["obj"]["key"] = "changed by a caller"
+        first[0].metadata["extra"] = "changed by a caller"
+        second = await engine.aretrieve("query")
+
+        # Assert
+        assert second[0].metadata["obj"] == {}
+        assert "extra" not in second[0].metadata
+        assert "obj" not in metadata  # the node of the retriever is not modified
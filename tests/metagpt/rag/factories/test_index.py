@@ -52,7 +52,7 @@ class TestRAGIndexFactory:
         self, mocker, faiss_config, mock_storage_context, mock_load_index_from_storage, mock_embedding
     ):
         # Mock
-        mock_faiss_store = mocker.patch("metagpt.rag.factories.index.FaissVectorStore.from_persist_dir")
+        mock_faiss_store = mocker.patch("metagpt.rag.factories.index.FAISSVectorStore.from_persist_dir")
 
         # Exec
         self.index_factory.get_index(faiss_config, embed_model=mock_embedding)
@@ -18,6 +18,7 @@ from metagpt.rag.schema import (
     ElasticsearchRetrieverConfig,
     ElasticsearchStoreConfig,
     FAISSRetrieverConfig,
+    HybridRetrieverConfig,
 )
 
 
@@ -70,6 +71,15 @@ class TestRetrieverFactory:
 
         assert isinstance(retriever, DynamicBM25Retriever)
 
+    def test_get_retriever_with_bm25_config_and_persist_path(self, mocker, mock_nodes, tmp_path):
+        mock_config = BM25RetrieverConfig()
+        mock_load = mocker.patch.object(DynamicBM25Retriever, "load_bm25_index", return_value=None)
+
+        retriever = self.retriever_factory.get_retriever(configs=[mock_config], nodes=mock_nodes, persist_path=tmp_path)
+
+        assert isinstance(retriever, DynamicBM25Retriever)
+        mock_load.assert_called_once_with(tmp_path)
+
     def test_get_retriever_with_multiple_configs_returns_hybrid(self, mocker, mock_nodes, mock_embedding):
         mock_faiss_config = FAISSRetrieverConfig(dimensions=1)
         mock_bm25_config = BM25RetrieverConfig()
@@ -81,6 +91,18 @@ class TestRetrieverFactory:
 
         assert isinstance(retriever, SimpleHybridRetriever)
 
+    def test_get_retriever_with_hybrid_config(self, mock_nodes, mock_embedding):
+        hybrid_config = HybridRetrieverConfig(fusion_mode="rrf")
+
+        retriever = self.retriever_factory.get_retriever(
+            configs=[FAISSRetrieverConfig(dimensions=1), BM25RetrieverConfig()],
+            hybrid_config=hybrid_config,
+            nodes=mock_nodes,
+            embed_model=mock_embedding,
+        )
+
+        assert retriever.config == hybrid_config
+
     def test_get_retriever_with_chroma_config(self, mocker, mock_chroma_vector_store, mock_embedding):
         mock_config = ChromaRetrieverConfig(persist_path="/path/to/chroma", collection_name="test_collection")
         mock_chromadb = mocker.patch("metagpt.rag.factories.retriever.chromadb.PersistentClient")
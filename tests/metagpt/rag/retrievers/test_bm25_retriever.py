@@ -1,7 +1,9 @@
 import pytest
 from llama_index.core import VectorStoreIndex
-from llama_index.core.schema import Node
+from llama_index.core.schema import Node, TextNode
+from rank_bm25 import BM25Okapi
 
+from metagpt.rag.retrievers.bm25_index import BM25_INDEX_FILE
 from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever
 
 
@@ -16,10 +18,10 @@ class TestDynamicBM25Retriever:
 
         index = mocker.MagicMock(spec=VectorStoreIndex)
         index.storage_context.persist.return_value = "ok"
+        self.index = index
 
         mock_nodes = []
-        mock_tokenizer = mocker.MagicMock()
-        self.mock_bm25okapi = mocker.patch("rank_bm25.BM25Okapi.__init__", return_value=None)
+        mock_tokenizer = mocker.MagicMock(return_value=["document"])
 
         self.retriever = DynamicBM25Retriever(nodes=mock_nodes, tokenizer=mock_tokenizer, index=index)
 
@@ -29,9 +31,71 @@ class TestDynamicBM25Retriever:
 
         # Assert
         assert len(self.retriever._nodes) == len(self.mock_nodes)
-        assert len(self.retriever._corpus) == len(self.mock_nodes)
-        self.retriever._tokenizer.assert_called()
-        self.mock_bm25okapi.assert_called()
+        assert self.retriever._bm25.corpus_size == len(self.mock_nodes)
+        assert self.retriever._tokenizer.call_count == len(self.mock_nodes)
+        self.index.insert_nodes.assert_called_once()
 
-    def test_persist(self):
-        self.retriever.persist("")
+    def test_add_docs_retokenizes_readded_nodes(self):
+        # Setup
+        retriever = DynamicBM25Retriever(nodes=[TextNode(id_="1", text="apple")], index=self.index)
+
+        # Exec
+        retriever.add_nodes([TextNode(id_="1", text="banana"), TextNode(id_="2", text="cherry")])
+
+        # Assert
+        assert len(retriever._nodes) == 2
+        assert retriever._bm25.corpus_size == 2
+        assert "1" in retriever._bm25.get_scores(["banana"])
+        assert "1" not in retriever._bm25.get_scores(["apple"])
+
+    def test_delete_nodes(self):
+        # Setup
+        self.retriever.add_nodes(self.mock_nodes)
+
+        # Exec
+        self.retriever.delete_nodes([self.doc1.node_id])
+
+        # Assert
+        assert self.retriever._nodes == [self.doc2]
+        assert self.retriever._bm25.corpus_size == 1
+        self.index.delete_nodes.assert_called_once()
+
+    def test_persist(self, tmp_path):
+        self.retriever.persist(str(tmp_path))
+
+        assert (tmp_path / BM25_INDEX_FILE).exists()
+
+
+class TestDynamicBM25RetrieverScores:
+    @pytest.fixture
+    def nodes(self):
+        texts = ["apple banana", "banana cherry", "cherry apple apple", "durian", "elderberry fig", "banana banana"]
+        return [TextNode(text=text, id_=f"node{i}") for i, text in enumerate(texts)]
+
+    @pytest.mark.parametrize("query", ["apple", "banana cherry", "durian apple", "grape"])
+    def test_scores_same_as_bm25okapi(self, nodes, query):
+        retriever = DynamicBM25Retriever(nodes=nodes, tokenizer=str.split, similarity_top_k=3)
+        okapi = BM25Okapi([node.text.split() for node in nodes])
+        expected = sorted(zip(okapi.get_scores(query.split()), range(len(nodes))), key=lambda x: -x[0])[:3]
+
+        result = retriever.retrieve(query)
+
+        assert [(n.node.node_id, n.score) for n in result] == [(f"node{i}", pytest.approx(s)) for s, i in expected]
+
+    def test_reload_without_tokenizing(self, mocker, nodes, tmp_path):
+        index = mocker.MagicMock(spec=VectorStoreIndex)
+        retriever = DynamicBM25Retriever(nodes=nodes, tokenizer=str.split, index=index)
+        retriever.persist(str(tmp_path))
+
+        tokenizer = mocker.MagicMock(side_effect=str.split)
+        bm25_index = DynamicBM25Retriever.load_bm25_index(tmp_path)
+        reloaded = DynamicBM25Retriever(nodes=nodes[1:], tokenizer=tokenizer, bm25_index=bm25_index)
+
+        tokenizer.assert_not_called()
+        assert "node0" not in reloaded._bm25
+        result = reloaded.retrieve("cherry")
+        tokenizer.assert_called_once_with("cherry")
+        assert {n.node.node_id for n in result if n.score > 0} == {"node1", "node2"}
+
+    def test_load_bm25_index_not_found(self, tmp_path):
+        assert DynamicBM25Retriever.load_bm25_index(tmp_path) is None
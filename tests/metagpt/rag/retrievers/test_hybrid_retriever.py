@@ -1,7 +1,11 @@
+import asyncio
+
 import pytest
 from llama_index.core.schema import NodeWithScore, TextNode
 
 from metagpt.rag.retrievers import SimpleHybridRetriever
+from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever
+from metagpt.rag.schema import HybridRetrieverConfig
 
 
 class TestSimpleHybridRetriever:
@@ -55,3 +59,94 @@ class TestSimpleHybridRetriever:
     def test_persist(self, mock_hybrid_retriever: SimpleHybridRetriever):
         mock_hybrid_retriever.persist("")
         mock_hybrid_retriever.retrievers[0].persist.assert_called_once()
+
+
+class TestSimpleHybridRetrieverFusion:
+    @pytest.fixture
+    def results(self):
+        return [
+            [NodeWithScore(node=TextNode(id_="1"), score=10.0), NodeWithScore(node=TextNode(id_="2"), score=5.0)],
+            [NodeWithScore(node=TextNode(id_="2"), score=0.9), NodeWithScore(node=TextNode(id_="3"), score=0.1)],
+        ]
+
+    @staticmethod
+    def _mock_retrievers(mocker, results, delays=None):
+        retrievers = []
+        for nodes, delay in zip(results, delays or [0] * len(results)):
+
+            async def aretrieve(query, nodes=nodes, delay=delay):
+                await asyncio.sleep(delay)
+                return nodes
+
+            retriever = mocker.AsyncMock()
+            retriever.aretrieve.side_effect = aretrieve
+            retrievers.append(retriever)
+        return retrievers
+
+    @pytest.mark.asyncio
+    async def test_rrf(self, mocker, results):
+        retriever = SimpleHybridRetriever(
+            *self._mock_retrievers(mocker, results), config=HybridRetrieverConfig(fusion_mode="rrf", rrf_k=60)
+        )
+
+        nodes = await retriever._aretrieve("query")
+
+        assert [n.node.node_id for n in nodes] == ["2", "1", "3"]
+        assert nodes[0].score == pytest.approx(1 / 62 + 1 / 61)
+
+    @pytest.mark.asyncio
+    async def test_weighted(self, mocker, results):
+        config = HybridRetrieverConfig(fusion_mode="weighted", weights=[1.0, 2.0], similarity_top_k=2)
+        retriever = SimpleHybridRetriever(*self._mock_retrievers(mocker, results), config=config)
+
+        nodes = await retriever._aretrieve("query")
+
+        assert [(n.node.node_id, n.score) for n in nodes] == [("2", 2.0), ("1", 1.0)]
+
+    def test_weights_validated(self, mocker, results):
+        with pytest.raises(ValueError):
+            HybridRetrieverConfig(weights=[1.0, -1.0])
+        with pytest.raises(ValueError):
+            SimpleHybridRetriever(*self._mock_retrievers(mocker, results), config=HybridRetrieverConfig(weights=[1.0]))
+
+    @pytest.mark.asyncio
+    async def test_stats_per_retrieve(self, mocker):
+        async def aretrieve(query):
+            await asyncio.sleep(0.3 if query == "slow" else 0)
+            return [NodeWithScore(node=TextNode(id_=query), score=1.0)]
+
+        retrievers = [mocker.AsyncMock() for _ in range(2)]
+        for r in retrievers:
+            r.aretrieve.side_effect = aretrieve
+        retriever = SimpleHybridRetriever(*retrievers)
+
+        (slow_nodes, slow), (fast_nodes, fast) = await asyncio.gather(
+            retriever.aretrieve_with_stats("slow"), retriever.aretrieve_with_stats("fast")
+        )
+
+        assert [n.node.node_id for n in slow_nodes] == ["slow"]
+        assert [n.node.node_id for n in fast_nodes] == ["fast"]
+        assert slow.latency >= 0.3 > fast.latency
+
+    @pytest.mark.asyncio
+    async def test_concurrent_with_timeout(self, mocker, results):
+        retrievers = self._mock_retrievers(mocker, results, delays=[0.2, 5])
+        retriever = SimpleHybridRetriever(*retrievers, config=HybridRetrieverConfig(timeout=0.5))
+
+        nodes, stats = await retriever.aretrieve_with_stats("query")
+
+        assert [n.node.node_id for n in nodes] == ["1", "2"]
+        assert stats.latency < 1
+        assert [i.timed_out for i in stats.retrievers] == [False, True]
+        assert stats.retrievers[0].num_nodes == 2
+
+    @pytest.mark.asyncio
+    async def test_sync_retriever_in_thread(self, mocker):
+        nodes = [TextNode(text="apple banana", id_="1"), TextNode(text="cherry", id_="2")]
+        bm25 = DynamicBM25Retriever(nodes=nodes, tokenizer=str.split)
+        other = self._mock_retrievers(mocker, [[]])[0]
+        retriever = SimpleHybridRetriever(bm25, other)
+
+        result = await retriever._aretrieve("apple")
+
+        assert result[0].node.node_id == "1"
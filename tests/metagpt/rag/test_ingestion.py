@@ -0,0 +1,154 @@
+import pytest
+from llama_index.core.node_parser import SentenceSplitter
+
+from metagpt.rag.embeddings import FakeEmbedding
+from metagpt.rag.engines import SimpleEngine
+from metagpt.rag.ingestion import (
+    INGEST_CHECKPOINT_FILE,
+    StreamingIngestion,
+    load_and_transform,
+)
+from metagpt.rag.retrievers.faiss_retriever import FAISSRetriever
+from metagpt.rag.schema import (
+    BM25RetrieverConfig,
+    ChromaRetrieverConfig,
+    FAISSRetrieverConfig,
+    StreamingIngestionConfig,
+)
+from metagpt.rag.vector_stores import FAISSVectorStore
+
+
+class TestStreamingIngestion:
+    @pytest.fixture
+    def input_files(self, tmp_path):
+        docs_dir = tmp_path / "docs"
+        docs_dir.mkdir()
+        files = []
+        for i in range(5):
+            path = docs_dir / f"doc{i}.txt"
+            path.write_text(f"document {i} talks about topic {i}.")
+            files.append(str(path))
+        return files
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        return StreamingIngestionConfig(persist_path=tmp_path / "index", num_workers=0, files_per_batch=2)
+
+    @staticmethod
+    def _ingestion(config):
+        return StreamingIngestion(config, transformations=[SentenceSplitter()], embed_model=FakeEmbedding())
+
+    def test_run(self, input_files, config):
+        index = self._ingestion(config).run(input_files)
+
+        assert len(index.docstore.docs) == len(input_files)
+        assert (config.persist_path / INGEST_CHECKPOINT_FILE).exists()
+
+    def test_run_with_process_pool(self, input_files, config):
+        config.num_workers = 2
+
+        index = self._ingestion(config).run(input_files)
+
+        assert len(index.docstore.docs) == len(input_files)
+
+    def test_saved_every_checkpoint(self, mocker, input_files, config):
+        config.batches_per_checkpoint = 2
+        saved = []
+        save = StreamingIngestion._save
+
+        def counting_save(self, index, finished):
+            saved.append(len(finished))
+            save(self, index, finished)
+
+        mocker.patch.object(StreamingIngestion, "_save", counting_save)
+
+        self._ingestion(config).run(input_files)
+
+        # 3 batches: saved after the second one and at the end, not after every batch
+        assert saved == [4, 5]
+
+    def test_faiss(self, mocker, input_files, config):
+        faiss_config = FAISSRetrieverConfig(dimensions=FakeEmbedding().embed_dim, index_factory="HNSW32")
+        index = StreamingIngestion(
+            config, transformations=[SentenceSplitter()], embed_model=FakeEmbedding(), faiss_config=faiss_config
+        ).run(input_files[:3])
+        assert isinstance(index.vector_store, FAISSVectorStore)
+
+        index = StreamingIngestion(
+            config, transformations=[SentenceSplitter()], embed_model=FakeEmbedding(), faiss_config=faiss_config
+        ).run(input_files)
+        assert isinstance(index.vector_store, FAISSVectorStore)
+        assert index.vector_store.ntotal == len(index.docstore.docs) == len(input_files)
+
+    def test_resume(self, mocker, input_files, config):
+        # interrupted after the second batch is inserted, before it is checkpointed
+        config.batches_per_checkpoint = 1
+        save_checkpoint = StreamingIngestion._save_checkpoint
+        calls = []
+
+        def interrupt(self, finished):
+            calls.append(finished)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            save_checkpoint(self, finished)
+
+        mocker.patch.object(StreamingIngestion, "_save_checkpoint", interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            self._ingestion(config).run(input_files)
+        mocker.stopall()
+
+        spy = mocker.patch("metagpt.rag.ingestion.load_and_transform", wraps=load_and_transform)
+        index = self._ingestion(config).run(input_files)
+
+        assert sorted(call.args[0] for call in spy.call_args_list) == input_files[2:]
+        assert sorted(node.metadata["file_path"] for node in index.docstore.docs.values()) == input_files
+
+    def test_modified_file_ingested_again(self, mocker, input_files, config):
+        self._ingestion(config).run(input_files)
+        with open(input_files[0], "a") as f:
+            f.write(" updated")
+
+        spy = mocker.patch("metagpt.rag.ingestion.load_and_transform", wraps=load_and_transform)
+        index = self._ingestion(config).run(input_files)
+
+        assert [call.args[0] for call in spy.call_args_list] == input_files[:1]
+        assert len(index.docstore.docs) == len(input_files)
+        assert any("updated" in node.text for node in index.docstore.docs.values())
+
+
+def test_from_docs_streaming(tmp_path, mocker):
+    mocker.patch("metagpt.rag.engines.simple.get_rag_llm")
+    doc = tmp_path / "doc.txt"
+    doc.write_text("streaming ingestion")
+    config = StreamingIngestionConfig(persist_path=tmp_path / "index", num_workers=0)
+
+    engine = SimpleEngine.from_docs(input_files=[str(doc)], embed_model=FakeEmbedding(), ingestion_config=config)
+
+    assert engine.retrieve("streaming")[0].text == "streaming ingestion"
+
+
+@pytest.mark.asyncio
+async def test_from_docs_streaming_retriever_configs(tmp_path, mocker):
+    mocker.patch("metagpt.rag.engines.simple.get_rag_llm")
+    doc = tmp_path / "doc.txt"
+    doc.write_text("streaming ingestion")
+    config = StreamingIngestionConfig(persist_path=tmp_path / "index", num_workers=0)
+    faiss_config = FAISSRetrieverConfig(dimensions=FakeEmbedding().embed_dim)
+
+    engine = SimpleEngine.from_docs(
+        input_files=[str(doc)],
+        embed_model=FakeEmbedding(),
+        ingestion_config=config,
+        retriever_configs=[faiss_config, BM25RetrieverConfig()],
+    )
+    faiss_retriever = next(r for r in engine.retriever.retrievers if isinstance(r, FAISSRetriever))
+    assert isinstance(faiss_retriever._index.vector_store, FAISSVectorStore)
+    assert (await engine.aretrieve("streaming"))[0].text == "streaming ingestion"
+
+    with pytest.raises(ValueError):
+        SimpleEngine.from_docs(
+            input_files=[str(doc)],
+            embed_model=FakeEmbedding(),
+            ingestion_config=config,
+            retriever_configs=[ChromaRetrieverConfig(persist_path=tmp_path / "chroma")],
+        )
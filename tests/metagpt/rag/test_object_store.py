@@ -0,0 +1,67 @@
+from metagpt.rag.object_store import OBJECT_STORE_FILE, ObjectStore
+
+
+class TestObjectStore:
+    def test_add_get(self):
+        store = ObjectStore()
+        store.add("a", '{"key": "a"}')
+
+        assert store.get("a") == '{"key": "a"}'
+        assert store.get("missing") is None
+        assert "a" in store
+        assert len(store) == 1
+
+    def test_persist_appends_new_records(self, tmp_path):
+        persist_path = tmp_path / OBJECT_STORE_FILE
+        store = ObjectStore()
+        store.add("a", "x" * 1000)
+        store.persist(persist_path)
+        size = persist_path.stat().st_size
+
+        store.persist(persist_path)
+        assert persist_path.stat().st_size == size
+
+        store.add("b", "y")
+        store.persist(persist_path)
+        assert size < persist_path.stat().st_size < size + 50
+        assert size < 1000  # compressed
+
+    def test_load_lazily(self, tmp_path):
+        store = ObjectStore()
+        store.add("a", "1")
+        store.add("b", "2")
+        store.persist(tmp_path / OBJECT_STORE_FILE)
+        store.add("a", "3")
+        store.persist(tmp_path / OBJECT_STORE_FILE)
+
+        loaded = ObjectStore.from_persist_dir(tmp_path)
+
+        assert len(loaded) == 2
+        assert loaded.get("a") == "3"
+        assert loaded.get("b") == "2"
+
+    def test_persist_to_another_path(self, tmp_path):
+        store = ObjectStore()
+        store.add("a", "1")
+        store.persist(tmp_path / "first" / OBJECT_STORE_FILE)
+        store.add("b", "2")
+
+        store.persist(tmp_path / "second" / OBJECT_STORE_FILE)
+
+        assert ObjectStore.from_persist_dir(tmp_path / "first").get("b") is None
+        loaded = ObjectStore.from_persist_dir(tmp_path / "second")
+        assert (loaded.get("a"), loaded.get("b")) == ("1", "2")
+
+    def test_truncated_record(self, tmp_path):
+        persist_path = tmp_path / OBJECT_STORE_FILE
+        store = ObjectStore()
+        store.add("a", "1")
+        store.persist(persist_path)
+        size = persist_path.stat().st_size
+        with open(persist_path, "ab") as f:
+            f.write(b"\x05\x00\x00")
+
+        loaded = ObjectStore(persist_path)
+
+        assert loaded.get("a") == "1"
+        assert persist_path.stat().st_size == size
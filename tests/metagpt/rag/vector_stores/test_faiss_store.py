@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import VectorStoreQuery
+
+from metagpt.rag.vector_stores import FAISSVectorStore, faiss_store
+from metagpt.rag.vector_stores.faiss_store import DELTA_SUFFIX
+
+DIM = 8
+
+
+def _nodes(vectors: np.ndarray) -> list[TextNode]:
+    return [TextNode(text=str(i), embedding=v.tolist()) for i, v in enumerate(vectors)]
+
+
+def _query(store: FAISSVectorStore, vector: np.ndarray, k: int = 1) -> list[str]:
+    return store.query(VectorStoreQuery(query_embedding=vector.tolist(), similarity_top_k=k)).ids
+
+
+class TestFAISSVectorStore:
+    @pytest.fixture
+    def vectors(self):
+        return np.random.default_rng(0).random((300, DIM), dtype="float32")
+
+    @pytest.fixture
+    def persist_path(self, tmp_path):
+        return str(tmp_path / "default__vector_store.json")
+
+    @pytest.mark.parametrize("index_factory", ["Flat", "HNSW16", "IVF4,Flat", "IVF4,SQ8"])
+    def test_add_and_query(self, vectors, index_factory):
+        store = FAISSVectorStore.from_factory(DIM, index_factory, train_size=100, search_params={})
+
+        ids = store.add(_nodes(vectors))
+
+        assert ids == [str(i) for i in range(len(vectors))]
+        assert store.client.is_trained
+        assert _query(store, vectors[42]) == ["42"]
+
+    def test_query_before_training(self, vectors):
+        store = FAISSVectorStore.from_factory(DIM, "IVF4,PQ2", train_size=1000)
+
+        store.add(_nodes(vectors[:10]))
+
+        assert not store.client.is_trained
+        assert store.ntotal == 10
+        assert _query(store, vectors[3], k=2)[0] == "3"
+
+    def test_persist_incremental(self, vectors, persist_path):
+        store = FAISSVectorStore.from_factory(DIM)
+        store.add(_nodes(vectors[:100]))
+        store.persist(persist_path)
+
+        store.add(_nodes(vectors[100:110]))
+        store.persist(persist_path)
+        assert len(np.fromfile(persist_path + DELTA_SUFFIX, dtype="float32")) == 10 * DIM
+
+        store.add(_nodes(vectors[110:200]))  # delta over compact_ratio, write the whole index
+        store.persist(persist_path)
+        assert len(np.fromfile(persist_path + DELTA_SUFFIX, dtype="float32")) == 0
+
+        store.add(_nodes(vectors[200:210]))
+        store.persist(persist_path)
+        loaded = FAISSVectorStore.from_persist_path(persist_path)
+        assert loaded.ntotal == 210
+        assert _query(loaded, vectors[205]) == ["205"]
+
+    def test_persist_untrained(self, vectors, persist_path):
+        store = FAISSVectorStore.from_factory(DIM, "IVF4,Flat", train_size=200)
+        store.add(_nodes(vectors[:150]))
+        store.persist(persist_path)
+
+        loaded = FAISSVectorStore.from_persist_path(persist_path, train_size=200)
+        loaded.add(_nodes(vectors[150:]))
+
+        assert loaded.client.is_trained
+        assert loaded.ntotal == len(vectors)
+
+    def test_mmap(self, vectors, persist_path):
+        store = FAISSVectorStore.from_factory(DIM, "IVF4,Flat", train_size=100, search_params={"nprobe": 4})
+        store.add(_nodes(vectors))
+        store.persist(persist_path)
+
+        loaded = FAISSVectorStore.from_persist_dir(str(persist_path.rsplit("/", 1)[0]), mmap=True)
+        assert _query(loaded, vectors[7]) == ["7"]
+
+        loaded.add(_nodes(vectors[:1]))  # read into memory before adding
+        assert loaded.ntotal == len(vectors) + 1
+
+    def test_mmap_with_delta(self, mocker, vectors, persist_path):
+        store = FAISSVectorStore.from_factory(DIM, "IVF4,Flat", train_size=100, search_params={"nprobe": 4})
+        store.add(_nodes(vectors[:250]))
+        store.persist(persist_path)
+        store.add(_nodes(vectors[250:]))
+        store.persist(persist_path)  # appended to the delta file
+
+        read_index = mocker.spy(faiss_store.faiss, "read_index")
+        loaded = FAISSVectorStore.from_persist_dir(str(persist_path.rsplit("/", 1)[0]), mmap=True)
+        assert read_index.call_count == 1  # mapped, the delta is not added to the index
+        assert loaded.ntotal == len(vectors)
+        assert _query(loaded, vectors[7]) == ["7"]
+        assert _query(loaded, vectors[280]) == ["280"]
+        assert len(_query(loaded, vectors[280], k=5)) == 5
+
+        loaded.add(_nodes(vectors[:1]))
+        assert read_index.call_count == 2
+        assert loaded.ntotal == len(vectors) + 1
+        assert _query(loaded, vectors[280]) == ["280"]
@@ -60,5 +60,38 @@ async def test_publish_and_process_message(env: Environment):
     assert len(env.history) > 10
 
 
+def test_publish_routing():
+    env = Environment(history_size=2)
+    role1 = Role(name="Alice", profile="product manager")
+    role2 = Role(name="Bob", profile="engineer")
+    env.add_roles([role1, role2])
+
+    env.publish_message(Message(content="to alice", send_to="Alice"))
+    assert not role1.rc.msg_buffer.empty()
+    assert role2.rc.msg_buffer.empty()
+
+    role1.set_addresses({"Carol"})
+    env.publish_message(Message(content="to alice again", send_to="Alice"))
+    assert len(role1.rc.msg_buffer.pop_all()) == 1
+
+    env.publish_message(Message(content="to all"))
+    assert len(role1.rc.msg_buffer.pop_all()) == 1
+    assert len(role2.rc.msg_buffer.pop_all()) == 1
+    assert env.history == "\nuser: to alice again\nuser: to all"
+
+
+@pytest.mark.asyncio
+async def test_run_skip_idle(env: Environment, mocker):
+    role1 = Role(name="Alice", profile="product manager")
+    role2 = Role(name="Bob", profile="engineer")
+    env.add_roles([role1, role2])
+    run = mocker.patch.object(Role, "run", autospec=True)
+
+    env.publish_message(Message(content="to alice", send_to="Alice"))
+    await env.run()
+    run.assert_called_once_with(role1)
+    assert len(env.round_costs) == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -154,5 +154,21 @@ async def test_think_act():
     assert rsp.content == "run"
 
 
+@pytest.mark.asyncio
+async def test_observe_unseen():
+    role = Role()
+    msg = Message(content="req")
+    role.put_message(msg)
+    role.put_message(Message(content="other", cause_by=MockAction))
+    assert await role._observe() == 1
+    assert role.rc.observe_rounds == 1
+    assert role.rc.observe_scanned == 2
+
+    role.put_message(msg)
+    assert await role._observe() == 0
+    assert role.rc.observe_scanned == 3
+    assert role.rc.memory.count() == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
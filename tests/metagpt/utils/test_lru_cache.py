@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of lru_cache
+
+from metagpt.utils.lru_cache import LRUCache
+
+
+def test_lru_cache():
+    cache = LRUCache(max_size=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    cache.delete("a")
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+    cache = LRUCache(ttl=10)
+    cache.set("a", "1", created=1)
+    assert cache.get("a") is None
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of stream_output_parser
+
+from typing import List
+
+import pytest
+
+from metagpt.actions.action_node import ActionNode
+from metagpt.utils.stream_output_parser import StreamOutputAbort, StreamOutputParser
+
+OUTPUT_CLASS = ActionNode.create_model_class(
+    "stream_test", {"Language": (str, ...), "Requirements": (List[str], ...), "Nested": {"Count": (int, ...)}}
+)
+
+
+def _feed(parser: StreamOutputParser, text: str, size: int = 3):
+    for i in range(0, len(text), size):
+        parser.feed(text[i : i + size])
+
+
+def test_stream_output_parser():
+    ready = []
+    parser = StreamOutputParser(OUTPUT_CLASS, on_field=lambda k, v: ready.append(k))
+    text = (
+        'ok\n[CONTENT]\n```json\n{"Language": "en, \\"us\\" {", "Requirements": ["a", "b]"], '
+        '"Nested": {"Count": 1, "x": [1, {"y": 2}]}, "Extra": 1}\n```\n[/CONTENT]'
+    )
+    _feed(parser, text)
+    assert parser.done
+    assert ready == ["Language", "Requirements", "Nested"]
+    assert parser.fields["Language"] == 'en, "us" {'
+    assert parser.fields["Requirements"] == ["a", "b]"]
+    assert parser.fields["Nested"].Count == 1
+
+
+def test_stream_output_parser_abort():
+    parser = StreamOutputParser(OUTPUT_CLASS)
+    parser.feed('[CONTENT]\n{"Language": "en", "Requirements": ')
+    assert parser.fields == {"Language": "en"}
+    with pytest.raises(StreamOutputAbort):
+        _feed(parser, '{"a": 1}, "Nested": {"Count": 1}}')
+
+    with pytest.raises(StreamOutputAbort):
+        _feed(StreamOutputParser(OUTPUT_CLASS), "[CONTENT]\nno json here\n[/CONTENT]")
+
+
+def test_stream_output_parser_repairable():
+    parser = StreamOutputParser(OUTPUT_CLASS)
+    _feed(parser, "[CONTENT]\n{'Language': 'en', \"Requirements\": [\"a\"],}\n[/CONTENT]")
+    assert parser.done
+    assert parser.fields == {"Requirements": ["a"]}  # invalid json is left to the repair of the full output
@@ -51,6 +51,13 @@ def test_generate_prompt_chunk(text, prompt_template, model_name, system_text, r
     assert chunk == expected
 
 
+def test_generate_prompt_chunk_keep_text():
+    text = "\n".join(_paragraphs(i) for i in range(1, 500)) + "\n" + "Hello World" * 8000
+    chunks = list(generate_prompt_chunk(text, "{}", "gpt-3.5-turbo-0613", "System", 1000))
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+
+
 @pytest.mark.parametrize(
     "paragraph, sep, count, expected",
     [
@@ -7,7 +7,12 @@
 """
 import pytest
 
-from metagpt.utils.token_counter import count_message_tokens, count_string_tokens
+from metagpt.utils.token_counter import (
+    count_message_tokens,
+    count_string_tokens,
+    count_strings_tokens,
+    get_encoding,
+)
 
 
 def test_count_message_tokens():
@@ -69,5 +74,19 @@ def test_count_string_tokens_gpt_4():
     assert count_string_tokens(string, model_name="gpt-4-0314") == 4
 
 
+def test_count_strings_tokens():
+    """Test that the batch counts match the one by one counts."""
+
+    strings = ["Hello, world!", "", "Hi there!"]
+    expected = [count_string_tokens(i, model_name="gpt-3.5-turbo-0613") for i in strings]
+    assert count_strings_tokens(strings, model_name="gpt-3.5-turbo-0613") == expected
+    assert count_strings_tokens([], model_name="gpt-3.5-turbo-0613") == []
+
+
+def test_get_encoding_cached():
+    assert get_encoding("gpt-4-0314") is get_encoding("gpt-4-0314")
+    assert get_encoding("invalid_model").name == "cl100k_base"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])